@@ -0,0 +1,231 @@
+'''
+Benchmarks for the LWOTai engine's hot paths.
+
+Times each path for ops/sec, measures the peak memory one call allocates and
+compares the results against a baseline saved by an earlier run.
+
+  python bench_labyrinth.py --save baseline.json
+  python bench_labyrinth.py --compare baseline.json
+'''
+
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+from collections import namedtuple
+
+from lwotai import Labyrinth, Dice, NullSink
+from simulator import Simulator
+
+BENCH_SCENARIO = 3
+BENCH_SEED = 1
+# Jihadist hand for the flowchart benchmark, a mix of events and cards the AI
+# plays for Ops.
+FLOWCHART_HAND = [61, 64, 68, 72, 79, 84, 88, 100]
+# A run this much slower than the baseline counts as a regression.
+DEFAULT_THRESHOLD = 0.2
+
+BenchResult = namedtuple("BenchResult", [
+  "name",
+  "opsPerSec",
+  "peakBytes",    # peak memory allocated during one call
+])
+
+def startPosition():
+  '''A quiet game at the start of the benchmark scenario.'''
+  app = Labyrinth(BENCH_SCENARIO, 1, dice = Dice(BENCH_SEED), sink = NullSink())
+  app.autoSave = False
+  app.history.enabled = False
+  return app
+
+def cycle(items):
+  '''Next item of items on each call, round and round.'''
+  state = [0]
+  def nextItem():
+    item = items[state[0]]
+    state[0] = (state[0] + 1) % len(items)
+    return item
+  return nextItem
+
+def benchConstruction():
+  return lambda: Labyrinth(BENCH_SCENARIO, 1, dice = Dice(BENCH_SEED), sink = NullSink())
+
+def benchCountryDistance():
+  app = startPosition()
+  pairs = cycle([(start, end) for start in app.countryNames for end in app.countryNames])
+  def run():
+    start, end = pairs()
+    app.countryDistance(start, end)
+  return run
+
+def benchIsAdjacent():
+  app = startPosition()
+  pairs = cycle([(here, there) for here in app.countryNames for there in app.countryNames])
+  def run():
+    here, there = pairs()
+    app.isAdjacent(here, there)
+  return run
+
+def benchTravel():
+  app = startPosition()
+  def run():
+    destinations = app.travelDestinations(3)
+    app.travelSources(destinations, 3)
+  return run
+
+def benchRecruitChoice():
+  app = startPosition()
+  return lambda: app.recruitChoice(3)
+
+def benchMajorJihadPossible():
+  app = startPosition()
+  return lambda: app.majorJihadPossible(3)
+
+def benchExecutePlot():
+  app = startPosition()
+  def run():
+    app.clone().executePlot(3, True, [1, 2, 3])
+  return run
+
+def benchPlayable():
+  app = startPosition()
+  cards = list(app.deck.values())
+  def run():
+    app.playableCache.clear()
+    for card in cards:
+      card.playable("US", app, False)
+      card.playable("Jihadist", app, False)
+  return run
+
+def benchPlayableCached():
+  app = startPosition()
+  cards = list(app.deck.values())
+  def run():
+    for card in cards:
+      card.playable("US", app, False)
+      card.playable("Jihadist", app, False)
+  return run
+
+def benchFlowchartTurn():
+  sim = Simulator(BENCH_SCENARIO, 1, BENCH_SEED)
+  sim.app = startPosition()
+  sim.acting = "Jihadist"
+  def run():
+    app = sim.app.clone()
+    app.my_raw_input = sim.respond
+    for cardNum in FLOWCHART_HAND:
+      sim.guarded(app.aiFlowChartTop, cardNum)
+  return run
+
+def benchSimulatedGame():
+  return lambda: Simulator(BENCH_SCENARIO, 1, BENCH_SEED).run()
+
+BENCHMARKS = [
+  ("construction", benchConstruction),
+  ("countryDistance", benchCountryDistance),
+  ("isAdjacent", benchIsAdjacent),
+  ("travelDestinations+Sources", benchTravel),
+  ("recruitChoice", benchRecruitChoice),
+  ("majorJihadPossible", benchMajorJihadPossible),
+  ("executePlot", benchExecutePlot),
+  ("playable deck", benchPlayable),
+  ("playable deck cached", benchPlayableCached),
+  ("aiFlowChartTop hand", benchFlowchartTurn),
+  ("simulated game", benchSimulatedGame),
+]
+
+def timeCall(func, minTime, rounds):
+  '''Best ops/sec over rounds of at least minTime seconds each.'''
+  func()
+  number = 1
+  while True:
+    start = time.perf_counter()
+    for i in range(number):
+      func()
+    elapsed = time.perf_counter() - start
+    if elapsed >= minTime:
+      break
+    number = max(number * 2, int(number * minTime * 1.2 / max(elapsed, 1e-6)))
+  best = elapsed / number
+  for i in range(rounds - 1):
+    start = time.perf_counter()
+    for i in range(number):
+      func()
+    best = min(best, (time.perf_counter() - start) / number)
+  return 1.0 / best
+
+def peakAllocation(func):
+  tracemalloc.start()
+  try:
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    func()
+    return tracemalloc.get_traced_memory()[1] - base
+  finally:
+    tracemalloc.stop()
+
+def runBenchmarks(names = None, minTime = 0.2, rounds = 3):
+  '''Run the benchmarks whose names contain one of names (all by default).'''
+  results = []
+  for name, setup in BENCHMARKS:
+    if names and not any(part.lower() in name.lower() for part in names):
+      continue
+    func = setup()
+    results.append(BenchResult(name, timeCall(func, minTime, rounds), peakAllocation(func)))
+  return results
+
+def toJson(results):
+  return {
+    "python": platform.python_version(),
+    "benchmarks": dict((r.name, {"opsPerSec": r.opsPerSec, "peakBytes": r.peakBytes}) for r in results),
+  }
+
+def compare(results, baseline, threshold = DEFAULT_THRESHOLD):
+  '''(name, speed relative to baseline, regressed) for each result in the baseline.'''
+  rows = []
+  for r in results:
+    old = baseline["benchmarks"].get(r.name)
+    if not old:
+      continue
+    ratio = r.opsPerSec / old["opsPerSec"]
+    rows.append((r.name, ratio, ratio < 1 - threshold))
+  return rows
+
+def report(results, rows = ()):
+  ratios = dict((name, (ratio, regressed)) for name, ratio, regressed in rows)
+  lines = ["%-28s %14s %12s" % ("Benchmark", "ops/sec", "peak KiB")]
+  for r in results:
+    line = "%-28s %14.1f %12.1f" % (r.name, r.opsPerSec, r.peakBytes / 1024.0)
+    if r.name in ratios:
+      ratio, regressed = ratios[r.name]
+      line += "  %5.2fx%s" % (ratio, "  REGRESSION" if regressed else "")
+    lines.append(line)
+  return "\n".join(lines)
+
+def main(argv = None):
+  parser = argparse.ArgumentParser(description = "Benchmark the LWOTai engine's hot paths.")
+  parser.add_argument("names", nargs = "*", help = "only run benchmarks whose names contain one of these")
+  parser.add_argument("-t", "--min-time", type = float, default = 0.2, help = "seconds per timing round")
+  parser.add_argument("-r", "--rounds", type = int, default = 3, help = "timing rounds, the best is kept")
+  parser.add_argument("--save", metavar = "FILE", help = "write the results to FILE as JSON")
+  parser.add_argument("--compare", metavar = "FILE", help = "compare against a baseline saved with --save")
+  parser.add_argument("--threshold", type = float, default = DEFAULT_THRESHOLD, help = "slowdown that counts as a regression")
+  args = parser.parse_args(argv)
+
+  results = runBenchmarks(args.names, args.min_time, args.rounds)
+  rows = []
+  if args.compare:
+    with open(args.compare) as f:
+      rows = compare(results, json.load(f), args.threshold)
+  print(report(results, rows))
+  if args.save:
+    with open(args.save, "w") as f:
+      json.dump(toJson(results), f, indent = 2, sort_keys = True)
+  if any(regressed for name, ratio, regressed in rows):
+    return 1
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
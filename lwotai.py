@@ -8,28 +8,46 @@ Thanks to Dave Horn for implementing the Save and Undo system.
 
 2. Rollback files are created at the beginning of each turn. You can rollback to any previous turn using 'roll' or 'rollback' command. You will be prompted to enter which turn you want to rollback to.
 
-3. An undo file is created after every card played. Player can undo to the last card at any time (two exceptions) by typing 'undo'. Exceptions are when you load from a previously suspended game or after executing a rollback. The undo file is removed at that exact point to prevent player from undoing themselves to some other game in the past!
+3. Every command is recorded in an in-memory journal. Player can undo back past the last card played as many times as they like by typing 'undo', and 'redo' replays what was undone. The journal starts empty when you load a previously suspended game.
+
+Saves are written on a background thread so commands never wait on the disk.
 
 Release 1.08112011.1
 
 '''
 
 SUSPEND_FILE = "suspend.lwot"
-UNDO_FILE = "undo.lwot"
+UNDO_FILE = "undo.lwot"   # only so main() can delete undo files left by older versions
 ROLLBACK_FILE = "turn."
 MAP_FILE = "map.yml"
 SCENARIOS_FILE = "scenarios.yml"
+CARDS_FILE = "cards.yml"
+DATA_CACHE_SUFFIX = ".cache"
+AUDIT_ENV = "LWOTAI_AUDIT"
 
 import sys
 import cmd
+import copy
+import contextlib
+import hashlib
+import json
+import marshal
 import random
 import shutil
-try:
-  import cPickle as pickle
-except:
-  import pickle
 import os.path
+import struct
+from array import array
+import threading
+import time
+import zlib
+from collections import deque, namedtuple
+from fractions import Fraction
 import yaml
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+try:
+  import numpy
+except ImportError:
+  numpy = None
 from enum import IntEnum
 from enum import Enum
 
@@ -53,54 +71,1249 @@ class Posture(Enum):
 
 COUNTRY_STATS = {'governance': Governance, 'alignment': Alignment}
 
+# Game data files already parsed by this process: fname -> (mtime, size, marshalled data)
+DATA_CACHE = {}
+DATA_CACHE_VERSION = 1
+# All-pairs distance tables by adjacency bitsets
+DISTANCE_CACHE = {}
+
+def loadData(fname):
+  '''Parsed contents of a YAML data file.
+
+  The parsed data is kept in memory and in a marshal cache file next to the
+  YAML file. A cache is used while the file's mtime and size are unchanged,
+  or while its SHA-1 still matches. Every call returns fresh objects.
+  '''
+  stat = os.stat(fname)
+  cached = DATA_CACHE.get(fname)
+  if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+    return marshal.loads(cached[2])
+  cacheName = fname + DATA_CACHE_SUFFIX
+  header = None
+  try:
+    with open(cacheName, 'rb') as f:
+      header, blob = marshal.loads(f.read())
+  except (OSError, EOFError, ValueError, TypeError):
+    pass
+  if header and header[0] == DATA_CACHE_VERSION and header[1] == stat.st_mtime and header[2] == stat.st_size:
+    DATA_CACHE[fname] = (stat.st_mtime, stat.st_size, blob)
+    return marshal.loads(blob)
+  with open(fname, 'rb') as f:
+    text = f.read()
+  digest = hashlib.sha1(text).hexdigest()
+  if header and header[0] == DATA_CACHE_VERSION and header[3] == digest:
+    data = marshal.loads(blob)
+  else:
+    data = yaml.load(text, Loader = YAML_LOADER)
+    blob = marshal.dumps(data)
+  try:
+    tmpName = cacheName + ".tmp"
+    with open(tmpName, 'wb') as f:
+      f.write(marshal.dumps(((DATA_CACHE_VERSION, stat.st_mtime, stat.st_size, digest), blob)))
+    os.replace(tmpName, cacheName)
+  except OSError:
+    pass
+  DATA_CACHE[fname] = (stat.st_mtime, stat.st_size, blob)
+  return marshal.loads(blob)
+
+class Dice:
+  '''Seedable source of every random decision in the game.
+
+  All draws reduce to draw(n), a uniform integer in [0, n). Those integers can
+  be recorded and replayed. Die rolls are served from a buffer filled in bulk,
+  by NumPy when it is installed.
+  '''
+
+  def __init__(self, seed = None, bufferSize = 1024):
+    self.bufferSize = bufferSize
+    self.recording = None
+    self.replaying = None
+    self.replayPos = 0
+    self.seed(seed)
+
+  def seed(self, seed = None):
+    self.rng = random.Random(seed)
+    self.npRng = None
+    if numpy is not None and self.bufferSize > 0:
+      self.npRng = numpy.random.default_rng(self.rng.getrandbits(64))
+    self.buffer = []
+    self.bufferPos = 0
+
+  def copy(self):
+    '''Dice that will produce the same future draws as this one.'''
+    dice = copy.copy(self)
+    dice.rng = random.Random()
+    dice.rng.setstate(self.rng.getstate())
+    dice.npRng = copy.deepcopy(self.npRng)
+    dice.buffer = self.buffer[:]
+    if self.recording is not None:
+      dice.recording = self.recording[:]
+    if self.replaying is not None:
+      dice.replaying = self.replaying[:]
+    return dice
+
+  def record(self):
+    '''Start recording draws; returns the list they are appended to.'''
+    self.recording = []
+    return self.recording
+
+  def stopRecording(self):
+    recorded = self.recording
+    self.recording = None
+    return recorded
+
+  def replay(self, draws):
+    '''Feed recorded draws back before resuming live rolls.'''
+    self.replaying = list(draws)
+    self.replayPos = 0
+
+  def draw(self, n):
+    if self.replaying is not None:
+      if self.replayPos < len(self.replaying):
+        value = self.replaying[self.replayPos]
+        self.replayPos += 1
+        if value < 0 or value >= n:
+          raise ValueError("Replayed draw %d out of range for %d" % (value, n))
+      else:
+        self.replaying = None
+        value = self.liveDraw(n)
+    else:
+      value = self.liveDraw(n)
+    if self.recording is not None:
+      self.recording.append(value)
+    return value
+
+  def liveDraw(self, n):
+    if n == 6 and self.bufferSize > 0:
+      if self.bufferPos >= len(self.buffer):
+        self.refill()
+      value = self.buffer[self.bufferPos]
+      self.bufferPos += 1
+      return value
+    return self.rng.randrange(n)
+
+  def refill(self):
+    if self.npRng is not None:
+      self.buffer = self.npRng.integers(0, 6, self.bufferSize).tolist()
+    else:
+      self.buffer = self.rng.choices(range(6), k = self.bufferSize)
+    self.bufferPos = 0
+
+  def roll(self):
+    return self.draw(6) + 1
+
+  def rollBatch(self, trials, count):
+    '''trials rows of count die rolls each, for the batch roll counters.
+
+    A NumPy array when NumPy is installed, else a list of lists. Batches use
+    the same generator as the game's rolls but are never recorded or replayed.
+    '''
+    if self.npRng is not None:
+      return self.npRng.integers(1, 7, (trials, count))
+    return [[self.rng.randint(1, 6) for i in range(count)] for trial in range(trials)]
+
+  def randint(self, a, b):
+    return a + self.draw(b - a + 1)
+
+  def choice(self, seq):
+    if len(seq) == 0:
+      raise IndexError("Cannot choose from an empty sequence")
+    return seq[self.draw(len(seq))]
+
+  def shuffle(self, seq):
+    for i in range(len(seq) - 1, 0, -1):
+      j = self.draw(i + 1)
+      seq[i], seq[j] = seq[j], seq[i]
+
+  def sample(self, population, k):
+    pool = list(population)
+    if k > len(pool):
+      raise ValueError("Sample larger than population")
+    for i in range(k):
+      j = i + self.draw(len(pool) - i)
+      pool[i], pool[j] = pool[j], pool[i]
+    return pool[:k]
+
+def rollCounts(rolls, target):
+  '''Successes and failures in each row of rolls, counting a roll at or under target as a success.
+
+  rolls is one row of rolls per trial, all the same length, as a NumPy array
+  or a list of lists; target is one number or one per trial. The counts come
+  back as NumPy arrays when NumPy is installed, else as lists.
+  '''
+  if numpy is not None:
+    rolls = numpy.asarray(rolls, dtype = numpy.int8).reshape(len(rolls), -1)
+    target = numpy.asarray(target, dtype = numpy.int8)
+    if target.ndim:
+      target = target[:, None]
+    successes = numpy.count_nonzero(rolls <= target, axis = 1)
+    return successes, rolls.shape[1] - successes
+  if isinstance(target, (int, float)):
+    target = [target] * len(rolls)
+  successes = [sum([1 for roll in row if roll <= limit]) for row, limit in zip(rolls, target)]
+  return successes, [len(row) - hits for row, hits in zip(rolls, successes)]
+
+def jihadRevolution(successes, failures, numRolls, governance, besieged):
+  '''Whether a Major Jihad with these rolls ends in an Islamic Revolution, as executeJihad resolves it.
+
+  successes and failures may be single counts or NumPy arrays of counts, one
+  per trial; the answer comes back in the same form.
+  '''
+  # Successes first shift governance to Poor; a failed Major Jihad at Poor
+  # besieges the regime before the revolution check.
+  toPoor = max(0, 3 - governance)
+  besieged = (besieged > 0) | ((failures >= 2) & (numRolls == 3 and governance == 3))
+  return (successes >= toPoor + 2) | (besieged & (successes >= toPoor + 1))
+
+# Exact odds already worked out: (function name, arguments) -> result
+ODDS_CACHE = {}
+
+def cachedOdds(func):
+  '''Keep the results of an odds function in ODDS_CACHE by its arguments.'''
+  def wrapper(*args):
+    key = (func.__name__,) + args
+    if key not in ODDS_CACHE:
+      ODDS_CACHE[key] = func(*args)
+    return ODDS_CACHE[key]
+  wrapper.__name__ = func.__name__
+  wrapper.__doc__ = func.__doc__
+  return wrapper
+
+@cachedOdds
+def successOdds(numRolls, target):
+  '''Exact chance of 0 to numRolls successes when each die succeeds at or under target.'''
+  hit = Fraction(min(max(target, 0), 6), 6)
+  odds = [Fraction(1)]
+  for die in range(numRolls):
+    nextOdds = [Fraction(0)] * (len(odds) + 1)
+    for successes, chance in enumerate(odds):
+      nextOdds[successes] += chance * (1 - hit)
+      nextOdds[successes + 1] += chance * hit
+    odds = nextOdds
+  return tuple(odds)
+
+@cachedOdds
+def jihadOdds(numRolls, governance, besieged, major):
+  '''Exact success odds of a jihad and the chance it ends in an Islamic Revolution.'''
+  odds = successOdds(numRolls, governance)
+  revolution = Fraction(0)
+  if major:
+    for successes, chance in enumerate(odds):
+      if jihadRevolution(successes, numRolls - successes, numRolls, governance, besieged):
+        revolution += chance
+  return odds, revolution
+
+@cachedOdds
+def woiOdds(modifier):
+  '''Exact chance that a War of Ideas roll with modifier fails, adds Aid or succeeds.'''
+  fail = len([roll for roll in range(1, 7) if roll + modifier <= 3])
+  aid = len([roll for roll in range(1, 7) if roll + modifier == 4])
+  return Fraction(fail, 6), Fraction(aid, 6), Fraction(6 - fail - aid, 6)
+
+Odds = namedtuple("Odds", [
+  "action",     # "jihad", "recruit", "plot", "travel" or "woi"
+  "country",
+  "rolls",
+  "target",     # highest roll that succeeds, or the WoI modifier
+  "successes",  # exact chance of 0, 1, ... successes
+  "outcomes",   # (name, exact chance) of anything else worth knowing
+])
+
+SNAPSHOT_MAGIC = b"LWOT"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sHBI")
+SNAPSHOT_TRACKERS = struct.Struct("<bbbbBBHHHHBI")
+SNAPSHOT_COUNTRY = struct.Struct("<BBBbbbbbbbb")
+SNAPSHOT_STRING = 255
+
+# Board values are a mix of enums loaded from map.yml and plain ints and
+# strings set by the card code, and they do not compare equal to each other,
+# so each one is stored with a code that keeps its exact type.
+GOVERNANCE_CODES = [0, 1, 2, 3, 4, Governance.TEST, Governance.GOOD, Governance.FAIR, Governance.POOR, Governance.ISLAMIST_RULE]
+ALIGNMENT_CODES = ["", "Adversary", "Neutral", "Ally", Alignment.TEST, Alignment.ADVERSARY, Alignment.NEUTRAL, Alignment.ALLY]
+POSTURE_CODES = ["", "Hard", "Soft", Posture.TEST, Posture.HARD, Posture.SOFT]
+
+def codeIndex(codes):
+  return dict(((type(value), value), i) for i, value in enumerate(codes))
+
+GOVERNANCE_INDEX = codeIndex(GOVERNANCE_CODES)
+ALIGNMENT_INDEX = codeIndex(ALIGNMENT_CODES)
+POSTURE_INDEX = codeIndex(POSTURE_CODES)
+
+def encodeValue(value, index):
+  code = index.get((type(value), value))
+  if code is None:
+    return SNAPSHOT_STRING, str(value)
+  return code, None
+
+def decodeValue(code, codes, reader):
+  if code == SNAPSHOT_STRING:
+    return reader.string()
+  return codes[code]
+
+class SnapshotWriter:
+  def __init__(self):
+    self.parts = []
+
+  def pack(self, fmt, *values):
+    self.parts.append(fmt.pack(*values))
+
+  def string(self, s):
+    data = s.encode("utf-8")
+    self.parts.append(struct.pack("<B", len(data)) + data)
+
+  def strings(self, items):
+    self.parts.append(struct.pack("<B", len(items)))
+    for s in items:
+      self.string(s)
+
+  def getvalue(self):
+    return b"".join(self.parts)
+
+class SnapshotReader:
+  def __init__(self, data):
+    self.data = data
+    self.pos = 0
+
+  def unpack(self, fmt):
+    values = fmt.unpack_from(self.data, self.pos)
+    self.pos += fmt.size
+    return values
+
+  def string(self):
+    size = self.data[self.pos]
+    self.pos += 1
+    s = self.data[self.pos:self.pos + size].decode("utf-8")
+    self.pos += size
+    return s
+
+  def strings(self):
+    count = self.data[self.pos]
+    self.pos += 1
+    return [self.string() for i in range(count)]
+
+class OutputSink:
+  '''Where the engine's printed lines go. Lines are written without a newline.'''
+
+  silent = False
+
+  def write(self, line):
+    raise NotImplementedError
+
+  def flush(self):
+    pass
+
+class NullSink(OutputSink):
+  '''Drops everything, for batch runs and rollouts.'''
+
+  silent = True
+
+  def write(self, line):
+    pass
+
+class BufferedSink(OutputSink):
+  '''Keeps every line in memory for the caller to read.'''
+
+  def __init__(self):
+    self.lines = []
+
+  def write(self, line):
+    self.lines.append(line)
+
+  def getvalue(self):
+    return "".join([line + "\n" for line in self.lines])
+
+  def clear(self):
+    del self.lines[:]
+
+class TerminalSink(BufferedSink):
+  '''Collects lines and writes them to stdout in one go on flush.
+
+  The console flushes after every command and before every prompt; limit
+  bounds the backlog when the engine is driven without the command loop.
+  '''
+
+  def __init__(self, stream = None, limit = 256):
+    BufferedSink.__init__(self)
+    self.stream = stream
+    self.limit = limit
+
+  def write(self, line):
+    self.lines.append(line)
+    if len(self.lines) >= self.limit:
+      self.flush()
+
+  def flush(self):
+    if self.lines:
+      stream = self.stream or sys.stdout
+      stream.write(self.getvalue())
+      stream.flush()
+      self.clear()
+
+class JsonLinesSink(OutputSink):
+  '''Writes each line to stream as a JSON object: {"seq": n, "text": line}.'''
+
+  def __init__(self, stream):
+    self.stream = stream
+    self.seq = 0
+
+  def write(self, line):
+    self.stream.write(json.dumps({"seq": self.seq, "text": line}) + "\n")
+    self.seq += 1
+
+  def flush(self):
+    self.stream.flush()
+
+HistoryRecord = namedtuple("HistoryRecord", [
+  "turn", "phase", "message", "args",
+  "kind",     # what happened: "travel", "recruit", "jihad", "plot", "disrupt", "posture", "prestige", "country" or None for plain text
+  "country",  # the country it happened in, or None
+])
+
+# Records a game's History keeps before dropping its oldest
+HISTORY_LIMIT = 5000
+
+class History:
+  '''Game log kept as records and only turned into text when it is read.
+
+  A record's message is rendered with its args, if any, as a % format.
+  Positions count every record ever added, so a log bounded by limit lines up
+  with journal and snapshot offsets after dropping its oldest records.
+  Setting enabled to False stops logging altogether for headless games.
+  '''
+
+  def __init__(self, limit = None, enabled = True):
+    self.limit = limit
+    self.enabled = enabled
+    self.records = []
+    self.dropped = 0
+
+  def __len__(self):
+    return self.dropped + len(self.records)
+
+  def __iter__(self):
+    for record in self.records:
+      yield self.render(record)
+
+  def __contains__(self, line):
+    for record in self.records:
+      if self.render(record) == line:
+        return True
+    return False
+
+  def __getitem__(self, index):
+    '''Text of the record at a position, or a list of them for a slice. Dropped records are gone.'''
+    if isinstance(index, slice):
+      return [self.render(self.records[i - self.dropped]) for i in range(*index.indices(len(self))) if i >= self.dropped]
+    if index < 0:
+      index += len(self)
+    if index < self.dropped or index >= len(self):
+      raise IndexError("History position out of range")
+    return self.render(self.records[index - self.dropped])
+
+  def __eq__(self, other):
+    other = list(other)
+    if len(other) != len(self.records):
+      return False
+    for record, line in zip(self.records, other):
+      if self.render(record) != line:
+        return False
+    return True
+
+  def render(self, record):
+    if record.args:
+      return record.message % record.args
+    return record.message
+
+  def lines(self, start = 0):
+    '''Rendered text of the records from position start on.'''
+    return [self.render(record) for record in self.recordsFrom(start)]
+
+  def add(self, turn, phase, message, args = (), kind = None, country = None):
+    if not self.enabled:
+      return
+    self.records.append(HistoryRecord(turn, phase, message, args, kind, country))
+    if self.limit is not None and len(self.records) > self.limit + self.limit // 4 + 1:
+      excess = len(self.records) - self.limit
+      del self.records[:excess]
+      self.dropped += excess
+
+  def recordsFrom(self, start):
+    return self.records[max(0, start - self.dropped):]
+
+  def select(self, kind = None, country = None):
+    '''The kept records of kind about country, either of which may be None for any.'''
+    return [record for record in self.records if (kind is None or record.kind == kind) and (country is None or record.country == country)]
+
+  def truncate(self, length):
+    '''Drop every record from position length on.'''
+    if length < self.dropped:
+      self.dropped = length
+      self.records = []
+    else:
+      del self.records[length - self.dropped:]
+
+  def extend(self, records):
+    for record in records:
+      self.add(record.turn, record.phase, record.message, record.args, record.kind, record.country)
+
+  def copy(self):
+    history = History(self.limit, self.enabled)
+    history.records = self.records[:]
+    history.dropped = self.dropped
+    return history
+
+class JournalEntry:
+  def __init__(self, label, changes, historyStart, historyLines):
+    self.label = label
+    self.changes = changes
+    self.historyStart = historyStart
+    self.historyLines = historyLines
+
+  def isCardPlay(self):
+    return self.label.split(" ")[0] in ("j", "u")
+
+class Journal:
+  '''In-memory undo/redo log of the state changed by each command.
+
+  Between begin() and commit() the tracker and country setters report each
+  field they are about to change, and the journal keeps the value it had
+  before the first change. commit() keeps only the fields whose value really
+  differs, with their exact old and new values. Turn marks allow rolling back
+  to the start of any turn.
+  '''
+
+  def __init__(self, app):
+    self.app = app
+    self.undoStack = []
+    self.redoStack = []
+    self.marks = {}
+    self.touched = None   # (object, field) -> value before the command, while recording
+    self.historyStart = 0
+
+  def record(self, obj, field, old):
+    '''Called by a setter before obj.field changes from old.'''
+    key = (obj, field)
+    if key not in self.touched:
+      self.touched[key] = tuple(old) if isinstance(old, list) else old
+
+  def begin(self):
+    self.touched = {}
+    self.historyStart = len(self.app.history)
+
+  def commit(self, label):
+    '''Record the changes made since begin(). Returns the entry or None.'''
+    if self.touched is None:
+      return None
+    changes = []
+    for (obj, field), old in self.touched.items():
+      new = getattr(obj, field)
+      if isinstance(new, list):
+        new = tuple(new)
+      if old is not new and (type(old) is not type(new) or old != new):
+        changes.append((obj, field, old, new))
+    self.touched = None
+    lines = self.app.history.recordsFrom(self.historyStart)
+    if not changes and not lines:
+      return None
+    entry = JournalEntry(label, changes, self.historyStart, lines)
+    self.undoStack.append(entry)
+    self.redoStack = []
+    for turn in list(self.marks):
+      if self.marks[turn] >= len(self.undoStack):
+        del self.marks[turn]
+    return entry
+
+  def apply(self, entry, forward):
+    self.touched = None
+    changes = entry.changes if forward else reversed(entry.changes)
+    for obj, field, old, new in changes:
+      value = new if forward else old
+      if type(value) is tuple:
+        value = list(value)
+      setattr(obj, field, value)
+    self.app.history.truncate(entry.historyStart)
+    if forward:
+      self.app.history.extend(entry.historyLines)
+
+  def undoEntry(self):
+    entry = self.undoStack.pop()
+    self.apply(entry, False)
+    self.redoStack.append(entry)
+    return entry
+
+  def undo(self):
+    '''Undo back to before the last card played. Returns the entries undone.'''
+    undone = []
+    while self.undoStack:
+      undone.append(self.undoEntry())
+      if undone[-1].isCardPlay():
+        break
+    return undone
+
+  def redo(self):
+    '''Redo the last undone card play and the commands that followed it.'''
+    redone = []
+    while self.redoStack:
+      if redone and self.redoStack[-1].isCardPlay():
+        break
+      entry = self.redoStack.pop()
+      self.apply(entry, True)
+      self.undoStack.append(entry)
+      redone.append(entry)
+    return redone
+
+  def mark(self, turn):
+    self.marks[turn] = len(self.undoStack)
+
+  def canRollback(self, turn):
+    return turn in self.marks
+
+  def rollback(self, turn):
+    while len(self.undoStack) > self.marks[turn]:
+      self.undoEntry()
+
+  def reset(self):
+    self.undoStack = []
+    self.redoStack = []
+    self.marks = {}
+    self.touched = None
+
+class Checkpointer:
+  '''Writes save files on a background thread.
+
+  Only the newest pending data for each file is written, so a burst of
+  commands costs one write and a command never waits on the disk. The
+  thread exits once nothing is pending and write() starts another.
+  '''
+
+  def __init__(self):
+    self.pending = {}
+    self.condition = threading.Condition()
+    self.thread = None
+    self.writing = False
+    self.error = None
+
+  def write(self, fname, data):
+    with self.condition:
+      self.pending[fname] = data
+      if self.thread is None:
+        self.thread = threading.Thread(target = self.run)
+        self.thread.daemon = True
+        self.thread.start()
+      self.condition.notify()
+
+  def run(self):
+    while True:
+      with self.condition:
+        if not self.pending:
+          self.thread = None
+          self.condition.notify_all()
+          return
+        fname, data = self.pending.popitem()
+        self.writing = True
+      try:
+        tmpname = fname + ".tmp"
+        f = open(tmpname, 'wb')
+        f.write(data)
+        f.close()
+        os.replace(tmpname, fname)
+      except Exception as e:
+        self.error = e
+      with self.condition:
+        self.writing = False
+        self.condition.notify_all()
+
+  def flush(self):
+    '''Block until every pending file has been written and the thread has finished.'''
+    with self.condition:
+      while self.pending or self.writing or self.thread is not None:
+        self.condition.wait()
+
+class Profiler:
+  '''Call counts and wall time for named spans of the AI's work.
+
+  Spans nest: a span's own time excludes the spans run inside it. Flowchart
+  box markers passed to mark() are counted too. With trace the spans are also
+  kept as Chrome trace events.
+  '''
+
+  def __init__(self, trace = False):
+    self.stats = {}      # name -> [calls, total seconds, own seconds]
+    self.callers = {}    # (caller span or None, name) -> [calls, total seconds, own seconds]
+    self.marks = {}      # marker -> times passed
+    self.trace = [] if trace else None
+    self.stack = []
+    self.started = time.perf_counter()
+
+  def begin(self, name):
+    self.stack.append([name, time.perf_counter(), 0.0])
+
+  def end(self):
+    name, start, inner = self.stack.pop()
+    now = time.perf_counter()
+    total = now - start
+    caller = None
+    if self.stack:
+      self.stack[-1][2] += total
+      caller = self.stack[-1][0]
+    for key, stats in ((name, self.stats), ((caller, name), self.callers)):
+      entry = stats.get(key)
+      if entry is None:
+        entry = stats[key] = [0, 0.0, 0.0]
+      entry[0] += 1
+      entry[1] += total
+      entry[2] += total - inner
+    if self.trace is not None:
+      self.trace.append({"name": name, "ph": "X", "ts": (start - self.started) * 1e6, "dur": total * 1e6, "pid": 0, "tid": 0})
+
+  @contextlib.contextmanager
+  def span(self, name):
+    self.begin(name)
+    try:
+      yield
+    finally:
+      self.end()
+
+  def mark(self, marker):
+    self.marks[marker] = self.marks.get(marker, 0) + 1
+    if self.trace is not None:
+      self.trace.append({"name": marker, "ph": "i", "s": "t", "ts": (time.perf_counter() - self.started) * 1e6, "pid": 0, "tid": 0})
+
+  def table(self):
+    '''Summary of the spans, slowest first, and of the markers passed.'''
+    lines = ["%-36s %8s %11s %11s %11s" % ("Span", "Calls", "Total ms", "Own ms", "us/call")]
+    for name, (calls, total, own) in sorted(self.stats.items(), key = lambda item: -item[1][1]):
+      lines.append("%-36s %8d %11.2f %11.2f %11.1f" % (name, calls, total * 1e3, own * 1e3, total * 1e6 / calls))
+    if self.marks:
+      lines.append("")
+      lines.append("%-36s %8s" % ("Marker", "Passed"))
+      for marker, count in sorted(self.marks.items(), key = lambda item: -item[1]):
+        lines.append("%-36s %8d" % (marker, count))
+    return "\n".join(lines)
+
+  def writeChromeTrace(self, stream):
+    '''Write the trace, for chrome://tracing or Perfetto. Needs trace = True.'''
+    json.dump({"traceEvents": self.trace or [], "displayTimeUnit": "ms"}, stream)
+
+  def dumpStats(self, fname):
+    '''Write the spans as a cProfile stats file that pstats.Stats can load.'''
+    stats = {}
+    for name, (calls, total, own) in self.stats.items():
+      stats[("lwotai", 0, name)] = (calls, calls, own, total, {})
+    for (caller, name), (calls, total, own) in self.callers.items():
+      if caller is not None:
+        stats[("lwotai", 0, name)][4][("lwotai", 0, caller)] = (calls, calls, own, total)
+    with open(fname, "wb") as f:
+      marshal.dump(stats, f)
+
+def profiled(name):
+  '''Labyrinth method decorator: time each call as span name when the game has a profiler.'''
+  def decorate(method):
+    def wrapper(self, *args, **kwargs):
+      profiler = self.profiler
+      if profiler is None:
+        return method(self, *args, **kwargs)
+      profiler.begin(name)
+      try:
+        return method(self, *args, **kwargs)
+      finally:
+        profiler.end()
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+  return decorate
+
+class InvariantError(Exception):
+  pass
+
+# Board invariants audited by Validator: function(app) -> list of problems found
+INVARIANTS = []
+
+def invariant(func):
+  '''Register func as one of the INVARIANTS.'''
+  INVARIANTS.append(func)
+  return func
+
+class Validator:
+  '''Audits the INVARIANTS after shell commands.
+
+  mode is "off", "sampled" (every sampleEvery commands), "always" or
+  "strict" (every command, raising InvariantError on a problem). Without a
+  mode it is taken from the LWOTAI_AUDIT environment variable, else off.
+  '''
+  MODES = ("off", "sampled", "always", "strict")
+
+  def __init__(self, mode = None, sampleEvery = 10, checks = None):
+    mode = mode or os.environ.get(AUDIT_ENV) or "off"
+    if mode not in self.MODES:
+      raise ValueError("Unknown audit mode %s" % mode)
+    self.mode = mode
+    self.sampleEvery = sampleEvery
+    self.checks = list(INVARIANTS) if checks is None else list(checks)
+    self.commands = 0
+
+  def afterCommand(self, app):
+    if self.mode == "off":
+      return []
+    self.commands += 1
+    if self.mode == "sampled" and self.commands % self.sampleEvery:
+      return []
+    return self.audit(app)
+
+  def audit(self, app):
+    '''Run every check now and report what they find.'''
+    problems = []
+    for check in self.checks:
+      problems.extend(check(app))
+    if problems and self.mode == "strict":
+      raise InvariantError("; ".join(problems))
+    for problem in problems:
+      app.output("DEBUG: " + problem)
+    return problems
+
+@invariant
+def cellTotal(app):
+  count = app.cellCount()
+  if count != 15:
+    return ["CELL COUNT %d" % count]
+  return []
+
+@invariant
+def troopTotal(app):
+  count = app.troopCount()
+  if count != 15:
+    return ["TROOP COUNT %d" % count]
+  return []
+
+@invariant
+def runningTotals(app):
+  '''The board's running totals agree with a recount.'''
+  problems = []
+  for field in TOTALED_FIELDS:
+    count = sum(getattr(app.board, field))
+    if count != app.board.totals[field]:
+      problems.append("%s TOTAL %d COUNTED %d" % (field, app.board.totals[field], count))
+  return problems
+
+@invariant
+def piecesInTestedCountries(app):
+  problems = []
+  for country in app.map.values():
+    if country.sleeper_cells > 0 or country.activeCells > 0 or country.troops_stationed > 0 or country.aid > 0 or country.regimeChange > 0 or country.cadre > 0 or country.plots > 0:
+      badCountry = country.governance == 0
+      if country.culture == "Non-Muslim":
+        badCountry = badCountry or country.posture == ""
+      elif country.culture != "Iran":
+        badCountry = badCountry or country.alignment == ""
+      if badCountry:
+        problems.append("UNTESTED COUNTRY " + country.countryStr())
+  return problems
+
+INDEXED_FIELDS = frozenset(["governance", "alignment", "activeCells", "sleeper_cells", "troops_stationed", "aid", "plots", "besieged", "regimeChange", "cadre", "markers"])
+
+class ChangeList(list):
+  '''List that calls changing() before and changed() after every in-place modification.'''
+
+  def changing(self):
+    pass
+
+  def changed(self):
+    pass
+
+  def append(self, item):
+    self.changing()
+    list.append(self, item)
+    self.changed()
+
+  def extend(self, items):
+    self.changing()
+    list.extend(self, items)
+    self.changed()
+
+  def insert(self, i, item):
+    self.changing()
+    list.insert(self, i, item)
+    self.changed()
+
+  def remove(self, item):
+    self.changing()
+    list.remove(self, item)
+    self.changed()
+
+  def pop(self, *args):
+    self.changing()
+    item = list.pop(self, *args)
+    self.changed()
+    return item
+
+  def clear(self):
+    self.changing()
+    list.clear(self)
+    self.changed()
+
+  def __setitem__(self, i, item):
+    self.changing()
+    list.__setitem__(self, i, item)
+    self.changed()
+
+  def __delitem__(self, i):
+    self.changing()
+    list.__delitem__(self, i)
+    self.changed()
+
+  def __iadd__(self, items):
+    self.changing()
+    list.extend(self, items)
+    self.changed()
+    return self
+
+class MarkerList(ChangeList):
+  '''Country marker list that tells the board index when it changes.'''
+
+  def __init__(self, owner, items = ()):
+    list.__init__(self, items)
+    self.owner = owner
+
+  def changing(self):
+    app = self.owner.app
+    if app is not None and app.journal is not None and app.journal.touched is not None:
+      app.journal.record(self.owner, "markers", self)
+
+  def changed(self):
+    app = self.owner.app
+    if app is not None:
+      app.version += 1
+      app.boardIndex.update(self.owner)
+      if app.eventFeed is not None:
+        app.eventFeed.emit(self.owner.name, "markers", None, self)
+
+class VersionedList(ChangeList):
+  '''Game-wide marker or lapsing list that bumps the board version when it changes.'''
+
+  def __init__(self, app, items = (), field = None):
+    list.__init__(self, items)
+    self.app = app
+    self.field = field
+
+  def changing(self):
+    journal = self.app.journal
+    if journal is not None and journal.touched is not None:
+      journal.record(self.app, self.field, self)
+
+  def changed(self):
+    self.app.version += 1
+    if self.app.eventFeed is not None:
+      self.app.eventFeed.emit(None, self.field, None, self)
+
+def eventValue(value):
+  '''A board value as plain JSON data. Enums and their string spellings come out the same.'''
+  if isinstance(value, Alignment):
+    return "" if value == Alignment.TEST else value.name.capitalize()
+  if isinstance(value, Posture):
+    return "" if value == Posture.TEST else value.value
+  if isinstance(value, Governance):
+    return int(value)
+  if isinstance(value, list):
+    return list(value)
+  return value
+
+class EventFeed:
+  '''Structured record of every change to the game state.
+
+  Each event is a dict ready for json.dumps:
+    {"seq": 0, "turn": 1, "phase": "", "country": "Iraq", "field": "sleeper_cells", "old": 1, "new": 2}
+  country is None for the game-wide trackers (prestige, troops, cells,
+  funding, markers, lapsing). Lists changed in place report old as None.
+  Without a stream events queue up for drain(); with one they are written to
+  it as JSON lines as they happen. A socket may be passed directly.
+  '''
+
+  def __init__(self, app, stream = None):
+    self.app = app
+    self.stream = stream
+    self.seq = 0
+    self.queue = deque()
+
+  def emit(self, country, field, old, new):
+    old = eventValue(old)
+    new = eventValue(new)
+    if old == new:
+      return
+    self.send({"seq": self.seq, "turn": self.app.turn, "phase": self.app.phase, "country": country, "field": field, "old": old, "new": new})
+
+  def send(self, event):
+    '''Number an event and queue or write it; also used to pass on events held by another feed.'''
+    event["seq"] = self.seq
+    self.seq += 1
+    if self.stream is None:
+      self.queue.append(event)
+    elif hasattr(self.stream, "sendall"):
+      self.stream.sendall((json.dumps(event) + "\n").encode("utf-8"))
+    else:
+      self.stream.write(json.dumps(event) + "\n")
+
+  def drain(self):
+    '''Yield the queued events, oldest first, removing them from the queue.'''
+    while self.queue:
+      yield self.queue.popleft()
+
+class BoardIndex:
+  '''Sets of country names kept in step with the board.
+
+  Countries are bucketed by their exact governance, alignment and culture
+  values, so an enum loaded from map.yml and the matching string assigned by
+  card code land in different alignment buckets just as they compare unequal.
+  '''
+
+  def __init__(self):
+    self.governance = {}
+    self.alignment = {}
+    self.culture = {}
+    self.cells = set()
+    self.cadre = set()
+    self.troops = set()
+    self.aid = set()
+    self.plots = set()
+    self.besieged = set()
+    self.regimeChange = set()
+    self.sadr = set()
+    self.nato = set()
+    self.keys = {}
+    self.order = {}
+
+  def copy(self):
+    index = BoardIndex()
+    for field in ("governance", "alignment", "culture"):
+      setattr(index, field, dict((key, set(names)) for key, names in getattr(self, field).items()))
+    for field in ("cells", "cadre", "troops", "aid", "plots", "besieged", "regimeChange", "sadr", "nato"):
+      setattr(index, field, set(getattr(self, field)))
+    index.keys = dict(self.keys)
+    index.order = self.order
+    return index
+
+  def update(self, country):
+    name = country.name
+    if name not in self.order:
+      self.order[name] = len(self.order)
+      self.culture.setdefault(country.culture, set()).add(name)
+      self.keys[name] = (None, None)
+    governance, alignment = self.keys[name]
+    if governance is None or governance != country.governance:
+      if governance is not None:
+        self.governance[governance].discard(name)
+      governance = country.governance
+      self.governance.setdefault(governance, set()).add(name)
+    if alignment is None or type(alignment) is not type(country.alignment) or alignment != country.alignment:
+      if alignment is not None:
+        self.alignment[alignment].discard(name)
+      alignment = country.alignment
+      self.alignment.setdefault(alignment, set()).add(name)
+    self.keys[name] = (governance, alignment)
+    self.flag(self.cells, name, country.activeCells + country.sleeper_cells > 0)
+    self.flag(self.cadre, name, country.cadre > 0)
+    self.flag(self.troops, name, country.troops() > 0)
+    self.flag(self.aid, name, country.aid > 0)
+    self.flag(self.plots, name, country.plots > 0)
+    self.flag(self.besieged, name, country.besieged > 0)
+    self.flag(self.regimeChange, name, country.regimeChange > 0)
+    self.flag(self.sadr, name, "Sadr" in country.markers)
+    self.flag(self.nato, name, "NATO" in country.markers)
+
+  def flag(self, members, name, isMember):
+    if isMember:
+      members.add(name)
+    else:
+      members.discard(name)
+
+  def withGovernance(self, *values):
+    found = set()
+    for value in values:
+      found |= self.governance.get(value, set())
+    return found
+
+  def withAlignment(self, value):
+    return self.alignment.get(value, set())
+
+  def withCells(self, includeSadr = False):
+    '''Countries where totalCells(includeSadr) > 0.'''
+    if includeSadr:
+      return self.cells | self.sadr
+    return self.cells
+
+  def withCulture(self, *values):
+    found = set()
+    for value in values:
+      found |= self.culture.get(value, set())
+    return found
+
+  def ordered(self, names):
+    '''Names in map order, so AI choices and listings do not depend on set order.'''
+    return sorted(names, key = self.order.__getitem__)
+
+def postureWeight(posture):
+  '''+1 for Hard, -1 for Soft and 0 for untested countries.'''
+  if posture == "Hard":
+    return 1
+  elif posture == "Soft":
+    return -1
+  return 0
+
+# Fields the Board keeps a running map-wide total of
+TOTALED_FIELDS = ("troops_stationed", "activeCells", "sleeper_cells")
+BOARD_FIELDS = ("governance", "alignment", "posture", "troops_stationed", "activeCells", "sleeper_cells", "aid", "besieged", "regimeChange", "cadre", "plots", "markers")
+
+class Board:
+  '''Per-country game state stored as one list per field, indexed by country id.
+
+  Country objects are views onto a row of the board, so copying the board
+  copies the whole map state at once.
+  '''
+  __slots__ = BOARD_FIELDS + ("totals",)
+
+  def __init__(self):
+    for field in BOARD_FIELDS:
+      setattr(self, field, [])
+    self.totals = dict((field, 0) for field in TOTALED_FIELDS)
+
+  def __len__(self):
+    return len(self.governance)
+
+  def add(self):
+    '''Append an empty row and return its country id.'''
+    self.governance.append(Governance.TEST)
+    self.alignment.append("")
+    self.posture.append("")
+    for field in ("troops_stationed", "activeCells", "sleeper_cells", "aid", "besieged", "regimeChange", "cadre", "plots"):
+      getattr(self, field).append(0)
+    self.markers.append([])
+    return len(self.governance) - 1
+
+  def copy(self):
+    '''Independent copy of the board. Marker lists come back as plain lists.'''
+    board = Board.__new__(Board)
+    for field in BOARD_FIELDS:
+      setattr(board, field, getattr(self, field)[:])
+    board.markers = [list(markers) for markers in self.markers]
+    board.totals = dict(self.totals)
+    return board
+
+def boardField(field):
+  '''Country property that reads and writes one column of the Board.'''
+  indexed = field in INDEXED_FIELDS
+  totaled = field in TOTALED_FIELDS
+
+  def get(self):
+    return getattr(self.board, field)[self.id]
+
+  def set(self, value):
+    column = getattr(self.board, field)
+    app = self.app
+    if app is not None:
+      if app.journal is not None and app.journal.touched is not None:
+        app.journal.record(self, field, column[self.id])
+      if app.eventFeed is not None:
+        app.eventFeed.emit(self.name, field, column[self.id], value)
+    if totaled:
+      self.board.totals[field] += value - column[self.id]
+    column[self.id] = value
+    if self.app is not None:
+      self.app.version += 1
+      if indexed:
+        self.app.boardIndex.update(self)
+
+  return property(get, set)
+
 class Country:
-  app = None
-  name = ""
-  culture = ""
-  posture = ""
-  alignment = ""
-  governance = Governance.TEST
-  schengen = False
-  recruit_req = 0
-  troops_stationed = 0
-  activeCells = 0
-  sleeper_cells = 0
-  oil = False
-  resources = 0
-  links = []
-  markers = []
-  schengenLink = False
-  aid = 0
-  besiged = 0
-  regimeChange = 0
-  cadre = 0
-  plots = 0
-
-  def __init__(self, theApp, country_name, stats):
+  '''One country on the map: fixed map data plus a view of its Board row.'''
+  # troopCubes, sleeperCells and regime_change are old attribute names that are
+  # still assigned by tests and scenarios.yml but never read by the game.
+  __slots__ = ("app", "board", "id", "name", "culture", "schengen", "recruit_req", "oil", "resources", "links", "schengenLink", "troopCubes", "sleeperCells", "regime_change")
+
+  def __init__(self, theApp, country_name, stats, board = None):
     self.app = theApp
+    if board is None:
+      board = theApp.board if theApp is not None else Board()
+    self.board = board
+    self.id = board.add()
 
     self.name = country_name
     self.culture = stats['culture']
-    self.posture = Posture[stats['posture']]
-    self.alignment = Alignment[stats['alignment']]
-    self.governance = Governance[stats['governance']]
     self.schengen = stats['schengen']
     self.recruit_req = stats['recruit_req']
     self.resources = stats['resources']
     self.oil = stats['oil']
-
-    self.troops_stationed = 0
-    self.activeCells = 0
-    self.sleeper_cells = 0
-    self.aid = 0
-    self.besieged = 0
-    self.regimeChange = 0
-    self.cadre = 0
-    self.plots = 0
     self.links = []
-    self.markers = []
     self.schengenLink = False
 
+    board.alignment[self.id] = Alignment[stats['alignment']]
+    board.governance[self.id] = Governance[stats['governance']]
+    board.markers[self.id] = MarkerList(self)
+    self.posture = Posture[stats['posture']]
+    if theApp is not None:
+      theApp.boardIndex.update(self)
+
+  governance = boardField("governance")
+  alignment = boardField("alignment")
+  troops_stationed = boardField("troops_stationed")
+  activeCells = boardField("activeCells")
+  sleeper_cells = boardField("sleeper_cells")
+  aid = boardField("aid")
+  besieged = boardField("besieged")
+  regimeChange = boardField("regimeChange")
+  cadre = boardField("cadre")
+  plots = boardField("plots")
+
+  @property
+  def markers(self):
+    return self.board.markers[self.id]
+
+  @markers.setter
+  def markers(self, value):
+    if type(value) is not MarkerList or value.owner is not self:
+      value = MarkerList(self, value)
+    old = self.board.markers[self.id]
+    if self.app is not None and self.app.journal is not None and self.app.journal.touched is not None:
+      self.app.journal.record(self, "markers", old)
+    self.board.markers[self.id] = value
+    if self.app is not None:
+      self.app.version += 1
+      self.app.boardIndex.update(self)
+      if self.app.eventFeed is not None:
+        self.app.eventFeed.emit(self.name, "markers", old, value)
+
+  @property
+  def posture(self):
+    return self.board.posture[self.id]
+
+  @posture.setter
+  def posture(self, value):
+    old = self.board.posture[self.id]
+    if self.app is not None and self.app.journal is not None and self.app.journal.touched is not None:
+      self.app.journal.record(self, "posture", old)
+    self.board.posture[self.id] = value
+    if self.app is not None:
+      self.app.version += 1
+      if self.app.eventFeed is not None:
+        self.app.eventFeed.emit(self.name, "posture", old, value)
+      self.app.postureChanged(self, old, value)
+
+  def view(self, theApp, board):
+    '''This country on another board with the same layout. Links are left for the caller to map.'''
+    country = Country.__new__(Country)
+    country.app = theApp
+    country.board = board
+    country.id = self.id
+    country.name = self.name
+    country.culture = self.culture
+    country.schengen = self.schengen
+    country.recruit_req = self.recruit_req
+    country.oil = self.oil
+    country.resources = self.resources
+    country.schengenLink = self.schengenLink
+    board.markers[self.id] = MarkerList(country, board.markers[self.id])
+    return country
+
   def totalCells(self, includeSadr = False):
     total = self.activeCells + self.sleeper_cells
     if includeSadr and "Sadr" in self.markers:
@@ -176,7 +1389,43 @@ class Country:
       return "%s, %s\n   Active:%d Sleeper:%d Cadre:%d Plots:%d %s" % (self.name, self.govStr(),self.activeCells,self.sleeper_cells, self.cadre, self.plots, markersStr)
 
   def printCountry(self):
-    print(self.countryStr())
+    self.app.output(self.countryStr())
+
+PlayableCard = namedtuple("PlayableCard", [
+  "number", "name", "ops",
+  "playable",        # side can play the event: True, False or None when the player must judge
+  "opponentEvent",   # an opponent card whose event fires when it is played: True, False or None
+  "recommendation",  # "event" or "ops"
+])
+
+# Card number -> playability test, playable(card, side, app)
+CARD_PLAYABLE = {}
+# Card number -> event effect, event(card, side, app)
+CARD_EVENTS = {}
+
+def cardPlayable(*numbers, reads = None):
+  '''Register a playability test for the given cards.
+
+  reads names the state the test looks at: "map", "markers", "lapsing",
+  "trackers", or "input" when it asks the player. () means the answer never
+  changes and None that it is undeclared.
+  '''
+  def register(func):
+    func.reads = reads
+    for number in numbers:
+      CARD_PLAYABLE[number] = func
+    return func
+  return register
+
+def cardEvent(*numbers):
+  '''Register the event effect for the given cards. An event returns None once
+  it has resolved, or a value to end the play before the card's removal,
+  marker and lapsing reminders.'''
+  def register(func):
+    for number in numbers:
+      CARD_EVENTS[number] = func
+    return func
+  return register
 
 class Card:
   number = 0
@@ -186,8 +1435,9 @@ class Card:
   remove = False
   mark = False
   lapsing = False
+  puts_cell = False
 
-  def __init__(self, theNumber, theType, theName, theOps, theRemove, theMark, theLapsing):
+  def __init__(self, theNumber, theType, theName, theOps, theRemove, theMark, theLapsing, thePutsCell = False):
     self.number = theNumber
     self.name = theName
     self.type = theType
@@ -195,2003 +1445,2491 @@ class Card:
     self.remove = theRemove
     self.mark = theMark
     self.lapsing = theLapsing
+    self.puts_cell = thePutsCell
 
-  def playable(self, side, app):
+  def playable(self, side, app, ask = True):
+    '''Whether side can play the event. With ask False, events that need the
+    player's ruling return None instead of prompting.'''
     if self.type == "US" and side == "Jihadist":
       return False
     elif self.type == "Jihadist" and side == "US":
       return False
-    elif self.type == "US" and side == "US":
-      if self.number == 1: # Backlash
-        for country in app.map:
-          if (app.map[country].culture != "Non-Muslim") and (app.map[country].plots > 0):
-            return True
-        return False
-      elif self.number == 2: # Biometrics
-        return True
-      elif self.number == 3: # CRT
-        return app.map["United States"].posture == "Soft"
-      elif self.number == 2: # Biometrics
-        return True
-      elif self.number == 4: # Moro Talks
-        return True
-      elif self.number == 5: # NEST
-        return True
-      elif self.number == 6 or self.number == 7 : # Sanctions
-        return "Patriot Act" in app.markers
-      elif self.number == 8 or self.number == 9 or self.number == 10: # Special Forces
-        for country in app.map:
-          if app.map[country].totalCells(True) > 0:
-            for subCountry in app.map:
-              if country == subCountry or app.isAdjacent(subCountry, country):
-                if app.map[subCountry].troops() > 0:
-                  return True
-        return False
-      elif self.number == 11: # Abbas
-        return True
-      elif self.number == 12: # Al-Azhar
-        return True
-      elif self.number == 13: # Anbar Awakening
-        return (app.map["Iraq"].troops() > 0) or (app.map["Syria"].troops() > 0)
-      elif self.number == 14: # Covert Action
-        for country in app.map:
-          if app.map[country].alignment == "Adversary":
-            return True
-        return False
-      elif self.number == 15: # Ethiopia Strikes
-        return (app.map["Somalia"].governance == 4) or (app.map["Sudan"].governance == 4)
-      elif self.number == 16: # Euro-Islam
-        return True
-      elif self.number == 17: # FSB
-        return True
-      elif self.number == 18: # Intel Community
-        return True
-      elif self.number == 19: # Kemalist Republic
-        return True
-      elif self.number == 20: # King Abdullah
+    elif side == "Jihadist" and "The door of Itjihad was closed" in app.lapsing:
+      return False
+    rule = CARD_PLAYABLE.get(self.number)
+    if rule is None:
+      return False
+    if rule.reads is None or "input" in rule.reads:
+      if not ask and rule.reads is not None:
+        return None
+      return rule(self, side, app)
+    # Cached per card and side until the board version moves on; tests that
+    # read nothing stay cached for the whole game.
+    version = app.version if rule.reads else -1
+    key = (self.number, side)
+    cached = app.playableCache.get(key)
+    if cached is not None and cached[0] == version:
+      return cached[1]
+    result = rule(self, side, app)
+    app.playableCache[key] = (version, result)
+    return result
+
+  def putsCell(self, app):
+    return self.puts_cell
+
+  def playEvent(self, side, app):
+    app.outputToHistory("Card played for Event.", True)
+    if self.type == "US" and side == "Jihadist":
+      return False
+    elif self.type == "Jihadist" and side == "US":
+      return False
+    event = CARD_EVENTS.get(self.number)
+    if event is None:
+      return False
+    if app.profiler is None:
+      result = event(self, side, app)
+    else:
+      with app.profiler.span("event: " + self.name):
+        result = event(self, side, app)
+    if result is not None:
+      return result
+    if self.remove:
+      app.outputToHistory("Remove card from game.", True)
+    if self.mark:
+      app.outputToHistory("Place marker for card.", True)
+    if self.lapsing:
+      app.outputToHistory("Place card in Lapsing.", True)
+
+@cardPlayable(1, reads = ("map",))
+def playableBacklash(card, side, app):
+  return len(app.boardIndex.plots - app.boardIndex.withCulture("Non-Muslim")) > 0
+
+@cardEvent(1)
+def eventBacklash(card, side, app):
+  for country in app.map:
+    if (app.map[country].culture != "Non-Muslim") and (app.map[country].plots > 0):
+      app.outputToHistory("Plot in Muslim country found. Select the plot. Backlash in play", True)
+      app.backlashInPlay = True
+      return True
+  return False
+
+@cardPlayable(2, reads = ())
+def playableBiometrics(card, side, app):
+  return True
+
+@cardEvent(2)
+def eventBiometrics(card, side, app):
+  app.lapsing.append("Biometrics")
+  app.outputToHistory("Biometrics in play. This turn, travel to adjacent Good countries must roll to succeed and no non-adjacent travel.", True)
+
+@cardPlayable(3, reads = ("map",))
+def playableCRT(card, side, app):
+  return app.map["United States"].posture == "Soft"
+
+@cardEvent(3)
+def eventCRT(card, side, app):
+  app.map["Russia"].markers.append("CRT")
+  app.outputToHistory("CRT Maker added in Russia", True)
+  if (app.map["Central Asia"].alignment == "Ally") or (app.map["Central Asia"].alignment == "Neutral"):
+    app.map["Central Asia"].markers.append("CRT")
+    app.outputToHistory("CRT Maker added in Central Asia", True)
+
+@cardPlayable(4, reads = ())
+def playableMoroTalks(card, side, app):
+  return True
+
+@cardEvent(4)
+def eventMoroTalks(card, side, app):
+  app.markers.append("Moro Talks")
+  app.outputToHistory("Moro Talks in play.", False)
+  app.testCountry("Philippines")
+  app.changeFunding(-1)
+
+@cardPlayable(5, reads = ())
+def playableNEST(card, side, app):
+  return True
+
+@cardEvent(5)
+def eventNEST(card, side, app):
+  app.markers.append("NEST")
+  app.outputToHistory("NEST in play. If jihadists have WMD, all plots in the US placed face up.", True)
+
+@cardPlayable(6, 7, reads = ("markers",))
+def playableSanctions(card, side, app):
+  return "Patriot Act" in app.markers
+
+@cardEvent(6, 7)
+def eventSanctions(card, side, app):
+  if "Patriot Act" in app.markers:
+    app.changeFunding(-2)
+  else:
+    return False
+
+@cardPlayable(8, 9, 10, reads = ("map", "markers"))
+def playableSpecialForces(card, side, app):
+  troops = app.boardIndex.troops
+  for country in app.boardIndex.withCells(True):
+    if country in troops:
+      return True
+    for subCountry in troops:
+      if app.isAdjacent(subCountry, country):
         return True
-      elif self.number == 21: # Let's Roll
-        allyGoodPlotCountries = 0
-        for country in app.map:
-          if app.map[country].plots > 0:
-            if app.map[country].alignment == "Ally" or app.map[country].governance == 1:
-              allyGoodPlotCountries += 1
-        return allyGoodPlotCountries > 0
-      elif self.number == 22: # Mossad and Shin Bet
-        targetCells = 0
-        targetCells += app.map["Israel"].totalCells()
-        targetCells += app.map["Jordan"].totalCells()
-        targetCells += app.map["Lebanon"].totalCells()
-        return targetCells > 0
-      elif self.number == 23 or self.number == 24 or self.number == 25: # Predator
-        numMuslimCellCountries = 0
-        for country in app.map:
-          if app.map[country].totalCells(True) > 0:
-            if app.map[country].culture == "Suni" or app.map[country].culture == "Shia-Mix":
-              numMuslimCellCountries += 1
-        return numMuslimCellCountries > 0
-      elif self.number == 26: # Quartet
-        if not "Abbas" in app.markers:
-          return False
-        if app.troops <= 4:
-          return False
+  return False
+
+@cardEvent(8, 9, 10)
+def eventSpecialForces(card, side, app):
+  while True:
+    input = app.getCountryFromUser("Remove a cell from what country that has troops or is adjacent to a country with troops (? for list)?: ",  "XXX", app.listCountriesWithCellAndAdjacentTroops)
+    if input == "":
+      app.output("")
+      return False
+    else:
+      if app.map[input].totalCells(True) <= 0:
+        app.output("There are no cells in %s" % input)
+        app.output("")
+      else:
+        foundTroops = False
         for country in app.map:
-          if app.isAdjacent(country, "Israel"):
-            if app.map[country].governance == 4:
-              return False
-        return True
-      elif self.number == 27: # Saddam Captured
-        return app.map["Iraq"].troops() > 0
-      elif self.number == 28: # Sharia
-        return app.numBesieged() > 0
-      elif self.number == 29: # Tony Blair
-        return True
-      elif self.number == 30: # UN Nation Building
-        numRC = app.numRegimeChange()
-        return (numRC > 0) and ("Vieira de Mello Slain" not in app.markers)
-      elif self.number == 31: # Wiretapping
-        if "Leak-Wiretapping" in app.markers:
-          return False
-        for country in ["United States", "United Kingdom", "Canada"]:
-          if app.map[country].totalCells() > 0 or app.map[country].cadre > 0 or app.map[country].plots > 0:
-            return True
+          if country == input or app.isAdjacent(input, country):
+            if app.map[country].troops() > 0:
+              foundTroops = True
+              break
+        if not foundTroops:
+          app.output("Neither this or any adjacent country have troops.")
+          app.output("")
+        else:
+          app.removeCell(input)
+          app.logCountry(input, True)
+          break
+
+@cardPlayable(11, reads = ())
+def playableAbbas(card, side, app):
+  return True
+
+@cardEvent(11)
+def eventAbbas(card, side, app):
+  numIRIsrael = 0
+  for country in app.map:
+    if app.isAdjacent(country, "Israel"):
+      if app.map[country].governance == 4:
+        numIRIsrael = 1
+        break
+  app.markers.append("Abbas")
+  app.outputToHistory("Abbas in play.", False)
+  if app.troops >= 5 and numIRIsrael <= 0:
+    app.changePrestige(1, False)
+    app.changeFunding(-2, True)
+
+@cardPlayable(12, reads = ())
+def playableAlAzhar(card, side, app):
+  return True
+
+@cardEvent(12)
+def eventAlAzhar(card, side, app):
+  app.testCountry("Egypt")
+  numIR = app.numIslamicRule()
+  if numIR <= 0:
+    app.changeFunding(-4, True)
+  else:
+    app.changeFunding(-2, True)
+
+@cardPlayable(13, reads = ("map",))
+def playableAnbarAwakening(card, side, app):
+  return (app.map["Iraq"].troops() > 0) or (app.map["Syria"].troops() > 0)
+
+@cardEvent(13)
+def eventAnbarAwakening(card, side, app):
+  if (app.map["Iraq"].troops() > 0) or (app.map["Syria"].troops() > 0):
+    app.markers.append("Anbar Awakening")
+    app.outputToHistory("Anbar Awakening in play.", False)
+    if app.map["Iraq"].troops() == 0:
+      app.map["Syria"].aid = 1
+      app.outputToHistory("Aid in Syria.", False)
+    elif app.map["Syria"].troops() == 0:
+      app.map["Iraq"].aid = 1
+      app.outputToHistory("Aid in Iraq.", False)
+    else:
+      app.output("There are troops in both Iraq and Syria.")
+      if app.getYesNoFromUser("Do you want to add the Aid to Iraq? (y/n): "):
+        app.map["Iraq"].aid = 1
+        app.outputToHistory("Aid in Iraq.", False)
+      else:
+        app.map["Syria"].aid = 1
+        app.outputToHistory("Aid in Syria.", False)
+    app.changePrestige(1, False)
+    app.output("")
+  else:
+    return False
+
+@cardPlayable(14, reads = ("map",))
+def playableCovertAction(card, side, app):
+  return len(app.boardIndex.withAlignment("Adversary")) > 0
+
+@cardEvent(14)
+def eventCovertAction(card, side, app):
+  targetCountry = ""
+  numAdv = 0
+  for country in app.map:
+    if app.map[country].alignment == "Adversary":
+      targetCountry = country
+      numAdv += 1
+  if numAdv == 0:
+    return False
+  elif numAdv > 1:
+    while True:
+      input = app.getCountryFromUser("Choose an Adversary country to attempt Covert Action (? for list): ",  "XXX", app.listAdversaryCountries)
+      if input == "":
+        app.output("")
         return False
-      elif self.number == 32: # Back Channel
-        if app.map["United States"].posture == "Hard":
-          return False
-        numAdv = app.numAdversary()
-        if numAdv <= 0:
-          return False
-        app.listAdversaryCountries()
-        return app.getYesNoFromUser("Do you have a card with a value that exactly matches an Adversary's Resources? (y/n): ")
-      elif self.number == 33: # Benazir Bhutto
-        if "Bhutto Shot" in app.markers:
-          return False
-        if app.map["Pakistan"].governance == 4:
-          return False
-        for countryObj in app.map["Pakistan"].links:
-          if countryObj.governance == 4:
+      else:
+        if app.map[input].alignment != "Adversary":
+          app.output("%s is not an Adversary." % input)
+          app.output("")
+        else:
+          targetCountry = input
+          break
+  actionRoll = app.getRollFromUser("Enter Covert Action roll or r to have program roll: ")
+  if actionRoll >= 4:
+    app.map[targetCountry].alignment = "Neutral"
+    app.outputToHistory("Covert Action successful, %s now Neutral." % targetCountry, False)
+    app.logCountry(targetCountry, True)
+  else:
+    app.outputToHistory("Covert Action fails.", True)
+
+@cardPlayable(15, reads = ("map",))
+def playableEthiopiaStrikes(card, side, app):
+  return (app.map["Somalia"].governance == 4) or (app.map["Sudan"].governance == 4)
+
+@cardEvent(15)
+def eventEthiopiaStrikes(card, side, app):
+  if (app.map["Somalia"].governance == 4) or (app.map["Sudan"].governance == 4):
+    if app.map["Somalia"].governance != 4:
+      app.map["Sudan"].governance = 3
+      app.map["Sudan"].alignment = "Neutral"
+      app.outputToHistory("Sudan now Poor Neutral.", False)
+      app.logCountry("Sudan", True)
+    elif app.map["Sudan"].governance != 4:
+      app.map["Somalia"].governance = 3
+      app.map["Somalia"].alignment = "Neutral"
+      app.outputToHistory("Somalia now Poor Neutral.", False)
+      app.logCountry("Somalia", True)
+    else:
+      app.output("Both Somalia and Sudan are under Islamic Rule.")
+      if app.getYesNoFromUser("Do you want Somalia to be set to Poor Neutral? (y/n): "):
+        app.map["Somalia"].governance = 3
+        app.map["Somalia"].alignment = "Neutral"
+        app.outputToHistory("Somalia now Poor Neutral.", False)
+        app.logCountry("Somalia", True)
+      else:
+        app.map["Sudan"].governance = 3
+        app.map["Sudan"].alignment = "Neutral"
+        app.outputToHistory("Sudan now Poor Neutral.", False)
+        app.logCountry("Sudan", True)
+    app.output("")
+  else:
+    return False
+
+@cardPlayable(16, reads = ())
+def playableEuroIslam(card, side, app):
+  return True
+
+@cardEvent(16)
+def eventEuroIslam(card, side, app):
+  posStr = app.getPostureFromUser("Select Benelux's Posture (hard or soft): ")
+  app.executeCardEuroIslam(posStr)
+
+@cardPlayable(17, reads = ())
+def playableFSB(card, side, app):
+  return True
+
+@cardEvent(17)
+def eventFSB(card, side, app):
+  app.outputToHistory("Examine Jihadist hand for Loose Nukes, HEU, or Kazakh Strain.", False)
+  hasThem = app.getYesNoFromUser("Does the Jihadist hand have Loose Nukes, HEU, or Kazakh Strain? (y/n): ")
+  if hasThem:
+    app.outputToHistory("Discard Loose Nukes, HEU, or Kazakh Strain from the Jihadist hand.", False)
+  else:
+    russiaCells = app.map["Russia"].totalCells(True)
+    cenAsiaCells = app.map["Central Asia"].totalCells(True)
+    if russiaCells > 0 or cenAsiaCells > 0:
+      if russiaCells == 0:
+        app.removeCell("Central Asia")
+        app.logCountry("Central Asia", True)
+      elif cenAsiaCells == 0:
+        app.removeCell("Russia")
+        app.logCountry("Russia", True)
+      else:
+        isRussia = app.getYesNoFromUser("There are cells in both Russia and Central Asia. Do you want to remove a cell in Russia? (y/n): ")
+        if isRussia:
+          app.removeCell("Russia")
+          app.logCountry("Russia", True)
+        else:
+          app.removeCell("Central Asia")
+          app.logCountry("Central Asia", False)
+    else:
+      app.outputToHistory("There are no cells in Russia or Central Asia.", False)
+  app.outputToHistory("Shuffle Jihadist hand.", True)
+
+@cardPlayable(18, reads = ())
+def playableIntelCommunity(card, side, app):
+  return True
+
+@cardEvent(18)
+def eventIntelCommunity(card, side, app):
+  app.outputToHistory("Examine Jihadist hand.  Do not change order of cards.", False)
+  app.outputToHistory("Conduct a 1-value operation (Use commands: alert, deploy, disrupt, reassessment, regime, withdraw, or woi).", False)
+  app.outputToHistory("You may now interrupt this action phase to play another card (Use the u command).", True)
+
+@cardPlayable(19, reads = ())
+def playableKemalistRepublic(card, side, app):
+  return True
+
+@cardEvent(19)
+def eventKemalistRepublic(card, side, app):
+  app.outputToHistory("Turkey now a Fair Ally.", False)
+  app.map["Turkey"].governance = 2
+  app.map["Turkey"].alignment = "Ally"
+  app.logCountry("Turkey", True)
+
+@cardPlayable(20, reads = ())
+def playableKingAbdullah(card, side, app):
+  return True
+
+@cardEvent(20)
+def eventKingAbdullah(card, side, app):
+  app.outputToHistory("Jordan now a Fair Ally.", False)
+  app.map["Jordan"].governance = 2
+  app.map["Jordan"].alignment = "Ally"
+  app.logCountry("Jordan", True)
+  app.changePrestige(1)
+  app.changeFunding(-1)
+
+@cardPlayable(21, reads = ("map",))
+def playableLetSRoll(card, side, app):
+  allyOrGood = app.boardIndex.withAlignment("Ally") | app.boardIndex.withGovernance(1)
+  return len(app.boardIndex.plots & allyOrGood) > 0
+
+@cardEvent(21)
+def eventLetSRoll(card, side, app):
+  while True:
+    plotCountry = app.getCountryFromUser("Draw a card.  Choose an Ally or Good country to remove a plot from (? for list): ", "XXX", app.listGoodAllyPlotCountries)
+    if plotCountry == "":
+      app.output("")
+      return False
+    else:
+      if app.map[plotCountry].governance != 1 and app.map[plotCountry].alignment != "Ally":
+        app.output("%s is not Good or an Ally." % plotCountry)
+        app.output("")
+      elif app.map[plotCountry].plots <= 0:
+        app.output("%s has no plots." % plotCountry)
+        app.output("")
+      else:
+        while True:
+          postureCountry = app.getCountryFromUser("Now choose a non-US country to set its Posture: ", "XXX", None)
+          if postureCountry == "":
+            app.output("")
             return False
-        return True
-      elif self.number == 34: # Enhanced Measures
-        if "Leak-Enhanced Measures" in app.markers or app.map["United States"].posture == "Soft":
-          return False
-        return app.numDisruptable() > 0
-      elif self.number == 35: # Hajib
-        return app.numIslamicRule() == 0
-      elif self.number == 36: # Indo-Pakistani Talks
-        if app.map['Pakistan'].governance == 1 or app.map['Pakistan'].governance == 2:
-          return True
+          else:
+            if postureCountry == "United States":
+              app.output("Choos a non-US country.")
+              app.output("")
+            else:
+              postureStr = app.getPostureFromUser("What Posture should %s have (h or s)? " % postureCountry)
+              app.executeCardLetsRoll(plotCountry, postureCountry, postureStr)
+              return False
+
+@cardPlayable(22, reads = ("map",))
+def playableMossadAndShinBet(card, side, app):
+  targetCells = 0
+  targetCells += app.map["Israel"].totalCells()
+  targetCells += app.map["Jordan"].totalCells()
+  targetCells += app.map["Lebanon"].totalCells()
+  return targetCells > 0
+
+@cardEvent(22)
+def eventMossadAndShinBet(card, side, app):
+  app.removeAllCellsFromCountry("Israel")
+  app.removeAllCellsFromCountry("Jordan")
+  app.removeAllCellsFromCountry("Lebanon")
+  app.outputToHistory("", False)
+
+@cardPlayable(23, 24, 25, reads = ("map",))
+def playablePredator(card, side, app):
+  return len(app.boardIndex.withCells(True) & app.boardIndex.withCulture("Suni", "Shia-Mix")) > 0
+
+@cardEvent(23, 24, 25)
+def eventPredator(card, side, app):
+  while True:
+    input = app.getCountryFromUser("Choose non-Iran Muslim Country to remove a cell from (? for list): ", "XXX", app.listMuslimCountriesWithCells)
+    if input == "":
+      app.output("")
+      return False
+    else:
+      if app.map[input].totalCells(True) == 0:
+        app.output("%s has no cells." % input)
+        app.output("")
+      elif app.map[input].culture == "Iran":
+        app.output("Iran is not allowed.")
+        app.output("")
+      elif app.map[input].culture == "Non-Muslim":
+        app.output("Choose a Muslim country.")
+        app.output("")
+      else:
+        app.removeCell(input)
+        app.logCountry(input, True)
+        break
+
+@cardPlayable(26, reads = ("map", "markers", "trackers"))
+def playableQuartet(card, side, app):
+  if not "Abbas" in app.markers:
+    return False
+  if app.troops <= 4:
+    return False
+  for country in app.map:
+    if app.isAdjacent(country, "Israel"):
+      if app.map[country].governance == 4:
         return False
-      elif self.number == 37: # Iraqi WMD
-        if app.map["United States"].posture == "Hard" and app.map["Iraq"].alignment == "Adversary":
-          return True
+  return True
+
+@cardEvent(26)
+def eventQuartet(card, side, app):
+  if not "Abbas" in app.markers:
+    return False
+  if app.troops <= 4:
+    return False
+  for country in app.map:
+    if app.isAdjacent(country, "Israel"):
+      if app.map[country].governance == 4:
         return False
-      elif self.number == 38: # Libyan Deal
-        if app.map["Libya"].governance == 3:
-          if app.map["Iraq"].alignment == "Ally" or app.map["Syria"].alignment == "Ally":
-            return True
+  app.changePrestige(2)
+  app.changeFunding(-3)
+  app.outputToHistory("", False)
+
+@cardPlayable(27, reads = ("map",))
+def playableSaddamCaptured(card, side, app):
+  return app.map["Iraq"].troops() > 0
+
+@cardEvent(27)
+def eventSaddamCaptured(card, side, app):
+  if app.map["Iraq"].troops() == 0:
+    return False
+  app.markers.append("Saddam Captured")
+  app.map["Iraq"].aid = 1
+  app.outputToHistory("Aid added in Iraq", False)
+  app.changePrestige(1)
+  app.logCountry("Iraq", True)
+
+@cardPlayable(28, reads = ("map",))
+def playableSharia(card, side, app):
+  return app.numBesieged() > 0
+
+@cardEvent(28)
+def eventSharia(card, side, app):
+  numBesieged = app.numBesieged()
+  target = ""
+  if numBesieged <= 0:
+    return False
+  elif numBesieged == 1:
+    for country in app.map:
+      if app.map[country].besieged > 0:
+        target = country
+        break
+  else:
+    while True:
+      input = app.getCountryFromUser("Choose a country with a Besieged Regime marker to remove (? for list): ",  "XXX", app.listBesiegedCountries)
+      if input == "":
+        app.output("")
         return False
-      elif self.number == 39: # Libyan WMD
-        if app.map["United States"].posture == "Hard" and app.map["Libya"].alignment == "Adversary" and "Libyan Deal" not in app.markers:
-          return True
+      else:
+        if app.map[input].besieged <= 0:
+          app.output("%s is not a Besieged Regime." % input)
+          app.output("")
+        else:
+          target = input
+          break
+  app.map[target].besieged = 0
+  app.outputToHistory("%s is no longer a Besieged Regime." % target, False)
+  app.logCountry(target, True)
+
+@cardPlayable(29, reads = ())
+def playableTonyBlair(card, side, app):
+  return True
+
+@cardEvent(29)
+def eventTonyBlair(card, side, app):
+  app.map["United Kingdom"].posture = app.map["United States"].posture
+  app.outputToHistory("United Kingdom posture now %s" % app.map["United Kingdom"].posture, False)
+  app.output("You may roll War of Ideas in up to 3 Schengen countries.")
+  for i in range(3):
+    target = ""
+    finishedPicking = False
+    while not target:
+      input = app.getCountryFromUser("Choose Schengen country to make a WOI roll (done to stop rolling) (? for list)?: ",  "done", app.listSchengenCountries)
+      if input == "":
+        app.output("")
         return False
-      elif self.number == 40: # Mass Turnout
-        return app.numRegimeChange() > 0
-      elif self.number == 41: # NATO
-        return (app.numRegimeChange() > 0) and (app.gwotPenalty() >= 0)
-      elif self.number == 42: # Pakistani Offensive
-        return (app.map["Pakistan"].alignment == "Ally") and ("FATA" in app.map["Pakistan"].markers)
-      elif self.number == 43: # Patriot Act
-        return True
-      elif self.number == 44: # Renditions
-        return (app.map["United States"].posture == "Hard") and ("Leak-Renditions" not in app.markers)
-      elif self.number == 45: # Safer Now
-        if app.numIslamicRule() > 0:
-          return False
-        for country in app.map:
-          if app.map[country].governance == 1:
-            if app.map[country].totalCells(True) > 0 or app.map[country].plots > 0:
-              return False
-        return True
-      elif self.number == 46: # Sistani
-        targetCountries = 0
-        for country in app.map:
-          if app.map[country].culture == "Shia-Mix":
-            if app.map[country].regimeChange > 0:
-              if (app.map[country].totalCells(True)) > 0:
-                targetCountries += 1
-        return targetCountries > 0
-      elif self.number == 47: # The door of Itjihad was closed
-        return True
+      elif input == "done":
+        finishedPicking = True
+        break
       else:
+        if not app.map[input].schengen:
+          app.output("%s is not a Schengen country." % input)
+          app.output("")
+          return False
+        else:
+          target = input
+          postureRoll = app.getRollFromUser("Enter Posture Roll or r to have program roll: ")
+          app.executeNonMuslimWOI(target, postureRoll)
+    if finishedPicking:
+      break
+  app.outputToHistory("", False)
+
+@cardPlayable(30, reads = ("map", "markers"))
+def playableUNNationBuilding(card, side, app):
+  numRC = app.numRegimeChange()
+  return (numRC > 0) and ("Vieira de Mello Slain" not in app.markers)
+
+@cardEvent(30)
+def eventUNNationBuilding(card, side, app):
+  numRC = app.numRegimeChange()
+  if (numRC <= 0) or ("Vieira de Mello Slain" in app.markers):
+    return False
+  target = ""
+  if numRC == 1:
+    for country in app.map:
+      if app.map[country].regimeChange > 0:
+        target = country
+        break
+  else:
+    while True:
+      input = app.getCountryFromUser("Choose a Regime Change country (? for list): ",  "XXX", app.listRegimeChangeCountries)
+      if input == "":
+        app.output("")
         return False
-    elif self.type == "Jihadist" and side == "Jihadist":
-      if "The door of Itjihad was closed" in app.lapsing:
+      else:
+        if app.map[input].regimeChange <= 0:
+          app.output("%s is not a Regime Change country." % input)
+          app.output("")
+        else:
+          target = input
+          break
+  app.map[target].aid = 1
+  app.outputToHistory("Aid added to %s." % target, False)
+  woiRoll = app.getRollFromUser("Enter WOI Roll or r to have program roll: ")
+  modRoll = app.modifiedWoIRoll(woiRoll, target, False)
+  app.handleMuslimWoI(modRoll, target)
+
+@cardPlayable(31, reads = ("map", "markers"))
+def playableWiretapping(card, side, app):
+  if "Leak-Wiretapping" in app.markers:
+    return False
+  for country in ["United States", "United Kingdom", "Canada"]:
+    if app.map[country].totalCells() > 0 or app.map[country].cadre > 0 or app.map[country].plots > 0:
+      return True
+  return False
+
+@cardEvent(31)
+def eventWiretapping(card, side, app):
+  if "Leak-Wiretapping" in app.markers:
+    return False
+  for country in ["United States", "United Kingdom", "Canada"]:
+    if app.map[country].activeCells > 0:
+      num = app.map[country].activeCells
+      if num > 0:
+        app.map[country].activeCells -= num
+        app.cells += num
+        app.outputToHistory("%d Active Cell(s) removed from %s." % (num, country), False)
+    if app.map[country].sleeper_cells > 0:
+      num = app.map[country].sleeper_cells
+      if num > 0:
+        app.map[country].sleeper_cells -= num
+        app.cells += num
+        app.outputToHistory("%d Sleeper Cell(s) removed from %s." % (num, country), False)
+    if app.map[country].cadre > 0:
+      num = app.map[country].cadre
+      if num > 0:
+        app.map[country].cadre = 0
+        app.outputToHistory("Cadre removed from %s." % country, False)
+    if app.map[country].plots > 0:
+      num = app.map[country].plots
+      if num > 0:
+        app.map[country].plots -= num
+        app.outputToHistory("%d Plots remove(d) from %s." % (num, country), False)
+  app.markers.append("Wiretapping")
+  app.outputToHistory("Wiretapping in Play.", True)
+
+@cardPlayable(32, reads = ("map", "input"))
+def playableBackChannel(card, side, app):
+  if app.map["United States"].posture == "Hard":
+    return False
+  numAdv = app.numAdversary()
+  if numAdv <= 0:
+    return False
+  app.listAdversaryCountries()
+  return app.getYesNoFromUser("Do you have a card with a value that exactly matches an Adversary's Resources? (y/n): ")
+
+@cardEvent(32)
+def eventBackChannel(card, side, app):
+  if app.map["United States"].posture == "Hard":
+    return False
+  numAdv = app.numAdversary()
+  if numAdv <= 0:
+    return False
+  if app.getYesNoFromUser("Do you want to discard a card with a value that exactly matches an Adversary's Resources? (y/n): "):
+    while True:
+      input = app.getCountryFromUser("Choose an Adversary country (? for list): ",  "XXX", app.listAdversaryCountries)
+      if input == "":
+        app.output("")
         return False
-      if self.number == 48: # Adam Gadahn
-        if app.numCellsAvailable() <= 0:
+      else:
+        if app.map[input].alignment != "Adversary":
+          app.output("%s is not a Adversary country." % input)
+          app.output("")
+        else:
+          app.map[input].alignment = "Neutral"
+          app.outputToHistory("%s now Neutral" % input, False)
+          app.map[input].aid = 1
+          app.outputToHistory("Aid added to %s." % input, False)
+          app.logCountry(input, True)
+          break
+
+@cardPlayable(33, reads = ("map", "markers"))
+def playableBenazirBhutto(card, side, app):
+  if "Bhutto Shot" in app.markers:
+    return False
+  if app.map["Pakistan"].governance == 4:
+    return False
+  for countryObj in app.map["Pakistan"].links:
+    if countryObj.governance == 4:
+      return False
+  return True
+
+@cardEvent(33)
+def eventBenazirBhutto(card, side, app):
+  app.markers.append("Benazir Bhutto")
+  app.outputToHistory("Benazir Bhutto in Play.", False)
+  if app.map["Pakistan"].governance == 3:
+    app.map["Pakistan"].governance = 2
+    app.outputToHistory("Pakistan now Fair governance.", False)
+  app.outputToHistory("No Jihads in Pakistan.", False)
+  app.logCountry("Pakistan", True)
+
+@cardPlayable(34, reads = ("map", "markers"))
+def playableEnhancedMeasures(card, side, app):
+  if "Leak-Enhanced Measures" in app.markers or app.map["United States"].posture == "Soft":
+    return False
+  return app.numDisruptable() > 0
+
+@cardEvent(34)
+def eventEnhancedMeasures(card, side, app):
+  app.markers.append("Enhanced Measures")
+  app.outputToHistory("Enhanced Measures in Play.", False)
+  app.outputToHistory("Take a random card from the Jihadist hand.", False)
+  app.do_disrupt("")
+  app.outputToHistory("", False)
+
+@cardPlayable(35, reads = ("map",))
+def playableHajib(card, side, app):
+  return app.numIslamicRule() == 0
+
+@cardEvent(35)
+def eventHajib(card, side, app):
+  app.testCountry("Turkey")
+  app.map["Turkey"].governance -= 1
+  app.outputToHistory("Turkey Governance now %s." % app.map["Turkey"].govStr(), False)
+  app.changeFunding(-2)
+  posStr = app.getPostureFromUser("Select Frances's Posture (hard or soft): ")
+  app.map["France"].posture = posStr
+  app.logCountry("Turkey", False)
+  app.logCountry("France", True)
+
+@cardPlayable(36, reads = ("map",))
+def playableIndoPakistaniTalks(card, side, app):
+  if app.map['Pakistan'].governance == 1 or app.map['Pakistan'].governance == 2:
+    return True
+  return False
+
+@cardEvent(36)
+def eventIndoPakistaniTalks(card, side, app):
+  app.markers.append("Indo-Pakistani Talks")
+  app.outputToHistory("Indo-Pakistani Talks in Play.", False)
+  app.map['Pakistan'].alignment = "Ally"
+  app.outputToHistory("Pakistan now Ally", False)
+  posStr = app.getPostureFromUser("Select India's Posture (hard or soft): ")
+  app.map["India"].posture = posStr
+  app.logCountry("Pakistan", False)
+  app.logCountry("India", True)
+
+@cardPlayable(37, reads = ("map",))
+def playableIraqiWMD(card, side, app):
+  if app.map["United States"].posture == "Hard" and app.map["Iraq"].alignment == "Adversary":
+    return True
+  return False
+
+@cardEvent(37)
+def eventIraqiWMD(card, side, app):
+  app.markers.append("Iraqi WMD")
+  app.outputToHistory("Iraqi WMD in Play.", False)
+  app.outputToHistory("Use this or a later card for Regime Change in Iraq at any Governance.", True)
+
+@cardPlayable(38, reads = ("map",))
+def playableLibyanDeal(card, side, app):
+  if app.map["Libya"].governance == 3:
+    if app.map["Iraq"].alignment == "Ally" or app.map["Syria"].alignment == "Ally":
+      return True
+  return False
+
+@cardEvent(38)
+def eventLibyanDeal(card, side, app):
+  app.markers.append("Libyan Deal")
+  app.outputToHistory("Libyan Deal in Play.", False)
+  app.map["Libya"].alignment == "Ally"
+  app.outputToHistory("Libya now Ally", False)
+  app.changePrestige(1)
+  app.output("Select the Posture of 2 Schengen countries.")
+  for i in range(2):
+    target = ""
+    while not target:
+      input = app.getCountryFromUser("Choose Schengen country (? for list)?: ", "XXX", app.listSchengenCountries)
+      if input == "":
+        app.output("")
+      else:
+        if not app.map[input].schengen:
+          app.output("%s is not a Schengen country." % input)
+          app.output("")
           return False
-        return app.getYesNoFromUser("Is this the 1st card of the Jihadist Action Phase? (y/n): ")
-      elif self.number == 49: # Al-Ittihad al-Islami
-        return True
-      elif self.number == 50: # Ansar al-Islam
-        return app.map["Iraq"].governance > 1
-      elif self.number == 51: # FREs
-        return app.map["Iraq"].troops() > 0
-      elif self.number == 52: # IDEs
-        for country in app.map:
-          if app.map[country].regimeChange > 0:
-            if (app.map[country].totalCells(True)) > 0:
-              return True
+        else:
+          target = input
+          posStr = app.getPostureFromUser("Select %s's Posture (hard or soft): " % target)
+          app.map[target].posture = posStr
+          app.logCountry(target, False)
+  app.outputToHistory("", False)
+
+@cardPlayable(39, reads = ("map", "markers"))
+def playableLibyanWMD(card, side, app):
+  if app.map["United States"].posture == "Hard" and app.map["Libya"].alignment == "Adversary" and "Libyan Deal" not in app.markers:
+    return True
+  return False
+
+@cardEvent(39)
+def eventLibyanWMD(card, side, app):
+  app.markers.append("Libyan WMD")
+  app.outputToHistory("Libyan WMD in Play.", False)
+  app.outputToHistory("Use this or a later card for Regime Change in Libya at any Governance.", True)
+
+@cardPlayable(40, reads = ("map",))
+def playableMassTurnout(card, side, app):
+  return app.numRegimeChange() > 0
+
+@cardEvent(40)
+def eventMassTurnout(card, side, app):
+  numRC = app.numRegimeChange()
+  target = ""
+  if numRC <= 0:
+    return False
+  elif numRC == 1:
+    for country in app.map:
+      if app.map[country].regimeChange > 0:
+        target = country
+        break
+  else:
+    while True:
+      input = app.getCountryFromUser("Choose a Regime Change Country to improve governance (? for list): ",  "XXX", app.listRegimeChangeCountries)
+      if input == "":
+        app.output("")
         return False
-      elif self.number == 53: # Madrassas
-        return app.getYesNoFromUser("Is this the 1st card of the Jihadist Action Phase? (y/n): ")
-      elif self.number == 54: # Moqtada al-Sadr
-        return app.map["Iraq"].troops() > 0
-      elif self.number == 55: # Uyghur Jihad
-        return True
-      elif self.number == 56: # Vieira de Mello Slain
-        for country in app.map:
-          if app.map[country].regimeChange > 0 and app.map[country].totalCells() > 0:
-            return True
+      else:
+        if app.map[input].regimeChange <= 0:
+          app.output("%s is not a Regime Change country." % input)
+          app.output("")
+        else:
+          target = input
+          break
+  app.improveGovernance(target)
+  app.outputToHistory("%s Governance improved." % target, False)
+  app.logCountry(target, True)
+
+@cardPlayable(41, reads = ("map",))
+def playableNATO(card, side, app):
+  return (app.numRegimeChange() > 0) and (app.gwotPenalty() >= 0)
+
+@cardEvent(41)
+def eventNATO(card, side, app):
+  numRC = app.numRegimeChange()
+  target = ""
+  if numRC <= 0:
+    return False
+  elif numRC == 1:
+    for country in app.map:
+      if app.map[country].regimeChange > 0:
+        target = country
+        break
+  else:
+    while True:
+      input = app.getCountryFromUser("Choose a Regime Change Country to land NATO troops (? for list): ",  "XXX", app.listRegimeChangeCountries)
+      if input == "":
+        app.output("")
         return False
-      elif self.number == 57: # Abu Sayyaf
-        return "Moro Talks" not in app.markers
-      elif self.number == 58: # Al-Anbar
-        return "Anbar Awakening" not in app.markers
-      elif self.number == 59: # Amerithrax
-        return True
-      elif self.number == 60: # Bhutto Shot
-        return app.map["Pakistan"].totalCells() > 0
-      elif self.number == 61: # Detainee Release
-        if "GTMO" in app.lapsing or "Renditions" in app.markers:
-          return False
-        return app.getYesNoFromUser("Did the US Disrupt during this or the last Action Phase? (y/n): ")
-      elif self.number == 62: # Ex-KGB
-        return True
-      elif self.number == 63: # Gaza War
-        return True
-      elif self.number == 64: # Hariri Killed
-        return True
-      elif self.number == 65: # HEU
-        possibles = 0
-        if app.map["Russia"].totalCells() > 0 and "CTR" not in app.map["Russia"].markers:
-          possibles += 1
-        if app.map["Central Asia"].totalCells() > 0 and "CTR" not in app.map["Central Asia"].markers:
-          possibles += 1
-        return possibles > 0
-      elif self.number == 66: # Homegrown
-        return True
-      elif self.number == 67: # Islamic Jihad Union
-        return True
-      elif self.number == 68: # Jemaah Islamiya
-        return True
-      elif self.number == 69: # Kazakh Strain
-        return app.map["Central Asia"].totalCells() > 0 and "CTR" not in app.map["Central Asia"].markers
-      elif self.number == 70: # Lashkar-e-Tayyiba
-        return "Indo-Pakistani Talks" not in app.markers
-      elif self.number == 71: # Loose Nuke
-        return app.map["Russia"].totalCells() > 0 and "CTR" not in app.map["Russia"].markers
-      elif self.number == 72: # Opium
-        return app.map["Afghanistan"].totalCells() > 0
-      elif self.number == 73: # Pirates
-        return app.map["Somalia"].governance == 4 or app.map["Yemen"].governance == 4
-      elif self.number == 74: # Schengen Visas
-        return True
-      elif self.number == 75: # Schroeder & Chirac
-        return app.map["United States"].posture == "Hard"
-      elif self.number == 76: # Abu Ghurayb
-        targetCountries = 0
-        for country in app.map:
-          if app.map[country].regimeChange > 0:
-            if (app.map[country].totalCells(True)) > 0:
-              targetCountries += 1
-        return targetCountries > 0
-      elif self.number == 77: # Al Jazeera
-        if app.map["Saudi Arabia"].troops() > 0:
-          return True
-        for country in app.map:
-          if app.isAdjacent("Saudi Arabia", country):
-            if app.map[country].troops() > 0:
-              return True
-        return False
-      elif self.number == 78: # Axis of Evil
-        return True
-      elif self.number == 79: # Clean Operatives
-        return True
-      elif self.number == 80: # FATA
-        return True
-      elif self.number == 81: # Foreign Fighters
-        return app.numRegimeChange() > 0
-      elif self.number == 82: # Jihadist Videos
-        return True
-      elif self.number == 83: # Kashmir
-        return "Indo-Pakistani Talks" not in app.markers
-      elif self.number == 84 or self.number == 85: # Leak
-        return ("Enhanced Measures" in app.markers) or ("Renditions" in app.markers) or ("Wiretapping" in app.markers)
-      elif self.number == 86: # Lebanon War
-        return True
-      elif self.number == 87 or self.number == 88 or self.number == 89: # Martyrdom Operation
-        for country in app.map:
-          if app.map[country].governance != 4:
-            if app.map[country].totalCells(True) > 0:
-              return True
-        return False
-      elif self.number == 90: # Quagmire
-        if app.prestige >= 7:
-          return False
-        for country in app.map:
-          if app.map[country].regimeChange > 0:
-            if app.map[country].totalCells(True) > 0:
-              return True
-        return False
-      elif self.number == 91: # Regional al-Qaeda
-        num = 0
-        for country in app.map:
-          if app.map[country].culture == "Suni" or app.map[country].culture == "Shia-Mix":
-            if app.map[country].governance == 0:
-              num += 1
-        return num >= 2
-      elif self.number == 92: # Saddam
-        if "Saddam Captured" in app.markers:
-          return False
-        return (app.map["Iraq"].governance == 3) and (app.map["Iraq"].alignment == "Adversary")
-      elif self.number == 93: # Taliban
-        return True
-      elif self.number == 94: # The door of Itjihad was closed
-        return app.getYesNoFromUser("Was a country tested or improved to Fair or Good this or last Action Phase.? (y/n): ")
-      elif self.number == 95: # Wahhabism
-        return True
-    else: # Unassociated Events
-      if side == "Jihadist" and "The door of Itjihad was closed" in app.lapsing:
-        return False
-      if self.number == 96: # Danish Cartoons
-        return True
-      elif self.number == 97: # Fatwa
-        return app.getYesNoFromUser("Do both sides have cards remaining beyond this one? (y/n): ")
-      elif self.number == 98: # Gaza Withdrawl
-        return True
-      elif self.number == 99: # HAMAS Elected
-        return True
-      elif self.number == 100: # His Ut-Tahrir
-        return True
-      elif self.number == 101: # Kosovo
-        return True
-      elif self.number == 102: # Former Soviet Union
-        return True
-      elif self.number == 103: # Hizballah
-        return True
-      elif self.number == 104 or self.number == 105: # Iran
-        return True
-      elif self.number == 106: # Jaysh al-Mahdi
-        for country in app.map:
-          if app.map[country].culture == "Shia-Mix":
-            if app.map[country].troops() > 0 and app.map[country].totalCells() > 0:
-              return True
+      else:
+        if app.map[input].regimeChange <= 0:
+          app.output("%s is not a Regime Change country." % input)
+          app.output("")
+        else:
+          target = input
+          break
+  app.map[target].markers.append("NATO")
+  app.outputToHistory("NATO added in %s" % target, False)
+  app.map[target].aid = 1
+  app.outputToHistory("Aid added in %s" % target, False)
+  app.logCountry(target, True)
+
+@cardPlayable(42, reads = ("map",))
+def playablePakistaniOffensive(card, side, app):
+  return (app.map["Pakistan"].alignment == "Ally") and ("FATA" in app.map["Pakistan"].markers)
+
+@cardEvent(42)
+def eventPakistaniOffensive(card, side, app):
+  if "FATA" in app.map["Pakistan"].markers:
+    app.map["Pakistan"].markers.remove("FATA")
+    app.outputToHistory("FATA removed from Pakistan", True)
+
+@cardPlayable(43, reads = ())
+def playablePatriotAct(card, side, app):
+  return True
+
+@cardEvent(43)
+def eventPatriotAct(card, side, app):
+  app.markers.append("Patriot Act")
+
+@cardPlayable(44, reads = ("map", "markers"))
+def playableRenditions(card, side, app):
+  return (app.map["United States"].posture == "Hard") and ("Leak-Renditions" not in app.markers)
+
+@cardEvent(44)
+def eventRenditions(card, side, app):
+  app.markers.append("Renditions")
+  app.outputToHistory("Renditions in Play.", False)
+  app.outputToHistory("Discard a random card from the Jihadist hand.", False)
+  if app.numDisruptable() > 0:
+    app.do_disrupt("")
+  app.outputToHistory("", False)
+
+@cardPlayable(45, reads = ("map",))
+def playableSaferNow(card, side, app):
+  if app.numIslamicRule() > 0:
+    return False
+  for country in app.map:
+    if app.map[country].governance == 1:
+      if app.map[country].totalCells(True) > 0 or app.map[country].plots > 0:
         return False
-      elif self.number == 107: # Kurdistan
-        return True
-      elif self.number == 108: # Musharraf
-        if "Benazir Bhutto" in app.markers:
-          return False
-        return app.map["Pakistan"].totalCells() > 0
-      elif self.number == 109: # Tora Bora
-        for country in app.map:
-          if app.map[country].regimeChange > 0:
-            if app.map[country].totalCells() >= 2:
-              return True
+  return True
+
+@cardEvent(45)
+def eventSaferNow(card, side, app):
+  app.changePrestige(3)
+  postureRoll = app.getRollFromUser("Enter US Posture Roll or r to have program roll: ")
+  if postureRoll <= 4:
+    app.map["United States"].posture = "Soft"
+    app.outputToHistory("US Posture now Soft.", False)
+  else:
+    app.map["United States"].posture = "Hard"
+    app.outputToHistory("US Posture now Hard.", False)
+  while True:
+    postureCountry = app.getCountryFromUser("Now choose a non-US country to set its Posture: ", "XXX", None)
+    if postureCountry == "":
+      app.output("")
+    else:
+      if postureCountry == "United States":
+        app.output("Choos a non-US country.")
+        app.output("")
+      else:
+        postureStr = app.getPostureFromUser("What Posture should %s have (h or s)? " % postureCountry)
+        app.outputToHistory("%s Posture now %s" % (postureCountry, postureStr), False)
+        app.map[postureCountry].posture = postureStr
+        app.logCountry("United States", False)
+        app.logCountry(postureCountry, True)
+        break
+
+@cardPlayable(46, reads = ("map",))
+def playableSistani(card, side, app):
+  shiaMix = app.boardIndex.withCulture("Shia-Mix")
+  return len(shiaMix & app.boardIndex.regimeChange & app.boardIndex.withCells(True)) > 0
+
+@cardEvent(46)
+def eventSistani(card, side, app):
+  targetCountries = []
+  for country in app.map:
+    if app.map[country].culture == "Shia-Mix":
+      if app.map[country].regimeChange > 0:
+        if (app.map[country].totalCells(True)) > 0:
+          targetCountries.append(country)
+  if len(targetCountries) == 1:
+    target = targetCountries[0]
+  else:
+    target = None
+  while not target:
+    input = app.getCountryFromUser("Choose a Shia-Mix Regime Change Country with a cell to improve governance (? for list): ",  "XXX", app.listShiaMixRegimeChangeCountriesWithCells)
+    if input == "":
+      app.output("")
+    else:
+      if input not in targetCountries:
+        app.output("%s is not a Shi-Mix Regime Change Country with a cell." % input)
+        app.output("")
+      else:
+        target = input
+        break
+  app.improveGovernance(target)
+  app.outputToHistory("%s Governance improved." % target, False)
+  app.logCountry(target, True)
+
+@cardPlayable(47, reads = ())
+def playableTheDoorOfItjihadWasClosed47(card, side, app):
+  return True
+
+@cardEvent(47)
+def eventTheDoorOfItjihadWasClosed47(card, side, app):
+  app.lapsing.append("The door of Itjihad was closed")
+
+@cardPlayable(48, reads = ("trackers", "input"))
+def playableAdamGadahn(card, side, app):
+  if app.numCellsAvailable() <= 0:
+    return False
+  return app.getYesNoFromUser("Is this the 1st card of the Jihadist Action Phase? (y/n): ")
+
+@cardEvent(48)
+def eventAdamGadahn(card, side, app):
+  cardNum = app.getCardNumFromUser("Enter the number of the next Jihadist card or none if there are none left: ")
+  if cardNum == "none":
+    app.outputToHistory("No cards left to recruit to US.", True)
+    app.outputToHistory("Jihadist Activity Phase findshed, enter plot command.", True)
+    return False
+  ops = app.deck[str(cardNum)].ops
+  rolls = []
+  for i in range(ops):
+    rolls.append(app.dice.roll())
+  app.outputToHistory("Jihadist Activity Phase findshed, enter plot command.", True)
+  app.executeRecruit("United States", ops, rolls, 2)
+
+@cardPlayable(49, reads = ())
+def playableAlIttihadAlIslami(card, side, app):
+  return True
+
+@cardEvent(49)
+def eventAlIttihadAlIslami(card, side, app):
+  app.placeCells("Somalia", 1)
+
+@cardPlayable(50, reads = ("map",))
+def playableAnsarAlIslam(card, side, app):
+  return app.map["Iraq"].governance > 1
+
+@cardEvent(50)
+def eventAnsarAlIslam(card, side, app):
+  possible = ["Iraq", "Iran"]
+  target = app.dice.choice(possible)
+  app.placeCells(target, 1)
+
+@cardPlayable(51, reads = ("map",))
+def playableFREs(card, side, app):
+  return app.map["Iraq"].troops() > 0
+
+@cardEvent(51)
+def eventFREs(card, side, app):
+  if "Saddam Captured" in app.markers:
+    cellsToMove = 2
+  else:
+    cellsToMove = 4
+  cellsToMove = min(cellsToMove, app.cells)
+  app.placeCells("Iraq", cellsToMove)
+
+@cardPlayable(52, reads = ("map",))
+def playableIDEs(card, side, app):
+  return len(app.boardIndex.regimeChange & app.boardIndex.withCells(True)) > 0
+
+@cardEvent(52)
+def eventIDEs(card, side, app):
+  app.outputToHistory("US randomly discards one card.", True)
+
+@cardPlayable(53, reads = ("input",))
+def playableMadrassas(card, side, app):
+  return app.getYesNoFromUser("Is this the 1st card of the Jihadist Action Phase? (y/n): ")
+
+@cardEvent(53)
+def eventMadrassas(card, side, app):
+  app.handleRecruit(1, True)
+  cardNum = app.getCardNumFromUser("Enter the number of the next Jihadist card or none if there are none left: ")
+  if cardNum == "none":
+    app.outputToHistory("No cards left to recruit.", True)
+    app.outputToHistory("Jihadist Activity Phase findshed, enter plot command.", True)
+    return False
+  ops = app.deck[str(cardNum)].ops
+  app.handleRecruit(ops, True)
+  app.outputToHistory("Jihadist Activity Phase findshed, enter plot command.", True)
+
+@cardPlayable(54, reads = ("map",))
+def playableMoqtadaAlSadr(card, side, app):
+  return app.map["Iraq"].troops() > 0
+
+@cardEvent(54)
+def eventMoqtadaAlSadr(card, side, app):
+  app.map["Iraq"].markers.append("Sadr")
+  app.outputToHistory("Sadr Maker added in Iraq", True)
+
+@cardPlayable(55, reads = ())
+def playableUyghurJihad(card, side, app):
+  return True
+
+@cardEvent(55)
+def eventUyghurJihad(card, side, app):
+  app.testCountry("China")
+  if app.cells > 0:
+    if app.map["China"].posture == "Soft":
+      app.map["China"].sleeper_cells += 1
+      app.cells -= 1
+      app.outputToHistory("Sleeper Cell placed in China", False)
+      app.logCountry("China", True)
+    else:
+      app.testCountry("Central Asia")
+      app.map["Central Asia"].sleeper_cells += 1
+      app.cells -= 1
+      app.outputToHistory("Sleeper Cell placed in Central Asia", False)
+      app.logCountry("Central Asia", True)
+  else:
+    app.outputToHistory("No cells to place.", True)
+
+@cardPlayable(56, reads = ("map",))
+def playableVieiraDeMelloSlain(card, side, app):
+  return len(app.boardIndex.regimeChange & app.boardIndex.withCells()) > 0
+
+@cardEvent(56)
+def eventVieiraDeMelloSlain(card, side, app):
+  app.markers.append("Vieira de Mello Slain")
+  app.outputToHistory("Vieira de Mello Slain in play.", False)
+  app.changePrestige(-1)
+
+@cardPlayable(57, reads = ("markers",))
+def playableAbuSayyaf(card, side, app):
+  return "Moro Talks" not in app.markers
+
+@cardEvent(57)
+def eventAbuSayyaf(card, side, app):
+  app.placeCells("Philippines", 1)
+  app.markers.append("Abu Sayyaf")
+
+@cardPlayable(58, reads = ("markers",))
+def playableAlAnbar(card, side, app):
+  return "Anbar Awakening" not in app.markers
+
+@cardEvent(58)
+def eventAlAnbar(card, side, app):
+  app.markers.append("Al-Anbar")
+  app.outputToHistory("Al-Anbar in play.", True)
+  app.testCountry("Iraq")
+  if app.cells > 0:
+    app.map["Iraq"].sleeper_cells += 1
+    app.cells -= 1
+    app.outputToHistory("Sleeper Cell placed in Iraq", True)
+
+@cardPlayable(59, reads = ())
+def playableAmerithrax(card, side, app):
+  return True
+
+@cardEvent(59)
+def eventAmerithrax(card, side, app):
+  app.outputToHistory("US side discards its highest-value US-associated event card, if it has any.", True)
+
+@cardPlayable(60, reads = ("map",))
+def playableBhuttoShot(card, side, app):
+  return app.map["Pakistan"].totalCells() > 0
+
+@cardEvent(60)
+def eventBhuttoShot(card, side, app):
+  app.markers.append("Bhutto Shot")
+  app.outputToHistory("Bhutto Shot in play.", True)
+
+@cardPlayable(61, reads = ("markers", "lapsing", "input"))
+def playableDetaineeRelease(card, side, app):
+  if "GTMO" in app.lapsing or "Renditions" in app.markers:
+    return False
+  return app.getYesNoFromUser("Did the US Disrupt during this or the last Action Phase? (y/n): ")
+
+@cardEvent(61)
+def eventDetaineeRelease(card, side, app):
+  if app.cells > 0:
+    target = None
+    while not target:
+      input = app.getCountryFromUser("Choose a country where Disrupt occured this or last Action Phase: ",  "XXX", None)
+      if input == "":
+        app.output("")
         return False
-      elif self.number == 110: # Zarqawi
-        return app.map["Iraq"].troops() > 0 or app.map["Syria"].troops() > 0 or app.map["Lebanon"].troops() > 0 or app.map["Jordan"].troops() > 0
-      elif self.number == 111: # Zawahiri
-        if side == "US":
-          if "FATA" in app.map["Pakistan"].markers:
-            return False
-          if "Al-Anbar" in app.markers:
-            return False
-          return app.numIslamicRule() == 0
-        else:
-          return True
-      elif self.number == 112: # Bin Ladin
-        if side == "US":
-          if "FATA" in app.map["Pakistan"].markers:
-            return False
-          if "Al-Anbar" in app.markers:
-            return False
-          return app.numIslamicRule() == 0
-        else:
-          return True
-      elif self.number == 113: # Darfur
-        return True
-      elif self.number == 114: # GTMO
-        return True
-      elif self.number == 115: # Hambali
-        possibles = ["Indonesia/Malaysia"]
-        for countryObj in app.map["Indonesia/Malaysia"].links:
-          possibles.append(countryObj.name)
-        for country in possibles:
-          if app.map[country].totalCells(True) > 0:
-            if app.map[country].culture == "Non-Muslim":
-              if app.map[country].posture == "Hard":
-                return True
-            else:
-              if app.map[country].alignment == "Ally":
-                return True
-      elif self.number == 116: # KSM
-        if side == "US":
-          for country in app.map:
-            if app.map[country].plots > 0:
-              if app.map[country].culture == "Non-Muslim" or app.map[country].alignment == "Ally":
-                return True
-          return False
+      else:
+        target = input
+        break
+    app.testCountry(target)
+    app.map[target].sleeper_cells += 1
+    app.cells -= 1
+    app.outputToHistory("Sleeper Cell placed in %s" % target, False)
+    app.logCountry(target, True)
+  app.outputToHistory("Draw a card for the Jihadist and put it on the top of their hand.", True)
+
+@cardPlayable(62, reads = ())
+def playableExKGB(card, side, app):
+  return True
+
+@cardEvent(62)
+def eventExKGB(card, side, app):
+  if "CTR" in app.map["Russia"].markers:
+    app.map["Russia"].markers.remove("CTR")
+    app.outputToHistory("CTR removed from Russia.", True)
+  else:
+    targetCaucasus = False
+    if app.map["Caucasus"].posture == "" or app.map["Caucasus"].posture == app.map["United States"].posture:
+      if app.gwotPenalty() == 0:
+        cacPosture = app.map["Caucasus"].posture
+        if app.map["United States"].posture == "Hard":
+          app.map["Caucasus"].posture = "Soft"
         else:
-          return True
-      elif self.number == 117 or self.number == 118: # Oil Price Spike
-        return True
-      elif self.number == 119: # Saleh
+          app.map["Caucasus"].posture = "Hard"
+        if app.gwotPenalty() < 0:
+          targetCaucasus = True
+        app.map["Caucasus"].posture = cacPosture
+    if targetCaucasus:
+      if app.map["United States"].posture == "Hard":
+        app.map["Caucasus"].posture = "Soft"
+      else:
+        app.map["Caucasus"].posture = "Hard"
+      app.outputToHistory("Caucasus posture now %s" % app.map["Caucasus"].posture, False)
+      app.logCountry("Caucasus", True)
+    else:
+      app.testCountry("Central Asia")
+      if app.map["Central Asia"].alignment == "Ally":
+        app.map["Central Asia"].alignment = "Neutral"
+        app.outputToHistory("Central Asia now Neutral.", True)
+      elif app.map["Central Asia"].alignment == "Neutral":
+        app.map["Central Asia"].alignment = "Adversary"
+        app.outputToHistory("Central Asia now Adversary.", True)
+      app.logCountry("Central Asia", True)
+
+@cardPlayable(63, reads = ())
+def playableGazaWar(card, side, app):
+  return True
+
+@cardEvent(63)
+def eventGazaWar(card, side, app):
+  app.changeFunding(1)
+  app.changePrestige(-1)
+  app.outputToHistory("US discards a random card.", True)
+
+@cardPlayable(64, reads = ())
+def playableHaririKilled(card, side, app):
+  return True
+
+@cardEvent(64)
+def eventHaririKilled(card, side, app):
+  app.testCountry("Lebanon")
+  app.testCountry("Syria")
+  app.map["Syria"].alignment = "Adversary"
+  app.outputToHistory("Syria now Adversary.", False)
+  if app.map["Syria"].governance < 3:
+    app.worsenGovernance("Syria")
+    app.outputToHistory("Governance in Syria worsened.", False)
+    app.logCountry("Syria", True)
+  app.logCountry("Lebanon", True)
+
+@cardPlayable(65, reads = ("map",))
+def playableHEU(card, side, app):
+  possibles = 0
+  if app.map["Russia"].totalCells() > 0 and "CTR" not in app.map["Russia"].markers:
+    possibles += 1
+  if app.map["Central Asia"].totalCells() > 0 and "CTR" not in app.map["Central Asia"].markers:
+    possibles += 1
+  return possibles > 0
+
+@cardEvent(65)
+def eventHEU(card, side, app):
+  possibles = []
+  if app.map["Russia"].totalCells() > 0 and "CTR" not in app.map["Russia"].markers:
+    possibles.append("Russia")
+  if app.map["Central Asia"].totalCells() > 0 and "CTR" not in app.map["Central Asia"].markers:
+    possibles.append("Central Asia")
+  target = app.dice.choice(possibles)
+  roll = app.dice.roll()
+  app.executeCardHEU(target, roll)
+
+@cardPlayable(66, reads = ())
+def playableHomegrown(card, side, app):
+  return True
+
+@cardEvent(66)
+def eventHomegrown(card, side, app):
+  app.placeCells("United Kingdom", 1)
+
+@cardPlayable(67, reads = ())
+def playableIslamicJihadUnion(card, side, app):
+  return True
+
+@cardEvent(67)
+def eventIslamicJihadUnion(card, side, app):
+  app.placeCells("Central Asia", 1)
+  if app.cells > 0:
+    app.placeCells("Afghanistan", 1)
+
+@cardPlayable(68, reads = ())
+def playableJemaahIslamiya(card, side, app):
+  return True
+
+@cardEvent(68)
+def eventJemaahIslamiya(card, side, app):
+  app.placeCells("Indonesia/Malaysia", 2)
+
+@cardPlayable(69, reads = ("map",))
+def playableKazakhStrain(card, side, app):
+  return app.map["Central Asia"].totalCells() > 0 and "CTR" not in app.map["Central Asia"].markers
+
+@cardEvent(69)
+def eventKazakhStrain(card, side, app):
+  roll = app.dice.roll()
+  app.executeCardHEU("Central Asia", roll)
+
+@cardPlayable(70, reads = ("markers",))
+def playableLashkarETayyiba(card, side, app):
+  return "Indo-Pakistani Talks" not in app.markers
+
+@cardEvent(70)
+def eventLashkarETayyiba(card, side, app):
+  app.placeCells("Pakistan", 1)
+  if app.cells > 0:
+    app.placeCells("India", 1)
+
+@cardPlayable(71, reads = ("map",))
+def playableLooseNuke(card, side, app):
+  return app.map["Russia"].totalCells() > 0 and "CTR" not in app.map["Russia"].markers
+
+@cardEvent(71)
+def eventLooseNuke(card, side, app):
+  roll = app.dice.roll()
+  app.executeCardHEU("Russia", roll)
+
+@cardPlayable(72, reads = ("map",))
+def playableOpium(card, side, app):
+  return app.map["Afghanistan"].totalCells() > 0
+
+@cardEvent(72)
+def eventOpium(card, side, app):
+  cellsToPlace = min(app.cells, 3)
+  if app.map["Afghanistan"].governance == 4:
+    cellsToPlace = app.cells
+  app.placeCells("Afghanistan", cellsToPlace)
+
+@cardPlayable(73, reads = ("map",))
+def playablePirates(card, side, app):
+  return app.map["Somalia"].governance == 4 or app.map["Yemen"].governance == 4
+
+@cardEvent(73)
+def eventPirates(card, side, app):
+  app.markers.append("Pirates")
+  app.outputToHistory("Pirates in play.", False)
+
+@cardPlayable(74, reads = ())
+def playableSchengenVisas(card, side, app):
+  return True
+
+@cardEvent(74)
+def eventSchengenVisas(card, side, app):
+  if app.cells == 15:
+    app.outputToHistory("No cells to travel.", False)
+    return False
+  app.handleTravel(2, False, True)
+
+@cardPlayable(75, reads = ("map",))
+def playableSchroederChirac(card, side, app):
+  return app.map["United States"].posture == "Hard"
+
+@cardEvent(75)
+def eventSchroederChirac(card, side, app):
+  app.map["Germany"].posture = "Soft"
+  app.outputToHistory("%s Posture now %s" % ("Germany", app.map["Germany"].posture), True)
+  app.map["France"].posture = "Soft"
+  app.outputToHistory("%s Posture now %s" % ("France", app.map["France"].posture), True)
+  app.changePrestige(-1)
+
+@cardPlayable(76, reads = ("map",))
+def playableAbuGhurayb(card, side, app):
+  return len(app.boardIndex.regimeChange & app.boardIndex.withCells(True)) > 0
+
+@cardEvent(76)
+def eventAbuGhurayb(card, side, app):
+  app.outputToHistory("Draw 2 cards.", False)
+  app.changePrestige(-2)
+  allys = app.minorJihadInGoodFairChoice(1, True)
+  if not allys:
+    app.outputToHistory("No Allys to shift.", True)
+  else:
+    target = allys[0][0]
+    app.map[target].alignment = "Neutral"
+    app.outputToHistory("%s Alignment shifted to Neutral." % target, True)
+
+@cardPlayable(77, reads = ("map", "markers"))
+def playableAlJazeera(card, side, app):
+  if app.map["Saudi Arabia"].troops() > 0:
+    return True
+  for country in app.map:
+    if app.isAdjacent("Saudi Arabia", country):
+      if app.map[country].troops() > 0:
         return True
-      elif self.number == 120: # US Election
+  return False
+
+@cardEvent(77)
+def eventAlJazeera(card, side, app):
+  choices = app.minorJihadInGoodFairChoice(1, False, True)
+  if not choices:
+    app.outputToHistory("No countries to shift.", True)
+  else:
+    target = choices[0][0]
+    if app.map[target].alignment == "Ally":
+      app.map[target].alignment = "Neutral"
+    elif app.map[target].alignment == "Neutral":
+      app.map[target].alignment = "Adversary"
+    app.outputToHistory("%s Alignment shifted to %s." % (target, app.map[target].alignment), True)
+
+@cardPlayable(78, reads = ())
+def playableAxisOfEvil(card, side, app):
+  return True
+
+@cardEvent(78)
+def eventAxisOfEvil(card, side, app):
+  app.outputToHistory("US discards any Iran, Hizballah, or Jaysh al-Mahdi cards from hand.", False)
+  if app.map["United States"].posture == "Soft":
+    app.map["United States"].posture = "Hard"
+    app.outputToHistory("US Posture now Hard.", False)
+  prestigeRolls = []
+  for i in range(3):
+    prestigeRolls.append(app.dice.roll())
+  presMultiplier = 1
+  if prestigeRolls[0] <= 4:
+    presMultiplier = -1
+  app.changePrestige(min(prestigeRolls[1], prestigeRolls[2]) * presMultiplier)
+
+@cardPlayable(79, reads = ())
+def playableCleanOperatives(card, side, app):
+  return True
+
+@cardEvent(79)
+def eventCleanOperatives(card, side, app):
+  app.handleTravel(2, False, False, True)
+
+@cardPlayable(80, reads = ())
+def playableFATA(card, side, app):
+  return True
+
+@cardEvent(80)
+def eventFATA(card, side, app):
+  app.testCountry("Pakistan")
+  app.map["Pakistan"].markers.append("FATA")
+  app.outputToHistory("FATA Maker added in Pakistan", True)
+  app.placeCells("Pakistan", 1)
+
+@cardPlayable(81, reads = ("map",))
+def playableForeignFighters(card, side, app):
+  return app.numRegimeChange() > 0
+
+@cardEvent(81)
+def eventForeignFighters(card, side, app):
+  possibles = []
+  for country in app.map:
+    if app.map[country].regimeChange > 0:
+      possibles.append(country)
+  if len(possibles) <= 0:
+    return False
+  target = app.dice.choice(possibles)
+  app.placeCells(target, 5)
+  if app.map[target].aid > 0:
+    app.map[target].aid = 0
+    app.outputToHistory("Aid removed from %s" % target, False)
+  else:
+    app.map[target].besieged = 1
+    app.outputToHistory("%s no Besieged Regime" % target, False)
+  app.logCountry(target, True)
+
+@cardPlayable(82, reads = ())
+def playableJihadistVideos(card, side, app):
+  return True
+
+@cardEvent(82)
+def eventJihadistVideos(card, side, app):
+  possibles = []
+  for country in app.map:
+    if app.map[country].totalCells() == 0:
+      possibles.append(country)
+  app.dice.shuffle(possibles)
+  for i in range(3):
+    app.testCountry(possibles[i])
+    # number of available cells does not matter for Jihadist Videos
+    # if app.cells > 0:
+    rolls = []
+    rolls.append(app.dice.roll())
+    app.executeRecruit(possibles[i], 1, rolls, False, True)
+
+@cardPlayable(83, reads = ("markers",))
+def playableKashmir(card, side, app):
+  return "Indo-Pakistani Talks" not in app.markers
+
+@cardEvent(83)
+def eventKashmir(card, side, app):
+  app.placeCells("Pakistan", 1)
+  if app.map["Pakistan"].alignment == "Ally":
+    app.map["Pakistan"].alignment = "Neutral"
+  elif app.map["Pakistan"].alignment == "Neutral":
+    app.map["Pakistan"].alignment = "Adversary"
+  app.outputToHistory("%s Alignment shifted to %s." % ("Pakistan", app.map["Pakistan"].alignment), True)
+  app.logCountry("Pakistan", True)
+
+@cardPlayable(84, 85, reads = ("markers",))
+def playableLeak(card, side, app):
+  return ("Enhanced Measures" in app.markers) or ("Renditions" in app.markers) or ("Wiretapping" in app.markers)
+
+@cardEvent(84, 85)
+def eventLeak(card, side, app):
+  possibles = []
+  if "Enhanced Measures" in app.markers:
+    possibles.append("Enhanced Measures")
+  if "Renditions" in app.markers:
+    possibles.append("Renditions")
+  if "Wiretapping" in app.markers:
+    possibles.append("Wiretapping")
+  target = app.dice.choice(possibles)
+  app.markers.remove(target)
+  app.markers.append("Leak-"+target)
+  app.outputToHistory("%s removed and can no longer be played." % target, False)
+  usPrestigeRolls = []
+  for i in range(3):
+    usPrestigeRolls.append(app.dice.roll())
+  postureRoll = app.dice.roll()
+
+  presMultiplier = 1
+  if usPrestigeRolls[0] <= 4:
+    presMultiplier = -1
+  app.changePrestige(min(usPrestigeRolls[1], usPrestigeRolls[2]) * presMultiplier, False)
+  if postureRoll <= 4:
+    app.map["United States"].posture = "Soft"
+  else:
+    app.map["United States"].posture = "Hard"
+  app.outputToHistory("US Posture now %s" % app.map["United States"].posture, True)
+
+@cardPlayable(86, reads = ())
+def playableLebanonWar(card, side, app):
+  return True
+
+@cardEvent(86)
+def eventLebanonWar(card, side, app):
+  app.outputToHistory("US discards a random card.", False)
+  app.changePrestige(-1, False)
+  possibles = []
+  for country in app.map:
+    if app.map[country].culture == "Shia-Mix":
+      possibles.append(country)
+  target = app.dice.choice(possibles)
+  app.placeCells(target, 1)
+
+@cardPlayable(87, 88, 89, reads = ("map",))
+def playableMartyrdomOperation(card, side, app):
+  return len(app.boardIndex.withCells(True) - app.boardIndex.withGovernance(4)) > 0
+
+@cardEvent(87, 88, 89)
+def eventMartyrdomOperation(card, side, app):
+  if app.executePlot(1, False, [1], True) == 1:
+    app.outputToHistory("No plots could be placed.", True)
+    app.handleRadicalization(app.deck[str(card.number)].ops)
+
+@cardPlayable(90, reads = ("map", "trackers"))
+def playableQuagmire(card, side, app):
+  if app.prestige >= 7:
+    return False
+  for country in app.map:
+    if app.map[country].regimeChange > 0:
+      if app.map[country].totalCells(True) > 0:
         return True
-      return False
+  return False
+
+@cardEvent(90)
+def eventQuagmire(card, side, app):
+  app.map["United States"].posture = "Soft"
+  app.outputToHistory("US Posture now Soft.", False)
+  app.outputToHistory("US randomly discards two cards and Jihadist plays them.", False)
+  app.outputToHistory("Do this using the j # command for each card.", True)
+
+@cardPlayable(91, reads = ("map",))
+def playableRegionalAlQaeda(card, side, app):
+  return len(app.boardIndex.withCulture("Suni", "Shia-Mix") & app.boardIndex.withGovernance(0)) >= 2
+
+@cardEvent(91)
+def eventRegionalAlQaeda(card, side, app):
+  possibles = []
+  for country in app.map:
+    if app.map[country].culture == "Suni" or app.map[country].culture == "Shia-Mix":
+      if app.map[country].governance == 0:
+        possibles.append(country)
+  app.dice.shuffle(possibles)
+  app.placeCells(possibles[0], 1)
+  app.placeCells(possibles[1], 1)
 
-  def putsCell(self, app):
-    if self.number == 48: # Adam Gadahn
-      return True
-    elif self.number == 49: # Al-Ittihad al-Islami
-      return True
-    elif self.number == 50: # Ansar al-Islam
-      return True
-    elif self.number == 51: # FREs
-      return True
-    elif self.number == 52: # IDEs
-      return False
-    elif self.number == 53: # Madrassas
-      return True
-    elif self.number == 54: # Moqtada al-Sadr
-      return False
-    elif self.number == 55: # Uyghur Jihad
-      return True
-    elif self.number == 56: # Vieira de Mello Slain
-      return False
-    elif self.number == 57: # Abu Sayyaf
-      return True
-    elif self.number == 58: # Al-Anbar
-      return True
-    elif self.number == 59: # Amerithrax
-      return False
-    elif self.number == 60: # Bhutto Shot
-      return False
-    elif self.number == 61: # Detainee Release
-      return True
-    elif self.number == 62: # Ex-KGB
-      return False
-    elif self.number == 63: # Gaza War
-      return False
-    elif self.number == 64: # Hariri Killed
-      return False
-    elif self.number == 65: # HEU
-      return False
-    elif self.number == 66: # Homegrown
-      return True
-    elif self.number == 67: # Islamic Jihad Union
-      return True
-    elif self.number == 68: # Jemaah Islamiya
-      return True
-    elif self.number == 69: # Kazakh Strain
-      return False
-    elif self.number == 70: # Lashkar-e-Tayyiba
-      return True
-    elif self.number == 71: # Loose Nuke
-      return False
-    elif self.number == 72: # Opium
-      return True
-    elif self.number == 73: # Pirates
-      return False
-    elif self.number == 74: # Schengen Visas
-      return False
-    elif self.number == 75: # Schroeder & Chirac
-      return False
-    elif self.number == 76: # Abu Ghurayb
-      return False
-    elif self.number == 77: # Al Jazeera
-      return False
-    elif self.number == 78: # Axis of Evil
-      return False
-    elif self.number == 79: # Clean Operatives
-      return False
-    elif self.number == 80: # FATA
-      return True
-    elif self.number == 81: # Foreign Fighters
-      return True
-    elif self.number == 82: # Jihadist Videos
-      return True
-    elif self.number == 83: # Kashmir
-      return True
-    elif self.number == 84 or self.number == 85: # Leak
-      return False
-    elif self.number == 86: # Lebanon War
-      return True
-    elif self.number == 87 or self.number == 88 or self.number == 89: # Martyrdom Operation
-      return False
-    elif self.number == 90: # Quagmire
-      return False
-    elif self.number == 91: # Regional al-Qaeda
-      return True
-    elif self.number == 92: # Saddam
-      return False
-    elif self.number == 93: # Taliban
-      return True
-    elif self.number == 94: # The door of Itjihad was closed
-      return False
-    elif self.number == 95: # Wahhabism
-      return False
-    elif self.number == 96: # Danish Cartoons
-      return False
-    elif self.number == 97: # Fatwa
-      return False
-    elif self.number == 98: # Gaza Withdrawl
-      return True
-    elif self.number == 99: # HAMAS Elected
-      return False
-    elif self.number == 100: # His Ut-Tahrir
-      return False
-    elif self.number == 101: # Kosovo
-      return False
-    elif self.number == 102: # Former Soviet Union
-      return False
-    elif self.number == 103: # Hizballah
-      return False
-    elif self.number == 104 or self.number == 105: # Iran
-      return False
-    elif self.number == 106: # Jaysh al-Mahdi
-      return False
-    elif self.number == 107: # Kurdistan
-      return False
-    elif self.number == 108: # Musharraf
-      return False
-    elif self.number == 109: # Tora Bora
-      return False
-    elif self.number == 110: # Zarqawi
-      return True
-    elif self.number == 111: # Zawahiri
-      return False
-    elif self.number == 112: # Bin Ladin
-      return False
-    elif self.number == 113: # Darfur
-      return False
-    elif self.number == 114: # GTMO
-      return False
-    elif self.number == 115: # Hambali
-      return False
-    elif self.number == 116: # KSM
-      return False
-    elif self.number == 117 or self.number == 118: # Oil Price Spike
-      return False
-    elif self.number == 119: # Saleh
-      return False
-    elif self.number == 120: # US Election
-      return False
+@cardPlayable(92, reads = ("map", "markers"))
+def playableSaddam(card, side, app):
+  if "Saddam Captured" in app.markers:
     return False
+  return (app.map["Iraq"].governance == 3) and (app.map["Iraq"].alignment == "Adversary")
+
+@cardEvent(92)
+def eventSaddam(card, side, app):
+  app.funding = 9
+  app.outputToHistory("Jihadist Funding now 9.", True)
+
+@cardPlayable(93, reads = ())
+def playableTaliban(card, side, app):
+  return True
+
+@cardEvent(93)
+def eventTaliban(card, side, app):
+  app.testCountry("Afghanistan")
+  app.map["Afghanistan"].besieged = 1
+  app.outputToHistory("Afghanistan is now a Besieged Regime.", False)
+  app.placeCells("Afghanistan", 1)
+  app.placeCells("Pakistan", 1)
+  if (app.map["Afghanistan"].governance == 4) or (app.map["Pakistan"].governance == 4):
+    app.changePrestige(-3)
+  else:
+    app.changePrestige(-1)
+
+@cardPlayable(94, reads = ("input",))
+def playableTheDoorOfItjihadWasClosed94(card, side, app):
+  return app.getYesNoFromUser("Was a country tested or improved to Fair or Good this or last Action Phase.? (y/n): ")
+
+@cardEvent(94)
+def eventTheDoorOfItjihadWasClosed94(card, side, app):
+  target = None
+  while not target:
+    input = app.getCountryFromUser("Choose a country tested or improved to Fair or Good this or last Action Phase: ",  "XXX", None)
+    if input == "":
+      app.output("")
+    elif app.map[input].governance != 2 and   app.map[input].governance != 1:
+      app.output("%s is not Fair or Good.")
+    else:
+      target = input
+      break
+  app.map[target].governance += 1
+  app.outputToHistory("%s Governance worsened." % target, False)
+  app.logCountry(target, True)
+
+@cardPlayable(95, reads = ())
+def playableWahhabism(card, side, app):
+  return True
+
+@cardEvent(95)
+def eventWahhabism(card, side, app):
+  if app.map["Saudi Arabia"].governance == 4:
+    app.changeFunding(9)
+  else:
+    app.changeFunding(app.map["Saudi Arabia"].governance)
+
+@cardPlayable(96, reads = ())
+def playableDanishCartoons(card, side, app):
+  return True
+
+@cardEvent(96)
+def eventDanishCartoons(card, side, app):
+  posStr = app.getPostureFromUser("Select Scandinavia's Posture (hard or soft): ")
+  app.map["Scandinavia"].posture = posStr
+  app.outputToHistory("Scandinavia posture now %s." % posStr, False)
+  possibles = []
+  for country in app.map:
+    if app.map[country].culture == "Suni" or app.map[country].culture == "Shia-Mix":
+      if app.map[country].governance != 4:
+        possibles.append(country)
+  target = app.dice.choice(possibles)
+  app.testCountry(target)
+  if app.numIslamicRule() > 0:
+    app.outputToHistory("Place any available plot in %s." % target, False)
+  else:
+    app.outputToHistory("Place a Plot 1 in %s." % target, False)
+  app.map[target].plots += 1
+
+@cardPlayable(97, reads = ("input",))
+def playableFatwa(card, side, app):
+  return app.getYesNoFromUser("Do both sides have cards remaining beyond this one? (y/n): ")
+
+@cardEvent(97)
+def eventFatwa(card, side, app):
+  app.outputToHistory("Trade random cards.", False)
+  if side == "US":
+    app.outputToHistory("Conduct a 1-value operation (Use commands: alert, deploy, disrupt, reassessment, regime, withdraw, or woi).", False)
+  else:
+    app.aiFlowChartMajorJihad(97)
 
-  def playEvent(self, side, app):
-    app.outputToHistory("Card played for Event.", True)
-    if self.type == "US" and side == "Jihadist":
-      return False
-    elif self.type == "Jihadist" and side == "US":
-      return False
-    elif self.type == "US" and side == "US":
-      if self.number == 1: # Backlash
-        for country in app.map:
-          if (app.map[country].culture != "Non-Muslim") and (app.map[country].plots > 0):
-            app.outputToHistory("Plot in Muslim country found. Select the plot. Backlash in play", True)
-            app.backlashInPlay = True
-            return True
-        return False
-      elif self.number == 2: # Biometrics
-        app.lapsing.append("Biometrics")
-        app.outputToHistory("Biometrics in play. This turn, travel to adjacent Good countries must roll to succeed and no non-adjacent travel.", True)
-      elif self.number == 3: # CRT
-        app.map["Russia"].markers.append("CRT")
-        app.outputToHistory("CRT Maker added in Russia", True)
-        if (app.map["Central Asia"].alignment == "Ally") or (app.map["Central Asia"].alignment == "Neutral"):
-          app.map["Central Asia"].markers.append("CRT")
-          app.outputToHistory("CRT Maker added in Central Asia", True)
-      elif self.number == 4: # Moro Talks
-        app.markers.append("Moro Talks")
-        app.outputToHistory("Moro Talks in play.", False)
-        app.testCountry("Philippines")
-        app.changeFunding(-1)
-      elif self.number == 5: # NEST
-        app.markers.append("NEST")
-        app.outputToHistory("NEST in play. If jihadists have WMD, all plots in the US placed face up.", True)
-      elif self.number == 6 or self.number == 7: # Sanctions
-        if "Patriot Act" in app.markers:
-          app.changeFunding(-2)
-        else:
-          return False
-      elif self.number == 8 or self.number == 9 or self.number == 10: # Special Forces
-        while True:
-          input = app.getCountryFromUser("Remove a cell from what country that has troops or is adjacent to a country with troops (? for list)?: ",  "XXX", app.listCountriesWithCellAndAdjacentTroops)
-          if input == "":
-            print("")
-            return
-          else:
-            if app.map[input].totalCells(True) <= 0:
-              print("There are no cells in %s" % input)
-              print("")
-            else:
-              foundTroops = False
-              for country in app.map:
-                if country == input or app.isAdjacent(input, country):
-                  if app.map[country].troops() > 0:
-                    foundTroops = True
-                    break
-              if not foundTroops:
-                print("Neither this or any adjacent country have troops.")
-                print("")
-              else:
-                app.removeCell(input)
-                app.outputToHistory(app.map[input].countryStr(), True)
-                break
-      elif self.number == 11: # Abbas
-        numIRIsrael = 0
-        for country in app.map:
-          if app.isAdjacent(country, "Israel"):
-            if app.map[country].governance == 4:
-              numIRIsrael = 1
-              break
-        app.markers.append("Abbas")
-        app.outputToHistory("Abbas in play.", False)
-        if app.troops >= 5 and numIRIsrael <= 0:
-          app.changePrestige(1, False)
-          app.changeFunding(-2, True)
-      elif self.number == 12: # Al-Azhar
-        app.testCountry("Egypt")
-        numIR = app.numIslamicRule()
-        if numIR <= 0:
-          app.changeFunding(-4, True)
-        else:
-          app.changeFunding(-2, True)
-      elif self.number == 13: # Anbar Awakening
-        if (app.map["Iraq"].troops() > 0) or (app.map["Syria"].troops() > 0):
-          app.markers.append("Anbar Awakening")
-          app.outputToHistory("Anbar Awakening in play.", False)
-          if app.map["Iraq"].troops() == 0:
-            app.map["Syria"].aid = 1
-            app.outputToHistory("Aid in Syria.", False)
-          elif app.map["Syria"].troops() == 0:
-            app.map["Iraq"].aid = 1
-            app.outputToHistory("Aid in Iraq.", False)
-          else:
-            print("There are troops in both Iraq and Syria.")
-            if app.getYesNoFromUser("Do you want to add the Aid to Iraq? (y/n): "):
-              app.map["Iraq"].aid = 1
-              app.outputToHistory("Aid in Iraq.", False)
-            else:
-              app.map["Syria"].aid = 1
-              app.outputToHistory("Aid in Syria.", False)
-          app.changePrestige(1, False)
-          print("")
-        else:
-          return False
-      elif self.number == 14: # Covert Action
-        targetCountry = ""
-        numAdv = 0
-        for country in app.map:
-          if app.map[country].alignment == "Adversary":
-            targetCountry = country
-            numAdv += 1
-        if numAdv == 0:
-          return False
-        elif numAdv > 1:
-          while True:
-            input = app.getCountryFromUser("Choose an Adversary country to attempt Covert Action (? for list): ",  "XXX", app.listAdversaryCountries)
-            if input == "":
-              print("")
-              return
-            else:
-              if app.map[input].alignment != "Adversary":
-                print("%s is not an Adversary." % input)
-                print("")
-              else:
-                targetCountry = input
-                break
-        actionRoll = app.getRollFromUser("Enter Covert Action roll or r to have program roll: ")
-        if actionRoll >= 4:
-          app.map[targetCountry].alignment = "Neutral"
-          app.outputToHistory("Covert Action successful, %s now Neutral." % targetCountry, False)
-          app.outputToHistory(app.map[input].countryStr(), True)
-        else:
-          app.outputToHistory("Covert Action fails.", True)
-      elif self.number == 15: # Ethiopia Strikes
-        if (app.map["Somalia"].governance == 4) or (app.map["Sudan"].governance == 4):
-          if app.map["Somalia"].governance != 4:
-            app.map["Sudan"].governance = 3
-            app.map["Sudan"].alignment = "Neutral"
-            app.outputToHistory("Sudan now Poor Neutral.", False)
-            app.outputToHistory(app.map["Sudan"].countryStr(), True)
-          elif app.map["Sudan"].governance != 4:
-            app.map["Somalia"].governance = 3
-            app.map["Somalia"].alignment = "Neutral"
-            app.outputToHistory("Somalia now Poor Neutral.", False)
-            app.outputToHistory(app.map["Somalia"].countryStr(), True)
-          else:
-            print("Both Somalia and Sudan are under Islamic Rule.")
-            if app.getYesNoFromUser("Do you want Somalia to be set to Poor Neutral? (y/n): "):
-              app.map["Somalia"].governance = 3
-              app.map["Somalia"].alignment = "Neutral"
-              app.outputToHistory("Somalia now Poor Neutral.", False)
-              app.outputToHistory(app.map["Somalia"].countryStr(), True)
-            else:
-              app.map["Sudan"].governance = 3
-              app.map["Sudan"].alignment = "Neutral"
-              app.outputToHistory("Sudan now Poor Neutral.", False)
-              app.outputToHistory(app.map["Sudan"].countryStr(), True)
-          print("")
-        else:
-          return False
-      elif self.number == 16: # Euro-Islam
-        posStr = app.getPostureFromUser("Select Benelux's Posture (hard or soft): ")
-        app.executeCardEuroIslam(posStr)
-      elif self.number == 17: # FSB
-        app.outputToHistory("Examine Jihadist hand for Loose Nukes, HEU, or Kazakh Strain.", False)
-        hasThem = app.getYesNoFromUser("Does the Jihadist hand have Loose Nukes, HEU, or Kazakh Strain? (y/n): ")
-        if hasThem:
-          app.outputToHistory("Discard Loose Nukes, HEU, or Kazakh Strain from the Jihadist hand.", False)
-        else:
-          russiaCells = app.map["Russia"].totalCells(True)
-          cenAsiaCells = app.map["Central Asia"].totalCells(True)
-          if russiaCells > 0 or cenAsiaCells > 0:
-            if russiaCells == 0:
-              app.removeCell("Central Asia")
-              app.outputToHistory(app.map["Central Asia"].countryStr(), True)
-            elif cenAsiaCells == 0:
-              app.removeCell("Russia")
-              app.outputToHistory(app.map["Russia"].countryStr(), True)
-            else:
-              isRussia = app.getYesNoFromUser("There are cells in both Russia and Central Asia. Do you want to remove a cell in Russia? (y/n): ")
-              if isRussia:
-                app.removeCell("Russia")
-                app.outputToHistory(app.map["Russia"].countryStr(), True)
-              else:
-                app.removeCell("Central Asia")
-                app.outputToHistory(app.map["Central Asia"].countryStr(), False)
-          else:
-            app.outputToHistory("There are no cells in Russia or Central Asia.", False)
-        app.outputToHistory("Shuffle Jihadist hand.", True)
-      elif self.number == 18: # Intel Community
-        app.outputToHistory("Examine Jihadist hand.  Do not change order of cards.", False)
-        app.outputToHistory("Conduct a 1-value operation (Use commands: alert, deploy, disrupt, reassessment, regime, withdraw, or woi).", False)
-        app.outputToHistory("You may now interrupt this action phase to play another card (Use the u command).", True)
-      elif self.number == 19: # Kemalist Republic
-        app.outputToHistory("Turkey now a Fair Ally.", False)
-        app.map["Turkey"].governance = 2
-        app.map["Turkey"].alignment = "Ally"
-        app.outputToHistory(app.map["Turkey"].countryStr(), True)
-      elif self.number == 20: # King Abdullah
-        app.outputToHistory("Jordan now a Fair Ally.", False)
-        app.map["Jordan"].governance = 2
-        app.map["Jordan"].alignment = "Ally"
-        app.outputToHistory(app.map["Jordan"].countryStr(), True)
-        app.changePrestige(1)
-        app.changeFunding(-1)
-      elif self.number == 21: # Let's Roll
-        while True:
-          plotCountry = app.getCountryFromUser("Draw a card.  Choose an Ally or Good country to remove a plot from (? for list): ", "XXX", app.listGoodAllyPlotCountries)
-          if plotCountry == "":
-            print("")
-            return
-          else:
-            if app.map[plotCountry].governance != 1 and app.map[plotCountry].alignment != "Ally":
-              print("%s is not Good or an Ally." % plotCountry)
-              print("")
-            elif app.map[plotCountry].plots <= 0:
-              print("%s has no plots." % plotCountry)
-              print("")
-            else:
-              while True:
-                postureCountry = app.getCountryFromUser("Now choose a non-US country to set its Posture: ", "XXX", None)
-                if postureCountry == "":
-                  print("")
-                  return
-                else:
-                  if postureCountry == "United States":
-                    print("Choos a non-US country.")
-                    print("")
-                  else:
-                    postureStr = app.getPostureFromUser("What Posture should %s have (h or s)? " % postureCountry)
-                    app.executeCardLetsRoll(plotCountry, postureCountry, postureStr)
-                    return
-      elif self.number == 22: # Mossad and Shin Bet
-        app.removeAllCellsFromCountry("Israel")
-        app.removeAllCellsFromCountry("Jordan")
-        app.removeAllCellsFromCountry("Lebanon")
-        app.outputToHistory("", False)
-      elif self.number == 23 or self.number == 24 or self.number == 25: # Predator
-        while True:
-          input = app.getCountryFromUser("Choose non-Iran Muslim Country to remove a cell from (? for list): ", "XXX", app.listMuslimCountriesWithCells)
-          if input == "":
-            print("")
-            return
-          else:
-            if app.map[input].totalCells(True) == 0:
-              print("%s has no cells." % input)
-              print("")
-            elif app.map[input].culture == "Iran":
-              print("Iran is not allowed.")
-              print("")
-            elif app.map[input].culture == "Non-Muslim":
-              print("Choose a Muslim country.")
-              print("")
-            else:
-              app.removeCell(input)
-              app.outputToHistory(app.map[input].countryStr(), True)
-              break
-      elif self.number == 26: # Quartet
-        if not "Abbas" in app.markers:
-          return False
-        if app.troops <= 4:
-          return False
-        for country in app.map:
-          if app.isAdjacent(country, "Israel"):
-            if app.map[country].governance == 4:
-              return False
-        app.changePrestige(2)
-        app.changeFunding(-3)
-        app.outputToHistory("", False)
-      elif self.number == 27: # Saddam Captured
-        if app.map["Iraq"].troops() == 0:
-          return False
-        app.markers.append("Saddam Captured")
-        app.map["Iraq"].aid = 1
-        app.outputToHistory("Aid added in Iraq", False)
-        app.changePrestige(1)
-        app.outputToHistory(app.map["Iraq"].countryStr(), True)
-      elif self.number == 28: # Sharia
-        numBesieged = app.numBesieged()
-        target = ""
-        if numBesieged <= 0:
-          return False
-        elif numBesieged == 1:
-          for country in app.map:
-            if app.map[country].besieged > 0:
-              target = country
-              break
-        else:
-          while True:
-            input = app.getCountryFromUser("Choose a country with a Besieged Regime marker to remove (? for list): ",  "XXX", app.listBesiegedCountries)
-            if input == "":
-              print("")
-              return
-            else:
-              if app.map[input].besieged <= 0:
-                print("%s is not a Besieged Regime." % input)
-                print("")
-              else:
-                target = input
-                break
-        app.map[target].besieged = 0
-        app.outputToHistory("%s is no longer a Besieged Regime." % target, False)
-        app.outputToHistory(app.map[target].countryStr(), True)
-      elif self.number == 29: # Tony Blair
-        app.map["United Kingdom"].posture = app.map["United States"].posture
-        app.outputToHistory("United Kingdom posture now %s" % app.map["United Kingdom"].posture, False)
-        print("You may roll War of Ideas in up to 3 Schengen countries.")
-        for i in range(3):
-          target = ""
-          finishedPicking = False
-          while not target:
-            input = app.getCountryFromUser("Choose Schengen country to make a WOI roll (done to stop rolling) (? for list)?: ",  "done", app.listSchengenCountries)
-            if input == "":
-              print("")
-              return
-            elif input == "done":
-              finishedPicking = True
-              break
-            else:
-              if not app.map[input].schengen:
-                print("%s is not a Schengen country." % input)
-                print("")
-                return
-              else:
-                target = input
-                postureRoll = app.getRollFromUser("Enter Posture Roll or r to have program roll: ")
-                app.executeNonMuslimWOI(target, postureRoll)
-          if finishedPicking:
-            break
-        app.outputToHistory("", False)
-      elif self.number == 30: # UN Nation Building
-        numRC = app.numRegimeChange()
-        if (numRC <= 0) or ("Vieira de Mello Slain" in app.markers):
-          return False
-        target = ""
-        if numRC == 1:
-          for country in app.map:
-            if app.map[country].regimeChange > 0:
-              target = country
-              break
-        else:
-          while True:
-            input = app.getCountryFromUser("Choose a Regime Change country (? for list): ",  "XXX", app.listRegimeChangeCountries)
-            if input == "":
-              print("")
-              return
-            else:
-              if app.map[input].regimeChange <= 0:
-                print("%s is not a Regime Change country." % input)
-                print("")
-              else:
-                target = input
-                break
-        app.map[target].aid = 1
-        app.outputToHistory("Aid added to %s." % target, False)
-        woiRoll = app.getRollFromUser("Enter WOI Roll or r to have program roll: ")
-        modRoll = app.modifiedWoIRoll(woiRoll, target, False)
-        app.handleMuslimWoI(modRoll, target)
-      elif self.number == 31: # Wiretapping
-        if "Leak-Wiretapping" in app.markers:
-          return False
-        for country in ["United States", "United Kingdom", "Canada"]:
-          if app.map[country].activeCells > 0:
-            num = app.map[country].activeCells
-            if num > 0:
-              app.map[country].activeCells -= num
-              app.cells += num
-              app.outputToHistory("%d Active Cell(s) removed from %s." % (num, country), False)
-          if app.map[country].sleeper_cells > 0:
-            num = app.map[country].sleeper_cells
-            if num > 0:
-              app.map[country].sleeper_cells -= num
-              app.cells += num
-              app.outputToHistory("%d Sleeper Cell(s) removed from %s." % (num, country), False)
-          if app.map[country].cadre > 0:
-            num = app.map[country].cadre
-            if num > 0:
-              app.map[country].cadre = 0
-              app.outputToHistory("Cadre removed from %s." % country, False)
-          if app.map[country].plots > 0:
-            num = app.map[country].plots
-            if num > 0:
-              app.map[country].plots -= num
-              app.outputToHistory("%d Plots remove(d) from %s." % (num, country), False)
-        app.markers.append("Wiretapping")
-        app.outputToHistory("Wiretapping in Play.", True)
-      elif self.number == 32: # Back Channel
-        if app.map["United States"].posture == "Hard":
-          return False
-        numAdv = app.numAdversary()
-        if numAdv <= 0:
-          return False
-        if app.getYesNoFromUser("Do you want to discard a card with a value that exactly matches an Adversary's Resources? (y/n): "):
-          while True:
-            input = app.getCountryFromUser("Choose an Adversary country (? for list): ",  "XXX", app.listAdversaryCountries)
-            if input == "":
-              print("")
-              return False
-            else:
-              if app.map[input].alignment != "Adversary":
-                print("%s is not a Adversary country." % input)
-                print("")
-              else:
-                app.map[input].alignment = "Neutral"
-                app.outputToHistory("%s now Neutral" % input, False)
-                app.map[input].aid = 1
-                app.outputToHistory("Aid added to %s." % input, False)
-                app.outputToHistory(app.map[input].countryStr(), True)
-                break
-      elif self.number == 33: # Benazir Bhutto
-        app.markers.append("Benazir Bhutto")
-        app.outputToHistory("Benazir Bhutto in Play.", False)
-        if app.map["Pakistan"].governance == 3:
-          app.map["Pakistan"].governance = 2
-          app.outputToHistory("Pakistan now Fair governance.", False)
-        app.outputToHistory("No Jihads in Pakistan.", False)
-        app.outputToHistory(app.map["Pakistan"].countryStr(), True)
-      elif self.number == 34: # Enhanced Measures
-        app.markers.append("Enhanced Measures")
-        app.outputToHistory("Enhanced Measures in Play.", False)
-        app.outputToHistory("Take a random card from the Jihadist hand.", False)
-        app.do_disrupt("")
-        app.outputToHistory("", False)
-      elif self.number == 35: # Hajib
-        app.testCountry("Turkey")
-        app.map["Turkey"].governance -= 1
-        app.outputToHistory("Turkey Governance now %s." % app.map["Turkey"].govStr(), False)
-        app.changeFunding(-2)
-        posStr = app.getPostureFromUser("Select Frances's Posture (hard or soft): ")
-        app.map["France"].posture = posStr
-        app.outputToHistory(app.map["Turkey"].countryStr(), False)
-        app.outputToHistory(app.map["France"].countryStr(), True)
-      elif self.number == 36: # Indo-Pakistani Talks
-        app.markers.append("Indo-Pakistani Talks")
-        app.outputToHistory("Indo-Pakistani Talks in Play.", False)
-        app.map['Pakistan'].alignment = "Ally"
-        app.outputToHistory("Pakistan now Ally", False)
-        posStr = app.getPostureFromUser("Select India's Posture (hard or soft): ")
-        app.map["India"].posture = posStr
-        app.outputToHistory(app.map["Pakistan"].countryStr(), False)
-        app.outputToHistory(app.map["India"].countryStr(), True)
-      elif self.number == 37: # Iraqi WMD
-        app.markers.append("Iraqi WMD")
-        app.outputToHistory("Iraqi WMD in Play.", False)
-        app.outputToHistory("Use this or a later card for Regime Change in Iraq at any Governance.", True)
-      elif self.number == 38: # Libyan Deal
-        app.markers.append("Libyan Deal")
-        app.outputToHistory("Libyan Deal in Play.", False)
-        app.map["Libya"].alignment == "Ally"
-        app.outputToHistory("Libya now Ally", False)
-        app.changePrestige(1)
-        print("Select the Posture of 2 Schengen countries.")
-        for i in range(2):
-          target = ""
-          while not target:
-            input = app.getCountryFromUser("Choose Schengen country (? for list)?: ", "XXX", app.listSchengenCountries)
-            if input == "":
-              print("")
-            else:
-              if not app.map[input].schengen:
-                print("%s is not a Schengen country." % input)
-                print("")
-                return
-              else:
-                target = input
-                posStr = app.getPostureFromUser("Select %s's Posture (hard or soft): " % target)
-                app.map[target].posture = posStr
-                app.outputToHistory(app.map[target].countryStr(), False)
-        app.outputToHistory("", False)
-      elif self.number == 39: # Libyan WMD
-        app.markers.append("Libyan WMD")
-        app.outputToHistory("Libyan WMD in Play.", False)
-        app.outputToHistory("Use this or a later card for Regime Change in Libya at any Governance.", True)
-      elif self.number == 40: # Mass Turnout
-        numRC = app.numRegimeChange()
-        target = ""
-        if numRC <= 0:
-          return False
-        elif numRC == 1:
-          for country in app.map:
-            if app.map[country].regimeChange > 0:
-              target = country
-              break
-        else:
-          while True:
-            input = app.getCountryFromUser("Choose a Regime Change Country to improve governance (? for list): ",  "XXX", app.listRegimeChangeCountries)
-            if input == "":
-              print("")
-              return
-            else:
-              if app.map[input].regimeChange <= 0:
-                print("%s is not a Regime Change country." % input)
-                print("")
-              else:
-                target = input
-                break
-        app.improveGovernance(target)
-        app.outputToHistory("%s Governance improved." % target, False)
-        app.outputToHistory(app.map[target].countryStr(), True)
-      elif self.number == 41: # NATO
-        numRC = app.numRegimeChange()
-        target = ""
-        if numRC <= 0:
-          return False
-        elif numRC == 1:
-          for country in app.map:
-            if app.map[country].regimeChange > 0:
-              target = country
-              break
-        else:
-          while True:
-            input = app.getCountryFromUser("Choose a Regime Change Country to land NATO troops (? for list): ",  "XXX", app.listRegimeChangeCountries)
-            if input == "":
-              print("")
-              return
-            else:
-              if app.map[input].regimeChange <= 0:
-                print("%s is not a Regime Change country." % input)
-                print("")
-              else:
-                target = input
-                break
-        app.map[target].markers.append("NATO")
-        app.outputToHistory("NATO added in %s" % target, False)
-        app.map[target].aid = 1
-        app.outputToHistory("Aid added in %s" % target, False)
-        app.outputToHistory(app.map[target].countryStr(), True)
-      elif self.number == 42: # Pakistani Offensive
-        if "FATA" in app.map["Pakistan"].markers:
-          app.map["Pakistan"].markers.remove("FATA")
-          app.outputToHistory("FATA removed from Pakistan", True)
-      elif self.number == 43: # Patriot Act
-        app.markers.append("Patriot Act")
-      elif self.number == 44: # Renditions
-        app.markers.append("Renditions")
-        app.outputToHistory("Renditions in Play.", False)
-        app.outputToHistory("Discard a random card from the Jihadist hand.", False)
-        if app.numDisruptable() > 0:
-          app.do_disrupt("")
-        app.outputToHistory("", False)
-      elif self.number == 45: # Safer Now
-        app.changePrestige(3)
-        postureRoll = app.getRollFromUser("Enter US Posture Roll or r to have program roll: ")
-        if postureRoll <= 4:
-          app.map["United States"].posture = "Soft"
-          app.outputToHistory("US Posture now Soft.", False)
-        else:
-          app.map["United States"].posture = "Hard"
-          app.outputToHistory("US Posture now Hard.", False)
-        while True:
-          postureCountry = app.getCountryFromUser("Now choose a non-US country to set its Posture: ", "XXX", None)
-          if postureCountry == "":
-            print("")
-          else:
-            if postureCountry == "United States":
-              print("Choos a non-US country.")
-              print("")
-            else:
-              postureStr = app.getPostureFromUser("What Posture should %s have (h or s)? " % postureCountry)
-              app.outputToHistory("%s Posture now %s" % (postureCountry, postureStr), False)
-              app.map[postureCountry].posture = postureStr
-              app.outputToHistory(app.map["United States"].countryStr(), False)
-              app.outputToHistory(app.map[postureCountry].countryStr(), True)
-              break
-      elif self.number == 46: # Sistani
-        targetCountries = []
-        for country in app.map:
-          if app.map[country].culture == "Shia-Mix":
-            if app.map[country].regimeChange > 0:
-              if (app.map[country].totalCells(True)) > 0:
-                targetCountries.append(country)
-        if len(targetCountries) == 1:
-          target = targetCountries[0]
-        else:
-          target = None
-        while not target:
-          input = app.getCountryFromUser("Choose a Shia-Mix Regime Change Country with a cell to improve governance (? for list): ",  "XXX", app.listShiaMixRegimeChangeCountriesWithCells)
-          if input == "":
-            print("")
-          else:
-            if input not in targetCountries:
-              print("%s is not a Shi-Mix Regime Change Country with a cell." % input)
-              print("")
-            else:
-              target = input
-              break
-        app.improveGovernance(target)
-        app.outputToHistory("%s Governance improved." % target, False)
-        app.outputToHistory(app.map[target].countryStr(), True)
-      elif self.number == 47: # The door of Itjihad was closed
-        app.lapsing.append("The door of Itjihad was closed")
-      else:
-        return False
-    elif self.type == "Jihadist" and side == "Jihadist":
-      if self.number == 48: # Adam Gadahn
-        cardNum = app.getCardNumFromUser("Enter the number of the next Jihadist card or none if there are none left: ")
-        if cardNum == "none":
-          app.outputToHistory("No cards left to recruit to US.", True)
-          app.outputToHistory("Jihadist Activity Phase findshed, enter plot command.", True)
-          return
-        ops = app.deck[str(cardNum)].ops
-        rolls = []
-        for i in range(ops):
-          rolls.append(random.randint(1,6))
-        app.outputToHistory("Jihadist Activity Phase findshed, enter plot command.", True)
-        app.executeRecruit("United States", ops, rolls, 2)
-      elif self.number == 49: # Al-Ittihad al-Islami
-        app.placeCells("Somalia", 1)
-      elif self.number == 50: # Ansar al-Islam
-        possible = ["Iraq", "Iran"]
-        target = random.choice(possible)
-        app.placeCells(target, 1)
-      elif self.number == 51: # FREs
-        if "Saddam Captured" in app.markers:
-          cellsToMove = 2
-        else:
-          cellsToMove = 4
-        cellsToMove = min(cellsToMove, app.cells)
-        app.placeCells("Iraq", cellsToMove)
-      elif self.number == 52: # IDEs
-        app.outputToHistory("US randomly discards one card.", True)
-      elif self.number == 53: # Madrassas
-        app.handleRecruit(1, True)
-        cardNum = app.getCardNumFromUser("Enter the number of the next Jihadist card or none if there are none left: ")
-        if cardNum == "none":
-          app.outputToHistory("No cards left to recruit.", True)
-          app.outputToHistory("Jihadist Activity Phase findshed, enter plot command.", True)
-          return
-        ops = app.deck[str(cardNum)].ops
-        app.handleRecruit(ops, True)
-        app.outputToHistory("Jihadist Activity Phase findshed, enter plot command.", True)
-      elif self.number == 54: # Moqtada al-Sadr
-        app.map["Iraq"].markers.append("Sadr")
-        app.outputToHistory("Sadr Maker added in Iraq", True)
-      elif self.number == 55: # Uyghur Jihad
-        app.testCountry("China")
-        if app.cells > 0:
-          if app.map["China"].posture == "Soft":
-            app.map["China"].sleeper_cells += 1
-            app.cells -= 1
-            app.outputToHistory("Sleeper Cell placed in China", False)
-            app.outputToHistory(app.map["China"].countryStr(), True)
-          else:
-            app.testCountry("Central Asia")
-            app.map["Central Asia"].sleeper_cells += 1
-            app.cells -= 1
-            app.outputToHistory("Sleeper Cell placed in Central Asia", False)
-            app.outputToHistory(app.map["Central Asia"].countryStr(), True)
-        else:
-          app.outputToHistory("No cells to place.", True)
-      elif self.number == 56: # Vieira de Mello Slain
-        app.markers.append("Vieira de Mello Slain")
-        app.outputToHistory("Vieira de Mello Slain in play.", False)
-        app.changePrestige(-1)
-      elif self.number == 57: # Abu Sayyaf
-        app.placeCells("Philippines", 1)
-        app.markers.append("Abu Sayyaf")
-      elif self.number == 58: # Al-Anbar
-        app.markers.append("Al-Anbar")
-        app.outputToHistory("Al-Anbar in play.", True)
-        app.testCountry("Iraq")
-        if app.cells > 0:
-          app.map["Iraq"].sleeper_cells += 1
-          app.cells -= 1
-          app.outputToHistory("Sleeper Cell placed in Iraq", True)
-      elif self.number == 59: # Amerithrax
-        app.outputToHistory("US side discards its highest-value US-associated event card, if it has any.", True)
-      elif self.number == 60: # Bhutto Shot
-        app.markers.append("Bhutto Shot")
-        app.outputToHistory("Bhutto Shot in play.", True)
-      elif self.number == 61: # Detainee Release
-        if app.cells > 0:
-          target = None
-          while not target:
-            input = app.getCountryFromUser("Choose a country where Disrupt occured this or last Action Phase: ",  "XXX", None)
-            if input == "":
-              print("")
-              return
-            else:
-              target = input
-              break
-          app.testCountry(target)
-          app.map[target].sleeper_cells += 1
-          app.cells -= 1
-          app.outputToHistory("Sleeper Cell placed in %s" % target, False)
-          app.outputToHistory(app.map[target].countryStr(), True)
-        app.outputToHistory("Draw a card for the Jihadist and put it on the top of their hand.", True)
-      elif self.number == 62: # Ex-KGB
-        if "CTR" in app.map["Russia"].markers:
-          app.map["Russia"].markers.remove("CTR")
-          app.outputToHistory("CTR removed from Russia.", True)
-        else:
-          targetCaucasus = False
-          if app.map["Caucasus"].posture == "" or app.map["Caucasus"].posture == app.map["United States"].posture:
-            if app.gwotPenalty() == 0:
-              cacPosture = app.map["Caucasus"].posture
-              if app.map["United States"].posture == "Hard":
-                app.map["Caucasus"].posture = "Soft"
-              else:
-                app.map["Caucasus"].posture = "Hard"
-              if app.gwotPenalty() < 0:
-                targetCaucasus = True
-              app.map["Caucasus"].posture = cacPosture
-          if targetCaucasus:
-            if app.map["United States"].posture == "Hard":
-              app.map["Caucasus"].posture = "Soft"
-            else:
-              app.map["Caucasus"].posture = "Hard"
-            app.outputToHistory("Caucasus posture now %s" % app.map["Caucasus"].posture, False)
-            app.outputToHistory(app.map["Caucasus"].countryStr(), True)
-          else:
-            app.testCountry("Central Asia")
-            if app.map["Central Asia"].alignment == "Ally":
-              app.map["Central Asia"].alignment = "Neutral"
-              app.outputToHistory("Central Asia now Neutral.", True)
-            elif app.map["Central Asia"].alignment == "Neutral":
-              app.map["Central Asia"].alignment = "Adversary"
-              app.outputToHistory("Central Asia now Adversary.", True)
-            app.outputToHistory(app.map["Central Asia"].countryStr(), True)
-      elif self.number == 63: # Gaza War
-        app.changeFunding(1)
-        app.changePrestige(-1)
-        app.outputToHistory("US discards a random card.", True)
-      elif self.number == 64: # Hariri Killed
-        app.testCountry("Lebanon")
-        app.testCountry("Syria")
-        app.map["Syria"].alignment = "Adversary"
-        app.outputToHistory("Syria now Adversary.", False)
-        if app.map["Syria"].governance < 3:
-          app.worsenGovernance("Syria")
-          app.outputToHistory("Governance in Syria worsened.", False)
-          app.outputToHistory(app.map["Syria"].countryStr(), True)
-        app.outputToHistory(app.map["Lebanon"].countryStr(), True)
-      elif self.number == 65: # HEU
-        possibles = []
-        if app.map["Russia"].totalCells() > 0 and "CTR" not in app.map["Russia"].markers:
-          possibles.append("Russia")
-        if app.map["Central Asia"].totalCells() > 0 and "CTR" not in app.map["Central Asia"].markers:
-          possibles.append("Central Asia")
-        target = random.choice(possibles)
-        roll = random.randint(1,6)
-        app.executeCardHEU(target, roll)
-      elif self.number == 66: # Homegrown
-        app.placeCells("United Kingdom", 1)
-      elif self.number == 67: # Islamic Jihad Union
-        app.placeCells("Central Asia", 1)
-        if app.cells > 0:
-          app.placeCells("Afghanistan", 1)
-      elif self.number == 68: # Jemaah Islamiya
-        app.placeCells("Indonesia/Malaysia", 2)
-      elif self.number == 69: # Kazakh Strain
-        roll = random.randint(1,6)
-        app.executeCardHEU("Central Asia", roll)
-      elif self.number == 70: # Lashkar-e-Tayyiba
-        app.placeCells("Pakistan", 1)
-        if app.cells > 0:
-          app.placeCells("India", 1)
-      elif self.number == 71: # Loose Nuke
-        roll = random.randint(1,6)
-        app.executeCardHEU("Russia", roll)
-      elif self.number == 72: # Opium
-        cellsToPlace = min(app.cells, 3)
-        if app.map["Afghanistan"].governance == 4:
-          cellsToPlace = app.cells
-        app.placeCells("Afghanistan", cellsToPlace)
-      elif self.number == 73: # Pirates
-        app.markers.append("Pirates")
-        app.outputToHistory("Pirates in play.", False)
-      elif self.number == 74: # Schengen Visas
-        if app.cells == 15:
-          app.outputToHistory("No cells to travel.", False)
-          return
-        app.handleTravel(2, False, True)
-      elif self.number == 75: # Schroeder & Chirac
-        app.map["Germany"].posture = "Soft"
-        app.outputToHistory("%s Posture now %s" % ("Germany", app.map["Germany"].posture), True)
-        app.map["France"].posture = "Soft"
-        app.outputToHistory("%s Posture now %s" % ("France", app.map["France"].posture), True)
-        app.changePrestige(-1)
-      elif self.number == 76: # Abu Ghurayb
-        app.outputToHistory("Draw 2 cards.", False)
-        app.changePrestige(-2)
-        allys = app.minorJihadInGoodFairChoice(1, True)
-        if not allys:
-          app.outputToHistory("No Allys to shift.", True)
-        else:
-          target = allys[0][0]
-          app.map[target].alignment = "Neutral"
-          app.outputToHistory("%s Alignment shifted to Neutral." % target, True)
-      elif self.number == 77: # Al Jazeera
-        choices = app.minorJihadInGoodFairChoice(1, False, True)
-        if not choices:
-          app.outputToHistory("No countries to shift.", True)
-        else:
-          target = choices[0][0]
-          if app.map[target].alignment == "Ally":
-            app.map[target].alignment = "Neutral"
-          elif app.map[target].alignment == "Neutral":
-            app.map[target].alignment = "Adversary"
-          app.outputToHistory("%s Alignment shifted to %s." % (target, app.map[target].alignment), True)
-      elif self.number == 78: # Axis of Evil
-        app.outputToHistory("US discards any Iran, Hizballah, or Jaysh al-Mahdi cards from hand.", False)
-        if app.map["United States"].posture == "Soft":
-          app.map["United States"].posture = "Hard"
-          app.outputToHistory("US Posture now Hard.", False)
-        prestigeRolls = []
-        for i in range(3):
-          prestigeRolls.append(random.randint(1,6))
-        presMultiplier = 1
-        if prestigeRolls[0] <= 4:
-          presMultiplier = -1
-        app.changePrestige(min(prestigeRolls[1], prestigeRolls[2]) * presMultiplier)
-      elif self.number == 79: # Clean Operatives
-        app.handleTravel(2, False, False, True)
-      elif self.number == 80: # FATA
-        app.testCountry("Pakistan")
-        app.map["Pakistan"].markers.append("FATA")
-        app.outputToHistory("FATA Maker added in Pakistan", True)
-        app.placeCells("Pakistan", 1)
-      elif self.number == 81: # Foreign Fighters
-        possibles = []
-        for country in app.map:
-          if app.map[country].regimeChange > 0:
-            possibles.append(country)
-        if len(possibles) <= 0:
-          return False
-        target = random.choice(possibles)
-        app.placeCells(target, 5)
-        if app.map[target].aid > 0:
-          app.map[target].aid = 0
-          app.outputToHistory("Aid removed from %s" % target, False)
-        else:
-          app.map[target].besieged = 1
-          app.outputToHistory("%s no Besieged Regime" % target, False)
-        app.outputToHistory(app.map[target].countryStr(), True)
-      elif self.number == 82: # Jihadist Videos
-        possibles = []
-        for country in app.map:
-          if app.map[country].totalCells() == 0:
-            possibles.append(country)
-        random.shuffle(possibles)
-        for i in range(3):
-          app.testCountry(possibles[i])
-          # number of available cells does not matter for Jihadist Videos
-          # if app.cells > 0:
-          rolls = []
-          rolls.append(random.randint(1,6))
-          app.executeRecruit(possibles[i], 1, rolls, False, True)
-      elif self.number == 83: # Kashmir
-        app.placeCells("Pakistan", 1)
-        if app.map["Pakistan"].alignment == "Ally":
-          app.map["Pakistan"].alignment = "Neutral"
-        elif app.map["Pakistan"].alignment == "Neutral":
-          app.map["Pakistan"].alignment = "Adversary"
-        app.outputToHistory("%s Alignment shifted to %s." % ("Pakistan", app.map["Pakistan"].alignment), True)
-        app.outputToHistory(app.map["Pakistan"].countryStr(), True)
-      elif self.number == 84 or self.number == 85: # Leak
-        possibles = []
-        if "Enhanced Measures" in app.markers:
-          possibles.append("Enhanced Measures")
-        if "Renditions" in app.markers:
-          possibles.append("Renditions")
-        if "Wiretapping" in app.markers:
-          possibles.append("Wiretapping")
-        target = random.choice(possibles)
-        app.markers.remove(target)
-        app.markers.append("Leak-"+target)
-        app.outputToHistory("%s removed and can no longer be played." % target, False)
-        usPrestigeRolls = []
-        for i in range(3):
-          usPrestigeRolls.append(random.randint(1,6))
-        postureRoll = random.randint(1,6)
+@cardPlayable(98, reads = ())
+def playableGazaWithdrawl(card, side, app):
+  return True
 
-        presMultiplier = 1
-        if usPrestigeRolls[0] <= 4:
-          presMultiplier = -1
-        app.changePrestige(min(usPrestigeRolls[1], usPrestigeRolls[2]) * presMultiplier, False)
-        if postureRoll <= 4:
-          app.map["United States"].posture = "Soft"
-        else:
-          app.map["United States"].posture = "Hard"
-        app.outputToHistory("US Posture now %s" % app.map["United States"].posture, True)
-      elif self.number == 86: # Lebanon War
-        app.outputToHistory("US discards a random card.", False)
-        app.changePrestige(-1, False)
-        possibles = []
-        for country in app.map:
-          if app.map[country].culture == "Shia-Mix":
-            possibles.append(country)
-        target = random.choice(possibles)
-        app.placeCells(target, 1)
-      elif self.number == 87 or self.number == 88 or self.number == 89: # Martyrdom Operation
-        if app.executePlot(1, False, [1], True) == 1:
-          app.outputToHistory("No plots could be placed.", True)
-          app.handleRadicalization(app.deck[str(self.number)].ops)
-      elif self.number == 90: # Quagmire
-        app.map["United States"].posture = "Soft"
-        app.outputToHistory("US Posture now Soft.", False)
-        app.outputToHistory("US randomly discards two cards and Jihadist plays them.", False)
-        app.outputToHistory("Do this using the j # command for each card.", True)
-      elif self.number == 91: # Regional al-Qaeda
-        possibles = []
-        for country in app.map:
-          if app.map[country].culture == "Suni" or app.map[country].culture == "Shia-Mix":
-            if app.map[country].governance == 0:
-              possibles.append(country)
-        random.shuffle(possibles)
-        app.placeCells(possibles[0], 1)
-        app.placeCells(possibles[1], 1)
-      elif self.number == 92: # Saddam
-        app.funding = 9
-        app.outputToHistory("Jihadist Funding now 9.", True)
-      elif self.number == 93: # Taliban
-        app.testCountry("Afghanistan")
-        app.map["Afghanistan"].besieged = 1
-        app.outputToHistory("Afghanistan is now a Besieged Regime.", False)
-        app.placeCells("Afghanistan", 1)
-        app.placeCells("Pakistan", 1)
-        if (app.map["Afghanistan"].governance == 4) or (app.map["Pakistan"].governance == 4):
-          app.changePrestige(-3)
-        else:
-          app.changePrestige(-1)
-      elif self.number == 94: # The door of Itjihad was closed
-        target = None
-        while not target:
-          input = app.getCountryFromUser("Choose a country tested or improved to Fair or Good this or last Action Phase: ",  "XXX", None)
-          if input == "":
-            print("")
-          elif app.map[input].governance != 2 and   app.map[input].governance != 1:
-            print("%s is not Fair or Good.")
-          else:
-            target = input
-            break
-        app.map[target].governance += 1
-        app.outputToHistory("%s Governance worsened." % target, False)
-        app.outputToHistory(app.map[target].countryStr(), True)
-      elif self.number == 95: # Wahhabism
-        if app.map["Saudi Arabia"].governance == 4:
-          app.changeFunding(9)
-        else:
-          app.changeFunding(app.map["Saudi Arabia"].governance)
+@cardEvent(98)
+def eventGazaWithdrawl(card, side, app):
+  if side == "US":
+    app.changeFunding(-1)
+  else:
+    app.placeCells("Israel", 1)
+
+@cardPlayable(99, reads = ())
+def playableHAMASElected(card, side, app):
+  return True
+
+@cardEvent(99)
+def eventHAMASElected(card, side, app):
+  app.outputToHistory("US selects and discards one card.", False)
+  app.changePrestige(-1)
+  app.changeFunding(-1)
+
+@cardPlayable(100, reads = ())
+def playableHisUtTahrir(card, side, app):
+  return True
+
+@cardEvent(100)
+def eventHisUtTahrir(card, side, app):
+  if app.troops >= 10:
+    app.changeFunding(-2)
+  elif app.troops < 5:
+    app.changeFunding(2)
+
+@cardPlayable(101, reads = ())
+def playableKosovo(card, side, app):
+  return True
+
+@cardEvent(101)
+def eventKosovo(card, side, app):
+  app.changePrestige(1)
+  app.testCountry("Serbia")
+  if app.map["United States"].posture == "Soft":
+    app.map["Serbia"].posture = "Hard"
+  else:
+    app.map["Serbia"].posture = "Soft"
+  app.outputToHistory("Serbia Posture now %s." %             app.map["Serbia"].posture, True)
+
+@cardPlayable(102, reads = ())
+def playableFormerSovietUnion(card, side, app):
+  return True
+
+@cardEvent(102)
+def eventFormerSovietUnion(card, side, app):
+  testRoll = app.dice.roll()
+  if testRoll <= 4:
+    app.map["Central Asia"].governance = 3
+  else:
+    app.map["Central Asia"].governance = 2
+  app.map["Central Asia"].alignment = "Neutral"
+  app.outputToHistory("%s tested, governance %s" % (app.map["Central Asia"].name, app.map["Central Asia"].govStr()), False)
+
+@cardPlayable(103, reads = ())
+def playableHizballah(card, side, app):
+  return True
+
+@cardEvent(103)
+def eventHizballah(card, side, app):
+  if side == "US":
+    oneAway = []
+    twoAway = []
+    threeAway = []
+    for countryObj in app.map["Lebanon"].links:
+      oneAway.append(countryObj.name)
+    for country in oneAway:
+      for subCountryObj in app.map[country].links:
+        if subCountryObj.name not in twoAway and subCountryObj.name not in oneAway and subCountryObj.name != "Lebanon":
+          twoAway.append(subCountryObj.name)
+    for country in twoAway:
+      for subCountryObj in app.map[country].links:
+        if subCountryObj.name not in threeAway and subCountryObj.name not in twoAway and subCountryObj.name not in oneAway and subCountryObj.name != "Lebanon":
+          threeAway.append(subCountryObj.name)
+    possibles = []
+    for country in oneAway:
+      if country not in possibles and app.map[country].totalCells(True) > 0 and app.map[country].culture == "Shia-Mix":
+        possibles.append(country)
+    for country in twoAway:
+      if country not in possibles and app.map[country].totalCells(True) > 0 and app.map[country].culture == "Shia-Mix":
+        possibles.append(country)
+    for country in threeAway:
+      if country not in possibles and app.map[country].totalCells(True) > 0 and app.map[country].culture == "Shia-Mix":
+        possibles.append(country)
+    if len(possibles) <= 0:
+      app.outputToHistory("No Shia-Mix countries with cells within 3 countries of Lebanon.", True)
+      target = None
+    elif len(possibles) == 1:
+      target = possibles[0]
     else:
-      if self.number == 96: # Danish Cartoons
-        posStr = app.getPostureFromUser("Select Scandinavia's Posture (hard or soft): ")
-        app.map["Scandinavia"].posture = posStr
-        app.outputToHistory("Scandinavia posture now %s." % posStr, False)
-        possibles = []
-        for country in app.map:
-          if app.map[country].culture == "Suni" or app.map[country].culture == "Shia-Mix":
-            if app.map[country].governance != 4:
-              possibles.append(country)
-        target = random.choice(possibles)
-        app.testCountry(target)
-        if app.numIslamicRule() > 0:
-          app.outputToHistory("Place any available plot in %s." % target, False)
-        else:
-          app.outputToHistory("Place a Plot 1 in %s." % target, False)
-        app.map[target].plots += 1
-      elif self.number == 97: # Fatwa
-        app.outputToHistory("Trade random cards.", False)
-        if side == "US":
-          app.outputToHistory("Conduct a 1-value operation (Use commands: alert, deploy, disrupt, reassessment, regime, withdraw, or woi).", False)
-        else:
-          app.aiFlowChartMajorJihad(97)
-      elif self.number == 98: # Gaza Withdrawl
-        if side == "US":
-          app.changeFunding(-1)
-        else:
-          app.placeCells("Israel", 1)
-      elif self.number == 99: # HAMAS Elected
-        app.outputToHistory("US selects and discards one card.", False)
-        app.changePrestige(-1)
-        app.changeFunding(-1)
-      elif self.number == 100: # His Ut-Tahrir
-        if app.troops >= 10:
-          app.changeFunding(-2)
-        elif app.troops < 5:
-          app.changeFunding(2)
-      elif self.number == 101: # Kosovo
-        app.changePrestige(1)
-        app.testCountry("Serbia")
-        if app.map["United States"].posture == "Soft":
-          app.map["Serbia"].posture = "Hard"
-        else:
-          app.map["Serbia"].posture = "Soft"
-        app.outputToHistory("Serbia Posture now %s." %             app.map["Serbia"].posture, True)
-      elif self.number == 102: # Former Soviet Union
-        testRoll = random.randint(1,6)
-        if testRoll <= 4:
-          app.map["Central Asia"].governance = 3
-        else:
-          app.map["Central Asia"].governance = 2
-        app.map["Central Asia"].alignment = "Neutral"
-        app.outputToHistory("%s tested, governance %s" % (app.map["Central Asia"].name, app.map["Central Asia"].govStr()), False)
-      elif self.number == 103: # Hizballah
-        if side == "US":
-          oneAway = []
-          twoAway = []
-          threeAway = []
-          for countryObj in app.map["Lebanon"].links:
-            oneAway.append(countryObj.name)
-          for country in oneAway:
-            for subCountryObj in app.map[country].links:
-              if subCountryObj.name not in twoAway and subCountryObj.name not in oneAway and subCountryObj.name != "Lebanon":
-                twoAway.append(subCountryObj.name)
-          for country in twoAway:
-            for subCountryObj in app.map[country].links:
-              if subCountryObj.name not in threeAway and subCountryObj.name not in twoAway and subCountryObj.name not in oneAway and subCountryObj.name != "Lebanon":
-                threeAway.append(subCountryObj.name)
-          possibles = []
-          for country in oneAway:
-            if country not in possibles and app.map[country].totalCells(True) > 0 and app.map[country].culture == "Shia-Mix":
-              possibles.append(country)
-          for country in twoAway:
-            if country not in possibles and app.map[country].totalCells(True) > 0 and app.map[country].culture == "Shia-Mix":
-              possibles.append(country)
-          for country in threeAway:
-            if country not in possibles and app.map[country].totalCells(True) > 0 and app.map[country].culture == "Shia-Mix":
-              possibles.append(country)
-          if len(possibles) <= 0:
-            app.outputToHistory("No Shia-Mix countries with cells within 3 countries of Lebanon.", True)
-            target = None
-          elif len(possibles) == 1:
-            target = possibles[0]
-          else:
-            target = None
-            while not target:
-              input = app.getCountryFromUser("Remove a cell from what Shia-Mix country within 3 countries of Lebanon (? for list)?: ",  "XXX", app.listCountriesInParam, possibles)
-              if input == "":
-                print("")
-              else:
-                if app.map[input].totalCells(True) <= 0:
-                  print("There are no cells in %s" % input)
-                  print("")
-                elif input not in possibles:
-                  print("%s not a Shia-Mix country within 3 countries of Lebanon." % input)
-                  print("")
-                else:
-                  target = input
-          if target:
-            app.removeCell(target)
-            app.outputToHistory(app.map[target].countryStr(), True)
-        else:
-          app.testCountry("Lebanon")
-          app.map["Lebanon"].governance = 3
-          app.outputToHistory("Lebanon governance now Poor.", False)
-          app.map["Lebanon"].alignment = "Neutral"
-          app.outputToHistory("Lebanon alignment now Neutral.", True)
-      elif self.number == 104 or self.number == 105: # Iran
-        if side == "US":
-          target = None
-          while not target:
-            input = app.getCountryFromUser("Choose a Shia-Mix country to test. You can then remove a cell from there or Iran (? for list)?: ",  "XXX", app.listShiaMixCountries)
-            if input == "":
-              print("")
-            else:
-              if app.map[input].culture != "Shia-Mix":
-                print("%s is not a Shia-Mix country." % input)
-                print("")
-              else:
-                target = input
-          picked = target
-          app.testCountry(picked)
-          if app.map["Iran"].totalCells(True) > 0:
-            target = None
-            while not target:
-              input = app.getCountryFromUser("Remove a cell from %s or %s: " % (picked, "Iran"),  "XXX", None)
-              if input == "":
-                print("")
-              else:
-                if input != picked and input != "Iran":
-                  print("Remove a cell from %s or %s: " % (picked, "Iran"))
-                  print("")
-                else:
-                  target = input
-          else:
-            target = picked
-          app.removeCell(target)
-          app.outputToHistory(app.map[target].countryStr(), True)
+      target = None
+      while not target:
+        input = app.getCountryFromUser("Remove a cell from what Shia-Mix country within 3 countries of Lebanon (? for list)?: ",  "XXX", app.listCountriesInParam, possibles)
+        if input == "":
+          app.output("")
         else:
-          possibles = []
-          for country in app.map:
-            if app.map[country].culture == "Shia-Mix":
-              possibles.append(country)
-          target = random.choice(possibles)
-          app.testCountry(target)
-          tested = target
-          target = None
-          goods = []
-          for country in app.map:
-            if app.map[country].culture == "Shia-Mix" or app.map[country].culture == "Suni":
-              if app.map[country].governance == 1:
-                goods.append(country)
-          if len(goods) > 1:
-            distances = []
-            for country in goods:
-              distances.append((app.countryDistance(tested, country), country))
-            distances.sort()
-            target = distances[0][1]
-          elif len(goods) == 1:
-            target = goods[0]
+          if app.map[input].totalCells(True) <= 0:
+            app.output("There are no cells in %s" % input)
+            app.output("")
+          elif input not in possibles:
+            app.output("%s not a Shia-Mix country within 3 countries of Lebanon." % input)
+            app.output("")
           else:
-            fairs = []
-            for country in app.map:
-              if app.map[country].culture == "Shia-Mix" or app.map[country].culture == "Suni":
-                if app.map[country].governance == 2:
-                  fairs.append(country)
-            if len(fairs) > 1:
-              distances = []
-              for country in fairs:
-                distances.append((app.countryDistance(tested, country), country))
-              distances.sort()
-              target = distances[0][1]
-            elif len(fairs) == 1:
-              target = fairs[0]
-            else:
-              app.outputToHistory("No Good or Fair countries to Jihad in.", True)
-              return
-          app.outputToHistory("%s selected for jihad rolls." % target, False)
-          for i in range(2):
-            droll = random.randint(1,6)
-            app.outputToHistory("Rolled: " + str(droll), False)
-            if droll <= app.map[target].governance:
-              if app.map[target].governance < 3:
-                app.map[target].governance += 1
-                app.outputToHistory("Governance worsened in %s." % target, False)
-                app.outputToHistory(app.map[target].countryStr(), True)
-            else:
-              app.outputToHistory("Roll failed.  No change to governance in %s." % target, False)
-
-      elif self.number == 106: # Jaysh al-Mahdi
-        if side == "US":
-          target = None
-          possibles = []
-          for country in app.map:
-            if app.map[country].culture == "Shia-Mix":
-              if app.map[country].troops() > 0 and app.map[country].totalCells() > 0:
-                possibles.append(country)
-          if len(possibles) == 1:
-            target = possibles[0]
-          while not target:
-            input = app.getCountryFromUser("Choose a Shia-Mix country with cells and troops (? for list)?: ",  "XXX", app.listShiaMixCountriesWithCellsTroops)
-            if input == "":
-              print("")
-            else:
-              if input not in possibles:
-                print("%s is not a Shia-Mix country with cells and troops." % input)
-                print("")
-              else:
-                target = input
-          app.removeCell(target)
-          app.removeCell(target)
-          app.outputToHistory(app.map[target].countryStr(), True)
+            target = input
+    if target:
+      app.removeCell(target)
+      app.logCountry(target, True)
+  else:
+    app.testCountry("Lebanon")
+    app.map["Lebanon"].governance = 3
+    app.outputToHistory("Lebanon governance now Poor.", False)
+    app.map["Lebanon"].alignment = "Neutral"
+    app.outputToHistory("Lebanon alignment now Neutral.", True)
+
+@cardPlayable(104, 105, reads = ())
+def playableIran(card, side, app):
+  return True
+
+@cardEvent(104, 105)
+def eventIran(card, side, app):
+  if side == "US":
+    target = None
+    while not target:
+      input = app.getCountryFromUser("Choose a Shia-Mix country to test. You can then remove a cell from there or Iran (? for list)?: ",  "XXX", app.listShiaMixCountries)
+      if input == "":
+        app.output("")
+      else:
+        if app.map[input].culture != "Shia-Mix":
+          app.output("%s is not a Shia-Mix country." % input)
+          app.output("")
         else:
-          possibles = []
-          for country in app.map:
-            if app.map[country].culture == "Shia-Mix":
-              possibles.append(country)
-          target = random.choice(possibles)
-          app.testCountry(target)
-          tested = target
-          target = None
-          goods = []
-          for country in app.map:
-            if app.map[country].culture == "Shia-Mix" or app.map[country].culture == "Suni":
-              if app.map[country].governance == 1:
-                goods.append(country)
-          if len(goods) > 1:
-            distances = []
-            for country in goods:
-              distances.append((app.countryDistance(tested, country), country))
-            distances.sort()
-            target = distances[0][1]
-          elif len(goods) == 1:
-            target = goods[0]
-          else:
-            fairs = []
-            for country in app.map:
-              if app.map[country].culture == "Shia-Mix" or app.map[country].culture == "Suni":
-                if app.map[country].governance == 2:
-                  fairs.append(country)
-            if len(fairs) > 1:
-              distances = []
-              for country in fairs:
-                distances.append((app.countryDistance(tested, country), country))
-              distances.sort()
-              target = distances[0][1]
-            elif len(fairs) == 1:
-              target = fairs[0]
-            else:
-              app.outputToHistory("No Good or Fair countries to Jihad in.", True)
-              return
-            if app.map[target].governance < 4:
-              app.map[target].governance += 1
-              app.outputToHistory("Governance worsened in %s." % target, False)
-              app.outputToHistory(app.map[target].countryStr(), True)
-      elif self.number == 107: # Kurdistan
-        if side == "US":
-          app.testCountry("Iraq")
-          app.map["Iraq"].aid = 1
-          app.outputToHistory("Aid added to Iraq.", False)
-          app.outputToHistory(app.map["Iraq"].countryStr(), True)
+          target = input
+    picked = target
+    app.testCountry(picked)
+    if app.map["Iran"].totalCells(True) > 0:
+      target = None
+      while not target:
+        input = app.getCountryFromUser("Remove a cell from %s or %s: " % (picked, "Iran"),  "XXX", None)
+        if input == "":
+          app.output("")
         else:
-          app.testCountry("Turkey")
-          target = None
-          possibles = []
-          if app.map["Turkey"].governance < 3:
-            possibles.append("Turkey")
-          if app.map["Iraq"].governance != 0 and app.map["Iraq"].governance < 3:
-            possibles.append("Iraq")
-          if len(possibles) == 0:
-            app.outputToHistory("Iraq and Lebanon cannot have governance worssened.", True)
-            return
-          elif len(possibles) == 0:
-            target = possibles[0]
+          if input != picked and input != "Iran":
+            app.output("Remove a cell from %s or %s: " % (picked, "Iran"))
+            app.output("")
           else:
-            countryScores = {}
-            for country in possibles:
-              countryScores[country] = 0
-              if app.map[country].aid > 0:
-                countryScores[country] += 10000
-              if app.map[country].besieged > 0:
-                countryScores[country] += 1000
-              countryScores[country] += (app.countryResources(country) * 100)
-              countryScores[country] += random.randint(1,99)
-            countryOrder = []
-            for country in countryScores:
-              countryOrder.append((countryScores[country], (app.map[country].totalCells(True)), country))
-            countryOrder.sort()
-            countryOrder.reverse()
-            target = countryOrder[0][2]
+            target = input
+    else:
+      target = picked
+    app.removeCell(target)
+    app.logCountry(target, True)
+  else:
+    possibles = []
+    for country in app.map:
+      if app.map[country].culture == "Shia-Mix":
+        possibles.append(country)
+    target = app.dice.choice(possibles)
+    app.testCountry(target)
+    tested = target
+    target = None
+    goods = []
+    for country in app.map:
+      if app.map[country].culture == "Shia-Mix" or app.map[country].culture == "Suni":
+        if app.map[country].governance == 1:
+          goods.append(country)
+    if len(goods) > 1:
+      distances = []
+      for country in goods:
+        distances.append((app.countryDistance(tested, country), country))
+      distances.sort()
+      target = distances[0][1]
+    elif len(goods) == 1:
+      target = goods[0]
+    else:
+      fairs = []
+      for country in app.map:
+        if app.map[country].culture == "Shia-Mix" or app.map[country].culture == "Suni":
+          if app.map[country].governance == 2:
+            fairs.append(country)
+      if len(fairs) > 1:
+        distances = []
+        for country in fairs:
+          distances.append((app.countryDistance(tested, country), country))
+        distances.sort()
+        target = distances[0][1]
+      elif len(fairs) == 1:
+        target = fairs[0]
+      else:
+        app.outputToHistory("No Good or Fair countries to Jihad in.", True)
+        return False
+    app.outputToHistory("%s selected for jihad rolls." % target, False)
+    for i in range(2):
+      droll = app.dice.roll()
+      app.outputToHistory("Rolled: " + str(droll), False)
+      if droll <= app.map[target].governance:
+        if app.map[target].governance < 3:
           app.map[target].governance += 1
           app.outputToHistory("Governance worsened in %s." % target, False)
-          app.outputToHistory(app.map[target].countryStr(), True)
-      elif self.number == 108: # Musharraf
-        app.removeCell("Pakistan")
-        app.map["Pakistan"].governance = 3
-        app.map["Pakistan"].alignment = "Ally"
-        app.outputToHistory("Pakistan now Poor Ally.", False)
-        app.outputToHistory(app.map["Pakistan"].countryStr(), True)
-      elif self.number == 109: # Tora Bora
-        possibles = []
-        for country in app.map:
-          if app.map[country].regimeChange > 0:
-            if app.map[country].totalCells() >= 2:
-              possibles.append(country)
-        target = None
-        if len(possibles) == 0:
-          return False
-        if len(possibles) == 1:
-          target = possibles[0]
-        else:
-          if side == "US":
-            app.outputToHistory("US draws one card.", False)
-            while not target:
-              input = app.getCountryFromUser("Choose a Regime Change country with at least 2 troops. (? for list)?: ",  "XXX", app.listRegimeChangeWithTwoCells)
-              if input == "":
-                print("")
-              else:
-                if input not in possibles:
-                  print("%s is not a Regime Change country with at least 2 troops." % input)
-                  print("")
-                else:
-                  target = input
-          else:
-            app.outputToHistory("Jihadist draws one card.", False)
-            target = random.choice(possibles)
-        app.removeCell(target)
-        app.removeCell(target)
-        prestigeRolls = []
-        for i in range(3):
-          prestigeRolls.append(random.randint(1,6))
-        presMultiplier = 1
-        if prestigeRolls[0] <= 4:
-          presMultiplier = -1
-        app.changePrestige(min(prestigeRolls[1], prestigeRolls[2]) * presMultiplier)
-      elif self.number == 110: # Zarqawi
-        if side == "US":
-          app.changePrestige(3)
-          app.outputToHistory("Remove card from game.", False)
+          app.logCountry(target, True)
+      else:
+        app.outputToHistory("Roll failed.  No change to governance in %s." % target, False)
+
+@cardPlayable(106, reads = ("map",))
+def playableJayshAlMahdi(card, side, app):
+  shiaMix = app.boardIndex.withCulture("Shia-Mix")
+  return len(shiaMix & app.boardIndex.troops & app.boardIndex.withCells()) > 0
+
+@cardEvent(106)
+def eventJayshAlMahdi(card, side, app):
+  if side == "US":
+    target = None
+    possibles = []
+    for country in app.map:
+      if app.map[country].culture == "Shia-Mix":
+        if app.map[country].troops() > 0 and app.map[country].totalCells() > 0:
+          possibles.append(country)
+    if len(possibles) == 1:
+      target = possibles[0]
+    while not target:
+      input = app.getCountryFromUser("Choose a Shia-Mix country with cells and troops (? for list)?: ",  "XXX", app.listShiaMixCountriesWithCellsTroops)
+      if input == "":
+        app.output("")
+      else:
+        if input not in possibles:
+          app.output("%s is not a Shia-Mix country with cells and troops." % input)
+          app.output("")
         else:
-          possibles = []
-          for country in ["Iraq", "Syria", "Lebanon", "Jordan"]:
-            if app.map[country].troops() > 0:
-              possibles.append(country)
-          target = random.choice(possibles)
-          app.placeCells(target, 3)
-          app.map[target].plots += 1
-          app.outputToHistory("Add a Plot 2 to %s." % target, False)
-          app.outputToHistory(app.map[target].countryStr(), True)
-      elif self.number == 111: # Zawahiri
-        if side == "US":
-          app.changeFunding(-2)
+          target = input
+    app.removeCell(target)
+    app.removeCell(target)
+    app.logCountry(target, True)
+  else:
+    possibles = []
+    for country in app.map:
+      if app.map[country].culture == "Shia-Mix":
+        possibles.append(country)
+    target = app.dice.choice(possibles)
+    app.testCountry(target)
+    tested = target
+    target = None
+    goods = []
+    for country in app.map:
+      if app.map[country].culture == "Shia-Mix" or app.map[country].culture == "Suni":
+        if app.map[country].governance == 1:
+          goods.append(country)
+    if len(goods) > 1:
+      distances = []
+      for country in goods:
+        distances.append((app.countryDistance(tested, country), country))
+      distances.sort()
+      target = distances[0][1]
+    elif len(goods) == 1:
+      target = goods[0]
+    else:
+      fairs = []
+      for country in app.map:
+        if app.map[country].culture == "Shia-Mix" or app.map[country].culture == "Suni":
+          if app.map[country].governance == 2:
+            fairs.append(country)
+      if len(fairs) > 1:
+        distances = []
+        for country in fairs:
+          distances.append((app.countryDistance(tested, country), country))
+        distances.sort()
+        target = distances[0][1]
+      elif len(fairs) == 1:
+        target = fairs[0]
+      else:
+        app.outputToHistory("No Good or Fair countries to Jihad in.", True)
+        return False
+      if app.map[target].governance < 4:
+        app.map[target].governance += 1
+        app.outputToHistory("Governance worsened in %s." % target, False)
+        app.logCountry(target, True)
+
+@cardPlayable(107, reads = ())
+def playableKurdistan(card, side, app):
+  return True
+
+@cardEvent(107)
+def eventKurdistan(card, side, app):
+  if side == "US":
+    app.testCountry("Iraq")
+    app.map["Iraq"].aid = 1
+    app.outputToHistory("Aid added to Iraq.", False)
+    app.logCountry("Iraq", True)
+  else:
+    app.testCountry("Turkey")
+    target = None
+    possibles = []
+    if app.map["Turkey"].governance < 3:
+      possibles.append("Turkey")
+    if app.map["Iraq"].governance != 0 and app.map["Iraq"].governance < 3:
+      possibles.append("Iraq")
+    if len(possibles) == 0:
+      app.outputToHistory("Iraq and Lebanon cannot have governance worssened.", True)
+      return False
+    elif len(possibles) == 0:
+      target = possibles[0]
+    else:
+      countryScores = {}
+      for country in possibles:
+        countryScores[country] = 0
+        if app.map[country].aid > 0:
+          countryScores[country] += 10000
+        if app.map[country].besieged > 0:
+          countryScores[country] += 1000
+        countryScores[country] += (app.countryResources(country) * 100)
+        countryScores[country] += app.dice.randint(1,99)
+      countryOrder = []
+      for country in countryScores:
+        countryOrder.append((countryScores[country], (app.map[country].totalCells(True)), country))
+      countryOrder.sort()
+      countryOrder.reverse()
+      target = countryOrder[0][2]
+    app.map[target].governance += 1
+    app.outputToHistory("Governance worsened in %s." % target, False)
+    app.logCountry(target, True)
+
+@cardPlayable(108, reads = ("map", "markers"))
+def playableMusharraf(card, side, app):
+  if "Benazir Bhutto" in app.markers:
+    return False
+  return app.map["Pakistan"].totalCells() > 0
+
+@cardEvent(108)
+def eventMusharraf(card, side, app):
+  app.removeCell("Pakistan")
+  app.map["Pakistan"].governance = 3
+  app.map["Pakistan"].alignment = "Ally"
+  app.outputToHistory("Pakistan now Poor Ally.", False)
+  app.logCountry("Pakistan", True)
+
+@cardPlayable(109, reads = ("map",))
+def playableToraBora(card, side, app):
+  for country in app.boardIndex.regimeChange:
+    if app.map[country].totalCells() >= 2:
+      return True
+  return False
+
+@cardEvent(109)
+def eventToraBora(card, side, app):
+  possibles = []
+  for country in app.map:
+    if app.map[country].regimeChange > 0:
+      if app.map[country].totalCells() >= 2:
+        possibles.append(country)
+  target = None
+  if len(possibles) == 0:
+    return False
+  if len(possibles) == 1:
+    target = possibles[0]
+  else:
+    if side == "US":
+      app.outputToHistory("US draws one card.", False)
+      while not target:
+        input = app.getCountryFromUser("Choose a Regime Change country with at least 2 troops. (? for list)?: ",  "XXX", app.listRegimeChangeWithTwoCells)
+        if input == "":
+          app.output("")
         else:
-          if app.numIslamicRule() > 0:
-            app.changePrestige(-3)
+          if input not in possibles:
+            app.output("%s is not a Regime Change country with at least 2 troops." % input)
+            app.output("")
           else:
-            app.changePrestige(-1)
-      elif self.number == 112: # Bin Ladin
-        if side == "US":
-          app.changeFunding(-4)
-          app.changePrestige(1)
-          app.outputToHistory("Remove card from game.", False)
+            target = input
+    else:
+      app.outputToHistory("Jihadist draws one card.", False)
+      target = app.dice.choice(possibles)
+  app.removeCell(target)
+  app.removeCell(target)
+  prestigeRolls = []
+  for i in range(3):
+    prestigeRolls.append(app.dice.roll())
+  presMultiplier = 1
+  if prestigeRolls[0] <= 4:
+    presMultiplier = -1
+  app.changePrestige(min(prestigeRolls[1], prestigeRolls[2]) * presMultiplier)
+
+@cardPlayable(110, reads = ("map",))
+def playableZarqawi(card, side, app):
+  return app.map["Iraq"].troops() > 0 or app.map["Syria"].troops() > 0 or app.map["Lebanon"].troops() > 0 or app.map["Jordan"].troops() > 0
+
+@cardEvent(110)
+def eventZarqawi(card, side, app):
+  if side == "US":
+    app.changePrestige(3)
+    app.outputToHistory("Remove card from game.", False)
+  else:
+    possibles = []
+    for country in ["Iraq", "Syria", "Lebanon", "Jordan"]:
+      if app.map[country].troops() > 0:
+        possibles.append(country)
+    target = app.dice.choice(possibles)
+    app.placeCells(target, 3)
+    app.map[target].plots += 1
+    app.outputToHistory("Add a Plot 2 to %s." % target, False)
+    app.logCountry(target, True)
+
+@cardPlayable(111, reads = ("map", "markers"))
+def playableZawahiri(card, side, app):
+  if side == "US":
+    if "FATA" in app.map["Pakistan"].markers:
+      return False
+    if "Al-Anbar" in app.markers:
+      return False
+    return app.numIslamicRule() == 0
+  else:
+    return True
+
+@cardEvent(111)
+def eventZawahiri(card, side, app):
+  if side == "US":
+    app.changeFunding(-2)
+  else:
+    if app.numIslamicRule() > 0:
+      app.changePrestige(-3)
+    else:
+      app.changePrestige(-1)
+
+@cardPlayable(112, reads = ("map", "markers"))
+def playableBinLadin(card, side, app):
+  if side == "US":
+    if "FATA" in app.map["Pakistan"].markers:
+      return False
+    if "Al-Anbar" in app.markers:
+      return False
+    return app.numIslamicRule() == 0
+  else:
+    return True
+
+@cardEvent(112)
+def eventBinLadin(card, side, app):
+  if side == "US":
+    app.changeFunding(-4)
+    app.changePrestige(1)
+    app.outputToHistory("Remove card from game.", False)
+  else:
+    if app.numIslamicRule() > 0:
+      app.changePrestige(-4)
+    else:
+      app.changePrestige(-2)
+
+@cardPlayable(113, reads = ())
+def playableDarfur(card, side, app):
+  return True
+
+@cardEvent(113)
+def eventDarfur(card, side, app):
+  app.testCountry("Sudan")
+  if app.prestige >= 7:
+    app.map["Sudan"].aid = 1
+    app.outputToHistory("Aid added to Sudan.", False)
+    if app.map["Sudan"].alignment == "Adversary":
+      app.map["Sudan"].alignment = "Neutral"
+      app.outputToHistory("Sudan alignment improved.", False)
+    elif app.map["Sudan"].alignment == "Neutral":
+      app.map["Sudan"].alignment = "Ally"
+      app.outputToHistory("Sudan alignment improved.", False)
+  else:
+    app.map["Sudan"].besieged = 1
+    app.outputToHistory("Sudan now Besieged Regime.", False)
+    if app.map["Sudan"].alignment == "Ally":
+      app.map["Sudan"].alignment = "Neutral"
+      app.outputToHistory("Sudan alignment worssened.", False)
+    elif app.map["Sudan"].alignment == "Neutral":
+      app.map["Sudan"].alignment = "Adversary"
+      app.outputToHistory("Sudan alignment worssened.", False)
+  app.logCountry("Sudan", True)
+
+@cardPlayable(114, reads = ())
+def playableGTMO(card, side, app):
+  return True
+
+@cardEvent(114)
+def eventGTMO(card, side, app):
+  app.lapsing.append("GTMO")
+  app.outputToHistory("GTMO in play. No recruit operations or Detainee Release the rest of this turn.", False)
+  prestigeRolls = []
+  for i in range(3):
+    prestigeRolls.append(app.dice.roll())
+  presMultiplier = 1
+  if prestigeRolls[0] <= 4:
+    presMultiplier = -1
+  app.changePrestige(min(prestigeRolls[1], prestigeRolls[2]) * presMultiplier)
+
+@cardPlayable(115, reads = ("map",))
+def playableHambali(card, side, app):
+  possibles = ["Indonesia/Malaysia"]
+  for countryObj in app.map["Indonesia/Malaysia"].links:
+    possibles.append(countryObj.name)
+  for country in possibles:
+    if app.map[country].totalCells(True) > 0:
+      if app.map[country].culture == "Non-Muslim":
+        if app.map[country].posture == "Hard":
+          return True
+      else:
+        if app.map[country].alignment == "Ally":
+          return True
+  return False
+
+@cardEvent(115)
+def eventHambali(card, side, app):
+  if side == "US":
+    possibles = ["Indonesia/Malaysia"]
+    targets = []
+    target = None
+    for countryObj in app.map["Indonesia/Malaysia"].links:
+      possibles.append(countryObj.name)
+    for country in possibles:
+      if app.map[country].totalCells(True) > 0:
+        if app.map[country].culture == "Non-Muslim":
+          if app.map[country].posture == "Hard":
+            targets.append(country)
         else:
-          if app.numIslamicRule() > 0:
-            app.changePrestige(-4)
-          else:
-            app.changePrestige(-2)
-      elif self.number == 113: # Darfur
-        app.testCountry("Sudan")
-        if app.prestige >= 7:
-          app.map["Sudan"].aid = 1
-          app.outputToHistory("Aid added to Sudan.", False)
-          if app.map["Sudan"].alignment == "Adversary":
-            app.map["Sudan"].alignment = "Neutral"
-            app.outputToHistory("Sudan alignment improved.", False)
-          elif app.map["Sudan"].alignment == "Neutral":
-            app.map["Sudan"].alignment = "Ally"
-            app.outputToHistory("Sudan alignment improved.", False)
+          if app.map[country].alignment == "Ally":
+            targets.append(country)
+    if len(targets) == 1:
+      target = targets[0]
+    else:
+      while not target:
+        input = app.getCountryFromUser("Choose Indonesia or an adjacent country that has a cell and is Ally or Hard. (? for list)?: ",  "XXX", app.listHambali)
+        if input == "":
+          app.output("")
         else:
-          app.map["Sudan"].besieged = 1
-          app.outputToHistory("Sudan now Besieged Regime.", False)
-          if app.map["Sudan"].alignment == "Ally":
-            app.map["Sudan"].alignment = "Neutral"
-            app.outputToHistory("Sudan alignment worssened.", False)
-          elif app.map["Sudan"].alignment == "Neutral":
-            app.map["Sudan"].alignment = "Adversary"
-            app.outputToHistory("Sudan alignment worssened.", False)
-        app.outputToHistory(app.map["Sudan"].countryStr(), True)
-      elif self.number == 114: # GTMO
-        app.lapsing.append("GTMO")
-        app.outputToHistory("GTMO in play. No recruit operations or Detainee Release the rest of this turn.", False)
-        prestigeRolls = []
-        for i in range(3):
-          prestigeRolls.append(random.randint(1,6))
-        presMultiplier = 1
-        if prestigeRolls[0] <= 4:
-          presMultiplier = -1
-        app.changePrestige(min(prestigeRolls[1], prestigeRolls[2]) * presMultiplier)
-      elif self.number == 115: # Hambali
-        if side == "US":
-          possibles = ["Indonesia/Malaysia"]
-          targets = []
-          target = None
-          for countryObj in app.map["Indonesia/Malaysia"].links:
-            possibles.append(countryObj.name)
-          for country in possibles:
-            if app.map[country].totalCells(True) > 0:
-              if app.map[country].culture == "Non-Muslim":
-                if app.map[country].posture == "Hard":
-                  targets.append(country)
-              else:
-                if app.map[country].alignment == "Ally":
-                  targets.append(country)
-          if len(targets) == 1:
-            target = targets[0]
+          if input not in targets:
+            app.output("%s is not Indonesia or an adjacent country that has a cell and is Ally or Hard." % input)
+            app.output("")
           else:
-            while not target:
-              input = app.getCountryFromUser("Choose Indonesia or an adjacent country that has a cell and is Ally or Hard. (? for list)?: ",  "XXX", app.listHambali)
-              if input == "":
-                print("")
-              else:
-                if input not in targets:
-                  print("%s is not Indonesia or an adjacent country that has a cell and is Ally or Hard." % input)
-                  print("")
-                else:
-                  target = input
-          app.removeCell(target)
-          app.outputToHistory("US draw 2 cards.", False)
-        else:
-          possibles = ["Indonesia/Malaysia"]
-          targets = []
-          target = None
-          for countryObj in app.map["Indonesia/Malaysia"].links:
-            possibles.append(countryObj.name)
-          for country in possibles:
-            if app.map[country].totalCells(True) > 0:
-              if app.map[country].culture == "Non-Muslim":
-                if app.map[country].posture == "Hard":
-                  targets.append(country)
-              else:
-                if app.map[country].alignment == "Ally":
-                  targets.append(country)
-          target = random.choice(targets)
-          app.map[target].plots += 1
-          app.outputToHistory("Place an plot in %s." % target, True)
-      elif self.number == 116: # KSM
-        if side == "US":
-          for country in app.map:
-            if app.map[country].plots > 0:
-              if app.map[country].alignment == "Ally" or app.map[country].culture == "Non-Muslim":
-                numPlots = app.map[country].plots
-                app.map[country].plots = 0
-                app.outputToHistory("%d Plots removed from %s." % (numPlots, country), False)
-          app.outputToHistory("US draws 2 cards.", True)
-        else:
-          if app.executePlot(1, False, [1], False, False, True) == 1:
-            app.outputToHistory("No plots could be placed.", True)
-      elif self.number == 117 or self.number == 118: # Oil Price Spike
-        app.lapsing.append("Oil Price Spike")
-        app.outputToHistory("Oil Price Spike in play. Add +1 to the resources of each Oil Exporter country for the turn.", False)
-        if side == "US":
-          app.outputToHistory("Select, reveal, and draw a card other than Oil Price Spike from the discard pile or a box.", True)
-        else:
-          if app.getYesNoFromUser("Are there any Jihadist event cards in the discard pile? "):
-            app.outputToHistory("Draw from the Discard Pile randomly among the highest-value Jihadist-associated event cards. Put the card on top of the Jihadist hand.", True)
-      elif self.number == 119: # Saleh
-        app.testCountry("Yemen")
-        if side == "US":
-          if app.map["Yemen"].governance != 4:
-            if app.map["Yemen"].alignment == "Adversary":
-              app.map["Yemen"].alignment = "Neutral"
-            elif app.map["Yemen"].alignment == "Neutral":
-              app.map["Yemen"].alignment = "Ally"
-            app.outputToHistory("Yemen Alignment improved to %s." % app.map["Yemen"].alignment, False)
-            app.map["Yemen"].aid = 1
-            app.outputToHistory("Aid added to Yemen.", True)
+            target = input
+    app.removeCell(target)
+    app.outputToHistory("US draw 2 cards.", False)
+  else:
+    possibles = ["Indonesia/Malaysia"]
+    targets = []
+    target = None
+    for countryObj in app.map["Indonesia/Malaysia"].links:
+      possibles.append(countryObj.name)
+    for country in possibles:
+      if app.map[country].totalCells(True) > 0:
+        if app.map[country].culture == "Non-Muslim":
+          if app.map[country].posture == "Hard":
+            targets.append(country)
         else:
-          if app.map["Yemen"].alignment == "Ally":
-            app.map["Yemen"].alignment = "Neutral"
-          elif app.map["Yemen"].alignment == "Neutral":
-            app.map["Yemen"].alignment = "Adversary"
-          app.outputToHistory("Yemen Alignment worssened to %s." % app.map["Yemen"].alignment, False)
-          app.map["Yemen"].besieged = 1
-          app.outputToHistory("Yemen now Besieged Regime.", True)
-      elif self.number == 120: # US Election
-        app.executeCardUSElection(random.randint(1,6))
-    if self.remove:
-      app.outputToHistory("Remove card from game.", True)
-    if self.mark:
-      app.outputToHistory("Place marker for card.", True)
-    if self.lapsing:
-      app.outputToHistory("Place card in Lapsing.", True)
+          if app.map[country].alignment == "Ally":
+            targets.append(country)
+    target = app.dice.choice(targets)
+    app.map[target].plots += 1
+    app.outputToHistory("Place an plot in %s." % target, True)
+
+@cardPlayable(116, reads = ("map",))
+def playableKSM(card, side, app):
+  if side == "US":
+    for country in app.map:
+      if app.map[country].plots > 0:
+        if app.map[country].culture == "Non-Muslim" or app.map[country].alignment == "Ally":
+          return True
+    return False
+  else:
+    return True
+
+@cardEvent(116)
+def eventKSM(card, side, app):
+  if side == "US":
+    for country in app.map:
+      if app.map[country].plots > 0:
+        if app.map[country].alignment == "Ally" or app.map[country].culture == "Non-Muslim":
+          numPlots = app.map[country].plots
+          app.map[country].plots = 0
+          app.outputToHistory("%d Plots removed from %s." % (numPlots, country), False)
+    app.outputToHistory("US draws 2 cards.", True)
+  else:
+    if app.executePlot(1, False, [1], False, False, True) == 1:
+      app.outputToHistory("No plots could be placed.", True)
+
+@cardPlayable(117, 118, reads = ())
+def playableOilPriceSpike(card, side, app):
+  return True
+
+@cardEvent(117, 118)
+def eventOilPriceSpike(card, side, app):
+  app.lapsing.append("Oil Price Spike")
+  app.outputToHistory("Oil Price Spike in play. Add +1 to the resources of each Oil Exporter country for the turn.", False)
+  if side == "US":
+    app.outputToHistory("Select, reveal, and draw a card other than Oil Price Spike from the discard pile or a box.", True)
+  else:
+    if app.getYesNoFromUser("Are there any Jihadist event cards in the discard pile? "):
+      app.outputToHistory("Draw from the Discard Pile randomly among the highest-value Jihadist-associated event cards. Put the card on top of the Jihadist hand.", True)
+
+@cardPlayable(119, reads = ())
+def playableSaleh(card, side, app):
+  return True
+
+@cardEvent(119)
+def eventSaleh(card, side, app):
+  app.testCountry("Yemen")
+  if side == "US":
+    if app.map["Yemen"].governance != 4:
+      if app.map["Yemen"].alignment == "Adversary":
+        app.map["Yemen"].alignment = "Neutral"
+      elif app.map["Yemen"].alignment == "Neutral":
+        app.map["Yemen"].alignment = "Ally"
+      app.outputToHistory("Yemen Alignment improved to %s." % app.map["Yemen"].alignment, False)
+      app.map["Yemen"].aid = 1
+      app.outputToHistory("Aid added to Yemen.", True)
+  else:
+    if app.map["Yemen"].alignment == "Ally":
+      app.map["Yemen"].alignment = "Neutral"
+    elif app.map["Yemen"].alignment == "Neutral":
+      app.map["Yemen"].alignment = "Adversary"
+    app.outputToHistory("Yemen Alignment worssened to %s." % app.map["Yemen"].alignment, False)
+    app.map["Yemen"].besieged = 1
+    app.outputToHistory("Yemen now Besieged Regime.", True)
+
+@cardPlayable(120, reads = ())
+def playableUSElection(card, side, app):
+  return True
+
+@cardEvent(120)
+def eventUSElection(card, side, app):
+  app.executeCardUSElection(app.dice.roll())
+
+
+# Cards the scenario instructions remove from the game before play.
+SCENARIO_REMOVED_CARDS = {
+  1: [],
+  2: [78],
+  3: [43, 109],
+  4: [43, 109, 5, 57, 116, 37],
+}
+
+# Where DeckTracker can hold a card
+DRAW_PILE, DISCARD_PILE, REMOVED_PILE, LAPSING_PILE, IN_PLAY, US_HAND, JIHADIST_HAND = range(7)
+PILE_NAMES = ("Draw pile", "Discards", "Removed", "Lapsing", "In play", "US hand", "Jihadist hand")
+HAND_PILES = {"US": US_HAND, "Jihadist": JIHADIST_HAND}
+HAND_SIDES = {US_HAND: "US", JIHADIST_HAND: "Jihadist"}
+
+class DeckTracker:
+  '''The draw pile, discards, removed and lapsing cards and both hands, for games played without the cards.
+
+  where[n] is the pile card n is in. The draw pile is an array of card numbers
+  dealt from index top onwards, with each card's index kept in pos, so drawing
+  a card or taking one out of the pile is O(1) and shuffles happen in place.
+  Hands keep the order their cards were drawn in. The discards are shuffled
+  into a new draw pile when it runs out, until decks passes have been dealt.
+  '''
+
+  def __init__(self, dice, numCards = 120, removed = (), decks = 1):
+    self.dice = dice
+    self.decks = decks
+    self.deckNumber = 1
+    self.where = array("b", [DISCARD_PILE]) * (numCards + 1)
+    self.where[0] = REMOVED_PILE
+    self.pos = array("h", [-1]) * (numCards + 1)
+    self.counts = [0] * len(PILE_NAMES)
+    self.counts[DISCARD_PILE] = numCards
+    self.drawPile = array("H")
+    self.top = 0
+    self.hands = {"US": [], "Jihadist": []}
+    self.marked = set()   # cards whose event placed a marker
+    for card in removed:
+      self.move(card, REMOVED_PILE)
+    self.shuffle()
+
+  def copy(self, dice):
+    tracker = copy.copy(self)
+    tracker.dice = dice
+    tracker.where = array("b", self.where)
+    tracker.pos = array("h", self.pos)
+    tracker.counts = self.counts[:]
+    tracker.drawPile = array("H", self.drawPile)
+    tracker.hands = {"US": self.hands["US"][:], "Jihadist": self.hands["Jihadist"][:]}
+    tracker.marked = set(self.marked)
+    return tracker
+
+  def shuffle(self):
+    '''Shuffle the discards together with what is left of the draw pile.'''
+    pile = self.drawPile[self.top:]
+    pile.extend([card for card in range(1, len(self.where)) if self.where[card] == DISCARD_PILE])
+    self.dice.shuffle(pile)
+    self.drawPile = pile
+    self.top = 0
+    for i in range(len(pile)):
+      self.pos[pile[i]] = i
+      self.where[pile[i]] = DRAW_PILE
+    self.counts[DRAW_PILE] = len(pile)
+    self.counts[DISCARD_PILE] = 0
+
+  def cardsLeft(self):
+    return len(self.drawPile) - self.top
+
+  def canDraw(self, count):
+    '''Whether count cards can be drawn, reshuffling if another pass is left.'''
+    if self.deckNumber < self.decks:
+      return self.cardsLeft() + self.counts[DISCARD_PILE] >= count
+    return self.cardsLeft() >= count
+
+  def draw(self, side, count = 1):
+    '''Draw up to count cards into side's hand and return them.'''
+    drawn = []
+    for i in range(count):
+      if self.top >= len(self.drawPile):
+        if self.deckNumber >= self.decks or self.counts[DISCARD_PILE] == 0:
+          break
+        self.deckNumber += 1
+        self.shuffle()
+      card = self.drawPile[self.top]
+      self.top += 1
+      self.pos[card] = -1
+      self.where[card] = HAND_PILES[side]
+      self.counts[DRAW_PILE] -= 1
+      self.counts[HAND_PILES[side]] += 1
+      self.hands[side].append(card)
+      drawn.append(card)
+    return drawn
+
+  def move(self, card, pile):
+    '''Put card in pile, from wherever it is. Cards returned to the draw pile go to the bottom.'''
+    old = self.where[card]
+    if old == pile:
+      return
+    if old == DRAW_PILE:
+      # Swap the top card into the gap, which leaves the pile just as random.
+      i = self.pos[card]
+      other = self.drawPile[self.top]
+      self.drawPile[i] = other
+      self.pos[other] = i
+      self.drawPile[self.top] = card
+      self.top += 1
+      self.pos[card] = -1
+    elif old in HAND_SIDES:
+      self.hands[HAND_SIDES[old]].remove(card)
+    if pile == DRAW_PILE:
+      self.pos[card] = len(self.drawPile)
+      self.drawPile.append(card)
+    elif pile in HAND_SIDES:
+      self.hands[HAND_SIDES[pile]].append(card)
+    self.where[card] = pile
+    self.counts[old] -= 1
+    self.counts[pile] += 1
+
+  def take(self, side):
+    '''Take the first card of side's hand into play and return it, or None.'''
+    if not self.hands[side]:
+      return None
+    card = self.hands[side][0]
+    self.move(card, IN_PLAY)
+    return card
+
+  def played(self, card, eventPlayed):
+    '''Put away a card that has been played, following its event's remove, mark and lapsing instructions.'''
+    pile = DISCARD_PILE
+    if eventPlayed:
+      if card.remove:
+        pile = REMOVED_PILE
+      elif card.lapsing:
+        pile = LAPSING_PILE
+      if card.mark:
+        self.marked.add(card.number)
+    self.move(card.number, pile)
+
+  def endTurn(self):
+    '''Lapsing cards go to the discards.'''
+    for card in self.cards(LAPSING_PILE):
+      self.move(card, DISCARD_PILE)
+
+  def cards(self, pile):
+    '''Numbers of the cards in pile; hands in the order drawn, the draw pile top first.'''
+    if pile == DRAW_PILE:
+      return self.drawPile[self.top:].tolist()
+    if pile in HAND_SIDES:
+      return self.hands[HAND_SIDES[pile]][:]
+    return [card for card in range(1, len(self.where)) if self.where[card] == pile]
+
+def versionedField(field):
+  '''Labyrinth property that bumps the board version whenever it is assigned.'''
+  name = "_" + field
+  isList = field in ("markers", "lapsing")
+
+  def get(self):
+    return getattr(self, name)
+
+  def set(self, value):
+    if isList and (type(value) is not VersionedList or value.app is not self):
+      value = VersionedList(self, value, field)
+    if self.journal is not None and self.journal.touched is not None:
+      self.journal.record(self, field, getattr(self, name))
+    if self.eventFeed is not None:
+      self.eventFeed.emit(None, field, getattr(self, name), value)
+    object.__setattr__(self, name, value)
+    self.version += 1
+
+  return property(get, set)
+
+def journaledField(field):
+  '''Labyrinth property that reports assignments to the journal.'''
+  name = "_" + field
+
+  def get(self):
+    return getattr(self, name)
+
+  def set(self, value):
+    if self.journal is not None and self.journal.touched is not None:
+      self.journal.record(self, field, getattr(self, name))
+    object.__setattr__(self, name, value)
+
+  return property(get, set)
 
 class Labyrinth(cmd.Cmd):
 
   map = {}
-  undo = False
-  rollturn = -1
 
   scenario = 0
   ideology = 0
-  prestige = 0
-  troops = 0
-  cells = 0
-  funding = 0
+  _prestige = 0
+  _troops = 0
+  _cells = 0
+  _funding = 0
   startYear = 0
-  turn = 0
-  uCard = 0
-  jCard = 0
-  phase = ""
-  markers = []
-  lapsing = []
+  _turn = 0
+  _uCard = 0
+  _jCard = 0
+  _phase = ""
+  _markers = []
+  _lapsing = []
   history = []
   deck = {}
-  gameOver = False
-  backlashInPlay = False
+  _gameOver = False
+  _backlashInPlay = False
+  worldPosture = 0
+  muslimPosture = 0
   testUserInput = []
-
-  def __init__(self, theScenario, theIdeology, setupFuntion = None, testUserInput = []):
+  autoSave = True
+  dice = None
+  sink = None
+  eventFeed = None
+  journal = None
+  validator = None
+  profiler = None
+  deckTracker = None
+  version = 0
+  playableCache = None
+
+  prestige = versionedField("prestige")
+  troops = versionedField("troops")
+  cells = versionedField("cells")
+  funding = versionedField("funding")
+  markers = versionedField("markers")
+  lapsing = versionedField("lapsing")
+  turn = journaledField("turn")
+  uCard = journaledField("uCard")
+  jCard = journaledField("jCard")
+  phase = journaledField("phase")
+  gameOver = journaledField("gameOver")
+  backlashInPlay = journaledField("backlashInPlay")
+
+  def __init__(self, theScenario, theIdeology, setupFuntion = None, testUserInput = [], dice = None, sink = None):
     cmd.Cmd.__init__(self)
+    self.sink = sink or TerminalSink()
+    self.dice = dice or Dice()
+    self.version = 0
+    self.playableCache = {}
     self.scenario = theScenario
     self.ideology = theIdeology
     self.prestige = 0
@@ -2204,8 +3942,13 @@ class Labyrinth(cmd.Cmd):
     self.jCard = 1
     self.phase = ""
     self.map = {}
+    self.worldPosture = 0
+    self.muslimPosture = 0
+    self.board = Board()
+    self.boardIndex = BoardIndex()
+    self.validator = Validator()
     self.map_setup()
-    self.history = []
+    self.history = History(HISTORY_LIMIT)
     self.markers = []
     self.lapsing = []
     self.testUserInput = testUserInput
@@ -2238,7 +3981,7 @@ class Labyrinth(cmd.Cmd):
     elif self.ideology == 5:
       self.outputToHistory("Jihadist Ideology: Virulent", False)
 
-    print("")
+    self.output("")
 
     self.outputToHistory("Game Start")
     self.outputToHistory("")
@@ -2246,72 +3989,149 @@ class Labyrinth(cmd.Cmd):
     #self.outputToHistory(self.phase)
     self.deck = {}
     self.deckSetup()
+    self.journal = Journal(self)
+    self.journal.mark(0)
+    self.checkpointer = Checkpointer()
+
+  def clone(self, dice = None, sink = None):
+    '''Fork the game for search and rollouts.
+
+    The map topology, distance tables and card deck are shared with this game;
+    the board, trackers, markers, tracked deck and history are copied. The clone rolls with
+    a copy of this game's dice unless given its own, prints to sink (silent by
+    default), has no event feed, starts an empty journal and never writes save
+    files. It audits with its own Validator in the same mode, so its commands
+    do not move this game's sampling. The profiler is shared on purpose, so
+    time spent in rollouts is counted with the game that forked them.
+    '''
+    other = Labyrinth.__new__(Labyrinth)
+    other.__dict__.update(self.__dict__)
+    other.journal = None
+    other.cmdqueue = []
+    other.sink = sink or NullSink()
+    other.eventFeed = None
+    other.checkpointer = Checkpointer()
+    if self.validator is not None:
+      other.validator = Validator(self.validator.mode, self.validator.sampleEvery, self.validator.checks)
+    other.playableCache = {}
+    other.dice = dice or self.dice.copy()
+    if self.deckTracker is not None:
+      other.deckTracker = self.deckTracker.copy(other.dice)
+    other.autoSave = False
+    other.history = self.history.copy()
+    other.markers = self.markers[:]
+    other.lapsing = self.lapsing[:]
+    other.testUserInput = self.testUserInput[:]
+    other.board = self.board.copy()
+    other.boardIndex = self.boardIndex.copy()
+    other.map = {}
+    for name, country in self.map.items():
+      other.map[name] = country.view(other, other.board)
+    for name, country in self.map.items():
+      other.map[name].links = [other.map[link.name] for link in country.links]
+    other.journal = Journal(other)
+    other.journal.mark(other.turn)
+    return other
+
+  def playableCards(self, side, hand = None):
+    '''PlayableCard for each card number in hand, or the whole deck, from side's point of view.
+
+    The tests share the board index and the playability cache, so a hand costs
+    at most one evaluation per card and board version. Events that need the
+    player's ruling are not asked about and come back as None.
+    '''
+    if hand is None:
+      hand = [int(number) for number in self.deck]
+    other = "Jihadist" if side == "US" else "US"
+    results = []
+    for number in hand:
+      card = self.deck[str(number)]
+      playable = False
+      opponentEvent = False
+      if card.type == other:
+        opponentEvent = card.playable(other, self, False)
+      else:
+        playable = card.playable(side, self, False)
+      recommendation = "event" if playable else "ops"
+      results.append(PlayableCard(int(number), card.name, card.ops, playable, opponentEvent, recommendation))
+    return results
 
-  def postcmd(self, stop, line):
+  def openEventFeed(self, stream = None):
+    '''Start recording state changes in a new EventFeed and return it.'''
+    self.eventFeed = EventFeed(self, stream)
+    return self.eventFeed
 
-    self.Save(SUSPEND_FILE)
+  def closeEventFeed(self):
+    self.eventFeed = None
 
-    if line == "quit":
-      return True
+  def preloop(self):
+    self.sink.flush()
 
-    if self.undo:
-      return True
+  def precmd(self, line):
+    self.journal.begin()
+    return line
 
-    if self.rollturn >= 0:
+  def postcmd(self, stop, line):
+
+    self.journal.commit(line)
+    if self.autoSave:
+      self.checkpointer.write(SUSPEND_FILE, self.snapshot())
+
+    if line == "quit":
+      self.sink.flush()
       return True
 
+    self.validator.afterCommand(self)
+    self.sink.flush()
 
+  def cellCount(self):
+    '''Cells on the map and the funding track; 15 in a sound game.'''
+    return self.board.totals["sleeper_cells"] + self.board.totals["activeCells"] + self.cells
 
-  # Cells test
-    cellCount = 0
-    for country in self.map:
-      cellCount += self.map[country].sleeper_cells
-      cellCount += self.map[country].activeCells
-    cellCount += self.cells
-    if cellCount != 15:
-      print("DEBUG: CELL COUNT %d" % cellCount)
-  # Troops test
-    troopCount = 0
-    for country in self.map:
-      troopCount += self.map[country].troops()
-    troopCount += self.troops
-    if troopCount != 15:
-      print("DEBUG: TROOP COUNT %d" % troopCount)
-  # Countries tested test
-    for country in self.map:
-      badCountry = False
-      if (self.map[country].sleeper_cells > 0) or (self.map[country].activeCells > 0) or (self.map[country].troops_stationed > 0) or (self.map[country].aid > 0) or  (self.map[country].regimeChange > 0) or (self.map[country].cadre > 0) or (self.map[country].plots > 0):
-        if (self.map[country].governance == 0):
-          badCountry = True
-        if self.map[country].culture == "Non-Muslim":
-          if (self.map[country].posture == ""):
-            badCountry = True
-        elif self.map[country].culture != "Iran":
-          if (self.map[country].alignment == ""):
-            badCountry = True
-      if badCountry:
-        print("DEBUG: UNTESTED COUNTRY")
-        self.map[country].printCountry()
+  def troopCount(self):
+    '''Troops on the map, with NATO, and the troop track; 15 in a sound game.'''
+    return self.board.totals["troops_stationed"] + 2 * len(self.boardIndex.nato) + self.troops
 
   def emptyline(self):
-    print("%d (Turn %s)" % (self.startYear + (self.turn - 1), self.turn))
+    self.output("%d (Turn %s)" % (self.startYear + (self.turn - 1), self.turn))
     #print("Enter help for a list of commands.")
-    print("")
+    self.output("")
 
   def debugprint(self, str):
-    return
-    print(str)
+    if self.profiler is not None:
+      self.profiler.mark(str)
+
+  def output(self, *values):
+    '''Print a line, like print(), through the output sink.'''
+    if not self.sink.silent:
+      self.sink.write(" ".join([str(value) for value in values]))
+
+  def outputToHistory(self, output, lineFeed = True, *args):
+    '''Print a line and log it. With args, output is a % format string.'''
+    self.logEvent(None, None, output, *args, lineFeed = lineFeed)
 
-  def outputToHistory(self, output, lineFeed = True):
-    print(output)
-    self.history.append(output)
+  def logEvent(self, kind, country, message, *args, lineFeed = True):
+    '''Print a line and log it as a kind record about country; see HistoryRecord.
+
+    message is a % format of args, rendered only when the line is printed or read.
+    '''
+    self.history.add(self.turn, self.phase, message, args, kind, country)
+    if self.sink.silent:
+      return
+    if args:
+      message = message % args
+    self.sink.write(message)
     if lineFeed:
-      print("")
+      self.sink.write("")
+
+  def logCountry(self, country, lineFeed = True):
+    '''Print and log country's summary, without building it when nothing would keep it.'''
+    if self.sink.silent and not self.history.enabled:
+      return
+    self.logEvent("country", country, self.map[country].countryStr(), lineFeed = lineFeed)
 
   def map_setup(self):
-    countries = None
-    with open(MAP_FILE, 'r') as f :
-      countries = yaml.load(f)
+    countries = loadData(MAP_FILE)
 
     for country, stats in countries.items() :
       self.map[country] = Country(self, country, stats)
@@ -2323,6 +4143,77 @@ class Labyrinth(cmd.Cmd):
         else :
           self.map[country].links.append(self.map[adj])
 
+    self.adjacency_setup()
+
+  def adjacency_setup(self):
+    '''Precompute adjacency bitsets and all-pairs distances for the map.
+    Two tables are built, one for the normal map and one for when Patriot Act
+    cuts the United States off from everything but Canada.'''
+    self.countryNames = list(self.map.keys())
+    self.countryIds = dict((name, i) for i, name in enumerate(self.countryNames))
+    self.adjacency = self.buildAdjacency(False)
+    self.patriotActAdjacency = self.buildAdjacency(True)
+    self.distances = self.cachedDistances(self.adjacency)
+    self.patriotActDistances = self.cachedDistances(self.patriotActAdjacency)
+
+  def cachedDistances(self, adjacency):
+    '''Distance tables are only read, so games with the same map share them.'''
+    key = tuple(adjacency)
+    if key not in DISTANCE_CACHE:
+      DISTANCE_CACHE[key] = self.buildDistances(adjacency)
+    return DISTANCE_CACHE[key]
+
+  def mapAdjacent(self, here, there, isPatriotAct):
+    if isPatriotAct:
+      if here == "United States" or there == "United States":
+        if here == "Canada" or there == "Canada":
+          return True
+        else:
+          return False
+    if self.map[here] in self.map[there].links:
+      return True
+    if self.map[here].schengen and self.map[there].schengen:
+      return True
+    if self.map[here].schengenLink and self.map[there].schengen:
+      return True
+    if self.map[here].schengen and self.map[there].schengenLink:
+      return True
+    return False
+
+  def buildAdjacency(self, isPatriotAct):
+    '''Bit j of entry i is set when isAdjacent(countryNames[i], countryNames[j]).'''
+    adjacency = []
+    for here in self.countryNames:
+      bits = 0
+      for there in self.countryNames:
+        if self.mapAdjacent(here, there, isPatriotAct):
+          bits |= 1 << self.countryIds[there]
+      adjacency.append(bits)
+    return adjacency
+
+  def buildDistances(self, adjacency):
+    '''Breadth first search from every country, None where unreachable.'''
+    num = len(self.countryNames)
+    distances = []
+    for start in range(num):
+      row = [None] * num
+      row[start] = 0
+      visited = 1 << start
+      wave = [start]
+      distance = 0
+      while wave:
+        distance += 1
+        nextWave = []
+        for country in wave:
+          for sub in range(num):
+            if not (visited >> sub) & 1 and (adjacency[sub] >> country) & 1:
+              visited |= 1 << sub
+              row[sub] = distance
+              nextWave.append(sub)
+        wave = nextWave
+      distances.append(row)
+    return distances
+
   def setup_board(self, scenario):
     board_trackers = [ 'startYear' , 'turn' , 'prestige' , 'troops' , 'funding' , 'cells' , 'phase' ]
     for t in board_trackers:
@@ -2346,7 +4237,7 @@ class Labyrinth(cmd.Cmd):
 
 
   def randomly_place_cells(self, num_countries, num_cell_per_country):
-    for country in random.sample(list(self.map.keys()), num_countries):
+    for country in self.dice.sample(list(self.map.keys()), num_countries):
       self.testCountry(country)
       self.placeCells(country, num_cell_per_country)
     
@@ -2366,49 +4257,54 @@ class Labyrinth(cmd.Cmd):
   def num_poor_countries(self):
     return len([ n for n, c in self.map.items() if c.governance > Governance.FAIR and (c.culture == "Shia-Mix" or c.culture == "Suni") ])
 
-  def gwot(self):
-    p = 0
-    postures = { 'Hard': 1, 'Soft': -1 }
+  def postureChanged(self, country, old, new):
+    '''Keep the world posture counters in step with Country.posture.'''
+    if country.name == "United States":
+      return
+    delta = postureWeight(new) - postureWeight(old)
+    if delta:
+      if country.culture == "Non-Muslim":
+        self.worldPosture += delta
+      else:
+        self.muslimPosture += delta
 
-    for n, c in self.map.items():
-      p += postures.get(c.posture, 0)
+  def gwot(self):
+    p = self.worldPosture + self.muslimPosture + postureWeight(self.map["United States"].posture)
 
     if self.map["United States"].posture == "Soft": p += 1
     else: p -= 1
     return ("Hard" if p > 0 else "Soft", min(abs(p),3))
 
   def print_board_trackers(self):
-    print("Good Resources   : %d" % self.num_good_resources())
-    print("Islamic Resources: %d" % self.num_islamist_resources())
-    print("---")
-    print("Good/Fair Countries   : %d" % self.num_good_countries())
-    print("Poor/Islamic Countries: %d" % self.num_poor_countries())
-    print("")
-    print("GWOT")
-    print("US Posture: %s" % self.map["United States"].posture)
-    print("World Posture: %s %d" % self.gwot())
-    print("US Prestige: %d \n" % self.prestige)
+    self.output("Good Resources   : %d" % self.num_good_resources())
+    self.output("Islamic Resources: %d" % self.num_islamist_resources())
+    self.output("---")
+    self.output("Good/Fair Countries   : %d" % self.num_good_countries())
+    self.output("Poor/Islamic Countries: %d" % self.num_poor_countries())
+    self.output("")
+    self.output("GWOT")
+    self.output("US Posture: %s" % self.map["United States"].posture)
+    self.output("World Posture: %s %d" % self.gwot())
+    self.output("US Prestige: %d \n" % self.prestige)
 
   def scenario_setup(self):
-    scenarios = None
-    with open(SCENARIOS_FILE, 'r') as f:
-      scenarios = yaml.load(f)
+    scenarios = loadData(SCENARIOS_FILE)
 
     if self.scenario == 1 :
       self.setup_board(scenarios['lets_roll']) 
     elif self.scenario == 2 :
       self.setup_board(scenarios['you_can_call_me_al']) 
-      print("Remove the card Axis of Evil from the game. \n")
+      self.output("Remove the card Axis of Evil from the game. \n")
 
     elif self.scenario == 3:
       self.setup_board(scenarios['anaconda'])
-      print("Remove the cards Patriot Act and Tora Bora from the game. \n")
+      self.output("Remove the cards Patriot Act and Tora Bora from the game. \n")
 
     elif self.scenario == 4:
       self.setup_board(scenarios['mission_accomplished'])
 
       self.test_countries([n for n, c in self.map.items() if c.schengen])
-      print("Remove the cards Patriot Act, Tora Bora, NEST, Abu Sayyaf, KSM and Iraqi WMD from the game. \n")
+      self.output("Remove the cards Patriot Act, Tora Bora, NEST, Abu Sayyaf, KSM and Iraqi WMD from the game. \n")
 
     self.print_board_trackers()
 
@@ -2461,134 +4357,17 @@ class Labyrinth(cmd.Cmd):
         self.map["United States"].posture = "Soft"
 
   def deckSetup(self):
-    self.deck["1"] = Card(1,"US","Backlash",1,False,False,False)
-    self.deck["2"] = Card(2,"US","Biometrics",1,False,False,True)
-    self.deck["3"] = Card(3,"US","CTR",1,False,True,False)
-    self.deck["4"] = Card(4,"US","Moro Talks",1,True,True,False)
-    self.deck["5"] = Card(5,"US","NEST",1,True,True,False)
-    self.deck["6"] = Card(6,"US","Sacntions",1,False,False,False)
-    self.deck["7"] = Card(7,"US","Sanctions",1,False,False,False)
-    self.deck["8"] = Card(8,"US","Special Forces",1,False,False,False)
-    self.deck["9"] = Card(9,"US","Special Forces",1,False,False,False)
-    self.deck["10"] = Card(10,"US","Special Forces",1,False,False,False)
-    self.deck["11"] = Card(11,"US","Abbas",2,True,True,False)
-    self.deck["12"] = Card(12,"US","Al-Azhar",2,False,False,False)
-    self.deck["13"] = Card(13,"US","Anbar Awakening",2,False,True,False)
-    self.deck["14"] = Card(14,"US","Covert Action",2,False,False,False)
-    self.deck["15"] = Card(15,"US","Ethiopia Strikes",2,True,False,False)
-    self.deck["16"] = Card(16,"US","Euro-Islam",2,True,False,False)
-    self.deck["17"] = Card(17,"US","FSB",2,False,False,False)
-    self.deck["18"] = Card(18,"US","Intel Community",2,False,False,False)
-    self.deck["19"] = Card(19,"US","Kemalist Republic",2,False,False,False)
-    self.deck["20"] = Card(20,"US","King Abdullah",2,True,False,False)
-    self.deck["21"] = Card(21,"US","Let's Roll",2,False,False,False)
-    self.deck["22"] = Card(22,"US","Mossad and Shin Bet",2,False,False,False)
-    self.deck["23"] = Card(23,"US","Predator",2,False,False,False)
-    self.deck["24"] = Card(24,"US","Predator",2,False,False,False)
-    self.deck["25"] = Card(25,"US","Predator",2,False,False,False)
-    self.deck["26"] = Card(26,"US","Quartet",2,False,False,False)
-    self.deck["27"] = Card(27,"US","Sadam Captured",2,True,True,False)
-    self.deck["28"] = Card(28,"US","Sharia",2,False,False,False)
-    self.deck["29"] = Card(29,"US","Tony Blair",2,True,False,False)
-    self.deck["30"] = Card(30,"US","UN Nation Building",2,False,False,False)
-    self.deck["31"] = Card(31,"US","Wiretapping",2,False,True,False)
-    self.deck["32"] = Card(32,"US","Back Channel",3,False,False,False)
-    self.deck["33"] = Card(33,"US","Benazir Bhutto",3,True,True,False)
-    self.deck["34"] = Card(34,"US","Enhanced Measures",3,False,True,False)
-    self.deck["35"] = Card(35,"US","Hijab",3,True,False,False)
-    self.deck["36"] = Card(36,"US","Indo-Pakistani Talks",3,True,True,False)
-    self.deck["37"] = Card(37,"US","Iraqi WMD",3,True,True,False)
-    self.deck["38"] = Card(38,"US","Libyan Deal",3,True,True,False)
-    self.deck["39"] = Card(39,"US","Libyan WMD",3,True,True,False)
-    self.deck["40"] = Card(40,"US","Mass Turnout",3,False,False,False)
-    self.deck["41"] = Card(41,"US","NATO",3,False,True,False)
-    self.deck["42"] = Card(42,"US","Pakistani Offensive",3,False,False,False)
-    self.deck["43"] = Card(43,"US","Patriot Act",3,True,True,False)
-    self.deck["44"] = Card(44,"US","Renditions",3,False,True,False)
-    self.deck["45"] = Card(45,"US","Safer Now",3,False,False,False)
-    self.deck["46"] = Card(46,"US","Sistani",3,False,False,False)
-    self.deck["47"] = Card(47,"US","The door of Itjihad was closed",3,False,False,True)
-    self.deck["48"] = Card(48,"Jihadist","Adam Gadahn",1,False,False,False)
-    self.deck["49"] = Card(49,"Jihadist","Al-Ittihad al-Islami",1,True,False,False)
-    self.deck["50"] = Card(50,"Jihadist","Ansar al-Islam",1,True,False,False)
-    self.deck["51"] = Card(51,"Jihadist","FREs",1,False,False,False)
-    self.deck["52"] = Card(52,"Jihadist","IEDs",1,False,False,False)
-    self.deck["53"] = Card(53,"Jihadist","Madrassas",1,False,False,False)
-    self.deck["54"] = Card(54,"Jihadist","Moqtada al-Sadr",1,True,True,False)
-    self.deck["55"] = Card(55,"Jihadist","Uyghur Jihad",1,True,False,False)
-    self.deck["56"] = Card(56,"Jihadist","Vieira de Mello Slain",1,True,True,False)
-    self.deck["57"] = Card(57,"Jihadist","Abu Sayyaf",2,True,True,False)
-    self.deck["58"] = Card(58,"Jihadist","Al-Anbar",2,True,True,False)
-    self.deck["59"] = Card(59,"Jihadist","Amerithrax",2,False,False,False)
-    self.deck["60"] = Card(60,"Jihadist","Bhutto Shot",2,True,True,False)
-    self.deck["61"] = Card(61,"Jihadist","Detainee Release",2,False,False,False)
-    self.deck["62"] = Card(62,"Jihadist","Ex-KGB",2,False,False,False)
-    self.deck["63"] = Card(63,"Jihadist","Gaza War",2,False,False,False)
-    self.deck["64"] = Card(64,"Jihadist","Hariri Killed",2,True,False,False)
-    self.deck["65"] = Card(65,"Jihadist","HEU",2,True,False,False)
-    self.deck["66"] = Card(66,"Jihadist","Homegrown",2,False,False,False)
-    self.deck["67"] = Card(67,"Jihadist","Islamic Jihad Union",2,True,False,False)
-    self.deck["68"] = Card(68,"Jihadist","Jemaah Islamiya",2,False,False,False)
-    self.deck["69"] = Card(69,"Jihadist","Kazakh Strain",2,True,False,False)
-    self.deck["70"] = Card(70,"Jihadist","Lashkar-e-Tayyiba",2,False,False,False)
-    self.deck["71"] = Card(71,"Jihadist","Loose Nuke",2,True,False,False)
-    self.deck["72"] = Card(72,"Jihadist","Opium",2,False,False,False)
-    self.deck["73"] = Card(73,"Jihadist","Pirates",2,True,True,False)
-    self.deck["74"] = Card(74,"Jihadist","Schengen Visas",2,False,False,False)
-    self.deck["75"] = Card(75,"Jihadist","Schroeder & Chirac",2,False,False,False)
-    self.deck["76"] = Card(76,"Jihadist","Abu Ghurayb",3,True,False,False)
-    self.deck["77"] = Card(77,"Jihadist","Al Jazeera",3,False,False,False)
-    self.deck["78"] = Card(78,"Jihadist","Axis of Evil",3,False,False,False)
-    self.deck["79"] = Card(79,"Jihadist","Clean Operatives",3,False,False,False)
-    self.deck["80"] = Card(80,"Jihadist","FATA",3,False,True,False)
-    self.deck["81"] = Card(81,"Jihadist","Foreign Fighters",3,False,False,False)
-    self.deck["82"] = Card(82,"Jihadist","Jihadist Videos",3,False,False,False)
-    self.deck["83"] = Card(83,"Jihadist","Kashmir",3,False,False,False)
-    self.deck["84"] = Card(84,"Jihadist","Leak",3,False,False,False)
-    self.deck["85"] = Card(85,"Jihadist","Leak",3,False,False,False)
-    self.deck["86"] = Card(86,"Jihadist","Lebanon War",3,False,False,False)
-    self.deck["87"] = Card(87,"Jihadist","Martyrdom Operation",3,False,False,False)
-    self.deck["88"] = Card(88,"Jihadist","Martyrdom Operation",3,False,False,False)
-    self.deck["89"] = Card(89,"Jihadist","Martyrdom Operation",3,False,False,False)
-    self.deck["90"] = Card(90,"Jihadist","Quagmire",3,False,False,False)
-    self.deck["91"] = Card(91,"Jihadist","Regional al-Qaeda",3,False,False,False)
-    self.deck["92"] = Card(92,"Jihadist","Saddam",3,False,False,False)
-    self.deck["93"] = Card(93,"Jihadist","Taliban",3,False,False,False)
-    self.deck["94"] = Card(94,"Jihadist","The door of Itjihad was closed",3,False,False,False)
-    self.deck["95"] = Card(95,"Jihadist","Wahhabism",3,False,False,False)
-    self.deck["96"] = Card(96,"Unassociated","Danish Cartoons",1,True,False,False)
-    self.deck["97"] = Card(97,"Unassociated","Fatwa",1,False,False,False)
-    self.deck["98"] = Card(98,"Unassociated","Gaza Withdrawal",1,True,False,False)
-    self.deck["99"] = Card(99,"Unassociated","HAMAS Elected",1,True,False,False)
-    self.deck["100"] = Card(100,"Unassociated","Hizb Ut-Tahrir",1,False,False,False)
-    self.deck["101"] = Card(101,"Unassociated","Kosovo",1,False,False,False)
-    self.deck["102"] = Card(102,"Unassociated","Former Soviet Union",2,False,False,False)
-    self.deck["103"] = Card(103,"Unassociated","Hizballah",2,False,False,False)
-    self.deck["104"] = Card(104,"Unassociated","Iran",2,False,False,False)
-    self.deck["105"] = Card(105,"Unassociated","Iran",2,False,False,False)
-    self.deck["106"] = Card(106,"Unassociated","Jaysh al-Mahdi",2,False,False,False)
-    self.deck["107"] = Card(107,"Unassociated","Kurdistan",2,False,False,False)
-    self.deck["108"] = Card(108,"Unassociated","Musharraf",2,False,False,False)
-    self.deck["109"] = Card(109,"Unassociated","Tora Bora",2,True,False,False)
-    self.deck["110"] = Card(110,"Unassociated","Zarqawi",2,False,False,False)
-    self.deck["111"] = Card(111,"Unassociated","Zawahiri",2,False,False,False)
-    self.deck["112"] = Card(112,"Unassociated","Bin Ladin",3,False,False,False)
-    self.deck["113"] = Card(113,"Unassociated","Darfur",3,False,False,False)
-    self.deck["114"] = Card(114,"Unassociated","GTMO",3,False,False,True)
-    self.deck["115"] = Card(115,"Unassociated","Hambali",3,False,False,False)
-    self.deck["116"] = Card(116,"Unassociated","KSM",3,False,False,False)
-    self.deck["117"] = Card(117,"Unassociated","Oil Price Spike",3,False,False,True)
-    self.deck["118"] = Card(118,"Unassociated","Oil Price Spike",3,False,False,True)
-    self.deck["119"] = Card(119,"Unassociated","Saleh",3,False,False,False)
-    self.deck["120"] = Card(120,"Unassociated","US Election",3,False,False,False)
+    for number, stats in loadData(CARDS_FILE).items():
+      self.deck[str(number)] = Card(number, stats['type'], stats['name'], stats['ops'], stats['remove'], stats['mark'], stats['lapsing'], stats['puts_cell'])
 
   def my_raw_input(self, prompt):
     if len(self.testUserInput) > 0:
       retVal = self.testUserInput[0]
       self.testUserInput.remove(retVal)
-      print("TEST: Prompt: %s VAL: %s" % (prompt, retVal))
+      self.output("TEST: Prompt: %s VAL: %s" % (prompt, retVal))
       return retVal
     else:
+      self.sink.flush()
       return raw_input(prompt)
 
   def getCountryFromUser(self, prompt, special, helpFunction, helpParameter = None):
@@ -2611,72 +4390,90 @@ class Labyrinth(cmd.Cmd):
         elif input.lower() in country.lower():
           possible.append(country)
       if len(possible) == 0:
-        print("Unrecognized country.")
-        print("")
+        self.output("Unrecognized country.")
+        self.output("")
       elif len(possible) > 1:
-        print("Be more specific", possible)
-        print("")
+        self.output("Be more specific", possible)
+        self.output("")
       else:
         goodCountry = possible[0]
     return goodCountry
 
+  def getUSOpCountry(self, action, prompt, helpFunction):
+    '''Ask for a country the US can take action in, checked with usOpError; None if the user backs out.'''
+    problem = self.usOpError(action)
+    if problem:
+      self.output(problem)
+      self.output("")
+      return None
+    while True:
+      input = self.getCountryFromUser(prompt, "XXX", helpFunction)
+      if input == "":
+        self.output("")
+        return None
+      problem = self.usOpError(action, input)
+      if not problem:
+        return input
+      self.output(problem)
+      self.output("")
+
   def getNumTroopsFromUser(self, prompt, max):
     goodNum = None
     while not goodNum:
+      input = self.my_raw_input(prompt)
       try:
-        input = self.my_raw_input(prompt)
         input = int(input)
         if input <= max:
           return input
         else:
-          print("Not enough troops.")
-          print("")
+          self.output("Not enough troops.")
+          self.output("")
       except:
-        print("Entry error")
-        print("")
+        self.output("Entry error")
+        self.output("")
 
   def getCardNumFromUser(self, prompt):
     goodNum = None
     while not goodNum:
+      input = self.my_raw_input(prompt)
       try:
-        input = self.my_raw_input(prompt)
         if input.lower() == "none":
           return "none"
         input = int(input)
         if input <= 120:
           return input
         else:
-          print("Enter a card number.")
-          print("")
+          self.output("Enter a card number.")
+          self.output("")
       except:
-        print("Enter a card number.")
-        print("")
+        self.output("Enter a card number.")
+        self.output("")
 
   def getPlotTypeFromUser(self, prompt):
     goodNum = None
     while not goodNum:
+      input = self.my_raw_input(prompt)
       try:
-        input = self.my_raw_input(prompt)
         if input.lower() == "w" or input.lower() == "wmd":
           return "WMD"
         input = int(input)
         if input <= 3 and input >= 1:
           return input
         else:
-          print("Enter 1, 2, 3 or W for WMD.")
-          print("")
+          self.output("Enter 1, 2, 3 or W for WMD.")
+          self.output("")
       except:
-        print("Enter 1, 2, 3 or W for WMD.")
-        print("")
+        self.output("Enter 1, 2, 3 or W for WMD.")
+        self.output("")
 
   def getRollFromUser(self, prompt):
     goodNum = None
     while not goodNum:
+      input = self.my_raw_input(prompt)
       try:
-        input = self.my_raw_input(prompt)
         if input == "r":
-          roll = random.randint(1,6)
-          print("Roll: %d" % roll)
+          roll = self.dice.roll()
+          self.output("Roll: %d" % roll)
           return roll
         input = int(input)
         if 1 <= input and input <= 6:
@@ -2684,104 +4481,93 @@ class Labyrinth(cmd.Cmd):
         else:
           raise
       except:
-        print("Entry error")
-        print("")
+        self.output("Entry error")
+        self.output("")
 
   def getYesNoFromUser(self, prompt):
     good = None
     while not good:
+      input = self.my_raw_input(prompt)
       try:
-        input = self.my_raw_input(prompt)
         if input.lower() == "y" or input.lower() == "yes":
           return True
         elif input.lower() == "n" or input.lower() == "no":
           return False
         else:
-          print("Enter y or n.")
-          print("")
+          self.output("Enter y or n.")
+          self.output("")
       except:
-        print("Enter y or n.")
-        print("")
+        self.output("Enter y or n.")
+        self.output("")
 
   def getPostureFromUser(self, prompt):
     good = None
     while not good:
+      input = self.my_raw_input(prompt)
       try:
-        input = self.my_raw_input(prompt)
         if input.lower() == "h" or input.lower() == "hard":
           return "Hard"
         elif input.lower() == "s" or input.lower() == "soft":
           return "Soft"
         else:
-          print("Enter h or s.")
-          print("")
+          self.output("Enter h or s.")
+          self.output("")
       except:
-        print("Enter h or s.")
-        print("")
+        self.output("Enter h or s.")
+        self.output("")
 
   def getEventOrOpsFromUser(self, prompt):
     good = None
     while not good:
+      input = self.my_raw_input(prompt)
       try:
-        input = self.my_raw_input(prompt)
         if input.lower() == "e" or input.lower() == "event":
           return "event"
         elif input.lower() == "o" or input.lower() == "ops":
           return "ops"
         else:
-          print("Enter e or o.")
-          print("")
+          self.output("Enter e or o.")
+          self.output("")
       except:
-        print("Enter e or o.")
-        print("")
+        self.output("Enter e or o.")
+        self.output("")
 
   def modifiedWoIRoll(self, baseRoll, country, useGWOTPenalty = True):
     modRoll = baseRoll
-    #print("DEBUG: base roll:%d" % modRoll)
+    for modifier, reason in self.woiModifiers(country, useGWOTPenalty):
+      modRoll += modifier
+      self.outputToHistory(reason, False)
+    return modRoll
 
+  def woiModifiers(self, country, useGWOTPenalty = True):
+    '''(modifier, reason) for each War of Ideas modifier that applies in country.'''
+    modifiers = []
     if self.prestige <= 3:
-      modRoll -= 1
-      self.outputToHistory("-1 for Prestige", False)
+      modifiers.append((-1, "-1 for Prestige"))
     elif self.prestige >= 7 and self.prestige <=9:
-      modRoll += 1
-      self.outputToHistory("+1 for Prestige", False)
+      modifiers.append((1, "+1 for Prestige"))
     elif self.prestige >= 10:
-      modRoll += 2
-      self.outputToHistory("+2 for Prestige", False)
-    #print("DEBUG: w/prestige mod:%d" % modRoll)
+      modifiers.append((2, "+2 for Prestige"))
 
     if self.map[country].alignment == "Ally" and self.map[country].governance == 2:
-      modRoll -= 1
-      self.outputToHistory("-1 for Attempt to shift to Good", False)
-    #print("DEBUG: w/to good mod:%d" % modRoll)
+      modifiers.append((-1, "-1 for Attempt to shift to Good"))
 
     if useGWOTPenalty:
-      modRoll += self.gwotPenalty()
-      if self.gwotPenalty() != 0:
-        self.outputToHistory("-1 for GWOT Relations Penalty", False)
-    #print("DEBUG: w/GWOT penalty:%d" % modRoll)
+      penalty = self.gwotPenalty()
+      if penalty != 0:
+        modifiers.append((penalty, "-1 for GWOT Relations Penalty"))
 
     if self.map[country].aid > 0:
-      modRoll += 1
-      self.outputToHistory("+1 for Aid", False)
-    #print("DEBUG: w/aid:%d" % modRoll)
+      modifiers.append((1, "+1 for Aid"))
 
     for adj in self.map[country].links:
       if adj.alignment == "Ally" and adj.governance == 1:
-        modRoll += 1
-        self.outputToHistory("+1 for Adjacent Good Ally", False)
+        modifiers.append((1, "+1 for Adjacent Good Ally"))
         break
-    #print("DEBUG: w/adj good:%d" % modRoll)
-    return modRoll
+    return modifiers
 
   def gwotPenalty(self):
-    worldPos = 0
-    for country in self.map:
-      if self.map[country].culture == "Non-Muslim" and self.map[country].name != "United States":
-        if self.map[country].posture == "Hard":
-          worldPos += 1
-        elif self.map[country].posture == "Soft":
-          worldPos -= 1
+    worldPos = self.worldPosture
     if worldPos > 0:
       worldPosStr = "Hard"
     elif worldPos < 0:
@@ -2803,7 +4589,7 @@ class Labyrinth(cmd.Cmd):
       self.prestige = 1
     elif self.prestige > 12:
       self.prestige = 12
-    self.outputToHistory("Prestige now %d" % self.prestige, lineFeed)
+    self.logEvent("prestige", None, "Prestige now %d", self.prestige, lineFeed = lineFeed)
 
   def changeFunding(self, delta, lineFeed = True):
     self.funding += delta
@@ -2824,7 +4610,7 @@ class Labyrinth(cmd.Cmd):
       self.map[country].cadre = 0
       self.cells -= cellsToMove
       self.outputToHistory("%d Sleeper Cell(s) placed in %s" % (cellsToMove, country), False)
-      self.outputToHistory(self.map[country].countryStr(), True)
+      self.logCountry(country, True)
 
   def removeCell(self, country):
     if self.map[country].totalCells() == 0:
@@ -2886,40 +4672,23 @@ class Labyrinth(cmd.Cmd):
     return max(retVal, 0)
 
   def numIslamicRule(self):
-    numIR = 0
-    for country in self.map:
-      if self.map[country].governance == 4:
-        numIR += 1
-    return numIR
+    return len(self.boardIndex.withGovernance(4))
 
   def numBesieged(self):
-    numBesieged = 0
-    for country in self.map:
-      if self.map[country].besieged > 0:
-        numBesieged += 1
-    return numBesieged
+    return len(self.boardIndex.besieged)
 
   def numRegimeChange(self):
-    numRC = 0
-    for country in self.map:
-      if self.map[country].regimeChange > 0:
-        numRC += 1
-    return numRC
+    return len(self.boardIndex.regimeChange)
 
   def numAdversary(self):
-    numAdv = 0
-    for country in self.map:
-      if self.map[country].alignment == "Adversary":
-        numAdv += 1
-    return numAdv
+    return len(self.boardIndex.withAlignment("Adversary"))
+
+  def disruptableCountries(self):
+    index = self.boardIndex
+    return (index.cells | index.cadre) & (index.troops | index.withCulture("Non-Muslim") | index.withAlignment("Ally"))
 
   def numDisruptable(self):
-    numDis = 0
-    for country in self.map:
-      if self.map[country].totalCells(False) > 0 or self.map[country].cadre > 0:
-        if self.map[country].troops() > 0 or self.map[country].culture == "Non-Muslim" or self.map[country].alignment == "Ally":
-          numDis += 1
-    return numDis
+    return len(self.disruptableCountries())
 
   def countryResources(self, country):
     res = self.map[country].resources
@@ -2931,22 +4700,92 @@ class Labyrinth(cmd.Cmd):
       res += spikes
     return res
 
+  def usOpError(self, action, country = None):
+    '''Why the US cannot take action (alert, disrupt, regime, withdraw or woi) in country, or None if it can.
+
+    With no country only the US posture is checked. The prompts print the
+    reason; the US bots use it to filter their targets. Alignment is compared
+    exactly as the "?" lists and disruptableCountries compare it.
+    '''
+    usPosture = eventValue(self.map["United States"].posture)
+    if action == "regime" and usPosture == "Soft":
+      return "No Regime Change with US Posture Soft"
+    if action == "withdraw" and usPosture == "Hard":
+      return "No Withdrawl with US Posture Hard"
+    if country is None:
+      return None
+    c = self.map[country]
+    if action == "alert":
+      if c.plots < 1:
+        return "Country has not plots."
+    elif action == "disrupt":
+      if c.sleeper_cells + c.activeCells <= 0 and c.cadre <= 0:
+        return "There are no cells or cadre in %s." % country
+      if "FATA" in c.markers and c.regimeChange == 0:
+        return "No disrupt allowed due to FATA."
+      if not (c.troops() > 0 or c.culture == "Non-Muslim" or c.alignment == "Ally"):
+        return "You can't disrupt there."
+    elif action == "regime":
+      if not (c.governance == 4 or (country == "Iraq" and "Iraqi WMD" in self.markers) or (country == "Libya" and "Libyan WMD" in self.markers)):
+        return "Country not Islamic Rule."
+    elif action == "withdraw":
+      if c.regimeChange <= 0:
+        return "Country not Regime Change."
+    elif action == "woi":
+      if country == "United States":
+        return "Country not eligible for War of Ideas."
+      if c.culture != "Non-Muslim" and not (c.alignment == "Ally" or c.alignment == "Neutral" or c.governance == 0):
+        return "Country not eligible for War of Ideas."
+    return None
+
+  def handleDeploy(self, moveFrom, moveTo, howMany):
+    '''Move howMany troops between countries or the troop track; False if a Regime Change country would be left short.'''
+    if moveFrom == "track":
+      self.troops -= howMany
+      troopsLeft = self.troops
+    else:
+      if self.map[moveFrom].regimeChange:
+        if (self.map[moveFrom].troops() - howMany) < (5 + self.map[moveFrom].totalCells(True)):
+          self.output("You cannot move that many troops from a Regime Change country.")
+          self.output("")
+          return False
+      self.map[moveFrom].changeTroops(-howMany)
+      troopsLeft = self.map[moveFrom].troops()
+    if moveTo == "track":
+      self.troops += howMany
+      troopsNow = self.troops
+    else:
+      self.map[moveTo].changeTroops(howMany)
+      troopsNow = self.map[moveTo].troops()
+    self.outputToHistory("* %d troops deployed from %s (%d) to %s (%d)" % (howMany, moveFrom, troopsLeft, moveTo, troopsNow))
+    return True
+
+  def handleWoI(self, country, roll):
+    '''War of Ideas in country with an unmodified roll: posture for non-Muslim countries, otherwise alignment and governance.'''
+    if self.map[country].culture == "Non-Muslim":
+      self.executeNonMuslimWOI(country, roll)
+    else:
+      self.testCountry(country)
+      modRoll = self.modifiedWoIRoll(roll, country)
+      self.outputToHistory("Modified Roll: %d" % modRoll)
+      self.handleMuslimWoI(modRoll, country)
+
   def handleMuslimWoI(self, roll, country):
     if roll <= 3:
       self.outputToHistory("* WoI in %s failed." % country)
     elif roll == 4:
       self.map[country].aid = 1
       self.outputToHistory("* WoI in %s adds Aid." % country, False)
-      self.outputToHistory(self.map[country].countryStr(), True)
+      self.logCountry(country, True)
     else:
       if self.map[country].alignment == "Neutral":
         self.map[country].alignment = "Ally"
         self.outputToHistory("* WoI in %s succeeded - Alignment now Ally." % country, False)
-        self.outputToHistory(self.map[country].countryStr(), True)
+        self.logCountry(country, True)
       elif self.map[country].alignment == "Ally":
         self.improveGovernance(country)
         self.outputToHistory("* WoI in %s succeeded - Governance now %s." % (country, self.map[country].govStr()), False)
-        self.outputToHistory(self.map[country].countryStr(), True)
+        self.logCountry(country, True)
 
   def handleAlert(self, country):
     if self.map[country].plots > 0:
@@ -2958,7 +4797,7 @@ class Labyrinth(cmd.Cmd):
       self.map["United States"].posture = "Soft"
     else:
       self.map["United States"].posture = "Hard"
-    self.outputToHistory("* Reassessment = US Posture now %s" % self.map["United States"].posture)
+    self.logEvent("posture", "United States", "* Reassessment = US Posture now %s", self.map["United States"].posture)
 
   def handleRegimeChange(self, where, moveFrom, howMany, govRoll, prestigeRolls):
     if self.map["United States"].posture == "Soft":
@@ -2982,12 +4821,12 @@ class Labyrinth(cmd.Cmd):
       presMultiplier = -1
     self.changePrestige(min(prestigeRolls[1], prestigeRolls[2]) * presMultiplier)
     self.outputToHistory("* Regime Change in %s" % where, False)
-    self.outputToHistory(self.map[where].countryStr(), False)
+    self.logCountry(where, False)
     if moveFrom == "track":
       self.outputToHistory("%d Troops on Troop Track" % self.troops, False)
     else:
       self.outputToHistory("%d Troops in %s" % (self.map[moveFrom].troops(), moveFrom), False)
-    self.outputToHistory("US Prestige %d" % self.prestige)
+    self.logEvent("prestige", None, "US Prestige %d", self.prestige)
     if where == "Iraq" and "Iraqi WMD" in self.markers:
       self.markers.remove("Iraqi WMD")
       self.outputToHistory("Iraqi WMD no longer in play.", True)
@@ -3010,13 +4849,13 @@ class Labyrinth(cmd.Cmd):
       presMultiplier = -1
     self.changePrestige(min(prestigeRolls[1], prestigeRolls[2]) * presMultiplier)
     self.outputToHistory("* Withdraw troops from %s" % moveFrom, False)
-    self.outputToHistory(self.map[moveFrom].countryStr(), False)
+    self.logCountry(moveFrom, False)
     if moveTo == "track":
       self.outputToHistory("%d Troops on Troop Track" % self.troops, False)
     else:
       self.outputToHistory("%d Troops in %s" % (self.map[moveTo].troops(), moveTo), False)
-      self.outputToHistory(self.map[moveTo].countryStr(), False)
-    self.outputToHistory("US Prestige %d" % self.prestige)
+      self.logCountry(moveTo, False)
+    self.logEvent("prestige", None, "US Prestige %d", self.prestige)
 
   def handleDisrupt(self, where):
     numToDisrupt = 1
@@ -3026,10 +4865,10 @@ class Labyrinth(cmd.Cmd):
       numToDisrupt = min(2, self.map[where].totalCells(False))
     if self.map[where].totalCells(False) <= 0 and self.map[where].cadre > 0:
       if "Al-Anbar" not in self.markers:
-        self.outputToHistory("* Cadre removed in %s" % where)
+        self.logEvent("disrupt", where, "* Cadre removed in %s", where)
         self.map[where].cadre = 0
     elif self.map[where].totalCells(False) <= numToDisrupt:
-      self.outputToHistory("* %d cell(s) disrupted in %s." % (self.map[where].totalCells(False), where), False)
+      self.logEvent("disrupt", where, "* %d cell(s) disrupted in %s.", self.map[where].totalCells(False), where, lineFeed = False)
       if self.map[where].sleeper_cells > 0:
         self.map[where].activeCells += self.map[where].sleeper_cells
         numToDisrupt -= self.map[where].sleeper_cells
@@ -3042,25 +4881,25 @@ class Labyrinth(cmd.Cmd):
         if self.cells > 15:
           self.cells = 15
       if self.map[where].totalCells(False) <= 0:
-        self.outputToHistory("Cadre added in %s." % where, False)
+        self.logEvent("disrupt", where, "Cadre added in %s.", where, lineFeed = False)
         self.map[where].cadre = 1
       if self.map[where].troops() >= 2:
         self.prestige += 1
         if self.prestige > 12:
           self.prestige = 12
-        self.outputToHistory("US Prestige now %d." % self.prestige, False)
-      self.outputToHistory(self.map[where].countryStr(), True)
+        self.logEvent("prestige", where, "US Prestige now %d.", self.prestige, lineFeed = False)
+      self.logCountry(where, True)
     else:
       if self.map[where].activeCells == 0:
         self.map[where].activeCells += numToDisrupt
         self.map[where].sleeper_cells -= numToDisrupt
-        self.outputToHistory("* %d cell(s) disrupted in %s." % (numToDisrupt, where), False)
+        self.logEvent("disrupt", where, "* %d cell(s) disrupted in %s.", numToDisrupt, where, lineFeed = False)
       elif self.map[where].sleeper_cells == 0:
         self.map[where].activeCells -= numToDisrupt
         self.cells += numToDisrupt
-        self.outputToHistory("* %d cell(s) disrupted in %s." % (numToDisrupt, where), False)
+        self.logEvent("disrupt", where, "* %d cell(s) disrupted in %s.", numToDisrupt, where, lineFeed = False)
         if self.map[where].totalCells(False) <= 0:
-          self.outputToHistory("Cadre added in %s." % where, False)
+          self.logEvent("disrupt", where, "Cadre added in %s.", where, lineFeed = False)
           self.map[where].cadre = 1
       else:
         if numToDisrupt == 1:
@@ -3073,11 +4912,11 @@ class Labyrinth(cmd.Cmd):
           if disStr == "a":
             self.map[where].activeCells -= numToDisrupt
             self.cells += numToDisrupt
-            self.outputToHistory("* %d cell(s) disrupted in %s." % (numToDisrupt, where))
+            self.logEvent("disrupt", where, "* %d cell(s) disrupted in %s.", numToDisrupt, where)
           else:
             self.map[where].sleeper_cells -= numToDisrupt
             self.map[where].activeCells += numToDisrupt
-            self.outputToHistory("* %d cell(s) disrupted in %s." % (numToDisrupt, where))
+            self.logEvent("disrupt", where, "* %d cell(s) disrupted in %s.", numToDisrupt, where)
         else:
           disStr = None
           while not disStr:
@@ -3099,21 +4938,21 @@ class Labyrinth(cmd.Cmd):
           if input == "aa":
             self.map[where].activeCells -= 2
             self.cells += 2
-            self.outputToHistory("* %d cell(s) disrupted in %s." % (numToDisrupt, where))
+            self.logEvent("disrupt", where, "* %d cell(s) disrupted in %s.", numToDisrupt, where)
           elif input == "as" or input == "sa":
             self.map[where].sleeper_cells -= 1
             self.cells += 1
-            self.outputToHistory("* %d cell(s) disrupted in %s." % (numToDisrupt, where))
+            self.logEvent("disrupt", where, "* %d cell(s) disrupted in %s.", numToDisrupt, where)
           else:
             self.map[where].sleeper_cells -= 2
             self.map[where].activeCells += 2
-            self.outputToHistory("* %d cell(s) disrupted in %s." % (numToDisrupt, where))
+            self.logEvent("disrupt", where, "* %d cell(s) disrupted in %s.", numToDisrupt, where)
       if self.map[where].troops() >= 2:
         self.prestige += 1
         if self.prestige > 12:
           self.prestige = 12
-        self.outputToHistory("US Prestige now %d." % self.prestige, False)
-      self.outputToHistory(self.map[where].countryStr(), True)
+        self.logEvent("prestige", where, "US Prestige now %d.", self.prestige, lineFeed = False)
+      self.logCountry(where, True)
 
   def executeJihad(self, country, rollList):
     successes = 0
@@ -3124,67 +4963,86 @@ class Labyrinth(cmd.Cmd):
       else:
         failures += 1
     isMajorJihad = country in self.majorJihadPossible(len(rollList))
-    self.outputToHistory("Jihad operation.  %d Successes rolled, %d Failures rolled" % (successes, failures), False)
+    self.logEvent("jihad", country, "Jihad operation.  %d Successes rolled, %d Failures rolled", successes, failures, lineFeed = False)
     if isMajorJihad: # all cells go active
-      self.outputToHistory("* Major Jihad attempt in %s" % country, False)
+      self.logEvent("jihad", country, "* Major Jihad attempt in %s", country, lineFeed = False)
       sleepers = self.map[country].sleeper_cells
       self.map[country].sleeper_cells = 0
       self.map[country].activeCells += sleepers
-      self.outputToHistory("All cells go Active", False)
+      self.logEvent("jihad", country, "All cells go Active", lineFeed = False)
       if ((failures >= 2  and self.map[country].besieged == 0) or (failures == 3 and self.map[country].besieged == 1))  and (len(rollList) == 3) and self.map[country].governance == 3:
-        self.outputToHistory("Major Jihad Failure", False)
+        self.logEvent("jihad", country, "Major Jihad Failure", lineFeed = False)
         self.map[country].besieged = 1
-        self.outputToHistory("Besieged Regime", False)
+        self.logEvent("jihad", country, "Besieged Regime", lineFeed = False)
         if self.map[country].alignment == "Adversary":
           self.map[country].alignment = "Neutral"
         elif self.map[country].alignment == "Neutral":
           self.map[country].alignment = "Ally"
-        self.outputToHistory("Alignment %s" % self.map[country].alignment, False)
+        self.logEvent("jihad", country, "Alignment %s", self.map[country].alignment, lineFeed = False)
     else: # a cell is active for each roll
-      self.outputToHistory("* Minor Jihad attempt in %s" % country, False)
+      self.logEvent("jihad", country, "* Minor Jihad attempt in %s", country, lineFeed = False)
       for i in range(len(rollList) - self.map[country].numActiveCells()):
-        self.outputToHistory("Cell goes Active", False)
+        self.logEvent("jihad", country, "Cell goes Active", lineFeed = False)
         self.map[country].sleeper_cells -= 1
         self.map[country].activeCells += 1
     while successes > 0 and self.map[country].governance < 3:
       self.map[country].governance += 1
       successes -= 1
-      self.outputToHistory("Governance to %s" % self.map[country].govStr(), False)
+      self.logEvent("jihad", country, "Governance to %s", self.map[country].govStr(), lineFeed = False)
       self.map[country].aid = 0
     if isMajorJihad and ((successes >= 2) or ((self.map[country].besieged > 0) and (successes >= 1))) : # Major Jihad
-      self.outputToHistory("Islamic Revolution in %s" % country, False)
+      self.logEvent("jihad", country, "Islamic Revolution in %s", country, lineFeed = False)
       self.map[country].governance = 4
-      self.outputToHistory("Governance to Islamic Rule", False)
+      self.logEvent("jihad", country, "Governance to Islamic Rule", lineFeed = False)
       self.map[country].alignment = "Adversary"
-      self.outputToHistory("Alingment to Adversary", False)
+      self.logEvent("jihad", country, "Alingment to Adversary", lineFeed = False)
       self.map[country].regimeChange = 0
       if self.map[country].besieged > 0:
-        self.outputToHistory("Besieged Regime marker removed.", False)
+        self.logEvent("jihad", country, "Besieged Regime marker removed.", lineFeed = False)
 
       self.map[country].besieged = 0
       self.map[country].aid = 0
       self.funding = min(9, self.funding + self.countryResources(country))
-      self.outputToHistory("Funding now %d" % self.funding, False)
+      self.logEvent("jihad", country, "Funding now %d", self.funding, lineFeed = False)
       if self.map[country].troops() > 0:
         self.prestige = 1
-        self.outputToHistory("Troops present so US Prestige now 1", False)
+        self.logEvent("prestige", country, "Troops present so US Prestige now 1", lineFeed = False)
     if self.ideology <= 4:
       for i in range(failures):
         if self.map[country].numActiveCells() > 0:
           self.map[country].removeActiveCell()
         else:
           self.map[country].sleeper_cells -= 1
-          self.outputToHistory("Sleeper cell Removed to Funding Track", False)
+          self.logEvent("jihad", country, "Sleeper cell Removed to Funding Track", lineFeed = False)
           self.cells += 1
-    self.outputToHistory(self.map[country].countryStr(), False)
-    print("")
-
+    self.logCountry(country, False)
+    self.output("")
+
+  def batchJihad(self, country, rolls):
+    '''Outcomes of executeJihad for many trials of rolls in country at once.
+
+    Returns successes, failures and, per trial, whether a Major Jihad would
+    cause an Islamic Revolution; see rollCounts for the form of rolls and the
+    results. The board is not changed.
+    '''
+    c = self.map[country]
+    successes, failures = rollCounts(rolls, int(c.governance))
+    numRolls = len(rolls[0]) if len(rolls) else 0
+    if country not in self.majorJihadPossible(numRolls):
+      if numpy is not None:
+        return successes, failures, numpy.zeros(len(successes), dtype = bool)
+      return successes, failures, [False] * len(successes)
+    if numpy is not None:
+      return successes, failures, jihadRevolution(successes, failures, numRolls, c.governance, c.besieged)
+    return successes, failures, [jihadRevolution(hits, misses, numRolls, c.governance, c.besieged) for hits, misses in zip(successes, failures)]
+
+  @profiled("jihad")
   def handleJihad(self, country, ops):
     '''Returns number of unused Ops'''
     cells = self.map[country].totalCells(True)
     rollList = []
     for i in range(min(cells, ops)):
-      rollList.append(random.randint(1,6))
+      rollList.append(self.dice.roll())
     self.executeJihad(country, rollList)
     return ops - len(rollList)
 
@@ -3205,18 +5063,17 @@ class Labyrinth(cmd.Cmd):
     '''Return list of countries where regime change is possible.'''
     possible = []
     plusCellsNeeded = self.extraCellsNeededForMajorJihad()
-    for country in self.map:
-      if self.map[country].culture == "Suni" or self.map[country].culture == "Shia-Mix":
-        if "Benazir Bhutto" in self.markers and country == "Pakistan":
-          continue
-        if self.map[country].governance != 4:
-          if ((self.map[country].totalCells(True)) - self.map[country].troops()) >= plusCellsNeeded:
-            need = 2
-            need += 3 - self.map[country].governance
-            if self.map[country].besieged:
-              need -= 1
-            if ops >= need:
-              possible.append(country)
+    index = self.boardIndex
+    for country in index.ordered(index.withCulture("Suni", "Shia-Mix") - index.withGovernance(4)):
+      if "Benazir Bhutto" in self.markers and country == "Pakistan":
+        continue
+      if ((self.map[country].totalCells(True)) - self.map[country].troops()) >= plusCellsNeeded:
+        need = 2
+        need += 3 - self.map[country].governance
+        if self.map[country].besieged:
+          need -= 1
+        if ops >= need:
+          possible.append(country)
     return possible
 
   def majorJihadChoice(self, ops):
@@ -3236,22 +5093,23 @@ class Labyrinth(cmd.Cmd):
         for country in possible:
           if self.countryResources(country) == maxResource:
             newPossible.append(country)
-        return random.choice(newPossible)
+        return self.dice.choice(newPossible)
 
   def minorJihadInGoodFairChoice(self, ops, isAbuGhurayb = False, isAlJazeera = False):
     possible = []
-    for country in self.map:
-      if isAbuGhurayb:
-        if self.map[country].alignment == "Ally" and self.map[country].governance != 4:
+    index = self.boardIndex
+    if isAbuGhurayb:
+      possible = index.ordered(index.withAlignment("Ally") - index.withGovernance(4))
+    elif isAlJazeera:
+      for country in index.ordered(index.troops):
+        if country == "Saudi Arabia" or self.isAdjacent(country, "Saudi Arabia"):
+          possible.append(country)
+    else:
+      for country in index.ordered(index.withCulture("Shia-Mix", "Suni") & index.withGovernance(1, 2)):
+        if self.map[country].totalCells(True) > 0:
+          if "Benazir Bhutto" in self.markers and country == "Pakistan":
+            continue
           possible.append(country)
-      elif isAlJazeera:
-        if country == "Saudi Arabia" or self.isAdjacent(country, "Saudi Arabia"):
-          if self.map[country].troops() > 0:
-            possible.append(country)
-      elif (self.map[country].culture == "Shia-Mix" or self.map[country].culture == "Suni") and (self.map[country].governance == 1 or self.map[country].governance == 2) and (self.map[country].totalCells(True) > 0):
-        if "Benazir Bhutto" in self.markers and country == "Pakistan":
-          continue
-        possible.append(country)
     if len(possible) == 0:
       return False
     else:
@@ -3268,7 +5126,7 @@ class Labyrinth(cmd.Cmd):
         if self.map[country].besieged > 0:
           countryScores[country] += 1000
         countryScores[country] += (self.countryResources(country) * 100)
-        countryScores[country] += random.randint(1,99)
+        countryScores[country] += self.dice.randint(1,99)
       countryOrder = []
       for country in countryScores:
         countryOrder.append((countryScores[country], (self.map[country].totalCells(True)), country))
@@ -3316,7 +5174,7 @@ class Labyrinth(cmd.Cmd):
         countryScores[country] += 100000
       countryScores[country] += (1000 * (self.map[country].troops() + self.map[country].totalCells(True)))
       countryScores[country] += 100 * self.countryResources(country)
-      countryScores[country] += random.randint(1,99)
+      countryScores[country] += self.dice.randint(1,99)
     countryOrder = []
     for country in countryScores:
       self.debugprint(("here: %d " % countryScores[country]))
@@ -3332,7 +5190,7 @@ class Labyrinth(cmd.Cmd):
       return countryOrder[0][2]
 
   def executeRecruit(self, country, ops, rolls, recruitOverride = None, isJihadistVideos = False, isMadrassas = False):
-    self.outputToHistory("* Recruit to %s" % country)
+    self.logEvent("recruit", country, "* Recruit to %s", country)
     cellsRequested = ops
     if self.ideology >= 2:
       cellsRequested = ops * 2
@@ -3342,22 +5200,22 @@ class Labyrinth(cmd.Cmd):
     cellsToRecruit = min(cellsRequested, cells)
     if (self.map[country].regimeChange or self.map[country].governance == 4):
       if self.map[country].regimeChange:
-        self.outputToHistory("Recruit to Regime Change country automatically successful.", False)
+        self.logEvent("recruit", country, "Recruit to Regime Change country automatically successful.", lineFeed = False)
       else:
-        self.outputToHistory("Recruit to Islamic Rule country automatically successful.", False)
+        self.logEvent("recruit", country, "Recruit to Islamic Rule country automatically successful.", lineFeed = False)
       self.cells -= cellsToRecruit
       self.map[country].sleeper_cells += cellsToRecruit
 
       if cellsToRecruit == 0 and isJihadistVideos:
         self.map[country].cadre = 1
-        self.outputToHistory("No cells available to recruit.  Cadre added.", False)
-        self.outputToHistory(self.map[country].countryStr(), True)
+        self.logEvent("recruit", country, "No cells available to recruit.  Cadre added.", lineFeed = False)
+        self.logCountry(country, True)
         return ops - 1;
       else:
         self.map[country].cadre = 0
 
-      self.outputToHistory("%d sleeper cells recruited to %s." % (cellsToRecruit, country), False)
-      self.outputToHistory(self.map[country].countryStr(), True)
+      self.logEvent("recruit", country, "%d sleeper cells recruited to %s.", cellsToRecruit, country, lineFeed = False)
+      self.logCountry(country, True)
       if self.ideology >= 2:
         return ops - ((cellsToRecruit / 2) + (cellsToRecruit % 2))
       else:
@@ -3368,17 +5226,12 @@ class Labyrinth(cmd.Cmd):
 
       if self.numCellsAvailable(isJihadistVideos) <= 0 and opsRemaining > 0:
         self.map[country].cadre = 1
-        self.outputToHistory("No cells available to recruit.  Cadre added.", False)
-        self.outputToHistory(self.map[country].countryStr(), True)
+        self.logEvent("recruit", country, "No cells available to recruit.  Cadre added.", lineFeed = False)
+        self.logCountry(country, True)
         return ops - 1;
       else:
         while self.numCellsAvailable(isMadrassas or isJihadistVideos) > 0 and opsRemaining > 0:
-          if recruitOverride:
-            recVal = recruitOverride
-          elif self.map[country].recruit_req > 0:
-            recVal = self.map[country].recruit_req
-          else:
-            recVal = self.map[country].governance
+          recVal = self.recruitTarget(country, recruitOverride)
           if rolls[i] <= recVal:
             if self.ideology >= 2:
               cellsMoving = min(self.numCellsAvailable(isMadrassas or isJihadistVideos), 2)
@@ -3387,62 +5240,76 @@ class Labyrinth(cmd.Cmd):
             self.cells -= cellsMoving
             self.map[country].sleeper_cells += cellsMoving
             self.map[country].cadre = 0
-            self.outputToHistory("Roll successful, %d sleeper cell(s) recruited." % cellsMoving, False)
+            self.logEvent("recruit", country, "Roll successful, %d sleeper cell(s) recruited.", cellsMoving, lineFeed = False)
           else:
-            self.outputToHistory("Roll failed.", False)
+            self.logEvent("recruit", country, "Roll failed.", lineFeed = False)
             if isJihadistVideos:
               self.map[country].cadre = 1
-              self.outputToHistory("Cadre added.", False)
+              self.logEvent("recruit", country, "Cadre added.", lineFeed = False)
           opsRemaining -= 1
           i += 1
-        self.outputToHistory(self.map[country].countryStr(), True)
+        self.logCountry(country, True)
         return opsRemaining
 
+  def recruitTarget(self, country, recruitOverride = None):
+    '''Highest roll that recruits in country.'''
+    if recruitOverride:
+      return recruitOverride
+    elif self.map[country].recruit_req > 0:
+      return self.map[country].recruit_req
+    else:
+      return self.map[country].governance
+
+  def batchRecruit(self, country, rolls, recruitOverride = None):
+    '''Successes and failures for many trials of recruit rolls in country; see rollCounts.
+
+    Regime Change and Islamic Rule countries recruit without a roll, so every
+    roll there succeeds. Cell availability is not taken into account.
+    '''
+    if self.map[country].regimeChange or self.map[country].governance == 4:
+      return rollCounts(rolls, 6)
+    return rollCounts(rolls, int(self.recruitTarget(country, recruitOverride)))
+
+  @profiled("recruit")
   def handleRecruit(self, ops, isMadrassas = False):
     self.debugprint(("recruit ops: "))
     self.debugprint(("DEBUG: recruit with remaining %d ops" % ops))
     country = self.recruitChoice(ops, isMadrassas)
     if not country:
-      self.outputToHistory("* No countries qualify to Recruit.", True)
+      self.logEvent("recruit", None, "* No countries qualify to Recruit.")
       return ops
     else:
       if isMadrassas:
         cells = self.cells
       else:
         if "GTMO" in self.lapsing:
-          self.outputToHistory("* Cannot Recruit due to GTMO.", True)
+          self.logEvent("recruit", None, "* Cannot Recruit due to GTMO.")
           return ops
         cells = self.numCellsAvailable()
       if cells <= 0:
-        self.outputToHistory("* No cells available to Recruit.", True)
+        self.logEvent("recruit", None, "* No cells available to Recruit.")
         return ops
       else:
         rolls = []
         for i in range(ops):
-          rolls.append(random.randint(1,6))
+          rolls.append(self.dice.roll())
         return self.executeRecruit(country, ops, rolls, None, False, isMadrassas)
 
   def isAdjacent(self, here, there):
     if "Patriot Act" in self.markers:
-      if here == "United States" or there == "United States":
-        if here == "Canada" or there == "Canada":
-          return True
-        else:
-          return False
-    if self.map[here] in self.map[there].links:
-      return True
-    if self.map[here].schengen and self.map[there].schengen:
-      return True
-    if self.map[here].schengenLink and self.map[there].schengen:
-      return True
-    if self.map[here].schengen and self.map[there].schengenLink:
-      return True
-    return False
+      adjacency = self.patriotActAdjacency
+    else:
+      adjacency = self.adjacency
+    return (adjacency[self.countryIds[here]] >> self.countryIds[there]) & 1 == 1
 
   def adjacentCountryHasCell(self, targetCountry):
-    for country in self.map:
-      if self.isAdjacent(targetCountry, country):
-        if (self.map[country].totalCells(True) > 0):
+    if "Patriot Act" in self.markers:
+      bits = self.patriotActAdjacency[self.countryIds[targetCountry]]
+    else:
+      bits = self.adjacency[self.countryIds[targetCountry]]
+    for i in range(len(self.countryNames)):
+      if (bits >> i) & 1:
+        if (self.map[self.countryNames[i]].totalCells(True) > 0):
           return True
     return False
 
@@ -3453,24 +5320,11 @@ class Labyrinth(cmd.Cmd):
     return False
 
   def countryDistance(self, start, end):
-    if start == end:
-      return 0
-    distanceGroups = []
-    distanceGroups.append([start])
-    distance = 1
-    while not self.inLists(end, distanceGroups):
-      list = distanceGroups[distance - 1]
-      nextWave = []
-      for country in list:
-        for subCountry in self.map:
-          if not self.inLists(subCountry, distanceGroups):
-            if self.isAdjacent(subCountry, country):
-              if subCountry == end:
-                return distance
-              if subCountry not in nextWave:
-                nextWave.append(subCountry)
-      distanceGroups.append(nextWave)
-      distance += 1
+    if "Patriot Act" in self.markers:
+      distances = self.patriotActDistances
+    else:
+      distances = self.distances
+    return distances[self.countryIds[start]][self.countryIds[end]]
 
   def travelDestinationChooseBasedOnPriority(self, countryList):
     for country in countryList:
@@ -3484,7 +5338,7 @@ class Labyrinth(cmd.Cmd):
     for country in countryList:
       if self.countryResources(country) == maxResources:
         maxdests.append(country)
-    return random.choice(maxdests)
+    return self.dice.choice(maxdests)
 
   def travelDestinations(self, ops, isRadicalization = False):
     dests = []
@@ -3549,7 +5403,7 @@ class Labyrinth(cmd.Cmd):
     if len(subdests) == 1:
       dests.append(subdests[0])
     elif len(subdests) > 1:
-      dests.append(random.choice(subdests))
+      dests.append(self.dice.choice(subdests))
     if len(dests) == ops:
       return dests
 
@@ -3561,10 +5415,10 @@ class Labyrinth(cmd.Cmd):
           subdests.append(country)
       if len(subdests) > 0:
         while len(dests) < ops:
-          dests.append(random.choice(subdests))
+          dests.append(self.dice.choice(subdests))
     else:
       while len(dests) < ops:
-        dests.append(random.choice(list(self.map.keys())))
+        dests.append(self.dice.choice(list(self.map.keys())))
 
     return dests
 
@@ -3576,7 +5430,7 @@ class Labyrinth(cmd.Cmd):
       for country in self.map:
         if self.map[country].schengen and self.map[country].posture == "":
           subdests.append(country)
-          print("SCHENGEN:", country)
+          self.output("SCHENGEN:", country)
     else:
       for country in self.map:
         if country != "United States" and self.map[country].schengen and self.map[country].posture == "Soft":
@@ -3585,14 +5439,14 @@ class Labyrinth(cmd.Cmd):
       dests.append(subdests[0])
       dests.append(subdests[0])
     elif len(subdests) > 1:
-      random.shuffle(subdests)
+      self.dice.shuffle(subdests)
       dests.append(subdests[0])
       dests.append(subdests[1])
     elif len(subdests) == 0:
       for country in self.map:
         if self.map[country].schengen:
           subdests.append(country)
-      random.shuffle(subdests)
+      self.dice.shuffle(subdests)
       dests.append(subdests[0])
       dests.append(subdests[1])
     return dests
@@ -3605,7 +5459,7 @@ class Labyrinth(cmd.Cmd):
     if len(subPossibles) == 1:
       return subPossibles[0]
     elif len(subPossibles) > 1:
-      return random.choice(subPossibles)
+      return self.dice.choice(subPossibles)
     else:
       subPossibles = []
       for country in countryList:
@@ -3616,9 +5470,9 @@ class Labyrinth(cmd.Cmd):
     if len(subPossibles) == 1:
       return subPossibles[0]
     elif len(subPossibles) > 1:
-      return random.choice(subPossibles)
+      return self.dice.choice(subPossibles)
     else:
-      return random.choice(countryList)
+      return self.dice.choice(countryList)
 
   def travelSourceBoxOne(self, i, destinations, sources, ops, isRadicalization = False):
     possibles = []
@@ -3719,14 +5573,14 @@ class Labyrinth(cmd.Cmd):
   def testCountry(self, country):
     # Country testing if necessary
     if self.map[country].culture == "Non-Muslim" and self.map[country].posture == "":
-      testRoll = random.randint(1,6)
+      testRoll = self.dice.roll()
       if testRoll <= 4:
         self.map[country].posture = "Soft"
       else:
         self.map[country].posture = "Hard"
-      self.outputToHistory("%s tested, posture %s" % (self.map[country].name, self.map[country].posture), False)
+      self.logEvent("posture", country, "%s tested, posture %s", country, self.map[country].posture, lineFeed = False)
     elif self.map[country].governance == 0:
-      testRoll = random.randint(1,6)
+      testRoll = self.dice.roll()
       if testRoll <= 4:
         self.map[country].governance = 3
       else:
@@ -3749,66 +5603,27 @@ class Labyrinth(cmd.Cmd):
           dict["Poor"].append(country)
     return dict
 
-  def getCountriesWithTroopsByGovernance(self):
+  def countriesByGovernance(self, countries):
+    index = self.boardIndex
     dict = {}
-    dict["Good"] = []
-    dict["Fair"] = []
-    dict["Poor"] = []
-    for country in self.map:
-      if self.map[country].troops() > 0:
-        if self.map[country].governance == 1:
-          dict["Good"].append(country)
-        elif self.map[country].governance == 2:
-          dict["Fair"].append(country)
-        elif self.map[country].governance == 3:
-          dict["Poor"].append(country)
+    dict["Good"] = index.ordered(countries & index.withGovernance(1))
+    dict["Fair"] = index.ordered(countries & index.withGovernance(2))
+    dict["Poor"] = index.ordered(countries & index.withGovernance(3))
     return dict
 
+  def getCountriesWithTroopsByGovernance(self):
+    return self.countriesByGovernance(self.boardIndex.troops)
+
   def getCountriesWithAidByGovernance(self):
-    dict = {}
-    dict["Good"] = []
-    dict["Fair"] = []
-    dict["Poor"] = []
-    for country in self.map:
-      if self.map[country].aid > 0:
-        if self.map[country].governance == 1:
-          dict["Good"].append(country)
-        elif self.map[country].governance == 2:
-          dict["Fair"].append(country)
-        elif self.map[country].governance == 3:
-          dict["Poor"].append(country)
-    return dict
+    return self.countriesByGovernance(self.boardIndex.aid)
 
   def getNonMuslimCountriesByGovernance(self):
-    dict = {}
-    dict["Good"] = []
-    dict["Fair"] = []
-    dict["Poor"] = []
-    for country in self.map:
-      if (country != "United States") and (self.map[country].culture == "Non-Muslim"):
-        if self.map[country].governance == 1:
-          dict["Good"].append(country)
-        elif self.map[country].governance == 2:
-          dict["Fair"].append(country)
-        elif self.map[country].governance == 3:
-          dict["Poor"].append(country)
-    return dict
+    return self.countriesByGovernance(self.boardIndex.withCulture("Non-Muslim") - set(["United States"]))
 
   def getMuslimCountriesByGovernance(self):
-    dict = {}
-    dict["Good"] = []
-    dict["Fair"] = []
-    dict["Poor"] = []
-    for country in self.map:
-      if self.map[country].culture != "Non-Muslim":
-        if self.map[country].governance == 1:
-          dict["Good"].append(country)
-        elif self.map[country].governance == 2:
-          dict["Fair"].append(country)
-        elif self.map[country].governance == 3:
-          dict["Poor"].append(country)
-    return dict
+    return self.countriesByGovernance(set(self.map) - self.boardIndex.withCulture("Non-Muslim"))
 
+  @profiled("travel")
   def handleTravel(self, ops, isRadicalization = False, isSchengenVisas = False, isCleanOperatives = False):
     if isSchengenVisas:
       destinations = self.travelDestinationsSchengenVisas()
@@ -3818,9 +5633,9 @@ class Labyrinth(cmd.Cmd):
       destinations = self.travelDestinations(ops, isRadicalization)
     sources = self.travelSources(destinations, ops, isRadicalization)
     if not isRadicalization and not isSchengenVisas and not isCleanOperatives:
-      self.outputToHistory("* Cells Travel", False)
+      self.logEvent("travel", None, "* Cells Travel", lineFeed = False)
     for i in range(len(sources)):
-      self.outputToHistory("->Travel from %s to %s." % (sources[i], destinations[i]), False)
+      self.logEvent("travel", destinations[i], "->Travel from %s to %s.", sources[i], destinations[i], lineFeed = False)
       success = False
       displayStr = "BLAH!!"
       if isRadicalization:
@@ -3842,20 +5657,20 @@ class Labyrinth(cmd.Cmd):
               success = True
               displayStr = ("Travel to adjacent country automatically successful.")
             else:
-              roll = random.randint(1,6)
+              roll = self.dice.roll()
               if roll <= self.map[destinations[i]].governance:
                 success = True
                 displayStr = ("Travel roll needed due to Biometrics - roll successful.")
               else:
                 displayStr = ("Travel roll needed due to Biometrics -  roll failed, cell to funding track.")
           else:
-            roll = random.randint(1,6)
+            roll = self.dice.roll()
             if roll <= self.map[destinations[i]].governance:
               success = True
               displayStr = ("Travel roll successful.")
             else:
               displayStr = ("Travel roll failed, cell to funding track.")
-      self.outputToHistory(displayStr, True)
+      self.logEvent("travel", destinations[i], displayStr)
       self.testCountry(destinations[i])
       if success:
         if self.map[sources[i]].activeCells > 0:
@@ -3863,41 +5678,41 @@ class Labyrinth(cmd.Cmd):
         else:
           self.map[sources[i]].sleeper_cells -= 1
         self.map[destinations[i]].sleeper_cells += 1
-        self.outputToHistory(self.map[sources[i]].countryStr(), False)
-        self.outputToHistory(self.map[destinations[i]].countryStr(), True)
+        self.logCountry(sources[i], False)
+        self.logCountry(destinations[i])
       else:
         if self.map[sources[i]].activeCells > 0:
           self.map[sources[i]].activeCells -= 1
         else:
           self.map[sources[i]].sleeper_cells -= 1
         self.cells += 1
-        self.outputToHistory(self.map[sources[i]].countryStr(), True)
+        self.logCountry(sources[i])
     return ops - len(sources)
 
   def placePlots(self, country, rollPosition, plotRolls, isMartydomOperation = False, isDanishCartoons = False, isKSM = False):
     if (self.map[country].totalCells(True)) > 0:
       if isMartydomOperation:
         self.removeCell(country)
-        self.outputToHistory("Place 2 available plots in %s." % country, False)
+        self.logEvent("plot", country, "Place 2 available plots in %s.", country, lineFeed = False)
         self.map[country].plots += 2
         rollPosition = 1
       elif isDanishCartoons:
         if self.numIslamcRule() > 0:
-          self.outputToHistory("Place any available plot in %s." % country, False)
+          self.logEvent("plot", country, "Place any available plot in %s.", country, lineFeed = False)
         else:
-          self.outputToHistory("Place a Plot 1 in %s." % country, False)
+          self.logEvent("plot", country, "Place a Plot 1 in %s.", country, lineFeed = False)
         self.map[country].plots += 1
         rollPosition = 1
       elif isKSM:
         if self.map[country] != 4:
-          self.outputToHistory("Place any available plot in %s." % country, False)
+          self.logEvent("plot", country, "Place any available plot in %s.", country, lineFeed = False)
           self.map[country].plots += 1
           rollPosition = 1
       else:
         opsRemaining = len(plotRolls) - rollPosition
         cellsAvailable = self.map[country].totalCells(True)
         plotsToPlace = min(cellsAvailable, opsRemaining)
-        self.outputToHistory("--> %s plot attempt(s) in %s." % (plotsToPlace, country), False)
+        self.logEvent("plot", country, "--> %s plot attempt(s) in %s.", plotsToPlace, country, lineFeed = False)
         successes = 0
         failures = 0
         for i in range(rollPosition, rollPosition + plotsToPlace):
@@ -3905,27 +5720,68 @@ class Labyrinth(cmd.Cmd):
             successes += 1
           else:
             failures += 1
-        self.outputToHistory("Plot rolls: %d Successes rolled, %d Failures rolled" % (successes, failures), False)
+        self.logEvent("plot", country, "Plot rolls: %d Successes rolled, %d Failures rolled", successes, failures, lineFeed = False)
         for i in range(plotsToPlace - self.map[country].numActiveCells()):
-          self.outputToHistory("Cell goes Active", False)
+          self.logEvent("plot", country, "Cell goes Active", lineFeed = False)
           self.map[country].sleeper_cells -= 1
           self.map[country].activeCells += 1
         self.map[country].plots += successes
-        self.outputToHistory("%d Plot(s) placed in %s." % (successes, country), False)
+        self.logEvent("plot", country, "%d Plot(s) placed in %s.", successes, country, lineFeed = False)
         if "Abu Sayyaf" in self.markers and country == "Philippines" and self.map[country].troops() <= self.map[country].totalCells() and successes > 0:
-          self.outputToHistory("Prestige loss due to Abu Sayyaf.", False)
+          self.logEvent("prestige", country, "Prestige loss due to Abu Sayyaf.", lineFeed = False)
           self.changePrestige(-successes)
         if "NEST" in self.markers and country == "Unites States":
-          self.outputToHistory("NEST in play. If jihadists have WMD, all plots in the US placed face up.", False)
-        self.outputToHistory(self.map[country].countryStr(), True)
+          self.logEvent("plot", country, "NEST in play. If jihadists have WMD, all plots in the US placed face up.", lineFeed = False)
+        self.logCountry(country, True)
         rollPosition += plotsToPlace
     return rollPosition
 
+  def batchPlots(self, country, rolls):
+    '''Successes and failures for many trials of plot rolls in country; see rollCounts.
+
+    Plot placement and the governance rolls of a resolved plot both succeed at
+    or under the country's governance.
+    '''
+    return rollCounts(rolls, int(self.map[country].governance))
+
+  def odds(self, action, country, numRolls = None):
+    '''Exact Odds of a jihad, recruit, plot, travel or woi roll in country as the board stands.
+
+    Jihad defaults to one roll per cell, up to 3; the others to a single roll.
+    Travel odds are for a move that needs a roll.
+    '''
+    c = self.map[country]
+    if numRolls is None:
+      numRolls = min(c.totalCells(True), 3) if action == "jihad" else 1
+    outcomes = ()
+    if action == "jihad":
+      target = int(c.governance)
+      major = country in self.majorJihadPossible(numRolls)
+      successes, revolution = jihadOdds(numRolls, target, int(c.besieged > 0), major)
+      outcomes = (("Major Jihad", Fraction(int(major))), ("Islamic Revolution", revolution))
+    elif action == "recruit":
+      if c.regimeChange or c.governance == 4:
+        target = 6
+      else:
+        target = int(self.recruitTarget(country))
+      successes = successOdds(numRolls, target)
+    elif action == "plot" or action == "travel":
+      target = int(c.governance)
+      successes = successOdds(numRolls, target)
+    elif action == "woi":
+      numRolls = 1
+      target = sum([modifier for modifier, reason in self.woiModifiers(country)])
+      successes = ()
+      outcomes = tuple(zip(("Fail", "Aid", "Success"), woiOdds(target)))
+    else:
+      raise ValueError("Unknown action %s" % action)
+    return Odds(action, country, numRolls, target, successes, outcomes)
+
   def handlePlotPriorities(self, countriesDict, ops, rollPosition, plotRolls, isOps, isMartydomOperation = False, isDanishCartoons = False, isKSM = False):
     if isOps:
       if len(countriesDict["Fair"]) > 0:
         targets = countriesDict["Fair"]
-        random.shuffle(targets)
+        self.dice.shuffle(targets)
         i = 0
         while rollPosition < ops and i < len(targets):
           rollPosition = self.placePlots(targets[i], rollPosition, plotRolls, isMartydomOperation, isDanishCartoons, isKSM)
@@ -3934,7 +5790,7 @@ class Labyrinth(cmd.Cmd):
         return rollPosition
       if len(countriesDict["Good"]) > 0:
         targets = countriesDict["Good"]
-        random.shuffle(targets)
+        self.dice.shuffle(targets)
         i = 0
         while rollPosition < ops and i < len(targets):
           rollPosition = self.placePlots(targets[i], rollPosition, plotRolls, isMartydomOperation, isDanishCartoons, isKSM)
@@ -3944,7 +5800,7 @@ class Labyrinth(cmd.Cmd):
     else:
       if len(countriesDict["Good"]) > 0:
         targets = countriesDict["Good"]
-        random.shuffle(targets)
+        self.dice.shuffle(targets)
         i = 0
         while rollPosition < ops and i < len(targets):
           rollPosition = self.placePlots(targets[i], rollPosition, plotRolls, isMartydomOperation, isDanishCartoons, isKSM)
@@ -3953,7 +5809,7 @@ class Labyrinth(cmd.Cmd):
         return rollPosition
       if len(countriesDict["Fair"]) > 0:
         targets = countriesDict["Fair"]
-        random.shuffle(targets)
+        self.dice.shuffle(targets)
         i = 0
         while rollPosition < ops and i < len(targets):
           rollPosition = self.placePlots(targets[i], rollPosition, plotRolls, isMartydomOperation, isDanishCartoons, isKSM)
@@ -3962,7 +5818,7 @@ class Labyrinth(cmd.Cmd):
         return rollPosition
     if len(countriesDict["Poor"]) > 0:
       targets = countriesDict["Poor"]
-      random.shuffle(targets)
+      self.dice.shuffle(targets)
       i = 0
       while rollPosition < ops and i < len(targets):
         rollPosition = self.placePlots(targets[i], rollPosition, plotRolls, isMartydomOperation, isDanishCartoons, isKSM)
@@ -3971,7 +5827,7 @@ class Labyrinth(cmd.Cmd):
 
   def executePlot(self, ops, isOps, plotRolls, isMartydomOperation = False, isDanishCartoons = False, isKSM = False):
     if not isMartydomOperation and not isDanishCartoons and not isKSM:
-      self.outputToHistory("* Jihadists Plotting", False)
+      self.logEvent("plot", None, "* Jihadists Plotting", lineFeed = False)
   # In US
     self.debugprint(("DEBUG: In US"))
     rollPosition = self.placePlots("United States", 0, plotRolls, isMartydomOperation, isDanishCartoons, isKSM)
@@ -4018,24 +5874,26 @@ class Labyrinth(cmd.Cmd):
         return 0
     return len(plotRolls) - rollPosition
 
+  @profiled("plot")
   def handlePlot(self, ops, isOps):
     plotRolls = []
     for i in range(ops):
-      plotRolls.append(random.randint(1,6))
+      plotRolls.append(self.dice.roll())
     return self.executePlot(ops, isOps, plotRolls)
 
+  @profiled("radicalization")
   def handleRadicalization(self, ops):
     self.outputToHistory("* Radicaliztion with %d ops." % ops, False)
     opsRemaining = ops
   # First box
     if opsRemaining > 0:
       if self.cells > 0:
-        country = random.choice(list(self.map.keys()))
+        country = self.dice.choice(list(self.map.keys()))
         self.map[country].sleeper_cells += 1
         self.cells -= 1
         self.outputToHistory("--> Cell placed in %s." % country, True)
         self.testCountry(country)
-        self.outputToHistory(self.map[country].countryStr(), True)
+        self.logCountry(country, True)
         opsRemaining -= 1
   # Second box
     if opsRemaining > 0:
@@ -4051,7 +5909,7 @@ class Labyrinth(cmd.Cmd):
             if (self.map[country].totalCells(True)) > 0:
               possibles.append(country)
         if len(possibles) > 0:
-          location = random.choice(possibles)
+          location = self.dice.choice(possibles)
           self.testCountry(location)
           self.map[location].plots += 1
           self.outputToHistory("--> Plot placed in %s." % location, True)
@@ -4069,38 +5927,38 @@ class Labyrinth(cmd.Cmd):
         self.outputToHistory("--> No remaining Good or Fair countries.", True)
         break
       else:
-        location = random.choice(possibles)
+        location = self.dice.choice(possibles)
         self.map[location].governance += 1
         self.outputToHistory("--> Governance in %s worsens to %s." % (location, self.map[location].govStr()), True)
-        self.outputToHistory(self.map[location].countryStr(), True)
+        self.logCountry(location, True)
         opsRemaining -= 1
 
   def resolvePlot(self, country, plotType, postureRoll, usPrestigeRolls, schCountries, schPostureRolls, govRolls, isBacklash = False):
-    self.outputToHistory("--> Resolve \"%s\" plot in %s" % (str(plotType), country), False)
+    self.logEvent("plot", country, "--> Resolve \"%s\" plot in %s", str(plotType), country, lineFeed = False)
     if country == "United States":
       if plotType == "WMD":
         self.gameOver = True
-        self.outputToHistory("== GAME OVER - JIHADIST AUTOMATIC VICTORY ==", True)
+        self.logEvent("plot", country, "== GAME OVER - JIHADIST AUTOMATIC VICTORY ==")
       else:
         self.funding = 9
-        self.outputToHistory("Jihadist Funding now 9", False)
+        self.logEvent("plot", country, "Jihadist Funding now 9", lineFeed = False)
         presMultiplier = 1
         if usPrestigeRolls[0] <= 4:
           presMultiplier = -1
         self.changePrestige(min(usPrestigeRolls[1], usPrestigeRolls[2]) * presMultiplier)
-        self.outputToHistory("US Prestige now %d" % self.prestige, False)
+        self.logEvent("prestige", None, "US Prestige now %d", self.prestige, lineFeed = False)
         if postureRoll <= 4:
           self.map["United States"].posture = "Soft"
         else:
           self.map["United States"].posture = "Hard"
-        self.outputToHistory("US Posture now %s" % self.map["United States"].posture, True)
+        self.logEvent("posture", "United States", "US Posture now %s", self.map["United States"].posture)
     elif self.map[country].culture != "Non-Muslim":
       if not isBacklash:
         if self.map[country].governance == 1:
           self.changeFunding(2)
         else:
           self.changeFunding(1)
-        self.outputToHistory("Jihadist Funding now %d" % self.funding, False)
+        self.logEvent("plot", country, "Jihadist Funding now %d", self.funding, lineFeed = False)
       else:
         if plotType == "WMD":
           self.funding = 1
@@ -4110,7 +5968,7 @@ class Labyrinth(cmd.Cmd):
             self.funding -= 1
           if self.funding < 1:
             self.funding = 1
-        self.outputToHistory("BACKLASH: Jihadist Funding now %d" % self.funding, False)
+        self.logEvent("plot", country, "BACKLASH: Jihadist Funding now %d", self.funding, lineFeed = False)
       if self.map[country].troops() > 0:
         if plotType == "WMD":
           self.prestige = 1
@@ -4118,7 +5976,7 @@ class Labyrinth(cmd.Cmd):
           self.prestige -= 1
         if self.prestige < 1:
           self.prestige = 1
-        self.outputToHistory("Troops present so US Prestige now %d" % self.prestige, False)
+        self.logEvent("prestige", country, "Troops present so US Prestige now %d", self.prestige, lineFeed = False)
       if country != "Iran":
         successes = 0
         failures = 0
@@ -4127,23 +5985,23 @@ class Labyrinth(cmd.Cmd):
             successes += 1
           else:
             failures += 1
-        self.outputToHistory("Governance rolls: %d Successes rolled, %d Failures rolled" % (successes, failures), False)
+        self.logEvent("plot", country, "Governance rolls: %d Successes rolled, %d Failures rolled", successes, failures, lineFeed = False)
         if self.map[country].aid and successes > 0:
           self.map[country].aid = 0
-          self.outputToHistory("Aid removed.", False)
+          self.logEvent("plot", country, "Aid removed.", lineFeed = False)
         if self.map[country].governance == 3 and successes > 0:
-          self.outputToHistory("Governance stays at %s" % self.map[country].govStr(), True)
+          self.logEvent("plot", country, "Governance stays at %s", self.map[country].govStr())
         while successes > 0 and self.map[country].governance < 3:
           self.map[country].governance += 1
           successes -= 1
-          self.outputToHistory("Governance to %s" % self.map[country].govStr(), True)
+          self.logEvent("plot", country, "Governance to %s", self.map[country].govStr())
     elif self.map[country].culture == "Non-Muslim":
       if country == "Israel" and "Abbas" in self.markers:
         self.markers.remove("Abbas")
-        self.outputToHistory("Abbas no longer in play.", True)
+        self.logEvent("plot", country, "Abbas no longer in play.")
       if country == "India" and "Indo-Pakistani Talks" in self.markers:
         self.markers.remove("Indo-Pakistani Talks")
-        self.outputToHistory("Indo-Pakistani Talks no longer in play.", True)
+        self.logEvent("plot", country, "Indo-Pakistani Talks no longer in play.")
       if plotType == "WMD":
         self.funding = 9
       else:
@@ -4151,13 +6009,13 @@ class Labyrinth(cmd.Cmd):
           self.changeFunding(plotType * 2)
         else:
           self.changeFunding(plotType)
-      self.outputToHistory("Jihadist Funding now %d" % self.funding, False)
+      self.logEvent("plot", country, "Jihadist Funding now %d", self.funding, lineFeed = False)
       if country != "Israel":
         if postureRoll <= 4:
           self.map[country].posture = "Soft"
         else:
           self.map[country].posture = "Hard"
-        self.outputToHistory("%s Posture now %s" % (country, self.map[country].posture), True)
+        self.logEvent("posture", country, "%s Posture now %s", country, self.map[country].posture)
 
       if self.map[country].troops() > 0:
         if plotType == "WMD":
@@ -4166,7 +6024,7 @@ class Labyrinth(cmd.Cmd):
           self.prestige -= 1
         if self.prestige < 1:
           self.prestige = 1
-        self.outputToHistory("Troops present so US Prestige now %d" % self.prestige, False)
+        self.logEvent("prestige", country, "Troops present so US Prestige now %d", self.prestige, lineFeed = False)
 
 
       if self.map[country].schengen:
@@ -4175,7 +6033,7 @@ class Labyrinth(cmd.Cmd):
             self.map[schCountries[i]].posture = "Soft"
           else:
             self.map[schCountries[i]].posture = "Hard"
-          self.outputToHistory("%s Posture now %s" % (schCountries[i], self.map[schCountries[i]].posture), False)
+          self.logEvent("posture", schCountries[i], "%s Posture now %s", schCountries[i], self.map[schCountries[i]].posture, lineFeed = False)
       self.outputToHistory("", False)
     self.map[country].plots -= 1
     if self.map[country].plots < 0:
@@ -4191,7 +6049,9 @@ class Labyrinth(cmd.Cmd):
   def playableUSEvent(self, cardNum):
     return self.deck[str(cardNum)].type == "US" and  self.deck[str(cardNum)].playable("US", self)
 
+  @profiled("flowchart")
   def aiFlowChartTop(self, cardNum):
+    '''Play cardNum for the Jihadist AI; True if its event was played.'''
     self.debugprint(("DEBUG: START"))
     self.debugprint(("DEBUG: Playble Non-US event? [1]"))
     if self.playableNonUSEvent(cardNum):
@@ -4203,14 +6063,14 @@ class Labyrinth(cmd.Cmd):
         self.debugprint(("Track has cell? [3]"))
         if self.cells > 0:
           self.debugprint(("DEBUG: YES"))
-          self.aiFlowChartPlayEvent(cardNum)
+          return self.aiFlowChartPlayEvent(cardNum)
         else:
           self.debugprint(("DEBUG: NO"))
           self.debugprint(("DEBUG: Radicalization [4]"))
           self.handleRadicalization(self.deck[str(cardNum)].ops)
       else:
         self.debugprint(("DEBUG: NO"))
-        self.aiFlowChartPlayEvent(cardNum)
+        return self.aiFlowChartPlayEvent(cardNum)
     else:
       self.debugprint(("DEBUG: NO"))
       self.debugprint(("DEBUG: Playble US event? [7]"))
@@ -4227,7 +6087,9 @@ class Labyrinth(cmd.Cmd):
         self.debugprint(("DEBUG: NO"))
         self.outputToHistory("Unplayable Event. Using Ops for Operations.", False)
         self.aiFlowChartMajorJihad(cardNum)
+    return False
 
+  @profiled("play event")
   def aiFlowChartPlayEvent(self, cardNum):
     self.debugprint(("Play Event [6]"))
     self.deck[str(cardNum)].playEvent("Jihadist", self)
@@ -4239,7 +6101,9 @@ class Labyrinth(cmd.Cmd):
     else:
       self.debugprint(("DEBUG: NO"))
       self.debugprint(("end [9]"))
+    return True
 
+  @profiled("operations")
   def aiFlowChartMajorJihad(self, cardNum):
     self.debugprint(("DEBUG: Major Jihad success possible? [10]"))
     country = self.majorJihadChoice(self.deck[str(cardNum)].ops)
@@ -4281,12 +6145,12 @@ class Labyrinth(cmd.Cmd):
   def executeNonMuslimWOI(self, country, postureRoll):
     if postureRoll > 4:
       self.map[country].posture = "Hard"
-      self.outputToHistory("* War of Ideas in %s - Posture Hard" % country, False)
+      self.logEvent("posture", country, "* War of Ideas in %s - Posture Hard", country, lineFeed = False)
       if self.map["United States"].posture == "Hard":
         self.changePrestige(1)
     else:
       self.map[country].posture = "Soft"
-      self.outputToHistory("* War of Ideas in %s - Posture Soft" % country, False)
+      self.logEvent("posture", country, "* War of Ideas in %s - Posture Soft", country, lineFeed = False)
       if self.map["United States"].posture == "Soft":
         self.changePrestige(1)
 
@@ -4297,15 +6161,15 @@ class Labyrinth(cmd.Cmd):
       if self.funding < 1:
         self.funding = 1
       self.outputToHistory("Jihadist Funding now %d" % self.funding, False)
-    self.outputToHistory(self.map["Benelux"].countryStr(), True)
+    self.logCountry("Benelux", True)
 
   def executeCardLetsRoll(self, plotCountry, postureCountry, postureStr):
     self.map[plotCountry].plots = max(0, self.map[plotCountry].plots - 1)
     self.outputToHistory("Plot removed from %s." % plotCountry, False)
     self.map[postureCountry].posture = postureStr
     self.outputToHistory("%s Posture now %s." % (postureCountry, postureStr), False)
-    self.outputToHistory(self.map[plotCountry].countryStr(), False)
-    self.outputToHistory(self.map[postureCountry].countryStr(), True)
+    self.logCountry(plotCountry, False)
+    self.logCountry(postureCountry, True)
 
   def executeCardHEU(self, country, roll):
     if roll <= self.map[country].governance:
@@ -4326,109 +6190,104 @@ class Labyrinth(cmd.Cmd):
       self.changePrestige(-1)
 
   def listCountriesInParam(self, needed = None):
-    print("")
-    print("Contries")
-    print("--------")
+    self.output("")
+    self.output("Contries")
+    self.output("--------")
     for country in needed:
       self.map[country].printCountry()
-    print("")
+    self.output("")
 
   def listCountriesWithTroops(self, needed = None):
-    print("")
-    print("Contries with Troops")
-    print("--------------------")
+    self.output("")
+    self.output("Contries with Troops")
+    self.output("--------------------")
     if needed == None:
       needed = 0
     if self.troops > needed:
-      print("Troop Track: %d" % self.troops)
+      self.output("Troop Track: %d" % self.troops)
     for country in self.map:
       if self.map[country].troops() > needed:
-        print("%s: %d" % (country, self.map[country].troops()))
-    print("")
+        self.output("%s: %d" % (country, self.map[country].troops()))
+    self.output("")
 
   def listDeployOptions(self, na = None):
-    print("")
-    print("Deploy Options")
-    print("--------------")
+    self.output("")
+    self.output("Deploy Options")
+    self.output("--------------")
     for country in self.map:
       if self.map[country].alignment == "Ally" or ("Abu Sayyaf" in self.markers and country == "Philippines"):
-        print("%s: %d troops" % (country, self.map[country].troops()))
-    print("")
+        self.output("%s: %d troops" % (country, self.map[country].troops()))
+    self.output("")
 
   def listDisruptableCountries(self, na = None):
-    print("")
-    print("Disruptable Countries")
-    print("--------------------")
-    for country in self.map:
-      if self.map[country].sleeper_cells + self.map[country].activeCells > 0 or self.map[country].cadre > 0:
-        if self.map[country].troops() > 0 or self.map[country].culture == "Non-Muslim" or self.map[country].alignment == "Ally":
-          postureStr = ""
-          troopsStr = ""
-          if self.map[country].culture == "Non-Muslim":
-            postureStr = ", Posture %s" % self.map[country].posture
-          else:
-            troopsStr = ", Troops: %d" % self.map[country].troops()
-          print("%s - %d Active Cells, %d Sleeper Cells, %d Cadre%s%s" % (country, self.map[country].activeCells, self.map[country].sleeper_cells, self.map[country].cadre, troopsStr, postureStr))
-    print("")
+    self.output("")
+    self.output("Disruptable Countries")
+    self.output("--------------------")
+    for country in self.boardIndex.ordered(self.disruptableCountries()):
+      postureStr = ""
+      troopsStr = ""
+      if self.map[country].culture == "Non-Muslim":
+        postureStr = ", Posture %s" % self.map[country].posture
+      else:
+        troopsStr = ", Troops: %d" % self.map[country].troops()
+      self.output("%s - %d Active Cells, %d Sleeper Cells, %d Cadre%s%s" % (country, self.map[country].activeCells, self.map[country].sleeper_cells, self.map[country].cadre, troopsStr, postureStr))
+    self.output("")
 
   def listWoICountries(self, na = None):
-    print("")
-    print("War of Ideas Eligible Countries")
-    print("-------------------------------")
+    self.output("")
+    self.output("War of Ideas Eligible Countries")
+    self.output("-------------------------------")
     for country in self.map:
       if self.map[country].alignment == "Neutral" or self.map[country].alignment == "Ally" or self.map[country].governance == 0:
-        print("%s, %s %s - %d Active Cells, %d Sleeper Cells, %d Cadre, %d troops" % (country, self.map[country].govStr(), self.map[country].alignment, self.map[country].activeCells, self.map[country].sleeper_cells, self.map[country].cadre, self.map[country].troops()))
+        self.output("%s, %s %s - %d Active Cells, %d Sleeper Cells, %d Cadre, %d troops" % (country, self.map[country].govStr(), self.map[country].alignment, self.map[country].activeCells, self.map[country].sleeper_cells, self.map[country].cadre, self.map[country].troops()))
     for country in self.map:
       if self.map[country].culture == "Non-Muslim" and country != "United States" and self.map[country].posture == "Hard":
-        print("%s, Posture %s" % (country, self.map[country].posture))
+        self.output("%s, Posture %s" % (country, self.map[country].posture))
     for country in self.map:
       if self.map[country].culture == "Non-Muslim" and country != "United States" and self.map[country].posture == "Soft":
-        print("%s, Posture %s" % (country, self.map[country].posture))
+        self.output("%s, Posture %s" % (country, self.map[country].posture))
     for country in self.map:
       if self.map[country].culture == "Non-Muslim" and country != "United States" and self.map[country].posture == "":
-        print("%s, Untested" % country)
+        self.output("%s, Untested" % country)
 
   def listPlotCountries(self, na = None):
-    print("")
-    print("Contries with Active Plots")
-    print("--------------------------")
-    for country in self.map:
-      if self.map[country].plots > 0:
-        self.map[country].printCountry()
-    print("")
+    self.output("")
+    self.output("Contries with Active Plots")
+    self.output("--------------------------")
+    for country in self.boardIndex.ordered(self.boardIndex.plots):
+      self.map[country].printCountry()
+    self.output("")
 
   def listIslamicCountries(self, na = None):
-    print("")
-    print("Islamic Rule Countries")
-    print("----------------------")
-    for country in self.map:
-      if self.map[country].governance == 4:
-        self.map[country].printCountry()
-    print("")
+    self.output("")
+    self.output("Islamic Rule Countries")
+    self.output("----------------------")
+    for country in self.boardIndex.ordered(self.boardIndex.withGovernance(4)):
+      self.map[country].printCountry()
+    self.output("")
 
   def listRegimeChangeCountries(self, na = None):
-    print("")
-    print("Regime Change Countries")
-    print("-----------------------")
-    for country in self.map:
-      if self.map[country].regimeChange > 0:
-        self.map[country].printCountry()
-    print("")
+    self.output("")
+    self.output("Regime Change Countries")
+    self.output("-----------------------")
+    for country in self.boardIndex.ordered(self.boardIndex.regimeChange):
+      self.map[country].printCountry()
+    self.output("")
 
   def listRegimeChangeWithTwoCells(self, na = None):
-    print("")
-    print("Regime Change Countries with Two Cells")
-    print("---------------------------------------")
+    self.output("")
+    self.output("Regime Change Countries with Two Cells")
+    self.output("---------------------------------------")
     for country in self.map:
       if self.map[country].regimeChange > 0:
         if self.map[country].totalCells() >= 2:
           self.map[country].printCountry()
-    print("")
+    self.output("")
 
   def listCountriesWithCellAndAdjacentTroops(self, na = None):
-    print("")
-    print("Countries with Cells and with Troops or adjacent to Troops")
-    print("----------------------------------------------------------")
+    self.output("")
+    self.output("Countries with Cells and with Troops or adjacent to Troops")
+    self.output("----------------------------------------------------------")
     for country in self.map:
       if self.map[country].totalCells(True) > 0:
         if self.map[country].troops() > 0:
@@ -4439,89 +6298,86 @@ class Labyrinth(cmd.Cmd):
               if self.map[subCountry].troops() > 0 and self.isAdjacent(country, subCountry):
                 self.map[country].printCountry()
                 break
-    print("")
+    self.output("")
 
   def listAdversaryCountries(self, na = None):
-    print("")
-    print("Adversary Countries")
-    print("-------------------")
-    for country in self.map:
-      if self.map[country].alignment == "Adversary":
-        self.map[country].printCountry()
-    print("")
+    self.output("")
+    self.output("Adversary Countries")
+    self.output("-------------------")
+    for country in self.boardIndex.ordered(self.boardIndex.withAlignment("Adversary")):
+      self.map[country].printCountry()
+    self.output("")
 
   def listGoodAllyPlotCountries(self, na = None):
-    print("")
-    print("Ally or Good Countries with Plots")
-    print("---------------------------------")
+    self.output("")
+    self.output("Ally or Good Countries with Plots")
+    self.output("---------------------------------")
     for country in self.map:
       if self.map[country].plots > 0:
         if self.map[country].alignment == "Ally" or self.map[country].governance == 1:
           self.map[country].printCountry()
-    print("")
+    self.output("")
 
   def listMuslimCountriesWithCells(self, na = None):
-    print("")
-    print("Muslim Countries with Cells")
-    print("---------------------------")
+    self.output("")
+    self.output("Muslim Countries with Cells")
+    self.output("---------------------------")
     for country in self.map:
       if self.map[country].totalCells(True) > 0:
         if self.map[country].culture == "Shia-Mix" or self.map[country].culture == "Suni":
           self.map[country].printCountry()
-    print("")
+    self.output("")
 
   def listBesiegedCountries(self, na = None):
-    print("")
-    print("Besieged Regimes")
-    print("----------------")
-    for country in self.map:
-      if self.map[country].besieged > 0:
-        self.map[country].printCountry()
-    print("")
+    self.output("")
+    self.output("Besieged Regimes")
+    self.output("----------------")
+    for country in self.boardIndex.ordered(self.boardIndex.besieged):
+      self.map[country].printCountry()
+    self.output("")
 
   def listShiaMixRegimeChangeCountriesWithCells(self, na = None):
-    print("")
-    print("Shia-Mix Regime Change Countries with Cells")
-    print("-------------------------------------------")
+    self.output("")
+    self.output("Shia-Mix Regime Change Countries with Cells")
+    self.output("-------------------------------------------")
     for country in self.map:
       if self.map[country].culture == "Shia-Mix":
         if self.map[country].regimeChange > 0:
           if (self.map[country].totalCells(True)) > 0:
             self.map[country].printCountry()
-    print("")
+    self.output("")
 
   def listShiaMixCountries(self, na = None):
-    print("")
-    print("Shia-Mix Countries")
-    print("------------------")
-    for country in self.map:
-      if self.map[country].culture == "Shia-Mix":
-        self.map[country].printCountry()
-    print("")
+    self.output("")
+    self.output("Shia-Mix Countries")
+    self.output("------------------")
+    for country in self.boardIndex.ordered(self.boardIndex.withCulture("Shia-Mix")):
+      self.map[country].printCountry()
+    self.output("")
 
   def listShiaMixCountriesWithCellsTroops(self, na = None):
-    print("")
-    print("Shia-Mix Countries with Cells and Troops")
-    print("----------------------------------------")
+    self.output("")
+    self.output("Shia-Mix Countries with Cells and Troops")
+    self.output("----------------------------------------")
     for country in self.map:
       if self.map[country].culture == "Shia-Mix":
         if self.map[country].troops() > 0 and self.map[country].totalCells() > 0:
           self.map[country].printCountry()
-    print("")
+    self.output("")
 
   def listSchengenCountries(self, na = None):
-    print("")
-    print("Schengen Countries")
-    print("------------------")
+    self.output("")
+    self.output("Schengen Countries")
+    self.output("------------------")
     for country in self.map:
       if self.map[country].schengen > 0:
         self.map[country].printCountry()
-    print("")
+    self.output("")
 
   def listHambali(self, na = None):
-    print("")
-    print("Indonesia or adjacent country with cell and Ally or Hard")
-    print("--------------------------------------------------------")
+    self.output("")
+    self.output("Indonesia or adjacent country with cell and Ally or Hard")
+    self.output("--------------------------------------------------------")
     possibles = ["Indonesia/Malaysia"]
     for countryObj in self.map["Indonesia/Malaysia"].links:
       possibles.append(countryObj.name)
@@ -4547,11 +6403,11 @@ class Labyrinth(cmd.Cmd):
         elif rest.lower() in country.lower():
           possible.append(country)
       if len(possible) == 0:
-        print("Unrecognized country.")
-        print("")
+        self.output("Unrecognized country.")
+        self.output("")
       elif len(possible) > 1:
-        print("Be more specific", possible)
-        print("")
+        self.output("Be more specific", possible)
+        self.output("")
       else:
         goodCountry = possible[0]
 
@@ -4566,7 +6422,6 @@ class Labyrinth(cmd.Cmd):
     islamRes = 0
     goodC = 0
     islamC = 0
-    worldPos = 0
     for country in self.map:
       if self.map[country].culture == "Shia-Mix" or self.map[country].culture == "Suni":
         if self.map[country].governance == 1:
@@ -4579,122 +6434,123 @@ class Labyrinth(cmd.Cmd):
         elif self.map[country].governance == 4:
           islamC += 1
           islamRes += self.countryResources(country)
-      elif self.map[country].culture != "Iran" and self.map[country].name != "United States":
-        if self.map[country].posture == "Hard":
-          worldPos += 1
-        elif self.map[country].posture == "Soft":
-          worldPos -= 1
-    print("")
-    print("GOOD GOVERNANCE")
+    worldPos = self.worldPosture
+    self.output("")
+    self.output("GOOD GOVERNANCE")
     num = 0
     for country in self.map:
       if self.map[country].culture != "Non-Muslim" and self.map[country].governance == 1:
         num += 1
         self.map[country].printCountry()
     if not num:
-      print("none")
-    print("")
-    print("FAIR GOVERNANCE")
+      self.output("none")
+    self.output("")
+    self.output("FAIR GOVERNANCE")
     num = 0
     for country in self.map:
       if self.map[country].culture != "Non-Muslim" and self.map[country].governance == 2:
         num += 1
         self.map[country].printCountry()
     if not num:
-      print("none")
-    print("")
-    print("POOR GOVERNANCE")
+      self.output("none")
+    self.output("")
+    self.output("POOR GOVERNANCE")
     num = 0
     for country in self.map:
       if self.map[country].culture != "Non-Muslim" and self.map[country].governance == 3:
         num += 1
         self.map[country].printCountry()
     if not num:
-      print("none")
-    print("")
-    print("ISLAMIC RULE")
+      self.output("none")
+    self.output("")
+    self.output("ISLAMIC RULE")
     num = 0
     for country in self.map:
       if self.map[country].culture != "Non-Muslim" and self.map[country].governance == 4:
         num += 1
         self.map[country].printCountry()
     if not num:
-      print("none")
-    print("")
-    print("HARD POSTURE")
+      self.output("none")
+    self.output("")
+    self.output("HARD POSTURE")
     num = 0
     for country in self.map:
       if self.map[country].posture == "Hard":
         num += 1
         self.map[country].printCountry()
     if not num:
-      print("none")
-    print("")
-    print("SOFT POSTURE")
+      self.output("none")
+    self.output("")
+    self.output("SOFT POSTURE")
     num = 0
     for country in self.map:
       if self.map[country].posture == "Soft":
         num += 1
         self.map[country].printCountry()
     if not num:
-      print("none")
-    print("")
-    print("PLOTS")
+      self.output("none")
+    self.output("")
+    self.output("PLOTS")
     plotCountries = 0
     for country in self.map:
       if self.map[country].plots > 0:
         plotCountries += 1
-        print("%s: %d plot(s)" % (country, self.map[country].plots))
+        self.output("%s: %d plot(s)" % (country, self.map[country].plots))
     if plotCountries == 0:
-      print("No Plots")
-    print("")
-    print("VICTORY")
-    print("Good Resources   : %d" % goodRes)
-    print("Islamic Resources: %d" % islamRes)
-    print("---")
-    print("Good/Fair Countries   : %d" % goodC)
-    print("Poor/Islamic Countries: %d" % islamC)
-    print("")
-    print("GWOT")
-    print("US Posture: %s" % self.map["United States"].posture)
+      self.output("No Plots")
+    self.output("")
+    self.output("VICTORY")
+    self.output("Good Resources   : %d" % goodRes)
+    self.output("Islamic Resources: %d" % islamRes)
+    self.output("---")
+    self.output("Good/Fair Countries   : %d" % goodC)
+    self.output("Poor/Islamic Countries: %d" % islamC)
+    self.output("")
+    self.output("GWOT")
+    self.output("US Posture: %s" % self.map["United States"].posture)
     if worldPos > 0:
       worldPosStr = "Hard"
     elif worldPos < 0:
       worldPosStr = "Soft"
     else:
       worldPosStr = "Even"
-    print("World Posture: %s %d" % (worldPosStr, abs(worldPos)))
-    print("US Prestige: %d" % self.prestige)
-    print("")
-    print("TROOPS")
+    self.output("World Posture: %s %d" % (worldPosStr, abs(worldPos)))
+    self.output("US Prestige: %d" % self.prestige)
+    self.output("")
+    self.output("TROOPS")
     if self.troops >= 10:
-      print("Low Intensity: %d troops available" % self.troops)
+      self.output("Low Intensity: %d troops available" % self.troops)
     elif self.troops >= 5:
-      print("War: %d troops available" % self.troops)
+      self.output("War: %d troops available" % self.troops)
     else:
-      print("Overstretch: %d troops available" % self.troops)
-    print("")
-    print("JIHADIST FUNDING")
-    print("Funding: %d" % self.funding)
-    print("Cells Available: %d" % self.cells)
-    print("")
-    print("EVENTS")
+      self.output("Overstretch: %d troops available" % self.troops)
+    self.output("")
+    self.output("JIHADIST FUNDING")
+    self.output("Funding: %d" % self.funding)
+    self.output("Cells Available: %d" % self.cells)
+    self.output("")
+    self.output("EVENTS")
     if len(self.markers) == 0:
-      print("Markers: None")
+      self.output("Markers: None")
     else:
-      print("Markers: %s" % ", ".join(self.markers))
+      self.output("Markers: %s" % ", ".join(self.markers))
     if len(self.lapsing) == 0:
-      print("Lapsing: None")
+      self.output("Lapsing: None")
     else:
-      print("Lapsing: %s" % ", ".join(self.lapsing))
-    print("")
-    print("DATE")
-    print("%d (Turn %s)" % (self.startYear + (self.turn - 1), self.turn))
-    print("")
+      self.output("Lapsing: %s" % ", ".join(self.lapsing))
+    self.output("")
+    if self.deckTracker is not None:
+      self.output("DECK")
+      self.output("Draw Pile: %d  Discards: %d  Removed: %d" % (self.deckTracker.cardsLeft(),
+        self.deckTracker.counts[DISCARD_PILE], self.deckTracker.counts[REMOVED_PILE]))
+      self.output("")
+    self.output("DATE")
+    self.output("%d (Turn %s)" % (self.startYear + (self.turn - 1), self.turn))
+    self.output("")
 
   def help_status(self):
-    print("Display game status.  status [country] will print out status of single country.")
-    print("")
+    self.output("Display game status.  status [country] will print out status of single country.")
+    self.output("")
 
   def do_sta(self, rest):
     self.do_status(rest)
@@ -4710,13 +6566,17 @@ class Labyrinth(cmd.Cmd):
         f.write(str + "\r\n")
       f.close()
 
-    for str in self.history:
-      print(str)
-    print("")
+    start = 0
+    if rest.isdigit():
+      start = len(self.history) - int(rest)
+    for str in self.history.lines(start):
+      self.output(str)
+    self.output("")
 
   def help_history(self):
-    print("Display Game History.  Type 'history save' to save history to a file called history.txt.")
-    print("")
+    self.output("Display Game History.  Type 'history save' to save history to a file called history.txt.")
+    self.output("Type 'history' and a number to display only that many of the latest lines.")
+    self.output("")
 
   def do_his(self, rest):
     self.do_history(rest)
@@ -4730,72 +6590,55 @@ class Labyrinth(cmd.Cmd):
     while not moveFrom:
       input = self.getCountryFromUser("From what country (track for Troop Track) (? for list)?: ",  "track", self.listCountriesWithTroops)
       if input == "":
-        print("")
+        self.output("")
         return
       elif input == "track":
         if self.troops <= 0:
-          print("There are no troops on the Troop Track.")
-          print("")
+          self.output("There are no troops on the Troop Track.")
+          self.output("")
           return
         else:
-          print("Deploy from Troop Track - %d available" % self.troops)
-          print("")
+          self.output("Deploy from Troop Track - %d available" % self.troops)
+          self.output("")
           available = self.troops
           moveFrom = input
       else:
         if self.map[input].troops() <= 0:
-          print("There are no troops in %s." % input)
-          print("")
+          self.output("There are no troops in %s." % input)
+          self.output("")
           return
         else:
-          print("Deploy from %s = %d availalbe" % (input, self.map[input].troops()))
-          print("")
+          self.output("Deploy from %s = %d availalbe" % (input, self.map[input].troops()))
+          self.output("")
           available = self.map[input].troops()
           moveFrom = input
     moveTo = None
     while not moveTo:
       input = self.getCountryFromUser("To what country (track for Troop Track)  (? for list)?: ",  "track", self.listDeployOptions)
       if input == "":
-        print("")
+        self.output("")
         return
       elif input == "track":
-        print("Deploy troops from %s to Troop Track" % moveFrom)
-        print("")
+        self.output("Deploy troops from %s to Troop Track" % moveFrom)
+        self.output("")
         moveTo = input
       else:
-        print("Deploy troops from %s to %s" % (moveFrom, input))
-        print("")
+        self.output("Deploy troops from %s to %s" % (moveFrom, input))
+        self.output("")
         moveTo = input
     howMany = 0
     while not howMany:
       input = self.getNumTroopsFromUser("Deploy how many troops (%d available)? " % available, available)
       if input == "":
-        print("")
+        self.output("")
         return
       else:
         howMany = input
-    if moveFrom == "track":
-      self.troops -= howMany
-      troopsLeft = self.troops
-    else:
-      if self.map[moveFrom].regimeChange:
-        if (self.map[moveFrom].troops() - howMany) < (5 + self.map[moveFrom].totalCells(True)):
-          print("You cannot move that many troops from a Regime Change country.")
-          print("")
-          return
-      self.map[moveFrom].changeTroops(-howMany)
-      troopsLeft = self.map[moveFrom].troops()
-    if moveTo == "track":
-      self.troops += howMany
-      troopsNow = self.troops
-    else:
-      self.map[moveTo].changeTroops(howMany)
-      troopsNow = self.map[moveTo].troops()
-    self.outputToHistory("* %d troops deployed from %s (%d) to %s (%d)" % (howMany, moveFrom, troopsLeft, moveTo, troopsNow))
+    self.handleDeploy(moveFrom, moveTo, howMany)
 
   def help_deploy(self):
-    print("Move Trops")
-    print("")
+    self.output("Move Trops")
+    self.output("")
 
   def do_dep(self, rest):
     self.do_deploy(rest)
@@ -4804,35 +6647,14 @@ class Labyrinth(cmd.Cmd):
     self.help_toops()
 
   def do_disrupt(self, rest):
-    where = None
-    sleepers = 0
-    actives = 0
-    while not where:
-      input = self.getCountryFromUser("Disrupt what country?  (? for list): ",  "XXX", self.listDisruptableCountries)
-      if input == "":
-        print("")
-        return
-      else:
-        if self.map[input].sleeper_cells + self.map[input].activeCells <= 0 and self.map[input].cadre <= 0:
-          print("There are no cells or cadre in %s." % input)
-          print("")
-        elif "FATA" in self.map[input].markers and self.map[input].regimeChange == 0:
-          print("No disrupt allowed due to FATA.")
-          print("")
-        elif self.map[input].troops() > 0 or self.map[input].culture == "Non-Muslim" or self.map[input].alignment == "Ally":
-          #print("Disrupt in %s - %d Active Cells, %d Sleeper Cells" % (input, self.map[input].activeCells, self.map[input].sleeper_cells))
-          print("")
-          where = input
-          sleepers = self.map[input].sleeper_cells
-          actives = self.map[input].activeCells
-        else:
-          print("You can't disrupt there.")
-          print("")
+    where = self.getUSOpCountry("disrupt", "Disrupt what country?  (? for list): ", self.listDisruptableCountries)
+    if not where:
+      return
     self.handleDisrupt(where)
 
   def help_disrupt(self):
-    print("Disrupt Cells or Cadre.")
-    print("")
+    self.output("Disrupt Cells or Cadre.")
+    self.output("")
 
   def do_dis(self, rest):
     self.do_disrupt(rest)
@@ -4841,65 +6663,26 @@ class Labyrinth(cmd.Cmd):
     self.help_disrupt()
 
   def do_woi(self, rest):
-    where = None
-    while not where:
-      input = self.getCountryFromUser("War of Ideas in what country?  (? for list): ", "XXX", self.listWoICountries)
-      if input == "":
-        print("")
-        return
-      else:
-        if self.map[input].culture == "Non-Muslim" and input != "United States":
-          where = input
-        elif self.map[input].alignment == "Ally" or self.map[input].alignment == "Neutral" or self.map[input].governance == 0:
-          where = input
-        else:
-          print("Country not eligible for War of Ideas.")
-          print("")
-    if self.map[where].culture == "Non-Muslim" and input != "United States": # Non-Muslim
-      postureRoll = self.getRollFromUser("Enter Posture Roll or r to have program roll: ")
-      if postureRoll > 4:
-        self.map[where].posture = "Hard"
-        self.outputToHistory("* War of Ideas in %s - Posture Hard" % where)
-        if self.map["United States"].posture == "Hard":
-          self.prestige += 1
-          if self.prestige > 12:
-            self.prestige = 12
-          self.outputToHistory("US Prestige now %d" % self.prestige)
-      else:
-        self.map[where].posture = "Soft"
-        self.outputToHistory("* War of Ideas in %s - Posture Soft" % where)
-        if self.map["United States"].posture == "Soft":
-          self.prestige += 1
-          if self.prestige > 12:
-            self.prestige = 12
-          self.outputToHistory("US Prestige now %d" % self.prestige)
+    where = self.getUSOpCountry("woi", "War of Ideas in what country?  (? for list): ", self.listWoICountries)
+    if not where:
+      return
+    if self.map[where].culture == "Non-Muslim": # Non-Muslim
+      roll = self.getRollFromUser("Enter Posture Roll or r to have program roll: ")
     else: # Muslim
-      self.testCountry(where)
-      woiRoll = self.getRollFromUser("Enter WoI roll or r to have program roll: ")
-      modRoll = self.modifiedWoIRoll(woiRoll, where)
-      self.outputToHistory("Modified Roll: %d" % modRoll)
-      self.handleMuslimWoI(modRoll, where)
+      roll = self.getRollFromUser("Enter WoI roll or r to have program roll: ")
+    self.handleWoI(where, roll)
 
   def help_woi(self):
-    print("Conduct War of Ideas operation.")
+    self.output("Conduct War of Ideas operation.")
 
   def do_alert(self, rest):
-    where = None
-    while not where:
-      input = self.getCountryFromUser("Alert in what country?  (? for list): ", "XXX", self.listPlotCountries)
-      if input == "":
-        print("")
-        return
-      else:
-        if self.map[input].plots < 1:
-          print("Country has not plots.")
-          print("")
-        else:
-          where = input
+    where = self.getUSOpCountry("alert", "Alert in what country?  (? for list): ", self.listPlotCountries)
+    if not where:
+      return
     self.handleAlert(where)
 
   def help_alert(self):
-    print("Alert an active Plot.")
+    self.output("Alert an active Plot.")
 
   def do_alr(self, rest):
     self.do_alert(rest)
@@ -4911,7 +6694,7 @@ class Labyrinth(cmd.Cmd):
     self.handleReassessment()
 
   def help_reassessment(self):
-    print("Reassessment of US Posture.")
+    self.output("Reassessment of US Posture.")
 
   def do_rea(self, rest):
     self.do_reassessment(rest)
@@ -4920,57 +6703,44 @@ class Labyrinth(cmd.Cmd):
     self.help_reassessment()
 
   def do_regime(self, rest):
-    if   self.map["United States"].posture == "Soft":
-      print("No Regime Change with US Posture Soft")
-      print("")
+    where = self.getUSOpCountry("regime", "Regime Change in what country?  (? for list): ", self.listIslamicCountries)
+    if not where:
       return
-    where = None
-    while not where:
-      input = self.getCountryFromUser("Regime Change in what country?  (? for list): ", "XXX", self.listIslamicCountries)
-      if input == "":
-        print("")
-        return
-      else:
-        if (self.map[input].governance == 4) or (input == "Iraq" and "Iraqi WMD" in self.markers) or (input == "Libya" and "Libyan WMD" in self.markers):
-          where = input
-        else:
-          print("Country not Islamic Rule.")
-          print("")
     moveFrom = None
     available = 0
     while not moveFrom:
       input = self.getCountryFromUser("Deploy 6+ troops from what country (track for Troop Track) (? for list)?: ",  "track", self.listCountriesWithTroops, 6)
       if input == "":
-        print("")
+        self.output("")
         return
       elif input == "track":
         if self.troops <= 6:
-          print("There are not enough troops on the Troop Track.")
-          print("")
+          self.output("There are not enough troops on the Troop Track.")
+          self.output("")
           return
         else:
-          print("Deploy from Troop Track - %d available" % self.troops)
-          print("")
+          self.output("Deploy from Troop Track - %d available" % self.troops)
+          self.output("")
           available = self.troops
           moveFrom = input
       else:
         if self.map[input].troops() <= 6:
-          print("There are not enough troops in %s." % input)
-          print("")
+          self.output("There are not enough troops in %s." % input)
+          self.output("")
           return
         else:
-          print("Deploy from %s = %d availalbe" % (input, self.map[input].troops()))
-          print("")
+          self.output("Deploy from %s = %d availalbe" % (input, self.map[input].troops()))
+          self.output("")
           available = self.map[input].troops()
           moveFrom = input
     howMany = 0
     while not howMany:
       input = self.getNumTroopsFromUser("Deploy how many troops (%d available)? " % available, available)
       if input == "":
-        print("")
+        self.output("")
         return
       elif input < 6:
-        print("At least 6 troops needed for Regime Change")
+        self.output("At least 6 troops needed for Regime Change")
       else:
         howMany = input
     govRoll = self.getRollFromUser("Enter Governance roll or r to have program roll: ")
@@ -4980,7 +6750,7 @@ class Labyrinth(cmd.Cmd):
     self.handleRegimeChange(where, moveFrom, howMany, govRoll, (preFirstRoll, preSecondRoll, preThirdRoll))
 
   def help_regime(self):
-    print("Regime Change in Islamist Rule Country.")
+    self.output("Regime Change in Islamist Rule Country.")
 
   def do_reg(self, rest):
     self.do_regime(rest)
@@ -4989,43 +6759,29 @@ class Labyrinth(cmd.Cmd):
     self.help_regime()
 
   def do_withdraw(self, rest):
-    if   self.map["United States"].posture == "Hard":
-      print("No Withdrawl with US Posture Hard")
-      print("")
+    moveFrom = self.getUSOpCountry("withdraw", "Withdrawl in what country?  (? for list): ", self.listRegimeChangeCountries)
+    if not moveFrom:
       return
-    moveFrom = None
-    available = 0
-    while not moveFrom:
-      input = self.getCountryFromUser("Withdrawl in what country?  (? for list): ", "XXX", self.listRegimeChangeCountries)
-      if input == "":
-        print("")
-        return
-      else:
-        if self.map[input].regimeChange > 0:
-          moveFrom = input
-          available = self.map[input].troops()
-        else:
-          print("Country not Regime Change.")
-          print("")
+    available = self.map[moveFrom].troops()
     moveTo = None
     while not moveTo:
       input = self.getCountryFromUser("To what country (track for Troop Track)  (? for list)?: ",  "track", self.listDeployOptions)
       if input == "":
-        print("")
+        self.output("")
         return
       elif input == "track":
-        print("Withdraw troops from %s to Troop Track" % moveFrom)
-        print("")
+        self.output("Withdraw troops from %s to Troop Track" % moveFrom)
+        self.output("")
         moveTo = input
       else:
-        print("Withdraw troops from %s to %s" % (moveFrom, input))
-        print("")
+        self.output("Withdraw troops from %s to %s" % (moveFrom, input))
+        self.output("")
         moveTo = input
     howMany = 0
     while not howMany:
       input = self.getNumTroopsFromUser("Withdraw how many troops (%d available)? " % available, available)
       if input == "":
-        print("")
+        self.output("")
         return
       else:
         howMany = input
@@ -5035,7 +6791,7 @@ class Labyrinth(cmd.Cmd):
     self.handleWithdraw(moveFrom, moveTo, howMany, (preFirstRoll, preSecondRoll, preThirdRoll))
 
   def help_withdraw(self):
-    print("Withdraw Troops from Regime Change Country.")
+    self.output("Withdraw Troops from Regime Change Country.")
 
   def do_wit(self, rest):
     self.do_withdraw(rest)
@@ -5048,16 +6804,15 @@ class Labyrinth(cmd.Cmd):
     try:
       input = int(rest)
       if input < 1 or input > 120:
-        print("Enter j then the card number e.g. j 24")
-        print("")
+        self.output("Enter j then the card number e.g. j 24")
+        self.output("")
         return
       else:
         cardNum = input
     except:
-      print("Enter j then the card number e.g. j 24")
-      print("")
+      self.output("Enter j then the card number e.g. j 24")
+      self.output("")
       return
-    self.SaveUndo()
     self.outputToHistory("", False)
     self.outputToHistory("== Jihadist plays %s - %d Ops ==" % (self.deck[str(cardNum)].name, self.deck[str(cardNum)].ops), True)
 
@@ -5093,23 +6848,22 @@ class Labyrinth(cmd.Cmd):
   '''
 
   def help_j(self):
-    print("Enter the number of the Jihadist card when it is their card play.")
+    self.output("Enter the number of the Jihadist card when it is their card play.")
 
   def do_u(self, rest):
     cardNum = None
     try:
       input = int(rest)
       if input < 1 or input > 120:
-        print("Enter u then the card number e.g. u 24")
-        print("")
+        self.output("Enter u then the card number e.g. u 24")
+        self.output("")
         return
       else:
         cardNum = input
     except:
-      print("Enter u then the card number e.g. u 24")
-      print("")
+      self.output("Enter u then the card number e.g. u 24")
+      self.output("")
       return
-    self.SaveUndo()
     self.outputToHistory("", False)
     self.outputToHistory("== US plays %s - %d Ops ==" % (self.deck[str(cardNum)].name, self.deck[str(cardNum)].ops), True)
 
@@ -5124,12 +6878,12 @@ class Labyrinth(cmd.Cmd):
         self.outputToHistory("Played for Event.", False)
         self.deck[str(cardNum)].playEvent("US", self)
         if cardNum == 120:
-          print("Now, %d Ops available. Use commands: alert, deploy, disrupt, reassessment, regime, withdraw, or woi" % self.deck[str(cardNum)].ops)
+          self.output("Now, %d Ops available. Use commands: alert, deploy, disrupt, reassessment, regime, withdraw, or woi" % self.deck[str(cardNum)].ops)
       elif choice == "ops":
         self.outputToHistory("Played for Ops.", False)
         if cardNum == 120:
-          print("When finished with Ops enter u 120 again to play the event.")
-        print("%d Ops available. Use commands: alert, deploy, disrupt, reassessment, regime, withdraw, or woi" % self.deck[str(cardNum)].ops)
+          self.output("When finished with Ops enter u 120 again to play the event.")
+        self.output("%d Ops available. Use commands: alert, deploy, disrupt, reassessment, regime, withdraw, or woi" % self.deck[str(cardNum)].ops)
     else:
       if self.deck[str(cardNum)].type == "Jihadist":
         if self.deck[str(cardNum)].playable("Jihadist", self):
@@ -5138,15 +6892,91 @@ class Labyrinth(cmd.Cmd):
           if playEventFirst:
             self.deck[str(cardNum)].playEvent("Jihadist", self)
           else:
-            print("Use the Ops now then enter u <card #> again to play the event")
-          print("%d Ops available. Use commands: alert, deploy, disrupt, reassessment, regime, withdraw, or woi" % self.deck[str(cardNum)].ops)
+            self.output("Use the Ops now then enter u <card #> again to play the event")
+          self.output("%d Ops available. Use commands: alert, deploy, disrupt, reassessment, regime, withdraw, or woi" % self.deck[str(cardNum)].ops)
           return
     # Here if it's unplayable by either side.
       self.outputToHistory("Unplayable %s Event" % self.deck[str(cardNum)].type, False)
-      print("%d Ops available. Use commands: alert, deploy, disrupt, reassessment, regime, withdraw, or woi" % self.deck[str(cardNum)].ops)
+      self.output("%d Ops available. Use commands: alert, deploy, disrupt, reassessment, regime, withdraw, or woi" % self.deck[str(cardNum)].ops)
 
   def help_u(self):
-    print("Enter the number of the US card when it is your card play.")
+    self.output("Enter the number of the US card when it is your card play.")
+
+  def do_playable(self, rest):
+    hand = []
+    for word in rest.split():
+      try:
+        cardNum = int(word)
+      except ValueError:
+        cardNum = 0
+      if cardNum < 1 or cardNum > 120:
+        self.output("Enter playable then the US card numbers e.g. playable 24 57 103")
+        self.output("")
+        return
+      hand.append(cardNum)
+    if not hand:
+      self.output("Enter playable then the US card numbers e.g. playable 24 57 103")
+      self.output("")
+      return
+    for card in self.playableCards("US", hand):
+      if card.playable is None or card.opponentEvent is None:
+        note = "check event conditions"
+      elif card.opponentEvent:
+        note = "Jihadist event will trigger"
+      elif card.playable:
+        note = "event playable"
+      else:
+        note = "event unplayable"
+      self.output("%3d %s - %d Ops: %s, play for %s" % (card.number, card.name, card.ops, note, card.recommendation.capitalize()))
+    self.output("")
+
+  def help_playable(self):
+    self.output("Enter the numbers of the US cards in hand to see which events are playable.")
+
+  def do_odds(self, rest):
+    words = rest.split()
+    if len(words) < 2 or words[0].lower() not in ("jihad", "recruit", "plot", "travel", "woi"):
+      self.help_odds()
+      self.output("")
+      return
+    action = words[0].lower()
+    numRolls = None
+    if len(words) > 2 and words[-1].isdigit():
+      numRolls = int(words.pop())
+    name = " ".join(words[1:]).lower()
+    possible = []
+    for country in self.map:
+      if name == country.lower():
+        possible = [country]
+        break
+      elif name in country.lower():
+        possible.append(country)
+    if len(possible) == 0:
+      self.output("Unrecognized country.")
+      self.output("")
+      return
+    elif len(possible) > 1:
+      self.output("Be more specific", possible)
+      self.output("")
+      return
+    country = possible[0]
+    if action == "woi" and self.map[country].culture == "Non-Muslim":
+      self.output("War of Ideas odds are for Muslim countries.")
+      self.output("")
+      return
+    odds = self.odds(action, country, numRolls)
+    if action == "woi":
+      self.output("WoI in %s, roll modifier %+d:" % (country, odds.target))
+    else:
+      self.output("%s in %s, %d roll(s) succeeding on %d or less:" % (action.capitalize(), country, odds.rolls, odds.target))
+    for successes, chance in enumerate(odds.successes):
+      self.output("  %d success(es): %5.1f%%" % (successes, chance * 100))
+    for outcome, chance in odds.outcomes:
+      self.output("  %s: %5.1f%%" % (outcome, chance * 100))
+    self.output("")
+
+  def help_odds(self):
+    self.output("Exact odds of an operation: odds then jihad, recruit, plot, travel or woi, a country and optionally the number of rolls e.g. odds jihad Pakistan 3")
 
   def do_plot(self, rest):
     foundPlot = False
@@ -5156,9 +6986,9 @@ class Labyrinth(cmd.Cmd):
           self.outputToHistory("", False)
           self.outputToHistory("[[ Resolving Plots ]]", True)
         foundPlot = True
-        print("")
+        self.output("")
         plotType = self.getPlotTypeFromUser("Enter Plot type from %s: " % country)
-        print("")
+        self.output("")
         isBacklash = False
         if self.backlashInPlay and (self.map[country].culture != 'Non-Muslim'):
           isBacklash = self.getYesNoFromUser("Was this plot selected with backlash (y/n): ")
@@ -5169,10 +6999,10 @@ class Labyrinth(cmd.Cmd):
         govRolls = []
         if country == "United States":
           if plotType != "WMD":
-            postureRoll = random.randint(1,6)
-            usPrestigeRolls.append(random.randint(1,6))
-            usPrestigeRolls.append(random.randint(1,6))
-            usPrestigeRolls.append(random.randint(1,6))
+            postureRoll = self.dice.roll()
+            usPrestigeRolls.append(self.dice.roll())
+            usPrestigeRolls.append(self.dice.roll())
+            usPrestigeRolls.append(self.dice.roll())
         elif self.map[country].culture != "Non-Muslim":
           if country != "Iran":
             numRolls = 0
@@ -5181,20 +7011,20 @@ class Labyrinth(cmd.Cmd):
             else:
               numRolls = plotType
             for i in range(numRolls):
-              govRolls.append(random.randint(1,6))
+              govRolls.append(self.dice.roll())
         elif self.map[country].culture == "Non-Muslim":
-          postureRoll = random.randint(1,6)
+          postureRoll = self.dice.roll()
           if self.map[country].schengen:
             schChoices = []
             for cou in self.map:
               if cou != country and self.map[cou].schengen:
                 schChoices.append(cou)
-            schCountries.append(random.choice(schChoices))
+            schCountries.append(self.dice.choice(schChoices))
             schCountries.append(schCountries[0])
             while schCountries[0] == schCountries[1]:
-              schCountries[1] = random.choice(schChoices)
+              schCountries[1] = self.dice.choice(schChoices)
             for i in range(2):
-              schPostureRolls.append(random.randint(1,6))
+              schPostureRolls.append(self.dice.roll())
         self.resolvePlot(country, plotType, postureRoll, usPrestigeRolls, schCountries, schPostureRolls, govRolls, isBacklash)
     if not foundPlot:
       self.outputToHistory("", False)
@@ -5202,7 +7032,7 @@ class Labyrinth(cmd.Cmd):
     self.backlashInPlay = False
 
   def help_plot(self):
-    print("Use this command after the US Action Phase to resolve any unblocked plots.")
+    self.output("Use this command after the US Action Phase to resolve any unblocked plots.")
 
   def do_turn(self, rest):
     self.SaveTurn()
@@ -5224,19 +7054,13 @@ class Labyrinth(cmd.Cmd):
       self.prestige -= 1
       if self.prestige < 1:
         self.prestige = 1
-    self.outputToHistory("Islamic Rule - US Prestige now %d" % self.prestige, False)
-    worldPos = 0
-    for country in self.map:
-      if not (self.map[country].culture == "Shia-Mix" or self.map[country].culture == "Suni") and self.map[country].culture != "Iran" and self.map[country].name != "United States":
-        if self.map[country].posture == "Hard":
-          worldPos += 1
-        elif self.map[country].posture == "Soft":
-          worldPos -= 1
+    self.logEvent("prestige", None, "Islamic Rule - US Prestige now %d", self.prestige, lineFeed = False)
+    worldPos = self.worldPosture
     if (self.map["United States"].posture == "Hard" and worldPos >= 3) or (self.map["United States"].posture == "Soft" and worldPos <= -3):
       self.prestige += 1
       if self.prestige > 12:
         self.prestige = 12
-      self.outputToHistory("GWOT World posture is 3 and matches US - US Prestige now %d" % self.prestige, False)
+      self.logEvent("prestige", None, "GWOT World posture is 3 and matches US - US Prestige now %d", self.prestige, lineFeed = False)
     for event in self.lapsing:
       self.outputToHistory("%s has Lapsed." % event, False)
     self.lapsing = []
@@ -5266,8 +7090,19 @@ class Labyrinth(cmd.Cmd):
     self.turn += 1
     self.outputToHistory("---", False)
     self.outputToHistory("", False)
-    usCards = 0
-    jihadistCards = 0
+    jihadistCards, usCards = self.handSizes()
+    self.outputToHistory("Jihadist draws %d cards." % jihadistCards, False)
+    self.outputToHistory("US draws %d cards." % usCards, False)
+    if self.deckTracker is not None:
+      self.deckTracker.endTurn()
+      if not self.dealHands():
+        self.outputToHistory("Not enough cards left in the deck to deal both hands.", False)
+    self.outputToHistory("---", False)
+    self.outputToHistory("", False)
+    self.outputToHistory("[[ %d (Turn %s) ]]" % (self.startYear + (self.turn - 1), self.turn), False)
+
+  def handSizes(self):
+    '''(Jihadist, US) cards drawn for the next turn, from funding and the troops track.'''
     if self.funding >= 7:
       jihadistCards = 9
     elif self.funding >= 4:
@@ -5280,43 +7115,138 @@ class Labyrinth(cmd.Cmd):
       usCards = 8
     else:
       usCards = 7
-    self.outputToHistory("Jihadist draws %d cards." % jihadistCards, False)
-    self.outputToHistory("US draws %d cards." % usCards, False)
-    self.outputToHistory("---", False)
-    self.outputToHistory("", False)
-    self.outputToHistory("[[ %d (Turn %s) ]]" % (self.startYear + (self.turn - 1), self.turn), False)
+    return jihadistCards, usCards
+
+  def trackDeck(self, decks = 1):
+    '''Keep the deck and both hands in a DeckTracker, for games played without the cards.'''
+    self.deckTracker = DeckTracker(self.dice, len(self.deck), SCENARIO_REMOVED_CARDS.get(self.scenario, []), decks)
+    return self.deckTracker
+
+  def dealHands(self):
+    '''Deal both tracked hands, or nothing if the deck cannot fill them.'''
+    jihadistCards, usCards = self.handSizes()
+    if not self.deckTracker.canDraw(jihadistCards + usCards):
+      return False
+    self.deckTracker.draw("Jihadist", jihadistCards)
+    self.deckTracker.draw("US", usCards)
+    return True
 
   def help_turn(self):
-    print("Use this command at the end of the turn.")
+    self.output("Use this command at the end of the turn.")
 
   def help_undo(self):
-    print("Rolls back to last card played.")
+    self.output("Rolls back to last card played.")
 
   def do_undo(self, args):
-    self.undo = self.getYesNoFromUser("Undo to last card played? (y/n): ")
+    if not self.journal.undoStack:
+      self.output("Nothing to undo.")
+      self.output("")
+      return
+    if self.getYesNoFromUser("Undo to last card played? (y/n): "):
+      for entry in self.journal.undo():
+        self.output("Undid: %s" % entry.label)
+      self.output("")
+
+  def help_redo(self):
+    self.output("Replays the last card undone.")
+
+  def do_redo(self, args):
+    redone = self.journal.redo()
+    if not redone:
+      self.output("Nothing to redo.")
+    for entry in redone:
+      self.output("Redid: %s" % entry.label)
+    self.output("")
 
   def help_quit(self):
-    print("Quits game and prompt to save.")
+    self.output("Quits game and prompt to save.")
 
   def do_quit(self, args):
     if self.getYesNoFromUser("Save? (y/n): "):
-      print("Save suspend file.")
+      self.output("Save suspend file.")
       self.Save(SUSPEND_FILE)
 
-    print("Exiting.")
-
+    self.output("Exiting.")
+
+
+  def mapChecksum(self):
+    return zlib.crc32("\n".join(self.countryNames).encode("utf-8"))
+
+  def snapshot(self):
+    '''Pack the mutable game state into a compact versioned byte string.'''
+    out = SnapshotWriter()
+    out.pack(SNAPSHOT_HEADER, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(self.countryNames), self.mapChecksum())
+    flags = (1 if self.gameOver else 0) | (2 if self.backlashInPlay else 0)
+    out.pack(SNAPSHOT_TRACKERS, self.prestige, self.troops, self.cells, self.funding, self.scenario, self.ideology,
+      self.startYear, self.turn, self.uCard, self.jCard, flags, len(self.history))
+    out.string(self.phase)
+    out.strings(self.markers)
+    out.strings(self.lapsing)
+    for name in self.countryNames:
+      country = self.map[name]
+      govCode, govStr = encodeValue(country.governance, GOVERNANCE_INDEX)
+      alignCode, alignStr = encodeValue(country.alignment, ALIGNMENT_INDEX)
+      postureCode, postureStr = encodeValue(country.posture, POSTURE_INDEX)
+      out.pack(SNAPSHOT_COUNTRY, govCode, alignCode, postureCode, country.troops_stationed, country.activeCells,
+        country.sleeper_cells, country.aid, country.besieged, country.regimeChange, country.cadre, country.plots)
+      for s in (govStr, alignStr, postureStr):
+        if s is not None:
+          out.string(s)
+      out.strings(country.markers)
+    return out.getvalue()
+
+  def restore(self, data):
+    '''Restore a snapshot in place. History past the snapshot is dropped.'''
+    reader = SnapshotReader(data)
+    magic, version, numCountries, checksum = reader.unpack(SNAPSHOT_HEADER)
+    if magic != SNAPSHOT_MAGIC:
+      raise ValueError("Not a LWOTai save file.")
+    if version != SNAPSHOT_VERSION:
+      raise ValueError("Unsupported save file version %d." % version)
+    if numCountries != len(self.countryNames) or checksum != self.mapChecksum():
+      raise ValueError("Save file was made with a different map.")
+    (self.prestige, self.troops, self.cells, self.funding, self.scenario, self.ideology, self.startYear,
+      self.turn, self.uCard, self.jCard, flags, historyOffset) = reader.unpack(SNAPSHOT_TRACKERS)
+    self.gameOver = bool(flags & 1)
+    self.backlashInPlay = bool(flags & 2)
+    self.phase = reader.string()
+    self.markers = reader.strings()
+    self.lapsing = reader.strings()
+    self.history.truncate(historyOffset)
+    for name in self.countryNames:
+      country = self.map[name]
+      (govCode, alignCode, postureCode, country.troops_stationed, country.activeCells, country.sleeper_cells,
+        country.aid, country.besieged, country.regimeChange, country.cadre, country.plots) = reader.unpack(SNAPSHOT_COUNTRY)
+      country.governance = decodeValue(govCode, GOVERNANCE_CODES, reader)
+      country.alignment = decodeValue(alignCode, ALIGNMENT_CODES, reader)
+      country.posture = decodeValue(postureCode, POSTURE_CODES, reader)
+      country.markers = reader.strings()
 
   def Save(self, fname):
     f = open(fname,'wb')
-    pickle.dump("FIX SAVING",f,2)
+    f.write(self.snapshot())
     f.close()
 
-  def SaveUndo(self):
-    self.Save(UNDO_FILE)
+  def Load(self, fname):
+    f = open(fname,'rb')
+    self.restore(f.read())
+    f.close()
 
   def SaveTurn(self):
+    self.journal.mark(self.turn)
+    if not self.autoSave:
+      return
     turnfile = ROLLBACK_FILE + str(self.turn) + ".lwot"
-    self.Save(turnfile)
+    self.checkpointer.write(turnfile, self.snapshot())
+
+  def rollbackTo(self, turn):
+    if self.journal.canRollback(turn):
+      self.journal.rollback(turn)
+    else:
+      self.checkpointer.flush()
+      self.Load(ROLLBACK_FILE + str(turn) + ".lwot")
+      self.journal.reset()
+    self.journal.mark(turn)
 
   def do_roll(self, args):
     self.do_rollback(args)
@@ -5325,29 +7255,29 @@ class Labyrinth(cmd.Cmd):
     self.help_rollback()
 
   def help_rollback(self):
-    print("Roll back to any previous turn in the game.")
+    self.output("Roll back to any previous turn in the game.")
 
   def do_rollback(self, args):
-    self.rollturn = -1
     needTurn = True
     while needTurn:
+      lastturn = self.turn - 1
+      input = self.my_raw_input("Rollback to which turn valid turns are 0 through " + str(lastturn) + "? Q to cancel rollback: " )
       try:
-        lastturn = self.turn - 1
-        input = raw_input("Rollback to which turn valid turns are 0 through " + str(lastturn) + "? Q to cancel rollback: " )
-
         if input == "Q":
-          print("Cancel Rollback")
+          self.output("Cancel Rollback")
           break
         else:
           input = int(input)
           if input >= 0 and input <= lastturn:
-            self.rollturn = input
             needTurn = False
           else:
             raise
       except:
-        print("Entry error")
-        print("")
+        self.output("Entry error")
+        self.output("")
+    if not needTurn:
+      self.output("Rolling back to turn " + str(input))
+      self.rollbackTo(input)
 
 
 def getUserYesNoResponse(prompt):
@@ -5369,6 +7299,9 @@ def getUserYesNoResponse(prompt):
 def raw_input(prompt):
   return input(prompt)
 
+def emptySetup(app):
+  pass
+
 def main():
   print("")
   print("Labyrinth: The War on Terror AI Player")
@@ -5377,7 +7310,7 @@ def main():
   ideology = 0
   loadfile = 0
 
-  # Starting new session unlink undo save
+  # Remove any undo save left by older versions
   if os.path.exists(UNDO_FILE):
     os.remove(UNDO_FILE)
 
@@ -5437,43 +7370,12 @@ def main():
 
   else:
     # Load previous game save
-    f = open(SUSPEND_FILE,'rb')
-    app = pickle.load(f)
-    app.stdout = sys.stdout
-    f.close()
-
-
-  rollback = True
-  while rollback == True:
-
-    app.cmdloop()
-
-    # exit out of cmdloop when user quits, want to undo, or rollback - prevents issues dealing with save/reloading within class instance
-    if app.undo:
-      print("Undo to last turn")
-      f = open(UNDO_FILE,'rb')
-
-      app = pickle.load(f)
-      app.stdout = sys.stdout
-
-      f.close()
-    elif app.rollturn >= 0:
-      print("Rolling back to turn " + str(app.rollturn))
-      turnfile = ROLLBACK_FILE + str(app.rollturn) + '.lwot'
-      f = open(turnfile,'rb')
-
-      app = pickle.load(f)
-      app.stdout = sys.stdout
-
-      f.close()
-      # rollback invalidates undo save so delete it
-      if os.path.exists(UNDO_FILE):
-        os.remove(UNDO_FILE)
-
-    else:
-      rollback = False
-
+    app = Labyrinth(0, 0, emptySetup)
+    app.Load(SUSPEND_FILE)
+    app.journal.reset()
 
+  app.cmdloop()
+  app.checkpointer.flush()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,199 @@
+'''
+Monte Carlo sweeps of headless LWOTai games.
+
+Fans independent Simulator games out over a process pool for every
+scenario/ideology pair and streams the GameResults into an Aggregator that
+reports win rates, game length and prestige/funding trajectories with 95%
+confidence intervals.
+
+  python montecarlo.py -n 1000 -w 32
+'''
+
+import sys
+import math
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from simulator import Simulator, SimpleUSPolicy, HeuristicUSBot
+
+SCENARIOS = (1, 2, 3, 4)
+IDEOLOGIES = (1, 2, 3, 4, 5)
+US_POLICIES = {"simple": SimpleUSPolicy, "heuristic": HeuristicUSBot}
+SCENARIO_NAMES = {1: "Let's Roll!", 2: "You Can Call Me Al", 3: "Anaconda", 4: "Mission Accomplished?"}
+Z95 = 1.959964
+
+def gameSeed(baseSeed, scenario, ideology, game):
+  '''Seed for one game, independent of worker count and scheduling.'''
+  return ((baseSeed * 10 + scenario) * 10 + ideology) * 1000003 + game
+
+def wilsonInterval(successes, trials, z = Z95):
+  '''Wilson score interval for a binomial proportion.'''
+  if trials == 0:
+    return (0.0, 0.0)
+  p = float(successes) / trials
+  denom = 1 + z * z / trials
+  centre = (p + z * z / (2 * trials)) / denom
+  half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+  return (max(0.0, centre - half), min(1.0, centre + half))
+
+class RunningStat:
+  '''Streaming mean and variance (Welford).'''
+
+  def __init__(self):
+    self.n = 0
+    self.mean = 0.0
+    self.m2 = 0.0
+
+  def add(self, x):
+    self.n += 1
+    delta = x - self.mean
+    self.mean += delta / self.n
+    self.m2 += delta * (x - self.mean)
+
+  def stdev(self):
+    if self.n < 2:
+      return 0.0
+    return math.sqrt(self.m2 / (self.n - 1))
+
+  def halfWidth(self, z = Z95):
+    if self.n < 2:
+      return 0.0
+    return z * self.stdev() / math.sqrt(self.n)
+
+class CellStats:
+  '''Accumulated results for one scenario/ideology pair.'''
+
+  def __init__(self):
+    self.games = 0
+    self.wins = {"US": 0, "Jihadist": 0, "Draw": 0}
+    self.reasons = {}
+    self.errors = 0
+    self.turns = RunningStat()
+    self.prestige = []
+    self.funding = []
+
+  def add(self, result):
+    self.games += 1
+    self.wins[result.winner] = self.wins.get(result.winner, 0) + 1
+    self.reasons[result.reason] = self.reasons.get(result.reason, 0) + 1
+    self.errors += result.errors
+    self.turns.add(result.turns)
+    self.addTrajectory(self.prestige, result.prestige)
+    self.addTrajectory(self.funding, result.funding)
+
+  def addTrajectory(self, stats, values):
+    while len(stats) < len(values):
+      stats.append(RunningStat())
+    for i in range(len(values)):
+      stats[i].add(values[i])
+
+class Aggregator:
+  '''Collects GameResults as they stream in from the workers.'''
+
+  def __init__(self):
+    self.cells = {}
+
+  def add(self, result):
+    key = (result.scenario, result.ideology)
+    if key not in self.cells:
+      self.cells[key] = CellStats()
+    self.cells[key].add(result)
+
+  def games(self):
+    return sum(cell.games for cell in self.cells.values())
+
+  def summary(self):
+    '''Per scenario/ideology statistics as plain data.'''
+    summary = {}
+    for key in sorted(self.cells):
+      cell = self.cells[key]
+      summary[key] = {
+        "games": cell.games,
+        "errors": cell.errors,
+        "reasons": dict(cell.reasons),
+        "winRate": dict((side, (float(wins) / cell.games, wilsonInterval(wins, cell.games))) for side, wins in cell.wins.items()),
+        "turns": (cell.turns.mean, cell.turns.halfWidth()),
+        "prestige": [(s.mean, s.halfWidth(), s.n) for s in cell.prestige],
+        "funding": [(s.mean, s.halfWidth(), s.n) for s in cell.funding],
+      }
+    return summary
+
+  def report(self):
+    '''Human readable report of the sweep.'''
+    lines = []
+    for key, cell in sorted(self.summary().items()):
+      scenario, ideology = key
+      lines.append("Scenario %d (%s), Ideology %d - %d games, %d card errors" % (scenario, SCENARIO_NAMES.get(scenario, "?"), ideology, cell["games"], cell["errors"]))
+      for side in ("US", "Jihadist", "Draw"):
+        rate, (low, high) = cell["winRate"][side]
+        lines.append("   %-8s wins: %5.1f%%  (95%% CI %5.1f%% - %5.1f%%)" % (side, rate * 100, low * 100, high * 100))
+      lines.append("   Game length: %.2f +/- %.2f turns" % cell["turns"])
+      for name in ("prestige", "funding"):
+        track = ", ".join("%.1f+/-%.1f" % (mean, half) for mean, half, n in cell[name])
+        lines.append("   %-8s by turn: %s" % (name.capitalize(), track))
+      lines.append("")
+    return "\n".join(lines)
+
+def playGames(scenario, ideology, seeds, maxTurns = 20, policyClass = SimpleUSPolicy, decks = 1):
+  '''Worker entry point: play one chunk of games and return the results.'''
+  return [Simulator(scenario, ideology, seed, policyClass(), maxTurns, decks = decks).run() for seed in seeds]
+
+def makeTasks(gamesPerCell, scenarios, ideologies, baseSeed, chunkSize):
+  tasks = []
+  for scenario in scenarios:
+    for ideology in ideologies:
+      seeds = [gameSeed(baseSeed, scenario, ideology, game) for game in range(gamesPerCell)]
+      for i in range(0, len(seeds), chunkSize):
+        tasks.append((scenario, ideology, seeds[i:i + chunkSize]))
+  return tasks
+
+def runSweep(gamesPerCell, scenarios = SCENARIOS, ideologies = IDEOLOGIES, workers = None, baseSeed = 0,
+    maxTurns = 20, policyClass = SimpleUSPolicy, chunkSize = 25, aggregator = None, progress = None, decks = 1):
+  '''Play gamesPerCell games for each scenario/ideology pair and aggregate them.
+
+  workers = 1 plays in this process; otherwise a process pool of that many
+  workers (default one per CPU) is used. Results do not depend on workers.
+  Each game deals through the deck decks times before it is exhausted.
+  '''
+  aggregator = aggregator or Aggregator()
+  tasks = makeTasks(gamesPerCell, scenarios, ideologies, baseSeed, chunkSize)
+  if workers == 1:
+    for scenario, ideology, seeds in tasks:
+      for result in playGames(scenario, ideology, seeds, maxTurns, policyClass, decks):
+        aggregator.add(result)
+      if progress:
+        progress(aggregator)
+    return aggregator
+  with ProcessPoolExecutor(max_workers = workers) as pool:
+    futures = [pool.submit(playGames, scenario, ideology, seeds, maxTurns, policyClass, decks) for scenario, ideology, seeds in tasks]
+    for future in as_completed(futures):
+      for result in future.result():
+        aggregator.add(result)
+      if progress:
+        progress(aggregator)
+  return aggregator
+
+def main(argv = None):
+  parser = argparse.ArgumentParser(description = "Monte Carlo sweep of headless LWOTai games.")
+  parser.add_argument("-n", "--games", type = int, default = 100, help = "games per scenario/ideology pair")
+  parser.add_argument("-w", "--workers", type = int, default = None, help = "worker processes (default: one per CPU)")
+  parser.add_argument("-s", "--seed", type = int, default = 0, help = "base seed")
+  parser.add_argument("-t", "--max-turns", type = int, default = 20, help = "turn limit per game")
+  parser.add_argument("--scenarios", type = int, nargs = "+", default = list(SCENARIOS))
+  parser.add_argument("--ideologies", type = int, nargs = "+", default = list(IDEOLOGIES))
+  parser.add_argument("-d", "--decks", type = int, choices = (1, 2, 3), default = 1, help = "passes through the deck per game")
+  parser.add_argument("--us", choices = sorted(US_POLICIES), default = "simple", help = "US policy to play against")
+  args = parser.parse_args(argv)
+  total = args.games * len(args.scenarios) * len(args.ideologies)
+
+  def progress(aggregator):
+    sys.stderr.write("\r%d/%d games" % (aggregator.games(), total))
+    sys.stderr.flush()
+
+  aggregator = runSweep(args.games, args.scenarios, args.ideologies, args.workers, args.seed, args.max_turns,
+    policyClass = US_POLICIES[args.us], progress = progress, decks = args.decks)
+  sys.stderr.write("\n")
+  print(aggregator.report())
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,146 @@
+'''
+Non-blocking game sessions for LWOTai.
+
+A Session runs console commands against a Labyrinth without ever waiting on
+input. When a command asks a question, submit() returns a DecisionRequired
+holding the prompt and the game is left as it was before the command. Each
+answer() replays the command from its start with the answers so far, the dice
+feeding back the draws already made, until the command finishes. No call
+blocks, so one process can host any number of sessions from a single thread or
+event loop.
+
+  from session import Session
+  session = Session(Labyrinth(1, 1, sink = NullSink()))
+  decision = session.submit("j 88")
+  while decision:
+    decision = session.answer(reply(decision.prompt))
+  lines = session.read()
+'''
+
+from lwotai import BufferedSink, EventFeed
+
+class DecisionRequired(Exception):
+  '''A command needs an answer that has not arrived yet.'''
+
+  def __init__(self, prompt):
+    Exception.__init__(self, prompt)
+    self.prompt = prompt
+
+class Session:
+  '''One game driven by submitted commands and answers instead of a console.
+
+  Replaying means a command with n questions runs n + 1 times, which costs
+  little next to a human's answer. The game's output is collected for read()
+  and its event feed, if any, only sees the events of finished commands.
+  '''
+
+  def __init__(self, app):
+    self.app = app
+    self.app.sink = BufferedSink()
+    self.app.my_raw_input = self.input
+    # Save files would be shared by every session in the process.
+    self.app.autoSave = False
+    self.line = None
+    self.answers = []
+    self.used = 0
+    self.draws = []
+    self.start = None
+    self.sent = 0
+    self.output = []
+    self.pending = None
+    self.finished = False
+
+  def submit(self, line):
+    '''Run a command. Returns a DecisionRequired, or None once the command has finished.'''
+    if self.pending is not None:
+      raise ValueError("Waiting for an answer to: %s" % self.pending.prompt)
+    self.line = line
+    self.answers = []
+    self.draws = []
+    self.sent = 0
+    tracker = self.app.deckTracker
+    self.start = (self.app.snapshot(), tracker.copy(self.app.dice) if tracker is not None else None)
+    return self.resume()
+
+  def answer(self, text):
+    '''Answer the pending decision and carry on with the command.'''
+    if self.pending is None:
+      raise ValueError("No decision is pending.")
+    self.answers.append(text)
+    return self.resume()
+
+  def read(self):
+    '''Output lines produced since the last read.'''
+    lines = self.output
+    self.output = []
+    return lines
+
+  def play(self, line):
+    '''Generator form of submit: yields each DecisionRequired and resumes with the answer sent back.'''
+    decision = self.submit(line)
+    while decision is not None:
+      decision = self.answer((yield decision))
+
+  async def playAsync(self, line, ask):
+    '''Run a command, awaiting ask(prompt) for each answer.'''
+    decision = self.submit(line)
+    while decision is not None:
+      decision = self.answer(await ask(decision.prompt))
+
+  def input(self, prompt):
+    '''Stand in for my_raw_input: the next answer given, or a DecisionRequired.'''
+    if self.used < len(self.answers):
+      self.used += 1
+      return self.answers[self.used - 1]
+    raise DecisionRequired(prompt)
+
+  def resume(self):
+    app = self.app
+    self.pending = None
+    self.used = 0
+    app.sink.clear()
+    feed = app.eventFeed
+    if feed is not None:
+      app.eventFeed = EventFeed(app)
+    app.dice.record()
+    app.dice.replay(self.draws)
+    try:
+      line = app.precmd(self.line)
+      stop = app.onecmd(line)
+      stop = app.postcmd(stop, line)
+    except DecisionRequired as decision:
+      self.draws = app.dice.stopRecording()
+      self.rewind()
+      app.eventFeed = feed
+      self.collect()
+      self.pending = decision
+      return decision
+    except:
+      app.dice.stopRecording()
+      app.eventFeed = feed
+      raise
+    app.dice.stopRecording()
+    if feed is not None:
+      for event in app.eventFeed.drain():
+        feed.send(event)
+      app.eventFeed = feed
+    self.collect()
+    self.finished = bool(stop)
+    self.line = None
+    self.start = None
+    return None
+
+  def rewind(self):
+    '''Put the game back as it was before the command.'''
+    snapshot, tracker = self.start
+    self.app.journal.touched = None
+    self.app.restore(snapshot)
+    if tracker is not None:
+      self.app.deckTracker = tracker.copy(self.app.dice)
+
+  def collect(self):
+    '''Keep the lines this run printed beyond those an earlier run of the command already printed.'''
+    lines = self.app.sink.lines
+    self.output.extend(lines[self.sent:])
+    self.sent = max(self.sent, len(lines))
+    self.app.sink.clear()
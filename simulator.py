@@ -0,0 +1,458 @@
+'''
+Headless batch simulation for LWOTai.
+
+Drives the Jihadist AI flowchart in Labyrinth against a pluggable US policy
+with a shuffled deck, automatic plot and end of turn phases and all console
+output suppressed. Each game returns a compact GameResult record.
+
+  from simulator import Simulator, HeuristicUSBot
+  result = Simulator(scenario = 1, ideology = 1, seed = 42).run()
+  result = Simulator(1, 1, 42, HeuristicUSBot()).run()
+'''
+
+from collections import namedtuple
+
+from lwotai import Labyrinth, Dice, NullSink, Alignment, Governance, SCENARIO_REMOVED_CARDS, DISCARD_PILE
+
+# Prompts the engine may ask more than this many times while resolving a single
+# card are treated as a stuck input loop.
+MAX_PROMPTS_PER_CARD = 50
+
+GameResult = namedtuple("GameResult", [
+  "scenario", "ideology", "seed",
+  "winner",       # "US", "Jihadist" or "Draw"
+  "reason",       # what ended the game
+  "turns",        # turns started
+  "cardsPlayed",
+  "prestige",     # prestige at the start of each turn and at game end
+  "funding",      # funding at the start of each turn and at game end
+  "errors",       # card plays aborted by an engine exception
+])
+
+class SimulationError(Exception):
+  pass
+
+def _isAlly(country):
+  return country.alignment == "Ally" or country.alignment == Alignment.ALLY
+
+def _isNeutral(country):
+  return country.alignment == "Neutral" or country.alignment == Alignment.NEUTRAL
+
+def _isMuslim(country):
+  return country.culture != "Non-Muslim"
+
+class USPolicy:
+  '''Interface for the US side of a simulated game.'''
+
+  def playCard(self, app, cardNum):
+    '''Use a US card. Called once per card, after any opponent event.
+
+    Return True if the card was played for its own event, so the deck puts
+    it where the event says; otherwise it is discarded.
+    '''
+    raise NotImplementedError
+
+  def answer(self, app, prompt):
+    '''Answer an engine prompt asked while the US acts, or None to pass.'''
+    return None
+
+class SimpleUSPolicy(USPolicy):
+  '''Plays every card for Ops: alert, then disrupt, then War of Ideas.'''
+
+  def playCard(self, app, cardNum):
+    ops = app.deck[str(cardNum)].ops
+    if ops >= 3:
+      plotCountry = self.alertTarget(app)
+      if plotCountry:
+        app.handleAlert(plotCountry)
+        return
+    disruptCountry = self.disruptTarget(app, ops)
+    if disruptCountry:
+      app.handleDisrupt(disruptCountry)
+      return
+    woiCountry = self.woiTarget(app, ops)
+    if woiCountry:
+      app.testCountry(woiCountry)
+      if app.map[woiCountry].governance <= ops:
+        roll = app.modifiedWoIRoll(app.dice.roll(), woiCountry)
+        app.handleMuslimWoI(roll, woiCountry)
+      return
+    postureCountry = self.postureTarget(app)
+    if postureCountry:
+      app.testCountry(postureCountry)
+      app.executeNonMuslimWOI(postureCountry, app.dice.roll())
+
+  def alertTarget(self, app):
+    if app.map["United States"].plots > 0:
+      return "United States"
+    best = None
+    for country in app.map:
+      if app.map[country].plots > 0:
+        if not best or app.countryResources(country) > app.countryResources(best):
+          best = country
+    return best
+
+  def disruptTarget(self, app, ops):
+    best = None
+    for country in app.map:
+      c = app.map[country]
+      if c.totalCells(False) <= 0:
+        continue
+      if "FATA" in c.markers and c.regimeChange == 0:
+        continue
+      if not (c.troops() > 0 or not _isMuslim(c) or _isAlly(c)):
+        continue
+      if c.governance > ops:
+        continue
+      if not best or c.totalCells(False) > app.map[best].totalCells(False):
+        best = country
+    return best
+
+  def woiTarget(self, app, ops):
+    best = None
+    for country in app.map:
+      c = app.map[country]
+      if not _isMuslim(c) or c.culture == "Iran":
+        continue
+      if c.governance == Governance.TEST:
+        if not best:
+          best = country
+        continue
+      if not (_isAlly(c) or _isNeutral(c)):
+        continue
+      if c.governance == Governance.GOOD or c.governance > ops:
+        continue
+      if not best or app.countryResources(country) > app.countryResources(best):
+        best = country
+    return best
+
+  def postureTarget(self, app):
+    usPosture = app.map["United States"].posture
+    for country in app.map:
+      c = app.map[country]
+      if country != "United States" and not _isMuslim(c) and c.posture != usPosture:
+        return country
+    return None
+
+  def answer(self, app, prompt):
+    if "Enter a or s" in prompt:
+      return "a"
+    if "Enter aa" in prompt:
+      return "aa"
+    if "Enter as" in prompt:
+      return "as"
+    if "(done to stop" in prompt:
+      return "done"
+    if "non-US country to set its Posture" in prompt:
+      return self.postureTarget(app) or "United Kingdom"
+    return None
+
+class HeuristicUSBot(SimpleUSPolicy):
+  '''Rule-based US player that spends each card on the first operation that applies.
+
+  A US card whose event is playable is played for the event, unless there is
+  a plot in the United States to alert with its Ops. Otherwise, in order:
+  alert a plot in the United States, regime change an Islamist Rule
+  country while Hard, withdraw from Regime Change countries when overstretched
+  and Soft, alert any other plot, deploy troops so an Ally with several cells
+  can be disrupted two at a time, disrupt, War of Ideas and finally set a
+  non-Muslim posture. Targets are filtered with Labyrinth.usOpError and
+  carried out through the handle methods, so no engine prompt is asked.
+  '''
+
+  def playCard(self, app, cardNum):
+    card = app.deck[str(cardNum)]
+    ops = card.ops
+    usPlot = ops >= 3 and app.map["United States"].plots > 0
+    if card.type == "US" and not usPlot and card.playable("US", app):
+      card.playEvent("US", app)
+      return True
+    if ops >= 3:
+      if usPlot:
+        app.handleAlert("United States")
+        return
+      if self.regimeChange(app) or self.withdraw(app):
+        return
+      plotCountry = self.alertTarget(app)
+      if plotCountry:
+        app.handleAlert(plotCountry)
+        return
+    if self.deploy(app, ops):
+      return
+    disruptCountry = self.disruptTarget(app, ops)
+    if disruptCountry:
+      app.handleDisrupt(disruptCountry)
+      return
+    woiCountry = self.woiTarget(app, ops)
+    if woiCountry:
+      app.testCountry(woiCountry)
+      if app.map[woiCountry].governance <= ops:
+        app.handleWoI(woiCountry, app.dice.roll())
+      return
+    postureCountry = self.postureTarget(app)
+    if postureCountry:
+      app.testCountry(postureCountry)
+      app.handleWoI(postureCountry, app.dice.roll())
+
+  def answer(self, app, prompt):
+    if "Schengen country" in prompt:
+      return self.schengenTarget(app)
+    return SimpleUSPolicy.answer(self, app, prompt)
+
+  def schengenTarget(self, app):
+    '''A Schengen country, preferring one whose posture differs from the US.'''
+    schengen = [country for country in app.map if app.map[country].schengen]
+    usPosture = app.map["United States"].posture
+    for country in schengen:
+      if app.map[country].posture != usPosture:
+        return country
+    return schengen[0]
+
+  def troopSource(self, app, needed):
+    '''Where to take needed troops from: the track, then the country with the most to spare.'''
+    if app.troops > needed:
+      return "track"
+    best = None
+    for country in app.map:
+      c = app.map[country]
+      spare = c.troops() - (5 + c.totalCells(True) if c.regimeChange else 0)
+      if spare > needed and (not best or spare > best[1]):
+        best = (country, spare)
+    return best[0] if best else None
+
+  def regimeChange(self, app):
+    targets = [country for country in app.map if not app.usOpError("regime", country)]
+    if not targets:
+      return False
+    where = max(targets, key = app.countryResources)
+    howMany = max(6, 5 + app.map[where].totalCells(True))
+    moveFrom = self.troopSource(app, howMany)
+    if not moveFrom:
+      return False
+    rolls = (app.dice.roll(), app.dice.roll(), app.dice.roll())
+    app.handleRegimeChange(where, moveFrom, howMany, app.dice.roll(), rolls)
+    return True
+
+  def withdraw(self, app):
+    if app.troops >= 5:
+      return False
+    targets = [country for country in app.map if not app.usOpError("withdraw", country) and app.map[country].troops() > 0]
+    if not targets:
+      return False
+    moveFrom = max(targets, key = lambda country: app.map[country].troops())
+    rolls = (app.dice.roll(), app.dice.roll(), app.dice.roll())
+    app.handleWithdraw(moveFrom, "track", app.map[moveFrom].troops(), rolls)
+    return True
+
+  def disruptTarget(self, app, ops):
+    best = None
+    for country in app.map:
+      c = app.map[country]
+      if app.usOpError("disrupt", country) or c.totalCells(False) <= 0 or c.governance > ops:
+        continue
+      if not best or c.totalCells(False) > app.map[best].totalCells(False):
+        best = country
+    return best
+
+  def deploy(self, app, ops):
+    '''Bring the Muslim Ally with the most cells, two or more, up to two troops from the track.'''
+    best = None
+    for country in app.map:
+      c = app.map[country]
+      if not _isAlly(c) or not _isMuslim(c) or c.troops() >= 2 or c.governance > ops:
+        continue
+      if c.totalCells(False) >= 2 and (not best or c.totalCells(False) > app.map[best].totalCells(False)):
+        best = country
+    if not best:
+      return False
+    # Keep the troop track out of Overstretch.
+    howMany = 2 - app.map[best].troops()
+    if app.troops - howMany < 5:
+      return False
+    return app.handleDeploy("track", best, howMany)
+
+class Simulator:
+  '''Plays one game of Labyrinth without a human.'''
+
+  def __init__(self, scenario = 1, ideology = 1, seed = None, usPolicy = None, maxTurns = 20, strict = False, eventStream = None, profiler = None, decks = 1):
+    self.scenario = scenario
+    self.ideology = ideology
+    self.seed = seed
+    self.usPolicy = usPolicy or SimpleUSPolicy()
+    self.maxTurns = maxTurns
+    self.strict = strict
+    self.eventStream = eventStream
+    self.profiler = profiler
+    self.decks = decks    # passes through the deck, reshuffling the discards between them
+    self.app = None
+    self.acting = None
+    self.firstCardOfPhase = False
+    self.promptCount = 0
+    self.cardsPlayed = 0
+    self.errors = 0
+    self.prestigeTrack = []
+    self.fundingTrack = []
+
+  def run(self):
+    '''Play the game to completion and return its GameResult.'''
+    self.app = Labyrinth(self.scenario, self.ideology, dice = Dice(self.seed), sink = NullSink())
+    self.app.autoSave = False
+    self.app.history.enabled = False
+    self.app.my_raw_input = self.respond
+    self.app.profiler = self.profiler
+    self.app.trackDeck(self.decks)
+    if self.eventStream is not None:
+      self.app.openEventFeed(self.eventStream)
+    winner, reason = self.playGame()
+    self.recordTrackers()
+    return GameResult(self.scenario, self.ideology, self.seed, winner, reason, self.app.turn,
+      self.cardsPlayed, tuple(self.prestigeTrack), tuple(self.fundingTrack), self.errors)
+
+  def playGame(self):
+    tracker = self.app.deckTracker
+    if not self.app.dealHands():
+      return self.adjudicate("Deck exhausted")
+    while True:
+      self.recordTrackers()
+      while tracker.hands["Jihadist"] or tracker.hands["US"]:
+        self.acting = "Jihadist"
+        self.firstCardOfPhase = True
+        for i in range(2):
+          if tracker.hands["Jihadist"]:
+            self.playJihadistCard(tracker.take("Jihadist"))
+            self.firstCardOfPhase = False
+            result = self.victory()
+            if result:
+              return result
+        self.acting = "US"
+        for i in range(2):
+          if tracker.hands["US"]:
+            self.playUSCard(tracker.take("US"))
+            result = self.victory()
+            if result:
+              return result
+        self.acting = "Jihadist"
+        self.guarded(self.app.do_plot, "")
+        result = self.victory()
+        if result:
+          return result
+      if self.app.turn >= self.maxTurns:
+        return self.adjudicate("Turn limit")
+      self.app.do_turn("")
+      if not (tracker.hands["Jihadist"] or tracker.hands["US"]):
+        self.recordTrackers()
+        return self.adjudicate("Deck exhausted")
+
+  def hand(self, side):
+    '''Cards left in side's hand, in the order they will be played.'''
+    if self.app.deckTracker is None:
+      return []
+    return self.app.deckTracker.hands[side]
+
+  def discards(self):
+    if self.app.deckTracker is None:
+      return []
+    return self.app.deckTracker.cards(DISCARD_PILE)
+
+  def playJihadistCard(self, cardNum):
+    card = self.app.deck[str(cardNum)]
+    self.app.outputToHistory("== Jihadist plays %s - %d Ops ==" % (card.name, card.ops), True)
+    eventPlayed = bool(self.guarded(self.app.aiFlowChartTop, cardNum))
+    if card.type == "US" and self.guarded(card.playable, "US", self.app):
+      self.acting = "US"
+      self.guarded(card.playEvent, "US", self.app)
+      self.acting = "Jihadist"
+      eventPlayed = True
+    self.discard(cardNum, eventPlayed)
+
+  def playUSCard(self, cardNum):
+    card = self.app.deck[str(cardNum)]
+    self.app.outputToHistory("== US plays %s - %d Ops ==" % (card.name, card.ops), True)
+    eventPlayed = False
+    if card.type == "Jihadist" and self.guarded(card.playable, "Jihadist", self.app):
+      self.acting = "Jihadist"
+      self.guarded(card.playEvent, "Jihadist", self.app)
+      self.acting = "US"
+      eventPlayed = True
+    if self.guarded(self.usPolicy.playCard, self.app, cardNum):
+      eventPlayed = True
+    self.discard(cardNum, eventPlayed)
+
+  def discard(self, cardNum, eventPlayed):
+    self.cardsPlayed += 1
+    self.app.deckTracker.played(self.app.deck[str(cardNum)], eventPlayed)
+
+  def guarded(self, func, *args):
+    '''Call into the engine, counting and skipping card bugs unless strict.'''
+    self.promptCount = 0
+    try:
+      return func(*args)
+    except Exception:
+      if self.strict:
+        raise
+      self.errors += 1
+      return None
+
+  def respond(self, prompt):
+    '''Stand in for my_raw_input while the simulation runs.'''
+    self.promptCount += 1
+    if self.promptCount > MAX_PROMPTS_PER_CARD:
+      raise SimulationError("No valid answer for prompt: %s" % prompt)
+    if self.acting == "US":
+      answer = self.usPolicy.answer(self.app, prompt)
+      if answer is not None:
+        return answer
+    return self.defaultAnswer(prompt)
+
+  def defaultAnswer(self, prompt):
+    if "1st card of the Jihadist Action Phase" in prompt:
+      return "y" if self.firstCardOfPhase else "n"
+    if "number of the next Jihadist card" in prompt:
+      return str(self.hand("Jihadist")[0]) if self.hand("Jihadist") else "none"
+    if "both sides have cards remaining" in prompt:
+      return "y" if self.hand("Jihadist") and self.hand("US") else "n"
+    if "Jihadist event cards in the discard pile" in prompt:
+      for cardNum in self.discards():
+        if self.app.deck[str(cardNum)].type == "Jihadist":
+          return "y"
+      return "n"
+    if "Plot type" in prompt:
+      return str(self.app.dice.randint(1,3))
+    if "Posture" in prompt and "Roll" not in prompt and "roll" not in prompt:
+      if self.acting == "US":
+        return "h" if self.app.map["United States"].posture == "Hard" else "s"
+      return "s" if self.app.map["United States"].posture == "Hard" else "h"
+    if "roll" in prompt or "Roll" in prompt:
+      return "r"
+    if "(y/n)" in prompt:
+      return "n"
+    if "(enter e or o)" in prompt:
+      return "e"
+    return ""
+
+  def recordTrackers(self):
+    self.prestigeTrack.append(self.app.prestige)
+    self.fundingTrack.append(self.app.funding)
+
+  def victory(self):
+    '''Return (winner, reason) once an automatic victory condition holds.'''
+    if self.app.gameOver:
+      return ("Jihadist", "WMD in United States")
+    if self.app.num_good_resources() >= 12:
+      return ("US", "Good Resources")
+    if self.app.num_islamist_resources() >= 6:
+      return ("Jihadist", "Islamist Resources")
+    return None
+
+  def adjudicate(self, reason):
+    goodC = self.app.num_good_countries()
+    islamC = self.app.num_poor_countries()
+    if goodC > islamC:
+      return ("US", reason)
+    elif islamC > goodC:
+      return ("Jihadist", reason)
+    return ("Draw", reason)
+
+def simulate(scenario = 1, ideology = 1, seed = None, usPolicy = None, maxTurns = 20, decks = 1):
+  '''Play a single headless game and return its GameResult.'''
+  return Simulator(scenario, ideology, seed, usPolicy, maxTurns, decks = decks).run()
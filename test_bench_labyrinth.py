@@ -0,0 +1,46 @@
+'''
+Tests for the LWOTai benchmark suite.
+'''
+from bench_labyrinth import runBenchmarks, compare, report, toJson, main, BenchResult, BENCHMARKS
+import os
+import json
+import tempfile
+import unittest
+
+class benchmarks(unittest.TestCase):
+  '''Test bench_labyrinth'''
+
+  def testEveryBenchmarkRuns(self):
+    for name, setup in BENCHMARKS:
+      setup()()
+
+  def testRun(self):
+    results = runBenchmarks(["isadjacent", "majorJihad"], 0.01, 1)
+    self.assertEqual([r.name for r in results], ["isAdjacent", "majorJihadPossible"])
+    for r in results:
+      self.assertTrue(r.opsPerSec > 0)
+      self.assertTrue(r.peakBytes >= 0)
+
+  def testCompare(self):
+    baseline = toJson([BenchResult("a", 100.0, 0), BenchResult("b", 100.0, 0)])
+    rows = compare([BenchResult("a", 90.0, 0), BenchResult("b", 50.0, 0), BenchResult("c", 1.0, 0)], baseline)
+    self.assertEqual(rows, [("a", 0.9, False), ("b", 0.5, True)])
+    self.assertTrue("REGRESSION" in report([BenchResult("b", 50.0, 0)], rows))
+
+  def testSaveAndCompare(self):
+    fd, path = tempfile.mkstemp(suffix = ".json")
+    os.close(fd)
+    try:
+      self.assertEqual(main(["isAdjacent", "-t", "0.01", "-r", "1", "--save", path]), 0)
+      with open(path) as f:
+        saved = json.load(f)
+      self.assertTrue("isAdjacent" in saved["benchmarks"])
+      saved["benchmarks"]["isAdjacent"]["opsPerSec"] *= 1000
+      with open(path, "w") as f:
+        json.dump(saved, f)
+      self.assertEqual(main(["isAdjacent", "-t", "0.01", "-r", "1", "--compare", path]), 1)
+    finally:
+      os.remove(path)
+
+if __name__ == "__main__":
+  unittest.main()
@@ -4,7 +4,18 @@ Mike Houser, 2011
 
 08112011.1
 '''
-from lwotai import Labyrinth
+from lwotai import Labyrinth, Dice, Checkpointer, loadData, CARD_PLAYABLE, CARD_EVENTS, History, HISTORY_LIMIT
+from lwotai import NullSink, BufferedSink, TerminalSink, JsonLinesSink, Alignment, rollCounts
+from lwotai import successOdds, jihadOdds, woiOdds, ODDS_CACHE
+from lwotai import Validator, InvariantError, piecesInTestedCountries, Profiler
+from lwotai import DeckTracker, DRAW_PILE, DISCARD_PILE, REMOVED_PILE, LAPSING_PILE, IN_PLAY
+import lwotai
+import pstats
+import tempfile
+from fractions import Fraction
+import io
+import os
+import json
 import unittest
 
 def testScenarioSetup(self):
@@ -114,6 +125,13 @@ def testBlankScenarioSetup(self):
   self.funding = 5
   self.cells = 11
 
+def setUpModule():
+  # Keep the card tests that end a turn from writing turn files into the working directory.
+  Labyrinth.autoSave = False
+
+def tearDownModule():
+  Labyrinth.autoSave = True
+
 class Scenarios(unittest.TestCase):
   '''Scenarios'''
 
@@ -6215,6 +6233,19 @@ class isAdjacent(unittest.TestCase):
     self.assertTrue(app.isAdjacent("Lebanon","France"))
     self.assertFalse(app.isAdjacent("United States","Lebanon"))
 
+  def testPatriotAct(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    self.assertTrue(app.isAdjacent("United States","Philippines"))
+    self.assertTrue(app.isAdjacent("United States","United Kingdom"))
+    app.markers.append("Patriot Act")
+    self.assertTrue(app.isAdjacent("United States","Canada"))
+    self.assertTrue(app.isAdjacent("Canada","United States"))
+    self.assertFalse(app.isAdjacent("United States","Philippines"))
+    self.assertFalse(app.isAdjacent("United Kingdom","United States"))
+    self.assertTrue(app.isAdjacent("Germany","Spain"))
+    app.markers.remove("Patriot Act")
+    self.assertTrue(app.isAdjacent("United States","Philippines"))
+
 class countryResources(unittest.TestCase):
   '''Test countryResources'''
 
@@ -6247,6 +6278,16 @@ class countryDistance(unittest.TestCase):
     self.assertTrue(app.countryDistance("Thailand","United States") == 2)
     self.assertTrue(app.countryDistance("Russia","Morocco") == 2)
 
+  def testPatriotAct(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    app.markers.append("Patriot Act")
+    self.assertTrue(app.countryDistance("United States","Canada") == 1)
+    self.assertTrue(app.countryDistance("United States","United Kingdom") == 2)
+    self.assertTrue(app.countryDistance("Thailand","United States") == 6)
+    self.assertTrue(app.countryDistance("Russia","Morocco") == 2)
+    app.markers.remove("Patriot Act")
+    self.assertTrue(app.countryDistance("Thailand","United States") == 2)
+
 class card1(unittest.TestCase):
   '''Backlash'''
 
@@ -9984,5 +10025,1004 @@ class cardHundredTwenty(unittest.TestCase):
     app.deck["120"].playEvent("US", app)
     self.assertTrue(app.prestige != 7)
 
+class dice(unittest.TestCase):
+  '''Test Dice'''
+
+  def testSeeded(self):
+    first = Dice(7)
+    second = Dice(7)
+    rolls = [first.roll() for i in range(200)]
+    self.assertEqual(rolls, [second.roll() for i in range(200)])
+    for roll in rolls:
+      self.assertTrue(1 <= roll <= 6)
+    self.assertEqual(set(rolls), set(range(1, 7)))
+
+  def testUnbuffered(self):
+    dice = Dice(3, 0)
+    for i in range(100):
+      self.assertTrue(1 <= dice.roll() <= 6)
+      self.assertTrue(1 <= dice.randint(1, 99) <= 99)
+
+  def testChoiceShuffleSample(self):
+    dice = Dice(1)
+    items = list(range(20))
+    dice.shuffle(items)
+    self.assertEqual(sorted(items), list(range(20)))
+    self.assertTrue(dice.choice(["a", "b"]) in ["a", "b"])
+    picked = dice.sample(range(10), 4)
+    self.assertEqual(len(set(picked)), 4)
+    self.assertRaises(IndexError, dice.choice, [])
+    self.assertRaises(ValueError, dice.sample, range(3), 4)
+
+  def testRecordReplay(self):
+    dice = Dice(11)
+    recorded = dice.record()
+    rolls = [dice.roll() for i in range(10)]
+    choices = [dice.choice("abcdef") for i in range(5)]
+    self.assertEqual(len(dice.stopRecording()), 15)
+    other = Dice(99)
+    other.replay(recorded)
+    self.assertEqual([other.roll() for i in range(10)], rolls)
+    self.assertEqual([other.choice("abcdef") for i in range(5)], choices)
+    self.assertTrue(1 <= other.roll() <= 6)
+    other.replay([5])
+    self.assertRaises(ValueError, other.draw, 2)
+
+  def testLabyrinthUsesDice(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup, dice = Dice(5))
+    replay = Dice(5)
+    self.assertEqual(app.dice.roll(), replay.roll())
+    app = Labyrinth(1, 1, testBlankScenarioSetup, dice = Dice(bufferSize = 0))
+    app.dice.replay([0, 5])
+    app.testCountry("Iraq")
+    self.assertTrue(app.map["Iraq"].governance == 3)
+    app.testCountry("Egypt")
+    self.assertTrue(app.map["Egypt"].governance == 2)
+
+class snapshot(unittest.TestCase):
+  '''Test snapshot and restore'''
+
+  def testRoundTrip(self):
+    app = Labyrinth(1, 1)
+    app.prestige = 3
+    app.funding = 8
+    app.cells = 4
+    app.turn = 3
+    app.backlashInPlay = True
+    app.markers.append("Patriot Act")
+    app.lapsing.append("Biometrics")
+    app.map["Iraq"].governance = 4
+    app.map["Iraq"].alignment = "Adversary"
+    app.map["Iraq"].activeCells = 3
+    app.map["Iraq"].plots = 2
+    app.map["Iraq"].markers.append("Sadr")
+    app.map["Spain"].posture = "Soft"
+    data = app.snapshot()
+    self.assertTrue(len(data) < 1024)
+    before = app.history[:]
+    app.outputToHistory("after the snapshot")
+
+    app.prestige = 9
+    app.funding = 1
+    app.turn = 5
+    app.backlashInPlay = False
+    app.markers = []
+    app.lapsing = []
+    app.map["Iraq"].governance = 1
+    app.map["Iraq"].alignment = "Ally"
+    app.map["Iraq"].activeCells = 0
+    app.map["Iraq"].plots = 0
+    app.map["Iraq"].markers = []
+    app.map["Spain"].posture = "Hard"
+    app.restore(data)
+
+    self.assertTrue(app.prestige == 3)
+    self.assertTrue(app.funding == 8)
+    self.assertTrue(app.cells == 4)
+    self.assertTrue(app.turn == 3)
+    self.assertTrue(app.backlashInPlay)
+    self.assertTrue(app.markers == ["Patriot Act"])
+    self.assertTrue(app.lapsing == ["Biometrics"])
+    self.assertTrue(app.map["Iraq"].governance == 4)
+    self.assertTrue(app.map["Iraq"].alignment == "Adversary")
+    self.assertTrue(app.map["Iraq"].activeCells == 3)
+    self.assertTrue(app.map["Iraq"].plots == 2)
+    self.assertTrue(app.map["Iraq"].markers == ["Sadr"])
+    self.assertTrue(app.map["Spain"].posture == "Soft")
+    self.assertTrue(app.history == before)
+    self.assertEqual(app.snapshot(), data)
+
+  def testKeepsEnumsAndStrings(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    untested = app.map["Canada"].posture
+    tested = app.map["Iraq"].governance
+    app.map["Egypt"].alignment = "Neutral"
+    data = app.snapshot()
+    app.map["Canada"].posture = "Hard"
+    app.map["Iraq"].governance = 3
+    app.map["Egypt"].alignment = "Ally"
+    app.restore(data)
+    self.assertTrue(app.map["Canada"].posture is untested)
+    self.assertTrue(app.map["Iraq"].governance is tested)
+    self.assertTrue(app.map["Egypt"].alignment == "Neutral")
+
+  def testBadData(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    data = app.snapshot()
+    self.assertRaises(ValueError, app.restore, b"XXXX" + data[4:])
+    self.assertRaises(ValueError, app.restore, data[:4] + b"\x63\x00" + data[6:])
+
+  def testSaveLoad(self):
+    app = Labyrinth(1, 1)
+    app.prestige = 11
+    app.Save("test_snapshot.lwot")
+    app.prestige = 2
+    app.Load("test_snapshot.lwot")
+    os.remove("test_snapshot.lwot")
+    self.assertTrue(app.prestige == 11)
+
+def runCommand(app, line):
+  line = app.precmd(line)
+  stop = app.onecmd(line)
+  app.postcmd(stop, line)
+
+class journal(unittest.TestCase):
+  '''Test undo journal'''
+
+  def testDeltas(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    app.journal.begin()
+    app.journal.commit("status")
+    self.assertTrue(app.journal.undoStack == [])
+    app.journal.begin()
+    app.prestige = 3
+    app.map["Iraq"].activeCells = 2
+    app.map["Iraq"].markers.append("Sadr")
+    entry = app.journal.commit("j 5")
+    self.assertTrue(len(entry.changes) == 3)
+
+  def testRecordsFromSetters(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    app.map["Iraq"].plots = 1
+    self.assertTrue(app.journal.touched is None)
+    app.journal.begin()
+    app.map["Iraq"].plots = 2
+    app.map["Iraq"].plots = 3
+    posture = app.map["Spain"].posture
+    app.map["Spain"].posture = "Hard"
+    app.map["Spain"].posture = posture
+    app.turn = 4
+    app.clone().map["Iraq"].plots = 0
+    self.assertTrue(len(app.journal.touched) == 3)
+    entry = app.journal.commit("j 5")
+    self.assertTrue(entry.changes == [(app.map["Iraq"], "plots", 1, 3), (app, "turn", 1, 4)])
+    app.journal.undo()
+    self.assertTrue(app.map["Iraq"].plots == 1 and app.turn == 1)
+
+  def testUndoRedo(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    start = app.snapshot()
+    app.journal.begin()
+    app.prestige = 3
+    app.outputToHistory("card one")
+    app.journal.commit("j 5")
+    first = app.snapshot()
+    app.journal.begin()
+    app.map["Spain"].posture = "Hard"
+    app.journal.commit("u 7")
+    app.journal.begin()
+    app.map["Iraq"].plots = 1
+    app.lapsing.append("Biometrics")
+    app.journal.commit("alert")
+    last = app.snapshot()
+
+    self.assertTrue(len(app.journal.undo()) == 2)
+    self.assertEqual(app.snapshot(), first)
+    self.assertTrue(len(app.journal.undo()) == 1)
+    self.assertEqual(app.snapshot(), start)
+    self.assertTrue("card one" not in app.history)
+    self.assertTrue(app.journal.undo() == [])
+
+    self.assertTrue(len(app.journal.redo()) == 1)
+    self.assertEqual(app.snapshot(), first)
+    self.assertTrue("card one" in app.history)
+    self.assertTrue(len(app.journal.redo()) == 2)
+    self.assertEqual(app.snapshot(), last)
+    self.assertTrue(app.lapsing == ["Biometrics"])
+
+  def testUndoCommand(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup, ["y"])
+    app.autoSave = False
+    start = app.snapshot()
+    app.journal.begin()
+    app.funding = 1
+    app.journal.commit("j 5")
+    runCommand(app, "undo")
+    self.assertTrue(app.funding == 5)
+    self.assertEqual(app.snapshot(), start)
+    runCommand(app, "redo")
+    self.assertTrue(app.funding == 1)
+
+  def testRollback(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup, ["0"])
+    app.autoSave = False
+    start = app.snapshot()
+    runCommand(app, "turn")
+    app.journal.begin()
+    app.prestige = 1
+    app.journal.commit("j 5")
+    self.assertTrue(app.turn == 2)
+    runCommand(app, "rollback")
+    self.assertTrue(app.turn == 1)
+    self.assertEqual(app.snapshot(), start)
+
+class checkpointer(unittest.TestCase):
+  '''Test Checkpointer'''
+
+  def testWrites(self):
+    writer = Checkpointer()
+    writer.write("test_checkpoint.lwot", b"first")
+    writer.write("test_checkpoint.lwot", b"second")
+    thread = writer.thread
+    writer.flush()
+    thread.join(5)
+    self.assertFalse(thread.is_alive())
+    self.assertTrue(writer.thread is None)
+    f = open("test_checkpoint.lwot", "rb")
+    data = f.read()
+    f.close()
+    os.remove("test_checkpoint.lwot")
+    self.assertEqual(data, b"second")
+    self.assertTrue(writer.error is None)
+
+class worldPosture(unittest.TestCase):
+  '''Test cached world posture'''
+
+  def testCounter(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    self.assertTrue(app.worldPosture == 0)
+    app.map["Spain"].posture = "Hard"
+    app.map["France"].posture = "Hard"
+    app.map["Canada"].posture = "Soft"
+    self.assertTrue(app.worldPosture == 1)
+    app.map["United States"].posture = "Soft"
+    self.assertTrue(app.worldPosture == 1)
+    app.map["France"].posture = ""
+    self.assertTrue(app.worldPosture == 0)
+    app.map["Canada"].posture = "Soft"
+    self.assertTrue(app.worldPosture == 0)
+
+  def testUsedByPenalty(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    app.map["United States"].posture = "Hard"
+    for country in ["Spain", "France", "Germany", "Russia"]:
+      app.map[country].posture = "Soft"
+    self.assertTrue(app.gwotPenalty() == -3)
+    self.assertTrue(app.gwot() == ("Soft", 3))
+    app.map["United States"].posture = "Soft"
+    self.assertTrue(app.gwotPenalty() == 0)
+
+  def testRestore(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    data = app.snapshot()
+    app.map["Spain"].posture = "Hard"
+    app.map["India"].posture = "Hard"
+    self.assertTrue(app.worldPosture == 2)
+    app.restore(data)
+    self.assertTrue(app.worldPosture == 0)
+
+class boardIndex(unittest.TestCase):
+  '''Test BoardIndex'''
+
+  def testTracksAssignments(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    index = app.boardIndex
+    self.assertTrue("Iraq" not in index.cells)
+    app.map["Iraq"].sleeper_cells = 2
+    self.assertTrue("Iraq" in index.cells)
+    app.map["Iraq"].sleeper_cells -= 2
+    self.assertTrue("Iraq" not in index.cells)
+    app.map["Iraq"].governance = 4
+    self.assertTrue(index.withGovernance(4) == set(["Iraq"]))
+    self.assertTrue(app.numIslamicRule() == 1)
+    app.map["Iraq"].governance = 3
+    self.assertTrue(app.numIslamicRule() == 0)
+    app.map["Iraq"].alignment = "Adversary"
+    self.assertTrue(app.numAdversary() == 1)
+    app.map["Gulf States"].besieged = 1
+    app.map["Gulf States"].regimeChange = 1
+    self.assertTrue(app.numBesieged() == 1)
+    self.assertTrue(app.numRegimeChange() == 1)
+
+  def testMarkers(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    self.assertTrue("Iraq" not in app.boardIndex.troops)
+    app.map["Iraq"].markers.append("NATO")
+    self.assertTrue("Iraq" in app.boardIndex.troops)
+    app.map["Iraq"].markers.remove("NATO")
+    self.assertTrue("Iraq" not in app.boardIndex.troops)
+    app.map["Iraq"].markers = ["NATO"]
+    self.assertTrue("Iraq" in app.boardIndex.troops)
+
+  def testEnumAndStringAlignment(self):
+    app = Labyrinth(1, 1)
+    allies = [country for country in app.map if app.map[country].alignment == "Ally"]
+    self.assertTrue(app.boardIndex.ordered(app.boardIndex.withAlignment("Ally")) == allies)
+
+  def testMatchesScan(self):
+    app = Labyrinth(1, 1)
+    app.map["Pakistan"].troops_stationed = 2
+    app.map["Egypt"].governance = 3
+    app.map["Egypt"].aid = 1
+    app.map["Iraq"].cadre = 1
+    app.map["Spain"].activeCells = 1
+    troops = app.getCountriesWithTroopsByGovernance()
+    self.assertTrue("Pakistan" in troops["Fair"])
+    aid = app.getCountriesWithAidByGovernance()
+    self.assertTrue(aid["Poor"] == ["Egypt"])
+    muslim = app.getMuslimCountriesByGovernance()
+    for key in ["Good", "Fair", "Poor"]:
+      for country in muslim[key]:
+        self.assertTrue(app.map[country].culture != "Non-Muslim")
+    self.assertTrue(app.numDisruptable() == len([c for c in app.map if (app.map[c].totalCells(False) > 0 or app.map[c].cadre > 0) and (app.map[c].troops() > 0 or app.map[c].culture == "Non-Muslim" or app.map[c].alignment == "Ally")]))
+
+class board(unittest.TestCase):
+  '''Test Board'''
+
+  def testCountryIsView(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    iraq = app.map["Iraq"]
+    self.assertFalse(hasattr(iraq, "__dict__"))
+    self.assertTrue(len(app.board) == len(app.map))
+    iraq.activeCells = 2
+    iraq.posture = "Hard"
+    self.assertTrue(app.board.activeCells[iraq.id] == 2)
+    self.assertTrue(app.board.posture[iraq.id] == "Hard")
+    self.assertRaises(AttributeError, setattr, iraq, "activeCell", 1)
+
+  def testCopy(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    iraq = app.map["Iraq"]
+    iraq.plots = 1
+    iraq.markers.append("NATO")
+    copy = app.board.copy()
+    iraq.plots = 2
+    iraq.markers.remove("NATO")
+    self.assertTrue(copy.plots[iraq.id] == 1)
+    self.assertTrue(copy.markers[iraq.id] == ["NATO"])
+    self.assertTrue(copy.governance == app.board.governance)
+
+class clone(unittest.TestCase):
+  '''Test Labyrinth.clone'''
+
+  def testOwnValidator(self):
+    app = Labyrinth(1, 1, sink = NullSink())
+    app.validator = Validator("sampled", 3)
+    app.profiler = Profiler()
+    fork = app.clone()
+    self.assertTrue(fork.validator is not app.validator)
+    self.assertTrue(fork.validator.mode == "sampled" and fork.validator.sampleEvery == 3)
+    self.assertTrue(fork.checkpointer is not app.checkpointer)
+    self.assertTrue(fork.profiler is app.profiler)
+    fork.validator.afterCommand(fork)
+    fork.validator.afterCommand(fork)
+    self.assertTrue(app.validator.commands == 0 and fork.validator.commands == 2)
+
+  def testIndependent(self):
+    app = Labyrinth(1, 1)
+    fork = app.clone()
+    self.assertTrue(fork.deck is app.deck)
+    self.assertTrue(fork.distances is app.distances)
+    self.assertTrue(fork.map["Iraq"] is not app.map["Iraq"])
+    self.assertTrue(app.map["Iraq"] not in fork.map["Iraq"].links)
+    self.assertTrue(fork.map["Syria"] in fork.map["Iraq"].links)
+    fork.map["Iraq"].governance = 4
+    fork.map["Iraq"].markers.append("NATO")
+    fork.map["Canada"].posture = "Hard"
+    fork.prestige = 1
+    fork.markers.append("Patriot Act")
+    fork.outputToHistory("Fork only", False)
+    self.assertTrue(app.map["Iraq"].governance == 3)
+    self.assertTrue(app.map["Iraq"].markers == [])
+    self.assertTrue(fork.numIslamicRule() == app.numIslamicRule() + 1)
+    self.assertTrue("Iraq" in fork.boardIndex.troops)
+    self.assertTrue("Iraq" not in app.boardIndex.troops)
+    self.assertTrue(fork.worldPosture == app.worldPosture + 1)
+    self.assertTrue(app.prestige == 7)
+    self.assertTrue(app.markers == [])
+    self.assertTrue("Fork only" not in app.history)
+    self.assertFalse(fork.autoSave)
+
+  def testSameDice(self):
+    app = Labyrinth(1, 1, dice = Dice(3))
+    fork = app.clone()
+    self.assertTrue([fork.dice.roll() for i in range(20)] == [app.dice.roll() for i in range(20)])
+    other = app.clone(Dice(4))
+    self.assertTrue(other.dice is not app.dice)
+
+  def testUndo(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    fork = app.clone()
+    runCommand(fork, "j 107")
+    self.assertTrue(fork.journal.undoStack)
+    self.assertFalse(app.journal.undoStack)
+
+class dataCache(unittest.TestCase):
+  '''Test loadData'''
+
+  def setUp(self):
+    self.fname = "test_data_cache.yml"
+    with open(self.fname, "w") as f:
+      f.write("a: [1, 2]\nb: {c: true}\n")
+
+  def tearDown(self):
+    for fname in (self.fname, self.fname + ".cache"):
+      if os.path.exists(fname):
+        os.remove(fname)
+
+  def testCacheFile(self):
+    data = loadData(self.fname)
+    self.assertTrue(data == {"a": [1, 2], "b": {"c": True}})
+    self.assertTrue(os.path.exists(self.fname + ".cache"))
+    data["a"].append(3)
+    self.assertTrue(loadData(self.fname)["a"] == [1, 2])
+
+  def testInvalidated(self):
+    loadData(self.fname)
+    with open(self.fname, "w") as f:
+      f.write("a: [1, 2, 3, 4]\n")
+    os.utime(self.fname, (0, 0))
+    self.assertTrue(loadData(self.fname) == {"a": [1, 2, 3, 4]})
+
+  def testSameGame(self):
+    first = Labyrinth(4, 1)
+    second = Labyrinth(4, 1)
+    for country in first.map:
+      self.assertTrue(first.map[country].countryStr() == second.map[country].countryStr())
+    self.assertTrue(first.distances is second.distances)
+
+class cardRegistry(unittest.TestCase):
+  '''Test card registry'''
+
+  def testEveryCardRegistered(self):
+    app = Labyrinth(1, 1)
+    self.assertTrue(len(app.deck) == 120)
+    for number in range(1, 121):
+      self.assertTrue(number in CARD_PLAYABLE)
+      self.assertTrue(number in CARD_EVENTS)
+      self.assertTrue(CARD_PLAYABLE[number].reads is not None)
+      self.assertTrue(app.deck[str(number)].number == number)
+    self.assertTrue(CARD_PLAYABLE[8] is CARD_PLAYABLE[10])
+    self.assertTrue(CARD_PLAYABLE[2].reads == ())
+    self.assertTrue("input" in CARD_PLAYABLE[97].reads)
+
+  def testDoorOfItjihad(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    self.assertTrue(app.deck["96"].playable("Jihadist", app))
+    app.lapsing.append("The door of Itjihad was closed")
+    self.assertFalse(app.deck["96"].playable("Jihadist", app))
+    self.assertTrue(app.deck["96"].playable("US", app))
+    self.assertFalse(app.deck["49"].playable("Jihadist", app))
+
+class playableCache(unittest.TestCase):
+  '''Test board version and playability cache'''
+
+  def testVersion(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    version = app.version
+    app.map["Iraq"].plots = 1
+    self.assertTrue(app.version > version)
+    version = app.version
+    app.map["Iraq"].markers.append("NATO")
+    self.assertTrue(app.version > version)
+    version = app.version
+    app.markers.append("Patriot Act")
+    self.assertTrue(app.version > version)
+    version = app.version
+    app.lapsing = ["Biometrics"]
+    self.assertTrue(app.version > version)
+    version = app.version
+    app.prestige += 1
+    self.assertTrue(app.version > version)
+
+  def testInvalidated(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    self.assertFalse(app.deck["1"].playable("US", app))
+    self.assertTrue((1, "US") in app.playableCache)
+    app.map["Iraq"].plots = 1
+    self.assertTrue(app.deck["1"].playable("US", app))
+    self.assertFalse(app.deck["6"].playable("US", app))
+    app.markers.append("Patriot Act")
+    self.assertTrue(app.deck["6"].playable("US", app))
+    app.markers.remove("Patriot Act")
+    self.assertFalse(app.deck["6"].playable("US", app))
+
+  def testInputNotCached(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup, ["y", "n"])
+    self.assertTrue(app.deck["97"].playable("Jihadist", app))
+    self.assertFalse(app.deck["97"].playable("Jihadist", app))
+    self.assertTrue((97, "Jihadist") not in app.playableCache)
+
+class playableCards(unittest.TestCase):
+  '''Test playableCards'''
+
+  def testHand(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    app.map["Iraq"].plots = 1
+    app.map["Iraq"].activeCells = 1
+    app.map["Iraq"].troops_stationed = 2
+    cards = app.playableCards("US", [1, 8, 48, 97, 2])
+    self.assertTrue([card.number for card in cards] == [1, 8, 48, 97, 2])
+    self.assertTrue(cards[0].playable and cards[0].recommendation == "event")
+    self.assertTrue(cards[1].playable)
+    self.assertFalse(cards[2].playable)
+    self.assertTrue(cards[2].opponentEvent is None)
+    self.assertTrue(cards[2].recommendation == "ops")
+    self.assertTrue(cards[3].playable is None)
+    self.assertTrue(cards[4].ops == 1)
+
+  def testMatchesPlayable(self):
+    app = Labyrinth(2, 1)
+    for side in ["US", "Jihadist"]:
+      cards = app.playableCards(side)
+      self.assertTrue(len(cards) == 120)
+      for card in cards:
+        if card.playable is not None and card.opponentEvent is not None:
+          other = "Jihadist" if side == "US" else "US"
+          if app.deck[str(card.number)].type == other:
+            self.assertTrue(card.opponentEvent == app.deck[str(card.number)].playable(other, app))
+          else:
+            self.assertTrue(card.playable == app.deck[str(card.number)].playable(side, app))
+
+class history(unittest.TestCase):
+  '''Test History'''
+
+  def testRecords(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    start = len(app.history)
+    app.outputToHistory("%d cell(s) in %s.", False, 2, "Iraq")
+    record = app.history.records[-1]
+    self.assertTrue(record.message == "%d cell(s) in %s." and record.args == (2, "Iraq"))
+    self.assertTrue(record.turn == app.turn)
+    self.assertTrue(app.history.lines(start) == ["2 cell(s) in Iraq."])
+    self.assertTrue("2 cell(s) in Iraq." in app.history)
+    self.assertTrue(app.history.limit == HISTORY_LIMIT)
+
+  def testTypedRecords(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    app.map["Iraq"].governance = 3
+    app.map["Iraq"].alignment = "Adversary"
+    app.map["Iraq"].sleeper_cells = 1
+    app.executeRecruit("Iraq", 1, [1])
+    app.changePrestige(1)
+    recruits = app.history.select("recruit", "Iraq")
+    self.assertTrue([record.message for record in recruits] == ["* Recruit to %s", "Roll successful, %d sleeper cell(s) recruited."])
+    self.assertTrue(recruits[1].args == (1,))
+    self.assertTrue(app.history.select("country", "Iraq")[-1].message.startswith("Iraq"))
+    prestige = app.history.select("prestige")[-1]
+    self.assertTrue(prestige.country is None and prestige.args == (app.prestige,))
+    self.assertTrue(app.history[-1] == "Prestige now %d" % app.prestige)
+
+  def testBounded(self):
+    history = History(10)
+    for i in range(100):
+      history.add(1, "", "line %d", (i,))
+    self.assertTrue(len(history) == 100)
+    self.assertTrue(len(history.records) <= 13)
+    self.assertTrue(history.lines(95) == ["line %d" % i for i in range(95, 100)])
+    self.assertTrue(history[99] == "line 99" and history[-2] == "line 98")
+    self.assertTrue(history[97:] == ["line 97", "line 98", "line 99"])
+    self.assertRaises(IndexError, history.__getitem__, 5)
+    self.assertTrue("line 90" in history and "line 5" not in history)
+    self.assertTrue(history == history.lines() and history != history.lines()[1:])
+    history.truncate(97)
+    self.assertTrue(len(history) == 97)
+    self.assertTrue(history.lines()[-1] == "line 96")
+    history.truncate(5)
+    self.assertTrue(len(history) == 5 and history.lines() == [])
+
+  def testDisabled(self):
+    history = History(enabled = False)
+    history.add(1, "", "line")
+    self.assertTrue(len(history) == 0)
+
+class outputSink(unittest.TestCase):
+  '''Test output sinks'''
+
+  def testBuffered(self):
+    sink = BufferedSink()
+    app = Labyrinth(1, 1, testBlankScenarioSetup, sink = sink)
+    self.assertTrue("Game Start" in sink.lines)
+    sink.clear()
+    app.outputToHistory("%d cell(s) in %s.", True, 2, "Iraq")
+    app.output("SCHENGEN:", "Spain")
+    app.map["Iraq"].printCountry()
+    self.assertTrue(sink.lines[:3] == ["2 cell(s) in Iraq.", "", "SCHENGEN: Spain"])
+    self.assertTrue(sink.lines[3].startswith("Iraq"))
+
+  def testNull(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup, sink = NullSink())
+    app.outputToHistory("%d cell(s) in %s.", False, 2, "Iraq")
+    self.assertTrue("2 cell(s) in Iraq." in app.history)
+
+  def testTerminal(self):
+    stream = io.StringIO()
+    sink = TerminalSink(stream, 3)
+    sink.write("a")
+    sink.write("b")
+    self.assertTrue(stream.getvalue() == "")
+    sink.flush()
+    self.assertTrue(stream.getvalue() == "a\nb\n")
+    for line in "cde":
+      sink.write(line)
+    self.assertTrue(stream.getvalue() == "a\nb\nc\nd\ne\n" and sink.lines == [])
+
+  def testTerminalFlushesPerCommand(self):
+    stream = io.StringIO()
+    app = Labyrinth(1, 1, testBlankScenarioSetup, sink = TerminalSink(stream))
+    app.autoSave = False
+    app.onecmd("status")
+    self.assertTrue(stream.getvalue() == "")
+    app.postcmd(False, "status")
+    self.assertTrue("Game Start" in stream.getvalue() and "Prestige" in stream.getvalue())
+
+  def testJsonLines(self):
+    stream = io.StringIO()
+    app = Labyrinth(1, 1, testBlankScenarioSetup, sink = JsonLinesSink(stream))
+    rows = [json.loads(line) for line in stream.getvalue().splitlines()]
+    self.assertTrue([row["seq"] for row in rows] == list(range(len(rows))))
+    self.assertTrue("Game Start" in [row["text"] for row in rows])
+
+  def testCloneIsSilent(self):
+    sink = BufferedSink()
+    app = Labyrinth(1, 1, testBlankScenarioSetup, sink = sink)
+    sink.clear()
+    app.clone().outputToHistory("rollout")
+    self.assertTrue(sink.lines == [])
+
+class eventFeed(unittest.TestCase):
+  '''Test EventFeed'''
+
+  def testChanges(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    feed = app.openEventFeed()
+    app.map["Iraq"].sleeper_cells += 2
+    app.map["Iraq"].alignment = Alignment.ALLY
+    app.map["Iraq"].alignment = "Ally"
+    app.map["Iraq"].markers.append("NATO")
+    app.prestige += 1
+    app.lapsing.append("Biometrics")
+    events = list(feed.drain())
+    self.assertTrue([(e["country"], e["field"]) for e in events] == [("Iraq", "sleeper_cells"), ("Iraq", "alignment"),
+      ("Iraq", "markers"), (None, "prestige"), (None, "lapsing")])
+    self.assertTrue(events[0]["old"] == 0 and events[0]["new"] == 2 and events[0]["turn"] == app.turn)
+    self.assertTrue(events[1]["new"] == "Ally")
+    self.assertTrue(events[2]["new"] == ["NATO"] and events[4]["new"] == ["Biometrics"])
+    self.assertTrue([e["seq"] for e in events] == list(range(5)))
+    self.assertTrue(list(feed.drain()) == [])
+    app.closeEventFeed()
+    app.map["Iraq"].plots = 1
+    self.assertTrue(list(feed.drain()) == [])
+
+  def testStream(self):
+    class socketLike:
+      def __init__(self):
+        self.data = b""
+      def sendall(self, data):
+        self.data += data
+    stream = io.StringIO()
+    sock = socketLike()
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    app.openEventFeed(stream)
+    app.funding = 9 - app.funding
+    self.assertTrue(json.loads(stream.getvalue())["new"] == app.funding)
+    app.openEventFeed(sock)
+    app.map["Spain"].posture = "Hard"
+    self.assertTrue(json.loads(sock.data.decode("utf-8"))["field"] == "posture")
+
+  def testCloneHasNoFeed(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    feed = app.openEventFeed()
+    app.clone().map["Iraq"].plots = 2
+    self.assertTrue(list(feed.drain()) == [])
+
+class batchRolls(unittest.TestCase):
+  '''Test batched roll counts'''
+
+  def testRollCounts(self):
+    successes, failures = rollCounts([[1, 2, 6], [3, 3, 3], [6, 5, 4]], 3)
+    self.assertTrue(list(successes) == [2, 3, 0] and list(failures) == [1, 0, 3])
+    successes, failures = rollCounts([[1, 2, 6], [3, 3, 3]], [1, 2])
+    self.assertTrue(list(successes) == [1, 0] and list(failures) == [2, 3])
+
+  def testJihadMatchesExecuteJihad(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    app.map["Pakistan"].governance = 2
+    app.map["Pakistan"].alignment = "Neutral"
+    app.map["Pakistan"].sleeper_cells = 8
+    rolls = [[1, 2, 1], [1, 2, 3], [6, 6, 1], [2, 2, 2]]
+    successes, failures, revolutions = app.batchJihad("Pakistan", rolls)
+    self.assertTrue(list(successes) == [3, 2, 1, 3] and list(failures) == [0, 1, 2, 0])
+    self.assertTrue([bool(r) for r in revolutions] == [True, False, False, True])
+    for row, revolution in zip(rolls, revolutions):
+      other = app.clone()
+      other.executeJihad("Pakistan", row)
+      self.assertTrue((other.map["Pakistan"].governance == 4) == bool(revolution))
+    self.assertTrue(app.map["Pakistan"].governance == 2)
+    successes, failures, revolutions = app.batchJihad("Pakistan", [[1], [3]])
+    self.assertTrue(list(successes) == [1, 0] and not any(revolutions))
+
+  @unittest.skipIf(lwotai.numpy is None, "NumPy is not installed")
+  def testJihadNumPyMatchesLists(self):
+    rolls = [[a, b, c] for a in range(1, 7) for b in range(1, 7) for c in range(1, 7)]
+    revolutions = 0
+    for governance in (1, 2, 3):
+      for besieged in (0, 1):
+        app = Labyrinth(1, 1, testBlankScenarioSetup)
+        app.map["Pakistan"].governance = governance
+        app.map["Pakistan"].alignment = "Neutral"
+        app.map["Pakistan"].besieged = besieged
+        app.map["Pakistan"].sleeper_cells = 8
+        arrays = app.batchJihad("Pakistan", rolls)
+        original = lwotai.numpy
+        lwotai.numpy = None
+        try:
+          lists = app.batchJihad("Pakistan", rolls)
+        finally:
+          lwotai.numpy = original
+        revolutions += sum(lists[2])
+        for fromArrays, fromLists in zip(arrays, lists):
+          self.assertEqual([int(n) for n in fromArrays], [int(n) for n in fromLists])
+    self.assertTrue(revolutions > 0)
+
+  def testRecruitAndPlots(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    app.map["Iraq"].governance = 3
+    app.map["Iraq"].alignment = "Adversary"
+    rolls = app.dice.rollBatch(200, 2)
+    successes, failures = app.batchRecruit("Iraq", rolls)
+    self.assertTrue(list(successes) == [len([r for r in row if r <= 3]) for row in rolls])
+    self.assertTrue(list(app.batchRecruit("Iraq", rolls, 1)[0]) == [len([r for r in row if r <= 1]) for row in rolls])
+    self.assertTrue(list(app.batchPlots("Iraq", rolls)[0]) == list(successes))
+    app.map["Iraq"].regimeChange = 1
+    self.assertTrue(set(app.batchRecruit("Iraq", rolls)[0]) == set([2]))
+
+class odds(unittest.TestCase):
+  '''Test exact odds'''
+
+  def testSuccessOdds(self):
+    self.assertTrue(successOdds(2, 3) == (Fraction(1, 4), Fraction(1, 2), Fraction(1, 4)))
+    self.assertTrue(successOdds(0, 3) == (Fraction(1),))
+    self.assertTrue(successOdds(3, 6)[3] == 1)
+    self.assertTrue(("successOdds", 2, 3) in ODDS_CACHE)
+
+  def testJihadOdds(self):
+    successes, revolution = jihadOdds(3, 2, 0, True)
+    self.assertTrue(revolution == Fraction(1, 27))
+    self.assertTrue(jihadOdds(3, 2, 0, False)[1] == 0)
+    self.assertTrue(jihadOdds(2, 3, 1, True)[1] == 1 - Fraction(1, 4))
+    self.assertTrue(woiOdds(0) == (Fraction(1, 2), Fraction(1, 6), Fraction(1, 3)))
+    self.assertTrue(woiOdds(-3)[2] == 0)
+
+  def testBoard(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    app.map["Pakistan"].governance = 2
+    app.map["Pakistan"].alignment = "Neutral"
+    app.map["Pakistan"].sleeper_cells = 8
+    odds = app.odds("jihad", "Pakistan")
+    self.assertTrue(odds.rolls == 3 and odds.target == 2)
+    self.assertTrue(dict(odds.outcomes)["Islamic Revolution"] == Fraction(1, 27))
+    self.assertTrue(app.odds("recruit", "Pakistan", 2).successes == successOdds(2, 2))
+    app.map["Pakistan"].regimeChange = 1
+    self.assertTrue(app.odds("recruit", "Pakistan").successes[1] == 1)
+    app.prestige = 8
+    app.map["Pakistan"].aid = 1
+    modifier = sum([m for m, reason in app.woiModifiers("Pakistan")])
+    self.assertTrue(app.odds("woi", "Pakistan").outcomes == tuple(zip(("Fail", "Aid", "Success"), woiOdds(modifier))))
+    self.assertTrue(app.modifiedWoIRoll(3, "Pakistan") == 3 + modifier)
+    self.assertRaises(ValueError, app.odds, "alert", "Pakistan")
+
+  def testCommand(self):
+    sink = BufferedSink()
+    app = Labyrinth(1, 1, testBlankScenarioSetup, sink = sink)
+    app.map["Iraq"].governance = 3
+    sink.clear()
+    app.do_odds("plot iraq 2")
+    self.assertTrue(sink.lines[0] == "Plot in Iraq, 2 roll(s) succeeding on 3 or less:")
+    self.assertTrue(sink.lines[1:4] == ["  0 success(es):  25.0%", "  1 success(es):  50.0%", "  2 success(es):  25.0%"])
+
+class validator(unittest.TestCase):
+  '''Test Validator'''
+
+  def testRunningTotals(self):
+    app = Labyrinth(1, 1)
+    self.assertTrue(app.cellCount() == 15 and app.troopCount() == 15)
+    app.map["Iraq"].sleeper_cells += 2
+    app.cells -= 2
+    app.map["Iraq"].changeTroops(1)
+    app.troops -= 1
+    app.map["Iraq"].markers.append("NATO")
+    app.troops -= 2
+    self.assertTrue(app.cellCount() == 15 and app.troopCount() == 15)
+    other = app.clone()
+    other.map["Iraq"].activeCells += 1
+    self.assertTrue(other.cellCount() == 16 and app.cellCount() == 15)
+    self.assertTrue(Validator("always").audit(app) == [])
+
+  def testModes(self):
+    sink = BufferedSink()
+    app = Labyrinth(1, 1, sink = sink)
+    app.autoSave = False
+    app.cells += 1
+    self.assertTrue(Validator("off").afterCommand(app) == [])
+    sampled = Validator("sampled", 3)
+    self.assertTrue([len(sampled.afterCommand(app)) for i in range(6)] == [0, 0, 1, 0, 0, 1])
+    sink.clear()
+    app.validator = Validator("always")
+    app.postcmd(False, "status")
+    self.assertTrue(sink.lines == ["DEBUG: CELL COUNT 16"])
+    app.validator = Validator("strict")
+    self.assertRaises(InvariantError, app.postcmd, False, "status")
+    self.assertRaises(ValueError, Validator, "sometimes")
+
+  def testUntestedCountry(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup)
+    app.map["Iraq"].governance = 0
+    app.map["Iraq"].plots = 1
+    problems = Validator("always", checks = [piecesInTestedCountries]).audit(app)
+    self.assertTrue(len(problems) == 1 and problems[0].startswith("UNTESTED COUNTRY Iraq"))
+
+class profiler(unittest.TestCase):
+  '''Test Profiler'''
+
+  def testSpans(self):
+    profiler = Profiler(True)
+    with profiler.span("outer"):
+      with profiler.span("inner"):
+        pass
+      with profiler.span("inner"):
+        pass
+    calls, total, own = profiler.stats["outer"]
+    self.assertTrue(calls == 1 and profiler.stats["inner"][0] == 2)
+    self.assertTrue(abs(total - own - profiler.stats["inner"][1]) < 1e-9)
+    self.assertTrue(profiler.callers[("outer", "inner")][0] == 2 and profiler.callers[(None, "outer")][0] == 1)
+    self.assertTrue(len(profiler.trace) == 3)
+    stream = io.StringIO()
+    profiler.writeChromeTrace(stream)
+    self.assertTrue([e["name"] for e in json.loads(stream.getvalue())["traceEvents"]] == ["inner", "inner", "outer"])
+
+  def testFlowchart(self):
+    app = Labyrinth(1, 1, testScenarioSetup, sink = NullSink())
+    app.profiler = Profiler()
+    app.aiFlowChartTop(88)
+    self.assertTrue(app.profiler.stats["flowchart"][0] == 1)
+    self.assertTrue("event: Martyrdom Operation" in app.profiler.stats)
+    self.assertTrue(app.profiler.marks["DEBUG: START"] == 1)
+    self.assertTrue("Span" in app.profiler.table() and "DEBUG: START" in app.profiler.table())
+    fd, path = tempfile.mkstemp(suffix = ".stats")
+    os.close(fd)
+    try:
+      app.profiler.dumpStats(path)
+      stats = pstats.Stats(path)
+      self.assertTrue(("lwotai", 0, "flowchart") in stats.stats)
+    finally:
+      os.remove(path)
+
+class deckTracker(unittest.TestCase):
+  '''Test DeckTracker'''
+
+  def testDrawAndShuffle(self):
+    tracker = DeckTracker(Dice(3), 120, [43, 109])
+    expected = [n for n in range(1, 121) if n not in (43, 109)]
+    Dice(3).shuffle(expected)
+    self.assertTrue(tracker.cards(DRAW_PILE) == expected)
+    self.assertTrue(tracker.cards(REMOVED_PILE) == [43, 109])
+    self.assertTrue(tracker.draw("Jihadist", 9) == expected[:9])
+    self.assertTrue(tracker.hands["Jihadist"] == expected[:9] and tracker.cardsLeft() == 109)
+    self.assertTrue(tracker.canDraw(109) and not tracker.canDraw(110))
+    tracker.move(expected[20], REMOVED_PILE)
+    self.assertTrue(tracker.cardsLeft() == 108 and expected[20] not in tracker.cards(DRAW_PILE))
+    self.assertTrue(sorted(tracker.cards(DRAW_PILE)) == sorted(expected[9:20] + expected[21:]))
+    self.assertTrue(tracker.counts == [108, 0, 3, 0, 0, 0, 9])
+
+  def testPlayedAndReshuffle(self):
+    app = Labyrinth(1, 1, testScenarioSetup, sink = NullSink())
+    cards = list(app.deck.values())
+    removes = [card for card in cards if card.remove and not card.mark][0]
+    lapses = [card for card in cards if card.lapsing and not card.remove][0]
+    marks = [card for card in cards if card.mark and not card.remove and not card.lapsing][0]
+    tracker = DeckTracker(Dice(1), 120, [], 2)
+    for card in (removes, lapses, marks):
+      tracker.move(card.number, IN_PLAY)
+      tracker.played(card, True)
+    self.assertTrue(tracker.where[removes.number] == REMOVED_PILE and tracker.where[lapses.number] == LAPSING_PILE)
+    self.assertTrue(tracker.where[marks.number] == DISCARD_PILE and tracker.marked == set([marks.number]))
+    tracker.endTurn()
+    self.assertTrue(tracker.cards(DISCARD_PILE) == sorted([lapses.number, marks.number]))
+    self.assertTrue(len(tracker.draw("US", 117)) == 117 and tracker.deckNumber == 1)
+    self.assertTrue(tracker.draw("US", 2) and tracker.deckNumber == 2 and tracker.counts[DISCARD_PILE] == 0)
+    self.assertTrue(tracker.draw("US", 5) == [] and tracker.take("US") == tracker.cards(IN_PLAY)[0])
+
+  def testDealAndClone(self):
+    app = Labyrinth(1, 1, testScenarioSetup, dice = Dice(5), sink = NullSink())
+    app.trackDeck()
+    self.assertTrue(app.dealHands())
+    self.assertTrue(len(app.deckTracker.hands["Jihadist"]) == 8 and len(app.deckTracker.hands["US"]) == 8)
+    other = app.clone()
+    other.deckTracker.take("US")
+    other.deckTracker.draw("US", 1)
+    self.assertTrue(app.deckTracker.cardsLeft() == 104 and other.deckTracker.cardsLeft() == 103)
+    self.assertTrue(len(app.deckTracker.hands["US"]) == 8 and app.deckTracker.counts[IN_PLAY] == 0)
+    app.deckTracker.draw("US", 100)
+    self.assertFalse(app.dealHands())
+    self.assertTrue(len(app.deckTracker.hands["Jihadist"]) == 8)
+
+class usOperations(unittest.TestCase):
+  '''Test usOpError and the US operation handlers'''
+
+  def testUSOpError(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup, sink = NullSink())
+    self.assertTrue(app.usOpError("alert", "Iraq") == "Country has not plots.")
+    app.map["Iraq"].plots = 1
+    self.assertTrue(app.usOpError("alert", "Iraq") is None)
+    self.assertTrue(app.usOpError("disrupt", "Iraq").startswith("There are no cells"))
+    app.map["Iraq"].sleeper_cells = 1
+    self.assertTrue(app.usOpError("disrupt", "Iraq") == "You can't disrupt there.")
+    app.map["Iraq"].changeTroops(1)
+    self.assertTrue(app.usOpError("disrupt", "Iraq") is None)
+    self.assertTrue(app.usOpError("woi", "United States") is not None and app.usOpError("woi", "France") is None)
+    self.assertTrue(app.usOpError("regime", "Iraq") == "Country not Islamic Rule.")
+    self.assertTrue(app.usOpError("regime") is None and app.usOpError("withdraw") is not None)
+    app.map["United States"].posture = "Soft"
+    self.assertTrue(app.usOpError("regime", "Iraq") == "No Regime Change with US Posture Soft")
+
+  def testListsAgree(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup, sink = NullSink())
+    app.map["Pakistan"].alignment = Alignment.ALLY
+    app.map["Pakistan"].sleeper_cells = 1
+    app.map["Saudi Arabia"].alignment = "Ally"
+    app.map["Saudi Arabia"].sleeper_cells = 1
+    app.map["Iraq"].cadre = 1
+    app.map["Iraq"].changeTroops(2)
+    app.map["Syria"].alignment = Alignment.NEUTRAL
+    app.map["Gulf States"].alignment = "Neutral"
+    disruptable = app.disruptableCountries()
+    self.assertTrue("Saudi Arabia" in disruptable and "Iraq" in disruptable and "Pakistan" not in disruptable)
+    self.assertTrue(app.numDisruptable() == len(disruptable))
+    sink = BufferedSink()
+    app.sink = sink
+    app.listWoICountries()
+    listed = set(line.split(",")[0] for line in sink.lines)
+    for name, country in app.map.items():
+      if "FATA" not in country.markers:
+        self.assertEqual(app.usOpError("disrupt", name) is None, name in disruptable)
+      if country.culture != "Non-Muslim":
+        self.assertEqual(app.usOpError("woi", name) is None, name in listed)
+
+  def testHandlers(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup, sink = NullSink())
+    troops = app.troops
+    self.assertTrue(app.handleDeploy("track", "Iraq", 3))
+    self.assertTrue(app.troops == troops - 3 and app.map["Iraq"].troops() == 3)
+    app.map["Iraq"].regimeChange = 1
+    self.assertFalse(app.handleDeploy("Iraq", "track", 1))
+    self.assertTrue(app.map["Iraq"].troops() == 3)
+    app.handleWoI("France", 5)
+    self.assertTrue(app.map["France"].posture == "Hard")
+    app.map["Gulf States"].governance = 2
+    app.map["Gulf States"].alignment = "Neutral"
+    app.handleWoI("Gulf States", 6)
+    self.assertTrue(app.map["Gulf States"].alignment == "Ally")
+
+  def testPromptAdapter(self):
+    app = Labyrinth(1, 1, testBlankScenarioSetup, ["Iraq", "Spain"], sink = NullSink())
+    app.map["Spain"].sleeper_cells = 1
+    app.do_disrupt("")
+    self.assertTrue(app.map["Spain"].sleeper_cells == 0 and app.map["Spain"].activeCells == 1)
+    app = Labyrinth(1, 1, testBlankScenarioSetup, ["Iraq"], sink = NullSink())
+    app.map["United States"].posture = "Hard"
+    app.do_withdraw("")
+    self.assertTrue(app.testUserInput == ["Iraq"])
+
 if __name__ == "__main__":
   unittest.main()   
@@ -0,0 +1,80 @@
+'''
+Tests for the LWOTai Monte Carlo runner.
+'''
+from montecarlo import Aggregator, RunningStat, wilsonInterval, gameSeed, runSweep
+from simulator import GameResult
+import unittest
+
+def result(winner, turns, prestige, funding, scenario = 1, ideology = 1):
+  return GameResult(scenario, ideology, 0, winner, "test", turns, 10, prestige, funding, 0)
+
+class wilson(unittest.TestCase):
+  '''Test wilsonInterval'''
+
+  def testBounds(self):
+    self.assertEqual(wilsonInterval(0, 0), (0.0, 0.0))
+    low, high = wilsonInterval(50, 100)
+    self.assertTrue(0.40 < low < 0.41)
+    self.assertTrue(0.59 < high < 0.60)
+    low, high = wilsonInterval(0, 10)
+    self.assertEqual(low, 0.0)
+    self.assertTrue(high > 0.0)
+    low, high = wilsonInterval(10, 10)
+    self.assertTrue(low < 1.0)
+    self.assertTrue(abs(high - 1.0) < 1e-9)
+
+class runningStat(unittest.TestCase):
+  '''Test RunningStat'''
+
+  def testMeanAndDeviation(self):
+    stat = RunningStat()
+    for x in (2, 4, 4, 4, 5, 5, 7, 9):
+      stat.add(x)
+    self.assertEqual(stat.mean, 5.0)
+    self.assertTrue(abs(stat.stdev() - 2.13809) < 1e-4)
+    self.assertTrue(stat.halfWidth() > 0)
+
+class aggregator(unittest.TestCase):
+  '''Test Aggregator'''
+
+  def testAdd(self):
+    agg = Aggregator()
+    agg.add(result("US", 3, (7, 8, 9), (5, 4, 3)))
+    agg.add(result("Jihadist", 5, (7, 6), (5, 6)))
+    agg.add(result("US", 2, (3,), (9,), 2, 1))
+    self.assertEqual(agg.games(), 3)
+    summary = agg.summary()
+    cell = summary[(1, 1)]
+    self.assertEqual(cell["games"], 2)
+    self.assertEqual(cell["winRate"]["US"][0], 0.5)
+    self.assertEqual(cell["turns"][0], 4.0)
+    self.assertEqual(cell["prestige"][1][0], 7.0)
+    self.assertEqual(cell["prestige"][2][2], 1)
+    self.assertEqual(summary[(2, 1)]["winRate"]["US"][0], 1.0)
+    self.assertTrue("Scenario 2" in agg.report())
+
+class sweep(unittest.TestCase):
+  '''Test runSweep'''
+
+  def testSeeds(self):
+    self.assertNotEqual(gameSeed(0, 1, 1, 0), gameSeed(0, 1, 2, 0))
+    self.assertNotEqual(gameSeed(0, 1, 1, 0), gameSeed(1, 1, 1, 0))
+
+  def testWorkersDoNotChangeResults(self):
+    serial = runSweep(2, (1, 3), (1, 5), workers = 1, chunkSize = 1)
+    pooled = runSweep(2, (1, 3), (1, 5), workers = 2, chunkSize = 1)
+    self.assertEqual(serial.games(), 8)
+    for key, cell in serial.summary().items():
+      other = pooled.summary()[key]
+      self.assertEqual(cell["games"], other["games"])
+      self.assertEqual(cell["winRate"], other["winRate"])
+      self.assertAlmostEqual(cell["turns"][0], other["turns"][0])
+      self.assertEqual(len(cell["prestige"]), len(other["prestige"]))
+
+  def testDecks(self):
+    one = runSweep(2, (1,), (1,), workers = 1)
+    two = runSweep(2, (1,), (1,), workers = 1, decks = 2)
+    self.assertTrue(two.summary()[(1, 1)]["turns"][0] >= one.summary()[(1, 1)]["turns"][0])
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,111 @@
+'''
+Tests for non-blocking LWOTai sessions.
+'''
+from lwotai import Labyrinth, Dice, NullSink
+from session import Session, DecisionRequired
+import io
+import json
+import asyncio
+import unittest
+
+WITHDRAW_ANSWERS = ["Iraq", "track", "6", "r", "r", "r"]
+
+def withdrawGame(testUserInput = []):
+  '''Scenario 1 with six troops in Regime Change Iraq and the US Soft.'''
+  app = Labyrinth(1, 1, testUserInput = testUserInput, dice = Dice(8), sink = NullSink())
+  app.map["Iraq"].regimeChange = 1
+  app.map["Iraq"].changeTroops(6)
+  app.troops -= 6
+  app.map["United States"].posture = "Soft"
+  return app
+
+class session(unittest.TestCase):
+  '''Test Session'''
+
+  def testDecisions(self):
+    app = withdrawGame()
+    s = Session(app)
+    prompts = []
+    decision = s.submit("withdraw")
+    for answer in WITHDRAW_ANSWERS:
+      self.assertTrue(isinstance(decision, DecisionRequired))
+      self.assertTrue(app.map["Iraq"].troops() == 6)
+      self.assertRaises(ValueError, s.submit, "status")
+      prompts.append(decision.prompt)
+      decision = s.answer(answer)
+    self.assertTrue(decision is None)
+    self.assertTrue(prompts[0].startswith("Withdrawl in what country"))
+    self.assertTrue(prompts[3].startswith("Enter first die"))
+    self.assertRaises(ValueError, s.answer, "r")
+
+    # The same game played at a console with the same answers ends up the same.
+    direct = withdrawGame(WITHDRAW_ANSWERS[:])
+    direct.do_withdraw("")
+    self.assertEqual(app.snapshot(), direct.snapshot())
+    self.assertEqual(app.dice.roll(), direct.dice.roll())
+    # Replays do not repeat lines already read.
+    lines = s.read()
+    self.assertTrue(sum(1 for line in lines if line.startswith("Roll: ")) == 3)
+    self.assertTrue(s.read() == [])
+
+  def testJournalIdleWhileWaiting(self):
+    app = withdrawGame()
+    s = Session(app)
+    self.assertTrue(isinstance(s.submit("withdraw"), DecisionRequired))
+    self.assertTrue(app.journal.touched is None)
+    self.assertFalse(hasattr(app.journal, "before"))
+    for answer in WITHDRAW_ANSWERS:
+      s.answer(answer)
+    self.assertTrue(app.journal.touched is None)
+    self.assertTrue(app.journal.undoStack[-1].label == "withdraw")
+
+  def testGenerator(self):
+    s = Session(withdrawGame())
+    play = s.play("withdraw")
+    decision = next(play)
+    answers = iter(WITHDRAW_ANSWERS)
+    try:
+      while True:
+        decision = play.send(next(answers))
+    except StopIteration:
+      pass
+    self.assertTrue(s.app.map["Iraq"].troops() == 0 and s.pending is None)
+
+  def testAsync(self):
+    sessions = [Session(withdrawGame()) for i in range(3)]
+    async def run(s):
+      answers = iter(WITHDRAW_ANSWERS)
+      async def ask(prompt):
+        await asyncio.sleep(0)
+        return next(answers)
+      await s.playAsync("withdraw", ask)
+    async def runAll():
+      await asyncio.gather(*[run(s) for s in sessions])
+    asyncio.run(runAll())
+    self.assertTrue(all(s.app.map["Iraq"].besieged == 1 for s in sessions))
+    self.assertEqual(sessions[0].app.snapshot(), sessions[2].app.snapshot())
+
+  def testEventFeed(self):
+    stream = io.StringIO()
+    app = withdrawGame()
+    app.openEventFeed(stream)
+    s = Session(app)
+    decision = s.submit("withdraw")
+    for answer in WITHDRAW_ANSWERS:
+      decision = s.answer(answer)
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    self.assertTrue([e["seq"] for e in events] == list(range(len(events))))
+    self.assertTrue(len([e for e in events if e["field"] == "besieged"]) == 1)
+
+  def testQuitAndTrackedDeck(self):
+    app = Labyrinth(1, 1, dice = Dice(2), sink = NullSink())
+    app.trackDeck()
+    app.dealHands()
+    s = Session(app)
+    self.assertTrue(s.submit("status") is None and not s.finished)
+    self.assertTrue("DECK" in s.read())
+    self.assertTrue(s.submit("quit").prompt == "Save? (y/n): " and not s.finished)
+    self.assertTrue(s.answer("n") is None and s.finished)
+
+if __name__ == "__main__":
+  unittest.main()
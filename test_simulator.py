@@ -0,0 +1,189 @@
+'''
+Tests for the headless LWOTai simulator.
+'''
+from simulator import Simulator, USPolicy, SimpleUSPolicy, HeuristicUSBot, SCENARIO_REMOVED_CARDS
+from lwotai import Labyrinth, Dice, NullSink, Checkpointer, DISCARD_PILE, REMOVED_PILE
+import io
+import json
+import unittest
+
+class recordingPolicy(SimpleUSPolicy):
+  '''Simple policy that remembers the cards it was handed.'''
+
+  def __init__(self):
+    self.played = []
+
+  def playCard(self, app, cardNum):
+    self.played.append(cardNum)
+    SimpleUSPolicy.playCard(self, app, cardNum)
+
+class simulator(unittest.TestCase):
+  '''Test Simulator'''
+
+  def testRunsToCompletion(self):
+    for scenario in range(1, 5):
+      result = Simulator(scenario, 1, 1).run()
+      self.assertTrue(result.winner in ("US", "Jihadist", "Draw"))
+      self.assertTrue(result.reason != "")
+      self.assertTrue(result.turns >= 1)
+      self.assertTrue(result.cardsPlayed > 0)
+      self.assertTrue(len(result.prestige) == len(result.funding))
+      self.assertTrue(result.prestige[0] > 0)
+
+  def testSeedIsReproducible(self):
+    self.assertEqual(Simulator(2, 3, 99).run(), Simulator(2, 3, 99).run())
+
+  def testPluggablePolicy(self):
+    policy = recordingPolicy()
+    result = Simulator(4, 1, 5, policy).run()
+    self.assertTrue(len(policy.played) > 0)
+    for cardNum in policy.played:
+      self.assertTrue(cardNum not in SCENARIO_REMOVED_CARDS[4])
+
+  def testBaseInterface(self):
+    self.assertRaises(NotImplementedError, USPolicy().playCard, None, 1)
+    self.assertTrue(USPolicy().answer(None, "Enter a or s") is None)
+
+  def testStrictRaises(self):
+    class brokenPolicy(USPolicy):
+      def playCard(self, app, cardNum):
+        raise ValueError(cardNum)
+    self.assertTrue(Simulator(1, 1, 3, brokenPolicy()).run().errors > 0)
+    self.assertRaises(ValueError, Simulator(1, 1, 3, brokenPolicy(), strict = True).run)
+
+  def testNoSaveFiles(self):
+    writes = []
+    original = Checkpointer.write
+    Checkpointer.write = lambda checkpointer, fname, data: writes.append(fname)
+    try:
+      result = Simulator(1, 1, 11, maxTurns = 2).run()
+    finally:
+      Checkpointer.write = original
+    self.assertTrue(result.turns <= 2)
+    self.assertEqual(writes, [])
+
+  def testEventStream(self):
+    stream = io.StringIO()
+    result = Simulator(1, 1, 7, eventStream = stream).run()
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    self.assertTrue(len(events) > 0)
+    self.assertEqual(events[-1]["seq"], len(events) - 1)
+    self.assertEqual(Simulator(1, 1, 7).run(), result)
+
+  def testDecks(self):
+    short = Simulator(1, 1, 2, maxTurns = 40).run()
+    self.assertEqual(short.reason, "Deck exhausted")
+    sim = Simulator(1, 1, 2, maxTurns = 40, decks = 2)
+    result = sim.run()
+    self.assertTrue(sim.app.deckTracker.deckNumber == 2)
+    self.assertTrue(result.turns > short.turns)
+
+  def testHeuristicBot(self):
+    for scenario in range(1, 5):
+      result = Simulator(scenario, 2, 13, HeuristicUSBot(), strict = True).run()
+      self.assertTrue(result.winner in ("US", "Jihadist", "Draw"))
+    self.assertEqual(Simulator(3, 1, 4, HeuristicUSBot()).run(), Simulator(3, 1, 4, HeuristicUSBot()).run())
+
+def simulatorBoard():
+  '''A Simulator holding a fresh scenario 1 game, ready for single cards.'''
+  sim = Simulator(1, 1, 5, strict = True)
+  sim.app = Labyrinth(1, 1, dice = Dice(5), sink = NullSink())
+  sim.app.my_raw_input = sim.respond
+  sim.app.trackDeck()
+  return sim
+
+class playedEvents(unittest.TestCase):
+  '''Test that played cards are put away by what their events did'''
+
+  def testCellEventWithoutCells(self):
+    sim = simulatorBoard()
+    sim.app.cells = 0
+    sim.playJihadistCard(55)
+    self.assertTrue(55 in sim.app.deckTracker.cards(DISCARD_PILE))
+    self.assertTrue(55 not in sim.app.deckTracker.cards(REMOVED_PILE))
+
+    sim = simulatorBoard()
+    sim.playJihadistCard(55)
+    self.assertTrue(55 in sim.app.deckTracker.cards(REMOVED_PILE))
+
+  def testUSEventOnJihadistTurn(self):
+    sim = simulatorBoard()
+    sim.playJihadistCard(16)
+    self.assertTrue(16 in sim.app.deckTracker.cards(REMOVED_PILE))
+    self.assertTrue(16 not in sim.app.deckTracker.cards(DISCARD_PILE))
+
+def botBoard():
+  '''Scenario 1 with Afghanistan no longer under Islamist Rule.'''
+  app = Labyrinth(1, 1, dice = Dice(1), sink = NullSink())
+  app.map["Afghanistan"].governance = 3
+  return app
+
+def opsCard(app, ops):
+  '''A Jihadist card with ops Ops, so the bot cannot play its event.'''
+  for number in range(1, 121):
+    card = app.deck[str(number)]
+    if card.type == "Jihadist" and card.ops == ops:
+      return number
+
+class heuristicBot(unittest.TestCase):
+  '''Test HeuristicUSBot decisions'''
+
+  def testRegimeChange(self):
+    app = botBoard()
+    app.map["Afghanistan"].governance = 4
+    HeuristicUSBot().playCard(app, opsCard(app, 3))
+    self.assertTrue(app.map["Afghanistan"].regimeChange == 1)
+    self.assertTrue(app.map["Afghanistan"].troops() == 9 and app.troops == 2)
+
+    # Without enough troops on the track, they come from the country with most to spare.
+    app = botBoard()
+    app.map["Iraq"].governance = 4
+    app.troops = 3
+    app.map["Pakistan"].changeTroops(10)
+    HeuristicUSBot().playCard(app, opsCard(app, 3))
+    self.assertTrue(app.map["Iraq"].regimeChange == 1 and app.map["Iraq"].troops() == 6)
+    self.assertTrue(app.map["Pakistan"].troops() == 4 and app.troops == 3)
+
+  def testWithdraw(self):
+    app = botBoard()
+    app.map["United States"].posture = "Soft"
+    app.map["Iraq"].regimeChange = 1
+    app.map["Iraq"].changeTroops(7)
+    app.troops = 4
+    HeuristicUSBot().playCard(app, opsCard(app, 3))
+    self.assertTrue(app.map["Iraq"].troops() == 0 and app.troops == 11)
+    self.assertTrue(app.map["Iraq"].besieged == 1)
+
+    app = botBoard()
+    app.map["United States"].posture = "Soft"
+    app.map["Iraq"].regimeChange = 1
+    app.map["Iraq"].changeTroops(7)
+    HeuristicUSBot().playCard(app, opsCard(app, 3))
+    self.assertTrue(app.map["Iraq"].troops() == 7)
+
+  def testDeploy(self):
+    app = botBoard()
+    app.map["Pakistan"].governance = 2
+    app.map["Pakistan"].alignment = "Ally"
+    app.map["Pakistan"].sleeper_cells = 3
+    troops = app.troops
+    HeuristicUSBot().playCard(app, opsCard(app, 2))
+    self.assertTrue(app.map["Pakistan"].troops() == 2 and app.troops == troops - 2)
+    self.assertTrue(app.map["Pakistan"].sleeper_cells == 3)
+    HeuristicUSBot().playCard(app, opsCard(app, 2))
+    self.assertTrue(app.map["Pakistan"].sleeper_cells == 1 and app.map["Pakistan"].activeCells == 2)
+
+  def testPlaysEvents(self):
+    class recordingBot(HeuristicUSBot):
+      def __init__(self):
+        self.events = 0
+      def playCard(self, app, cardNum):
+        played = HeuristicUSBot.playCard(self, app, cardNum)
+        self.events += bool(played)
+        return played
+    bot = recordingBot()
+    Simulator(1, 1, 3, bot, strict = True).run()
+    self.assertTrue(bot.events > 0)
+
+if __name__ == "__main__":
+  unittest.main()